@@ -1,6 +1,6 @@
 TCL_NAME="$1"
 
-export TOP_PROJ_DIR="/ISPD26-Contest"
+export TOP_PROJ_DIR="${TOP_PROJ_DIR:-/ISPD26-Contest}"
 export PROJ_DIR="${TOP_PROJ_DIR}/scripts"
 
 export DESIGN_NAME="bsg_chip"
@@ -9,13 +9,46 @@ export FOLDER_NAME="TCP_1200_UTIL_0.30"
 export OUT_DIR="${TOP_PROJ_DIR}/solution/output/${TCL_NAME}/${DESIGN_NAME}/${FOLDER_NAME}"
 
 mkdir -p "${OUT_DIR}"
-export LOG_FILE="${OUT_DIR}/evaluation.log"
+# EVAL_LOG_COMPRESS=zstd|gzip streams the OpenROAD log through a compressor
+# (evaluation.log.zst / .gz); parse_log.py and the solution tools read either
+LOG_SUFFIX=""
+COMPRESS=""
+if [ "${EVAL_LOG_COMPRESS:-}" = zstd ] && command -v zstd > /dev/null; then
+  LOG_SUFFIX=".zst"
+  COMPRESS="zstd -q -3 -T0"
+elif [ "${EVAL_LOG_COMPRESS:-}" = zstd ] || [ "${EVAL_LOG_COMPRESS:-}" = gzip ]; then
+  LOG_SUFFIX=".gz"
+  COMPRESS="gzip -3"
+fi
+rm -f "${OUT_DIR}/evaluation.log" "${OUT_DIR}/evaluation.log.gz" "${OUT_DIR}/evaluation.log.zst"
+export LOG_FILE="${OUT_DIR}/evaluation.log${LOG_SUFFIX}"
 export METRICS_CSV="${OUT_DIR}/metrics.csv"
 export CONGESTION_REPORT="${OUT_DIR}/congestion_report.rpt"
-/OpenROAD/build/bin/openroad -exit ${PROJ_DIR}/evaluation.tcl > ${LOG_FILE}
+# run under the watchdog (budgets, resource_eval.csv) when the solution tree has it
+export SUPERVISOR="${TOP_PROJ_DIR}/solution/tools/or_supervisor.py"
+run_eval() {
+  if [ -f "${SUPERVISOR}" ] && [ "${OR_WATCHDOG:-1}" != 0 ]; then
+    python3 ${SUPERVISOR} --design ${DESIGN_NAME} --stage eval --run-dir ${OUT_DIR} \
+      -- /OpenROAD/build/bin/openroad -exit ${PROJ_DIR}/evaluation.tcl
+  else
+    /OpenROAD/build/bin/openroad -exit ${PROJ_DIR}/evaluation.tcl
+  fi
+}
+# status of OpenROAD/the supervisor, not the compressor; test_bench.sh sources
+# this script, so PIPESTATUS rather than a pipefail that would outlive it
+if [ -n "${COMPRESS}" ]; then
+  run_eval | ${COMPRESS} > ${LOG_FILE}
+  EVAL_RC=${PIPESTATUS[0]}
+else
+  run_eval > ${LOG_FILE}
+  EVAL_RC=$?
+fi
+if [ "${EVAL_RC}" -ne 0 ]; then
+  echo "Warning: evaluation of ${DESIGN_NAME} exited with status ${EVAL_RC}" >&2
+fi
 
 # output metrics to csv
 python3 ${PROJ_DIR}/parse_log.py ${LOG_FILE} --csv ${METRICS_CSV}
 
-
-
+# metrics.csv is written either way; the exit status reports a failed eval
+return ${EVAL_RC} 2> /dev/null || exit ${EVAL_RC}
@@ -125,41 +125,8 @@ report_power
 
 
 # ---- global routing overflow -----
-puts "Start Global Routing Results Analysis ..."
-set block [ord::get_db_block]
-set gcellgrid [$block getGCellGrid]
-set tech [$block getTech]
-set layers {}
-foreach layer [$tech getLayers] {
-  set routing_level [$layer getRoutingLevel]
-  if {$routing_level > 0} {
-    lappend layers $layer
-  }
-}
-
-# set layers [lsort -unique $layers]
-set gird_x_count [llength [$gcellgrid getGridX]]
-set gird_y_count [llength [$gcellgrid getGridY]]
-
-## For loop for x from 0 to gird_x_count - 1
-for {set x 0} {$x < $gird_x_count} {incr x} {
-  for {set y 0} {$y < $gird_y_count} {incr y} {
-    set capacity_value 0
-    set usage_value 0
-    foreach layer $layers {
-      set capacity [$gcellgrid getCapacity $layer $x $y]
-      set usage [$gcellgrid getUsage $layer $x $y]
-      set capacity_value [expr $capacity_value + $capacity]
-      set usage_value [expr $usage_value + $usage]
-    }
-    set congestion 0
-    if {$capacity_value > 0} {
-    set congestion [expr ($usage_value *100.0) / $capacity_value]
-    }
-    puts "$x $y $capacity_value $usage_value $congestion"
-  }
-}
-puts "End Global Routing Results Analysis ..."
+source $proj_dir/gcell_usage.tcl
+gcell_usage_report "$::env(OUT_DIR)/gcell_usage.bin"
 
 
 report_check_types -max_slew         -violators 
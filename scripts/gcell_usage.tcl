@@ -0,0 +1,79 @@
+# Global-routing overflow of the current block, exported in bulk.
+#
+#   gcell_usage_report <file>
+#
+# Reads capacity/usage of every routing layer once per gcell and writes them
+# as one compact binary file instead of a printed line per gcell:
+#
+#   GCUSAGE1 <nx> <ny> <nlayers> <layer names...>\n
+#   per layer: capacity[nx*ny] then usage[nx*ny], int32 little-endian,
+#   x-major (index = x * ny + y)
+#
+# and prints the same overflow figures the per-gcell text dump produced
+# (overflow of a gcell = max(sum usage - sum capacity, 0) over layers):
+#
+#   [GCELL_DUMP] file=<file> nx=<nx> ny=<ny> layers=<n>
+#   max_gr_overflow:        <max>
+#   total_gr_overflow:      <sum>
+#
+# solution/tools/gr_overflow.py reads the file for per-layer hotspot reports.
+
+proc gcell_usage_report {file_name} {
+  set block [ord::get_db_block]
+  set gcellgrid [$block getGCellGrid]
+  set tech [$block getTech]
+  set layers {}
+  set names {}
+  foreach layer [$tech getLayers] {
+    if {[$layer getRoutingLevel] > 0} {
+      lappend layers $layer
+      lappend names [$layer getName]
+    }
+  }
+  set nx [llength [$gcellgrid getGridX]]
+  set ny [llength [$gcellgrid getGridY]]
+
+  # One pass over the gcells fills the per-layer columns of the file and,
+  # from the same getCapacity/getUsage results, the gcell's overflow.
+  set nlayers [llength $layers]
+  set idx {}
+  for {set i 0} {$i < $nlayers} {incr i} {
+    lappend idx $i
+    set caps($i) {}
+    set uses($i) {}
+  }
+  set max_over 0
+  set total_over 0
+  for {set x 0} {$x < $nx} {incr x} {
+    for {set y 0} {$y < $ny} {incr y} {
+      set cap 0
+      set use 0
+      foreach layer $layers i $idx {
+        lappend caps($i) [set c [$gcellgrid getCapacity $layer $x $y]]
+        lappend uses($i) [set u [$gcellgrid getUsage $layer $x $y]]
+        incr cap $c
+        incr use $u
+      }
+      if {$use > $cap} {
+        set over [expr {$use - $cap}]
+        incr total_over $over
+        if {$over > $max_over} {
+          set max_over $over
+        }
+      }
+    }
+  }
+
+  set fh [open $file_name w]
+  fconfigure $fh -translation binary
+  puts $fh "GCUSAGE1 $nx $ny $nlayers $names"
+  for {set i 0} {$i < $nlayers} {incr i} {
+    puts -nonewline $fh [binary format i* $caps($i)]
+    puts -nonewline $fh [binary format i* $uses($i)]
+  }
+  close $fh
+
+  puts "\[GCELL_DUMP\] file=$file_name nx=$nx ny=$ny layers=$nlayers"
+  puts "max_gr_overflow:        $max_over"
+  puts "total_gr_overflow:      $total_over"
+}
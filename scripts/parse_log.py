@@ -18,14 +18,25 @@ Metrics extracted (when present):
 - legal_fail_summary (DPL failure types)
 - tool_runtime (seconds)
 - flow_runtime (seconds)
+- run_status (ok, or the reason from a "[WATCHDOG] killed" marker)
+- displacement (um, from a "[DISPLACEMENT]" marker; designs with a nonzero
+  baseline displacement only)
+
+The log may be compressed (evaluation.log.gz, or evaluation.log.zst with the
+optional zstandard module); a missing plain path falls back to either.
+open_text()/resolve_input() are shared with the solution tools.
 """
 
 import re
 import csv
+import gzip
+import io
 import sys
 import argparse
+import functools
+import importlib.util
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, FrozenSet
 
 FLOAT = r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?"
 ANSI = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")  # strip ANSI color if any
@@ -39,16 +50,92 @@ FLOW_RUNTIME_RE = re.compile(
     re.IGNORECASE,
 )
 
-# One line per GCell:
+# Appended by solution/tools/or_supervisor.py when it stops a run:
+#   [WATCHDOG] killed stage=flow design=<name> reason=wall_timeout ...
+WATCHDOG_RE = re.compile(r"^\[WATCHDOG\]\s+killed\s+(.*)$")
+
+# Appended by solution/tools/displacement.py (average over movable cells, um):
+#   [DISPLACEMENT] avg=0.3131 cells=14006 moved=812 max=4.212 inserted=35 removed=0
+DISPLACEMENT_RE = re.compile(rf"^\[DISPLACEMENT\]\s+avg=({FLOAT})")
+# Only designs with a nonzero baseline displacement get the column: the score
+# divides by (baseline + 1e-8), so any move on a 0 baseline would swamp S_final.
+# The baselines come from the scoring script's own table.
+SCORE_SCRIPT = Path(__file__).resolve().parents[1] / "solution" / "test" / "cal_total_score.py"
+
+# One line per GCell (older logs; evaluation.tcl now writes gcell_usage.bin
+# and prints max_gr_overflow/total_gr_overflow directly):
 #   x y capacity usage congestion%
 GR_LINE = re.compile(rf"^\s*(\d+)\s+(\d+)\s+({FLOAT})\s+({FLOAT})\s+({FLOAT})\s*$")
 
+# ---- compressed logs / exports ----
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+READ_BUFFER = 1 << 20          # large reads: run directories live on NFS
+GZIP_LEVEL = 3
+ZSTD_LEVEL = 3
+
+
+def resolve_input(path: Path) -> Path:
+    """path itself, or its .zst/.gz sibling when only that one exists."""
+    path = Path(path)
+    if path.exists() or path.suffix in COMPRESSED_SUFFIXES:
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        alt = path.with_name(path.name + suffix)
+        if alt.exists():
+            return alt
+    return path
+
+
+def open_text(path: Path, mode: str = "r", encoding: str = "utf-8", errors: str = "ignore"):
+    """Text handle ("r", "w" or "a") on a plain, .gz or .zst file.
+
+    Compressed files are streamed; appending adds a gzip member / zstd
+    frame, which readers see as one continuous text.
+    """
+    path = Path(path)
+    if mode not in ("r", "w", "a"):
+        raise ValueError(f"unsupported mode {mode!r}")
+    if path.suffix == ".gz":
+        if mode == "r":
+            raw = io.BufferedReader(gzip.GzipFile(path, "rb"), READ_BUFFER)
+        else:
+            raw = gzip.GzipFile(path, mode + "b", compresslevel=GZIP_LEVEL)
+        return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(f"{path}: reading .zst needs the zstandard module") from None
+        fh = open(path, "rb" if mode == "r" else mode + "b")
+        if mode == "r":
+            raw = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+                fh, read_size=READ_BUFFER, read_across_frames=True, closefd=True), READ_BUFFER)
+        else:
+            raw = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(fh, closefd=True)
+        return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+    return open(path, mode, buffering=READ_BUFFER, encoding=encoding, errors=errors)
+
+
 def _last_floats(line: str, n: int) -> Optional[Tuple[float, ...]]:
     nums = re.findall(FLOAT, line)
     if len(nums) < n:
         return None
     return tuple(float(x) for x in nums[-n:])
 
+@functools.lru_cache(maxsize=None)
+def displacement_designs() -> Optional[FrozenSet[str]]:
+    """Designs whose baseline displacement in cal_total_score.py is nonzero.
+
+    None when the scoring script is not there (scripts/ used on its own);
+    the column is then kept as logged.
+    """
+    if not SCORE_SCRIPT.is_file():
+        return None
+    spec = importlib.util.spec_from_file_location("_cal_total_score", SCORE_SCRIPT)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return frozenset(d for d, b in mod.baseline.items() if b.get("displacement"))
+
 def parse_log(log_path: Path) -> Dict[str, Any]:
     m: Dict[str, Any] = {
         "design": None,
@@ -72,6 +159,8 @@ def parse_log(log_path: Path) -> Dict[str, Any]:
         "legal_fail_summary": None,
         "tool_runtime": None,
         "flow_runtime": None,
+        "run_status": "ok",
+        "displacement": None,
     }
 
     # section state machine for violation tables
@@ -106,7 +195,7 @@ def parse_log(log_path: Path) -> Dict[str, Any]:
     max_v_over = None
     max_over   = None  # if the log prints a “max overflow:” line directly
 
-    with log_path.open("r", encoding="utf-8", errors="ignore") as f:
+    with open_text(log_path) as f:
         for raw in f:
             line = ANSI.sub("", raw).rstrip("\r\n")
             stripped = line.strip()
@@ -140,6 +229,21 @@ def parse_log(log_path: Path) -> Dict[str, Any]:
                         gr_max_overflow_acc = overflow
                 continue  # don’t let these lines hit other parsers
 
+            # ---- watchdog marker ----
+            mw = WATCHDOG_RE.match(stripped)
+            if mw:
+                fields = dict(kv.split("=", 1) for kv in mw.group(1).split() if "=" in kv)
+                m["run_status"] = fields.get("reason", "killed")
+                if m["design"] is None:
+                    m["design"] = fields.get("design")
+                continue
+
+            # ---- displacement marker ----
+            md = DISPLACEMENT_RE.match(stripped)
+            if md:
+                m["displacement"] = float(md.group(1))
+                continue
+
             # ---- design name ----
             m2 = re.search(r"^\s*design:\s*(\S+)", line, re.IGNORECASE)
             if m2:
@@ -341,6 +445,10 @@ def parse_log(log_path: Path) -> Dict[str, Any]:
             if not m["power_unit"]:
                 m["power_unit"] = "w"
 
+    designs = displacement_designs()
+    if designs is not None and m["design"] not in designs:
+        m["displacement"] = None
+
     return m
 
 def print_metrics(m: Dict[str, Any]) -> None:
@@ -369,6 +477,8 @@ def print_metrics(m: Dict[str, Any]) -> None:
     p("legal_fail_summary", m["legal_fail_summary"])
     p("tool_runtime", m["tool_runtime"], "seconds")
     p("flow_runtime", m["flow_runtime"], "seconds")
+    p("run_status", m["run_status"])
+    p("displacement", m["displacement"], "um")
     print("==========================")
 
 def append_csv(csv_path: Path, m: Dict[str, Any]) -> None:
@@ -383,6 +493,8 @@ def append_csv(csv_path: Path, m: Dict[str, Any]) -> None:
         "legal_fail_summary",
         "tool_runtime",
         "flow_runtime",
+        "run_status",
+        "displacement",
     ]
     row = [
         m.get("design"),
@@ -406,12 +518,32 @@ def append_csv(csv_path: Path, m: Dict[str, Any]) -> None:
         m.get("legal_fail_summary"),
         m.get("tool_runtime"),
         m.get("flow_runtime"),
+        m.get("run_status"),
+        m.get("displacement"),
     ]
-    new_file = not csv_path.exists()
-    with csv_path.open("a", newline="") as fp:
+    if csv_path.exists():
+        with csv_path.open("r", newline="") as fp:
+            rows = list(csv.reader(fp))
+        if rows:
+            # Older files lack newer columns and may carry extra ones
+            # (S_final); write the row in the file's own column order.
+            old_header = rows[0]
+            values = dict(zip(header, row))
+            missing = [h for h in header if h not in old_header]
+            if missing:
+                old_header = old_header + missing
+                with csv_path.open("w", newline="") as fp:
+                    writer = csv.writer(fp)
+                    writer.writerow(old_header)
+                    writer.writerows(rows[1:])
+            header = old_header
+            row = [values.get(h) for h in header]
+            with csv_path.open("a", newline="") as fp:
+                csv.writer(fp).writerow(row)
+            return
+    with csv_path.open("w", newline="") as fp:
         writer = csv.writer(fp)
-        if new_file:
-            writer.writerow(header)
+        writer.writerow(header)
         writer.writerow(row)
 
 def main():
@@ -420,7 +552,7 @@ def main():
     ap.add_argument("--csv", type=str, default=None, help="Append metrics to CSV file")
     args = ap.parse_args()
 
-    log_path = Path(args.log)
+    log_path = resolve_input(Path(args.log))
     if not log_path.exists():
         print(f"ERROR: log file not found: {log_path}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+Genetic buffering/sizing optimizer for solution/tcl/ga_baseline.tcl.
+
+The flow exports the worst setup paths with ga_export_context
+(solution/tcl/util/ga.tcl) and execs this script. A genome holds one gene
+per critical-path instance (index into its asap7_equivalent_cell_list.csv
+group, i.e. size and Vt) and one gene per buffering candidate net (no
+buffer, or which buffer to put in front of the net's non-critical sinks).
+Fitness is an S_final-like score from a lumped RC model: TNS over the
+exported endpoints (weight 80), leakage (40) and switched capacitance (40)
+relative to the design.
+
+Fitness is evaluated in a process pool. Every genome goes through a memo
+keyed by its blake2b hash, persisted per context, so identical genomes are
+never evaluated twice. The search stops after --generations, after
+--stall generations without improvement, or when --time-budget runs out.
+
+Writes <ga_output>/ga_work/best_solution.json (summary), best_solution.changelist
+(applied by ga_apply_changelist) and ga_history.csv. With --placement (a DEF
+written just before the GA) inserted buffers are moved onto the nearest free
+sites (tools/placement_index.py) instead of the sink centroid, so the final
+detailed_placement does not have to push neighbours aside, and the RUDY
+estimate (tools/rudy.py) is checked for a likely GR overflow regression
+("congestion_flags" in the summary).
+
+python3 ga_buffer_optimizer.py <design> <tech_dir> <design_dir> <ga_output> \
+    --context <ga_output>/ga_context.txt [--time-budget 60] [--workers 8] \
+    [--placement <ga_output>/ga_placement.def]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+from common import EQUIV_CELLS, TECH_DIR  # noqa: E402
+from changelist import Change, InsertBuffer, Resize, write_changelist  # noqa: E402
+from netlist_equiv_check import load_equiv_cells  # noqa: E402
+
+Genome = Tuple[int, ...]
+
+W_TNS, W_LEAK, W_DYN = 80.0, 40.0, 40.0
+W_CHANGE = 1e-4                 # per change: displacement/legalization risk
+
+# Name-based fallbacks when the context has no liberty data (pF, kOhm, ns).
+VT_DELAY = {"SL": 0.85, "L": 1.0, "R": 1.2}
+VT_LEAK = {"SL": 16.0, "L": 4.0, "R": 1.0}
+UNIT_CAP = 0.0006
+UNIT_RES = 8.0
+INTRINSIC = 0.008
+WIRE_CAP_PER_UM = 1.73323e-4    # setRC.tcl signal wire, pF/um
+SIZE_RE = re.compile(r"x(p)?(\d+)f?_ASAP7")
+
+
+# ---------------- cell model ----------------
+def cell_size(master: str) -> float:
+    m = SIZE_RE.search(master)
+    if not m:
+        return 1.0
+    return float("0." + m.group(2)) if m.group(1) else float(m.group(2))
+
+
+def cell_vt(master: str) -> str:
+    return master.rsplit("_", 1)[-1] if master.rsplit("_", 1)[-1] in VT_DELAY else "L"
+
+
+class CellModel:
+    """Input cap, drive resistance, intrinsic delay and leakage per master."""
+
+    def __init__(self, lib: Dict[str, Tuple[float, float]]):
+        self.lib = lib
+
+    def cap(self, master: str) -> float:
+        if master in self.lib:
+            return self.lib[master][0]
+        return UNIT_CAP * max(cell_size(master), 0.33)
+
+    def res(self, master: str) -> float:
+        if master in self.lib:
+            return self.lib[master][1]
+        return UNIT_RES / max(cell_size(master), 0.33) * VT_DELAY[cell_vt(master)]
+
+    def intrinsic(self, master: str) -> float:
+        return INTRINSIC * VT_DELAY[cell_vt(master)]
+
+    def delay(self, master: str, load: float) -> float:
+        return self.intrinsic(master) + self.res(master) * load
+
+    def leakage(self, master: str) -> float:
+        return max(cell_size(master), 0.33) * VT_LEAK[cell_vt(master)]
+
+
+# ---------------- context ----------------
+@dataclass
+class Sink:
+    inst: str
+    pin: str
+    master: str
+    slack: float
+
+
+@dataclass
+class NetInfo:
+    name: str
+    driver: str
+    fanout: int
+    sinks: List[Sink] = field(default_factory=list)
+
+
+@dataclass
+class Context:
+    design: str = ""
+    n_insts: int = 0
+    wns: float = 0.0
+    tns: float = 0.0
+    lib: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    # (endpoint, slack, [(driver inst, net)] in path order)
+    paths: List[Tuple[str, float, List[Tuple[str, str]]]] = field(default_factory=list)
+    masters: Dict[str, str] = field(default_factory=dict)        # inst -> master
+    nets: Dict[str, NetInfo] = field(default_factory=dict)
+    locs: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+
+def load_context(path: Path) -> Context:
+    ctx = Context()
+    with Path(path).open() as f:
+        for line in f:
+            t = line.split()
+            if not t:
+                continue
+            kind = t[0]
+            try:
+                if kind == "design":
+                    ctx.design, ctx.n_insts = t[1], int(t[2])
+                    ctx.wns, ctx.tns = float(t[3]), float(t[4])
+                elif kind == "lib":
+                    ctx.lib[t[1]] = (float(t[2]), float(t[3]))
+                elif kind == "path":
+                    ctx.paths.append((t[1], float(t[2]), []))
+                elif kind == "stage" and ctx.paths:
+                    ctx.paths[-1][2].append((t[1], t[4]))
+                    ctx.masters[t[1]] = t[2]
+                elif kind == "net":
+                    ctx.nets[t[1]] = NetInfo(t[1], t[2] if len(t) > 3 else "", int(t[-1]))
+                elif kind == "sink" and t[1] in ctx.nets:
+                    ctx.nets[t[1]].sinks.append(Sink(t[2], t[3], t[4], float(t[5])))
+                    ctx.masters.setdefault(t[2], t[4])
+                elif kind == "inst":
+                    ctx.masters.setdefault(t[1], t[2])
+                    ctx.locs[t[1]] = (float(t[3]), float(t[4]))
+            except (IndexError, ValueError):
+                continue
+    return ctx
+
+
+def context_digest(path: Path) -> str:
+    return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+
+
+# ---------------- problem ----------------
+class Problem:
+    """Gene layout and fitness model for one exported context."""
+
+    def __init__(self, ctx: Context, equiv_file: Path = EQUIV_CELLS,
+                 max_buffer_size: float = 8.0, margin: float = 0.010):
+        self.ctx = ctx
+        self.model = CellModel(ctx.lib)
+        groups, buffer_masters, _ = load_equiv_cells(str(equiv_file))
+        members: Dict[int, List[str]] = {}
+        for cell, gid in groups.items():
+            members.setdefault(gid, []).append(cell)
+
+        def usable(m: str) -> bool:
+            return not ctx.lib or m in ctx.lib
+
+        # Instance genes: every driver on an exported path.
+        self.insts: List[str] = []
+        self.candidates: List[List[str]] = []
+        seen = set()
+        for _, _, stages in ctx.paths:
+            for inst, _ in stages:
+                master = ctx.masters.get(inst)
+                if inst in seen or master not in groups:
+                    continue
+                seen.add(inst)
+                cands = sorted((m for m in members[groups[master]] if usable(m) or m == master),
+                               key=lambda m: (cell_size(m), VT_DELAY[cell_vt(m)]))
+                if len(cands) > 1:
+                    self.insts.append(inst)
+                    self.candidates.append(cands)
+        self.inst_index = {inst: i for i, inst in enumerate(self.insts)}
+
+        # Buffer genes: nets whose sinks split into critical and non-critical.
+        self.buffers = sorted((m for m in buffer_masters
+                               if m.startswith("BUFx") and usable(m)
+                               and cell_size(m) <= max_buffer_size),
+                              key=lambda m: (cell_size(m), VT_DELAY[cell_vt(m)]))
+        self.buf_nets: List[str] = []
+        self.moved: Dict[str, List[Sink]] = {}
+        for name, net in ctx.nets.items():
+            if not self.buffers or len(net.sinks) < 2 or len(net.sinks) != net.fanout:
+                continue
+            worst = min(s.slack for s in net.sinks)
+            cut = worst + max(margin, 0.5 * abs(worst))
+            moved = [s for s in net.sinks if s.slack >= cut]
+            if moved and len(moved) < len(net.sinks):
+                self.buf_nets.append(name)
+                self.moved[name] = moved
+        self.net_index = {n: i for i, n in enumerate(self.buf_nets)}
+
+        # Nets whose delay depends on an instance (as driver or as sink).
+        self.touches: Dict[str, set] = {}
+        for name, net in ctx.nets.items():
+            self.touches.setdefault(net.driver, set()).add(name)
+            for s in net.sinks:
+                self.touches.setdefault(s.inst, set()).add(name)
+
+        self.initial: Genome = tuple(
+            [c.index(ctx.masters[i]) for i, c in zip(self.insts, self.candidates)]
+            + [0] * len(self.buf_nets))
+        self.leak_total = max(ctx.n_insts, 1) * self.model.leakage("INVx1_ASAP7_75t_L")
+        self.cap_total = max(ctx.n_insts, 1) * self.model.cap("INVx1_ASAP7_75t_L")
+        self.base = self.stage_delays(self.initial)
+
+    @property
+    def n_genes(self) -> int:
+        return len(self.insts) + len(self.buf_nets)
+
+    def gene_choices(self, g: int) -> int:
+        if g < len(self.insts):
+            return len(self.candidates[g])
+        return len(self.buffers) + 1
+
+    # ---- decoding ----
+    def master(self, genome: Genome, inst: str) -> str:
+        i = self.inst_index.get(inst)
+        if i is None:
+            return self.ctx.masters.get(inst, "")
+        return self.candidates[i][genome[i]]
+
+    def buffer(self, genome: Genome, net: str) -> Optional[str]:
+        i = self.net_index.get(net)
+        if i is None:
+            return None
+        g = genome[len(self.insts) + i]
+        return self.buffers[g - 1] if g else None
+
+    def _wire_cap(self, points: Sequence[Tuple[float, float]], fanout: int) -> float:
+        if len(points) >= 2:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            return WIRE_CAP_PER_UM * (max(xs) - min(xs) + max(ys) - min(ys))
+        return WIRE_CAP_PER_UM * 2.0 * max(fanout, 1)
+
+    def _net_loads(self, genome: Genome, name: str) -> Tuple[float, float]:
+        """(driver load, buffer output load) of a net; buffer load is 0 if unbuffered."""
+        net = self.ctx.nets.get(name)
+        if net is None:
+            return 0.0, 0.0
+        locs = self.ctx.locs
+        buf = self.buffer(genome, name)
+        if len(net.sinks) != net.fanout:
+            # High-fanout net without a sink list: treat as fixed unit loads.
+            return net.fanout * self.model.cap("INVx1_ASAP7_75t_L") + \
+                self._wire_cap([], net.fanout), 0.0
+        moved = {id(s) for s in self.moved.get(name, [])} if buf else set()
+        stay = [s for s in net.sinks if id(s) not in moved]
+        load = sum(self.model.cap(self.master(genome, s.inst)) for s in stay)
+        pts = [locs[s.inst] for s in stay if s.inst in locs]
+        if net.driver in locs:
+            pts.append(locs[net.driver])
+        if not buf:
+            return load + self._wire_cap(pts, net.fanout), 0.0
+        behind = [s for s in net.sinks if id(s) in moved]
+        bpts = [locs[s.inst] for s in behind if s.inst in locs]
+        bx = buffer_location(bpts, locs.get(net.driver))
+        load += self.model.cap(buf) + self._wire_cap(pts + [bx], len(stay) + 1)
+        bload = sum(self.model.cap(self.master(genome, s.inst)) for s in behind) \
+            + self._wire_cap(bpts + [bx], len(behind))
+        return load, bload
+
+    # ---- fitness ----
+    def stage_delays(self, genome: Genome, nets: Optional[Sequence[str]] = None
+                     ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Per net: driver stage delay and buffer delay (0 if unbuffered)."""
+        drv, bufd = {}, {}
+        for name in (self.ctx.nets if nets is None else nets):
+            net = self.ctx.nets[name]
+            load, bload = self._net_loads(genome, name)
+            drv[name] = self.model.delay(self.master(genome, net.driver), load) \
+                if net.driver else 0.0
+            buf = self.buffer(genome, name)
+            bufd[name] = self.model.delay(buf, bload) if buf else 0.0
+        return drv, bufd
+
+    def evaluate(self, genome: Genome) -> Tuple[float, float]:
+        """(fitness, estimated TNS of the exported endpoints)."""
+        base_drv, _ = self.base
+        affected = set()
+        for i, inst in enumerate(self.insts):
+            if genome[i] != self.initial[i]:
+                affected |= self.touches.get(inst, set())
+        for k, net in enumerate(self.buf_nets):
+            if genome[len(self.insts) + k]:
+                affected.add(net)
+        drv = dict(base_drv)
+        new_drv, bufd = self.stage_delays(genome, sorted(affected))
+        drv.update(new_drv)
+
+        moved_by_net = {n: {(s.inst, s.pin) for s in self.moved[n]}
+                        for n in self.buf_nets if self.buffer(genome, n)}
+        d_tns = 0.0
+        new_tns = 0.0
+        for _, slack, stages in self.ctx.paths:
+            delta = 0.0
+            for k, (_, net) in enumerate(stages):
+                delta += drv.get(net, 0.0) - base_drv.get(net, 0.0)
+                moved = moved_by_net.get(net)
+                if moved and k + 1 < len(stages):
+                    nxt = stages[k + 1][0]
+                    if any(inst == nxt for inst, _ in moved):
+                        delta += bufd.get(net, 0.0)
+            s_new = slack - delta
+            d_tns += min(0.0, s_new) - min(0.0, slack)
+            new_tns += min(0.0, s_new)
+        # Non-critical sinks moved behind a buffer must not become violators.
+        for net, moved in moved_by_net.items():
+            extra = drv[net] - base_drv[net] + bufd.get(net, 0.0)
+            for s in self.moved[net]:
+                d_tns += min(0.0, s.slack - extra) - min(0.0, s.slack)
+
+        d_leak = d_cap = 0.0
+        n_changes = 0
+        for i, inst in enumerate(self.insts):
+            if genome[i] != self.initial[i]:
+                old, new = self.ctx.masters[inst], self.candidates[i][genome[i]]
+                d_leak += self.model.leakage(new) - self.model.leakage(old)
+                d_cap += self.model.cap(new) - self.model.cap(old)
+                n_changes += 1
+        for net in moved_by_net:
+            buf = self.buffer(genome, net)
+            d_leak += self.model.leakage(buf)
+            d_cap += self.model.cap(buf)
+            n_changes += 1
+
+        tns0 = self.ctx.tns if self.ctx.tns < 0 else min(-1e-9, sum(
+            min(0.0, s) for _, s, _ in self.ctx.paths))
+        fitness = (W_TNS * d_tns / abs(tns0)
+                   - W_LEAK * d_leak / self.leak_total
+                   - W_DYN * d_cap / self.cap_total
+                   - W_CHANGE * n_changes)
+        return fitness, new_tns
+
+    def changes(self, genome: Genome) -> List:
+        out: List = []
+        for i, inst in enumerate(self.insts):
+            if genome[i] != self.initial[i]:
+                out.append(Resize(inst, self.candidates[i][genome[i]]))
+        for k, net in enumerate(self.buf_nets):
+            buf = self.buffer(genome, net)
+            if not buf:
+                continue
+            moved = self.moved[net]
+            x, y = buffer_location([self.ctx.locs[s.inst] for s in moved
+                                    if s.inst in self.ctx.locs],
+                                   self.ctx.locs.get(self.ctx.nets[net].driver))
+            out.append(InsertBuffer(f"ga_buf_{k}", buf, x, y, net, f"ga_net_{k}",
+                                    tuple((s.inst, s.pin) for s in moved)))
+        return out
+
+
+def buffer_location(points: Sequence[Tuple[float, float]],
+                    fallback: Optional[Tuple[float, float]]) -> Tuple[float, float]:
+    """Centroid of the sinks behind the buffer (detailed_placement legalizes it)."""
+    if points:
+        return (sum(p[0] for p in points) / len(points),
+                sum(p[1] for p in points) / len(points))
+    return fallback or (0.0, 0.0)
+
+
+# ---------------- pool workers ----------------
+_PROBLEM: Optional[Problem] = None
+
+
+def _init_worker(context_file: str, equiv_file: str) -> None:
+    global _PROBLEM
+    _PROBLEM = Problem(load_context(Path(context_file)), Path(equiv_file))
+
+
+def _evaluate(genome: Genome) -> Tuple[float, float]:
+    return _PROBLEM.evaluate(genome)
+
+
+def genome_key(genome: Genome) -> str:
+    return hashlib.blake2b(array("H", genome).tobytes(), digest_size=12).hexdigest()
+
+
+class FitnessMemo:
+    """Fitness by genome hash, persisted next to the results for one context."""
+
+    def __init__(self, path: Path, context: str):
+        self.path = path
+        self.context = context
+        self.values: Dict[str, Tuple[float, float]] = {}
+        self.hits = 0
+        if path.is_file():
+            try:
+                data = json.loads(path.read_text())
+            except ValueError:
+                data = {}
+            if data.get("context") == context:
+                self.values = {k: tuple(v) for k, v in data.get("values", {}).items()}
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"context": self.context, "values": self.values}))
+        os.replace(tmp, self.path)
+
+
+# ---------------- GA ----------------
+@dataclass
+class GAConfig:
+    population: int = 48
+    generations: int = 200
+    stall: int = 20
+    time_budget: float = 60.0
+    crossover: float = 0.8
+    elite: int = 2
+    tournament: int = 3
+    workers: int = 4
+    seed: int = 0
+
+
+def mutate(genome: List[int], problem: Problem, rate: float, rng: random.Random) -> None:
+    for g in range(len(genome)):
+        if rng.random() >= rate:
+            continue
+        n = problem.gene_choices(g)
+        if g < len(problem.insts) and rng.random() < 0.7:
+            genome[g] = min(n - 1, max(0, genome[g] + rng.choice((-1, 1))))
+        else:
+            genome[g] = rng.randrange(n)
+
+
+def seed_population(problem: Problem, size: int, rng: random.Random) -> List[Genome]:
+    """Current netlist, a one-step upsize of every critical driver, and mutants."""
+    init = list(problem.initial)
+    upsized = [min(g + 1, problem.gene_choices(i) - 1) if i < len(problem.insts) else g
+               for i, g in enumerate(init)]
+    pop = [tuple(init), tuple(upsized)]
+    rate = 2.0 / max(problem.n_genes, 1)
+    while len(pop) < size:
+        child = list(rng.choice((init, upsized)))
+        mutate(child, problem, max(rate, 0.05), rng)
+        pop.append(tuple(child))
+    return pop
+
+
+def run_ga(problem: Problem, context_file: Path, memo: FitnessMemo, cfg: GAConfig,
+           history_file: Path, log=print) -> Tuple[Genome, float, float, int]:
+    rng = random.Random(cfg.seed)
+    t0 = time.time()
+    population = seed_population(problem, cfg.population, rng)
+    rate = 1.0 / max(problem.n_genes, 1)
+    best: Tuple[Genome, float, float] = (problem.initial, float("-inf"), 0.0)
+    stall = 0
+    evaluations = 0
+
+    with ProcessPoolExecutor(max_workers=cfg.workers, initializer=_init_worker,
+                             initargs=(str(context_file), str(EQUIV_CELLS))) as pool, \
+            history_file.open("w", newline="") as hf:
+        history = csv.writer(hf)
+        history.writerow(["generation", "best", "mean", "evaluations", "memo_hits", "elapsed"])
+        for gen in range(cfg.generations):
+            keys = [genome_key(g) for g in population]
+            todo = {}
+            for k, g in zip(keys, population):
+                if k in memo.values:
+                    memo.hits += 1
+                elif k not in todo:
+                    todo[k] = g
+            if todo:
+                chunk = max(1, len(todo) // (cfg.workers * 4))
+                for k, value in zip(todo, pool.map(_evaluate, todo.values(), chunksize=chunk)):
+                    memo.values[k] = value
+                evaluations += len(todo)
+            scores = [memo.values[k][0] for k in keys]
+
+            i_best = max(range(len(population)), key=scores.__getitem__)
+            if scores[i_best] > best[1] + 1e-12:
+                best = (population[i_best], scores[i_best], memo.values[keys[i_best]][1])
+                stall = 0
+            else:
+                stall += 1
+            elapsed = time.time() - t0
+            history.writerow([gen, f"{best[1]:.6f}", f"{sum(scores) / len(scores):.6f}",
+                              evaluations, memo.hits, f"{elapsed:.2f}"])
+            log(f"[GA] gen {gen:3d} best {best[1]:10.5f} est_tns {best[2]:10.4f} "
+                f"evals {evaluations} memo_hits {memo.hits} ({elapsed:.1f}s)")
+
+            if stall >= cfg.stall:
+                log(f"[GA] no improvement for {cfg.stall} generations, stopping")
+                break
+            per_gen = elapsed / (gen + 1)
+            if elapsed + per_gen > cfg.time_budget:
+                log(f"[GA] time budget {cfg.time_budget:.0f}s reached, stopping")
+                break
+
+            ranked = sorted(range(len(population)), key=scores.__getitem__, reverse=True)
+            nxt = [population[i] for i in ranked[:cfg.elite]]
+            while len(nxt) < cfg.population:
+                a = _tournament(population, scores, cfg.tournament, rng)
+                b = _tournament(population, scores, cfg.tournament, rng)
+                if rng.random() < cfg.crossover:
+                    child = [x if rng.random() < 0.5 else y for x, y in zip(a, b)]
+                else:
+                    child = list(a)
+                mutate(child, problem, rate, rng)
+                nxt.append(tuple(child))
+            population = nxt
+    return best[0], best[1], best[2], evaluations
+
+
+def _tournament(population: List[Genome], scores: List[float], k: int,
+                rng: random.Random) -> Genome:
+    picks = [rng.randrange(len(population)) for _ in range(k)]
+    return population[max(picks, key=scores.__getitem__)]
+
+
+def congestion_flags(args, changes: List[Change]) -> Optional[List[str]]:
+    """RUDY check of the final changelist on the --placement DEF."""
+    from rudy import flag_regression, load_map
+    design_dir = Path(args.design_dir) if args.design_dir else None
+    if design_dir is None or not (design_dir / "nets.csv").is_file():
+        return None
+    try:
+        m = load_map(args.design_name, Path(args.placement), design_dir=design_dir)
+        before = m.summary()
+        for change in changes:
+            m.apply(change)
+    except (KeyError, ValueError) as e:
+        print(f"[WARN] congestion check skipped: {e}", file=sys.stderr)
+        return None
+    reasons = flag_regression(before, m.summary())
+    if reasons:
+        print(f"[WARN] likely GR overflow regression: {'; '.join(reasons)}", file=sys.stderr)
+    return reasons
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GA buffering/sizing optimizer.")
+    ap.add_argument("design_name")
+    ap.add_argument("tech_dir", nargs="?", default=str(TECH_DIR))
+    ap.add_argument("design_dir", nargs="?", default="")
+    ap.add_argument("ga_output", nargs="?", default=".")
+    ap.add_argument("--context", default=None,
+                    help="ga_export_context output (default: <ga_output>/ga_context.txt)")
+    ap.add_argument("--time-budget", type=float,
+                    default=float(os.environ.get("GA_TIME_BUDGET", 60)))
+    ap.add_argument("--population", type=int, default=48)
+    ap.add_argument("--generations", type=int, default=200)
+    ap.add_argument("--stall", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--placement", default=None,
+                    help="DEF of the current placement; buffers are moved to free sites")
+    ap.add_argument("--max-buffer-move", type=float, default=10.0,
+                    help="um; buffers without a free site this close keep their location")
+    args = ap.parse_args()
+
+    out_dir = Path(args.ga_output)
+    work = out_dir / "ga_work"
+    work.mkdir(parents=True, exist_ok=True)
+    context_file = Path(args.context) if args.context else out_dir / "ga_context.txt"
+    if not context_file.is_file():
+        print(f"ERROR: context not found: {context_file}", file=sys.stderr)
+        return 2
+
+    t0 = time.time()
+    ctx = load_context(context_file)
+    problem = Problem(ctx)
+    print(f"[GA] {args.design_name}: {len(ctx.paths)} paths, {len(problem.insts)} sizing "
+          f"genes, {len(problem.buf_nets)} buffer genes, lib data for {len(ctx.lib)} masters")
+
+    cfg = GAConfig(population=args.population, generations=args.generations,
+                   stall=args.stall, time_budget=args.time_budget, workers=args.workers,
+                   seed=args.seed)
+    memo = FitnessMemo(work / "fitness_memo.json", context_digest(context_file))
+    base_fitness, base_tns = problem.evaluate(problem.initial)
+    if problem.n_genes:
+        genome, fitness, est_tns, evaluations = run_ga(
+            problem, context_file, memo, cfg, work / "ga_history.csv")
+        memo.save()
+    else:
+        genome, fitness, est_tns, evaluations = problem.initial, base_fitness, base_tns, 0
+
+    if fitness <= base_fitness:
+        genome, fitness, est_tns = problem.initial, base_fitness, base_tns
+    changes = problem.changes(genome)
+    unplaced = congestion = None
+    if args.placement and any(isinstance(c, InsertBuffer) for c in changes):
+        if Path(args.placement).is_file():
+            from placement_index import build_index, legalize_buffers
+            index = build_index(Path(args.placement),
+                                sorted((Path(args.tech_dir) / "lef").glob("*.lef")) or None)
+            changes, unplaced = legalize_buffers(changes, index, args.max_buffer_move)
+            congestion = congestion_flags(args, changes)
+        else:
+            print(f"[WARN] placement not found: {args.placement}", file=sys.stderr)
+    n = write_changelist(work / "best_solution.changelist", changes)
+    summary = {
+        "design": args.design_name,
+        "fitness": fitness,
+        "baseline_fitness": base_fitness,
+        "est_tns_before": base_tns,
+        "est_tns_after": est_tns,
+        "resizes": sum(isinstance(c, Resize) for c in changes),
+        "buffers": sum(isinstance(c, InsertBuffer) for c in changes),
+        "buffers_off_site": unplaced,
+        "congestion_flags": congestion,
+        "evaluations": evaluations,
+        "memo_hits": memo.hits,
+        "runtime": round(time.time() - t0, 2),
+        "changelist": str(work / "best_solution.changelist"),
+    }
+    (work / "best_solution.json").write_text(json.dumps(summary, indent=2))
+    print(f"[GA] best fitness {fitness:.5f} (baseline {base_fitness:.5f}), "
+          f"est. TNS {base_tns:.4f} -> {est_tns:.4f} ns, {n} changes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
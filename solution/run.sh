@@ -5,6 +5,8 @@
 # Default settings
 #######################################
 TCL_NAME="baseline"
+GENERATE_ONLY=false
+DESIGN_DB=""
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 TCL_DIR="$SCRIPT_DIR/tcl"
 BIN_DIR="$SCRIPT_DIR/bin"
@@ -19,6 +21,9 @@ usage() {
   echo "  -t <tcl_name>   Use specified tcl script (default: baseline)"
   echo "                  Example: -t baseline  -> baseline.tcl"
   echo "                           -t foo       -> foo.tcl"
+  echo "  -n              Only generate the TCL file, do not run OpenROAD"
+  echo "  -b <odb_file>   Start from an ODB checkpoint instead of reading LEF/DEF/Verilog"
+  echo "                  (see solution/tools/odb_checkpoint.py)"
   exit 1
 }
 
@@ -49,6 +54,15 @@ while [[ $# -gt 0 ]]; do
       TCL_NAME="$2"
       shift 2
       ;;
+    -n)
+      GENERATE_ONLY=true
+      shift
+      ;;
+    -b)
+      [[ $# -lt 2 ]] && usage
+      DESIGN_DB="$2"
+      shift 2
+      ;;
     *)
       echo "Unknown option: $1"
       usage
@@ -69,6 +83,11 @@ if [[ ! -f "$TEMPLATE_FILE" ]]; then
   exit 2
 fi
 
+if [[ -n "$DESIGN_DB" && ! -f "$DESIGN_DB" ]]; then
+  echo "Error: ODB checkpoint not found: $DESIGN_DB" >&2
+  exit 3
+fi
+
 #######################################
 # Prepare temporary TCL directory
 # Preserve the full DESIGN_DIR path structure
@@ -77,6 +96,8 @@ TEMP_TCL_DIR="${TCL_DIR}/temp/${DESIGN_NAME}/$(basename "$DESIGN_DIR")"
 mkdir -p "$TEMP_TCL_DIR"
 
 GENERATED_TCL_FILE="${TEMP_TCL_DIR}/${TCL_NAME}.tcl"
+# TCL_NAME may contain subdirectories (e.g. sweep/<name>/v000)
+mkdir -p "$(dirname "$GENERATED_TCL_FILE")"
 
 #######################################
 # Generate TCL file from template
@@ -88,6 +109,8 @@ sed -e "s|\$::env(DESIGN_NAME)|\"${DESIGN_NAME}\"|g" \
     -e "s|\$::env(TECH_DIR)|\"${TECH_DIR}\"|g" \
     -e "s|\$::env(DESIGN_DIR)|\"${DESIGN_DIR}\"|g" \
     -e "s|\$::env(OUTPUT_DIR)|\"${OUTPUT_DIR}\"|g" \
+    -e "s|\$::env(DESIGN_DB)|\"${DESIGN_DB}\"|g" \
+    -e "s|\$::env(TCL_DIR)|\"${TCL_DIR}\"|g" \
     "$TEMPLATE_FILE" > "$GENERATED_TCL_FILE"
 
 if [[ ! -f "$GENERATED_TCL_FILE" ]]; then
@@ -95,6 +118,10 @@ if [[ ! -f "$GENERATED_TCL_FILE" ]]; then
   exit 4
 fi
 
+if [[ "$GENERATE_ONLY" = true ]]; then
+  exit 0
+fi
+
 #######################################
 # Prepare output directory
 #######################################
@@ -106,16 +133,31 @@ mkdir -p "$OUTPUT_DIR"
 echo "Running OpenROAD with generated TCL file..."
 
 # Use openroad from ISPD26-Contest directory
-OPENROAD_BIN="/home/mitch24/ISPD26-Contest/openroad/openroad"
+OPENROAD_BIN="${OPENROAD_BIN:-/home/mitch24/ISPD26-Contest/openroad/openroad}"
 
 if [[ ! -x "$OPENROAD_BIN" ]]; then
   echo "Error: OpenROAD not found at $OPENROAD_BIN" >&2
   exit 5
 fi
 
-"$OPENROAD_BIN" \
-  -no_init \
-  -exit \
-  "$GENERATED_TCL_FILE"
+# Wall-clock/RSS budgets and resource trace (OR_WATCHDOG=0 to disable)
+SUPERVISOR="$SCRIPT_DIR/tools/or_supervisor.py"
+
+if [[ "${OR_WATCHDOG:-1}" != 0 && -f "$SUPERVISOR" ]]; then
+  python3 "$SUPERVISOR" \
+    --design "$DESIGN_NAME" \
+    --stage flow \
+    --run-dir "$OUTPUT_DIR" \
+    -- "$OPENROAD_BIN" -no_init -exit "$GENERATED_TCL_FILE"
+else
+  "$OPENROAD_BIN" \
+    -no_init \
+    -exit \
+    "$GENERATED_TCL_FILE"
+fi
+
+status=$?
 
 # $BIN_DIR/gen_changelist "$DESIGN_DIR/contest.def" "$OUTPUT_DIR/$DESIGN_NAME.def" "$OUTPUT_DIR/$DESIGN_NAME.changelist"
+
+exit $status
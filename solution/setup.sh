@@ -0,0 +1,3 @@
+#!/bin/bash
+# Dependencies of the solution tools (solution/tools/liberty.py and users).
+python3 -c "import numpy" 2>/dev/null || python3 -m pip install --quiet numpy
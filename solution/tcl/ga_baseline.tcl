@@ -6,21 +6,36 @@ set design_name $::env(DESIGN_NAME)
 set tech_dir    $::env(TECH_DIR)
 set design_dir  $::env(DESIGN_DIR)
 set out_dir     $::env(OUTPUT_DIR)
+set design_db   $::env(DESIGN_DB)
+set tcl_dir     $::env(TCL_DIR)
 
 set start [clock seconds]
+set start_ms [clock milliseconds]
+
+# Stage markers for solution/tools/profile_log.py
+source $tcl_dir/util/profile.tcl
+prof_instrument {
+  read_lef read_liberty read_verilog read_def read_db read_sdc
+  estimate_parasitics repair_design repair_timing detailed_placement global_route
+  write_verilog write_def
+}
+prof_begin setup
 
 # -------------------------------
 # 1) Read LEF / LIB
+#    With an ODB checkpoint (run.sh -b) the LEFs come from the database
 # -------------------------------
-read_lef  $tech_dir/lef/asap7_tech_1x_201209.lef
-
-foreach lef [lsort [glob -nocomplain $tech_dir/lef/asap7sc7p5t_28_*_1x_220121a.lef]] {
-  read_lef $lef
+if {$design_db eq ""} {
+  read_lef  $tech_dir/lef/asap7_tech_1x_201209.lef
+
+  foreach lef [lsort [glob -nocomplain $tech_dir/lef/asap7sc7p5t_28_*_1x_220121a.lef]] {
+    read_lef $lef
+  }
+  foreach lef [lsort [glob -nocomplain $tech_dir/lef/sram_asap7_*.lef]] {
+    read_lef $lef
+  }
+  read_lef $tech_dir/lef/fakeram_256x64.lef
 }
-foreach lef [lsort [glob -nocomplain $tech_dir/lef/sram_asap7_*.lef]] {
-  read_lef $lef
-}
-read_lef $tech_dir/lef/fakeram_256x64.lef
 
 foreach lib [lsort [glob -nocomplain $tech_dir/lib/asap7sc7p5t_*.lib]] {
   read_liberty $lib
@@ -33,8 +48,13 @@ read_liberty $tech_dir/lib/fakeram_256x64.lib
 # -------------------------------
 # 2) Read design
 # -------------------------------
-read_verilog $design_dir/contest.v
-read_def     $design_dir/contest.def
+if {$design_db ne ""} {
+  # Checkpoint from solution/tools/odb_checkpoint.py (LEF + Verilog + DEF)
+  read_db $design_db
+} else {
+  read_verilog $design_dir/contest.v
+  read_def     $design_dir/contest.def
+}
 read_sdc     $design_dir/contest.sdc
 
 # -------------------------------
@@ -60,7 +80,10 @@ set initial_tns [sta::total_negative_slack -max]
 puts "\[INFO\] Initial WNS: [format %.4f $initial_wns] ns"
 puts "\[INFO\] Initial TNS: [format %.4f $initial_tns] ns"
 
-set start_rsz [clock seconds]
+set start_rsz [prof_clock]
+puts "\[INFO\] Setup runtime:   [expr {([clock milliseconds] - $start_ms) / 1000.0}] second"
+prof_end setup
+prof_begin rsz
 
 # -------------------------------
 # 4) GA-Optimized Resizer
@@ -77,53 +100,80 @@ puts "\[INFO\] After repair_design:"
 puts "\[INFO\]   WNS: [format %.4f $after_rd_wns] ns"
 puts "\[INFO\]   TNS: [format %.4f $after_rd_tns] ns"
 
-# Run GA optimizer (replaces repair_timing)
+# Run GA optimizer on the worst setup paths (resizing + buffering)
 puts "\[INFO\] Running GA buffer optimization..."
+source $tcl_dir/util/ga.tcl
 
 # Create GA output directory
 set ga_output "$out_dir/ga_result"
 file mkdir $ga_output
 
-# Get script directory
-set script_dir [file dirname [info script]]
-
-# Run Python GA optimizer
-set ga_script "$script_dir/../ga_buffer_optimizer.py"
+# The generated script lives in tcl/temp/..., so locate the optimizer via tcl_dir
+set ga_script "$tcl_dir/../ga_buffer_optimizer.py"
+set ga_budget 60
+if {[info exists ::env(GA_TIME_BUDGET)]} {
+    set ga_budget $::env(GA_TIME_BUDGET)
+}
 
+set ga_applied 0
 if {[file exists $ga_script]} {
+    set ga_context "$ga_output/ga_context.txt"
+    set n_paths [ga_export_context $ga_context]
+    puts "\[INFO\] Exported $n_paths violating paths to $ga_context"
     puts "\[INFO\] Launching GA optimizer: $ga_script"
-    
-    # Run GA optimization in background and wait
+
+    # Current placement (after repair_design) for legal buffer locations
+    set ga_placement "$ga_output/ga_placement.def"
+    write_def $ga_placement
+
     set ga_log "$ga_output/ga_optimization.log"
-    
-    if {[catch {exec python3 $ga_script $design_name $tech_dir $design_dir $ga_output >& $ga_log} ga_result]} {
-        puts "\[WARN\] GA optimizer encountered issues (may be normal): $ga_result"
+    set ga_changelist "$ga_output/ga_work/best_solution.changelist"
+    file delete -force $ga_changelist
+    if {[catch {exec python3 $ga_script $design_name $tech_dir $design_dir $ga_output \
+                  --context $ga_context --time-budget $ga_budget \
+                  --placement $ga_placement >& $ga_log} ga_result]} {
+        puts "\[WARN\] GA optimizer failed: $ga_result"
         puts "\[INFO\] Check log at: $ga_log"
     }
-    
-    # Check if GA produced a solution
-    set ga_solution "$ga_output/ga_work/best_solution.json"
-    
-    if {[file exists $ga_solution]} {
-        puts "\[INFO\] GA optimization completed successfully"
-        puts "\[INFO\] Solution saved at: $ga_solution"
-        
-        # Parse and apply GA solution
-        # For now, we'll use standard repair_timing with GA insights
-        puts "\[INFO\] Applying optimizations based on GA analysis..."
-        
-        # Apply standard repair_timing (GA has analyzed the best buffer strategy)
-        repair_timing -setup -skip_gate_cloning -skip_pin_swap
-        
-        puts "\[INFO\] GA-guided optimization applied"
+
+    if {[file exists $ga_changelist]} {
+        set ga_applied [ga_apply_changelist $ga_changelist]
+        puts "\[INFO\] Applied $ga_applied GA changes from $ga_changelist"
+        estimate_parasitics -placement
+        puts "\[INFO\] After GA:"
+        puts "\[INFO\]   WNS: [format %.4f [sta::worst_slack -max]] ns"
+        puts "\[INFO\]   TNS: [format %.4f [sta::total_negative_slack -max]] ns"
     } else {
-        puts "\[WARN\] GA solution not found, using standard repair_timing"
-        repair_timing -setup -skip_gate_cloning -skip_pin_swap
+        puts "\[WARN\] GA solution not found"
     }
 } else {
     puts "\[WARN\] GA optimizer script not found at: $ga_script"
-    puts "\[INFO\] Falling back to standard repair_timing"
-    repair_timing -setup -skip_gate_cloning -skip_pin_swap
+}
+
+# Fix whatever the GA did not cover (paths beyond the exported set)
+repair_timing -setup -skip_gate_cloning -skip_pin_swap
+
+# Optional Vt-swap leakage recovery on the cells with positive slack
+# (solution/tools/leakage_recovery.py), LEAKAGE_RECOVERY=1 to enable
+if {[info exists ::env(LEAKAGE_RECOVERY)] && $::env(LEAKAGE_RECOVERY)} {
+    source $tcl_dir/util/sta_export.tcl
+    source $tcl_dir/../../equiv_check/or_utils.tcl
+    set lr_dir "$out_dir/leakage"
+    file mkdir $lr_dir
+    write_node_and_net_files $lr_dir/node.csv $lr_dir/nets.csv
+    sta_export_instance_slacks $lr_dir/inst_slacks.txt
+    set lr_changelist "$lr_dir/leakage.changelist"
+    file delete -force $lr_changelist
+    if {[catch {exec python3 $tcl_dir/../tools/leakage_recovery.py run -d $design_name \
+                  --nodes $lr_dir/node.csv --nets $lr_dir/nets.csv \
+                  --slacks $lr_dir/inst_slacks.txt -o $lr_changelist >& $lr_dir/leakage.log} lr_result]} {
+        puts "\[WARN\] Leakage recovery failed: $lr_result"
+    } elseif {[file exists $lr_changelist]} {
+        set lr_applied [ga_apply_changelist $lr_changelist]
+        puts "\[INFO\] Applied $lr_applied Vt swaps from $lr_changelist"
+        puts "\[INFO\]   WNS: [format %.4f [sta::worst_slack -max]] ns"
+        puts "\[INFO\]   TNS: [format %.4f [sta::total_negative_slack -max]] ns"
+    }
 }
 
 # -------------------------------
@@ -158,12 +208,14 @@ report_worst_slack -max -digits 4
 puts "\[INFO\] Design Statistics:"
 set total_insts [llength [get_cells -hier *]]
 puts "\[INFO\] Total instances: $total_insts"
+prof_end rsz
 
 # -------------------------------
 # 7) Write outputs
 # -------------------------------
-set end_rsz [clock seconds]
-puts "\[INFO\] Total RSZ runtime: [expr {$end_rsz - $start_rsz}] seconds"
+set end_rsz [prof_clock]
+puts "\[INFO\] Total RSZ runtime: [prof_elapsed $start_rsz $end_rsz] seconds"
+puts "\[INFO\] OR RSZ runtime:   [prof_elapsed $start_rsz $end_rsz] second"
 
 write_verilog $out_dir/$design_name.v
 write_def     $out_dir/$design_name.def
@@ -187,7 +239,7 @@ puts $report_file "Improvement:"
 puts $report_file "  WNS: [format %.4f [expr {$final_wns - $initial_wns}]] ns"
 puts $report_file "  TNS: [format %.4f [expr {$final_tns - $initial_tns}]] ns"
 puts $report_file ""
-puts $report_file "Runtime: [expr {$end_rsz - $start_rsz}] seconds"
+puts $report_file "Runtime: [prof_elapsed $start_rsz $end_rsz] seconds"
 puts $report_file "Total instances: $total_insts"
 puts $report_file "================================================================"
 close $report_file
@@ -0,0 +1,101 @@
+
+# ===============================
+# ISPD26 OpenROAD Sweep Flow
+# Baseline flow with repair options left as sweep parameters;
+# solution/tools/sweep.py fills in $::env(REPAIR_*) per variant.
+# ===============================
+
+set design_name $::env(DESIGN_NAME)
+set tech_dir    $::env(TECH_DIR)
+set design_dir  $::env(DESIGN_DIR)
+set out_dir     $::env(OUTPUT_DIR)
+set design_db   $::env(DESIGN_DB)
+set tcl_dir     $::env(TCL_DIR)
+
+set start [clock seconds]
+set start_ms [clock milliseconds]
+
+# Stage markers for solution/tools/profile_log.py
+source $tcl_dir/util/profile.tcl
+prof_instrument {
+  read_lef read_liberty read_verilog read_def read_db read_sdc
+  estimate_parasitics repair_design repair_timing detailed_placement global_route
+  write_verilog write_def
+}
+prof_begin setup
+
+# -------------------------------
+# 1) Read LEF / LIB
+#    With an ODB checkpoint (run.sh -b) the LEFs come from the database
+# -------------------------------
+if {$design_db eq ""} {
+  read_lef  $tech_dir/lef/asap7_tech_1x_201209.lef
+
+  foreach lef [lsort [glob -nocomplain $tech_dir/lef/asap7sc7p5t_28_*_1x_220121a.lef]] {
+    read_lef $lef
+  }
+  foreach lef [lsort [glob -nocomplain $tech_dir/lef/sram_asap7_*.lef]] {
+    read_lef $lef
+  }
+  read_lef $tech_dir/lef/fakeram_256x64.lef
+}
+
+foreach lib [lsort [glob -nocomplain $tech_dir/lib/asap7sc7p5t_*.lib]] {
+  read_liberty $lib
+}
+foreach lib [lsort [glob -nocomplain $tech_dir/lib/sram_asap7_*.lib]] {
+  read_liberty $lib
+}
+read_liberty $tech_dir/lib/fakeram_256x64.lib
+
+# -------------------------------
+# 2) Read design
+#    ⚠️ DEF 會建立 block
+# -------------------------------
+if {$design_db ne ""} {
+  # Checkpoint from solution/tools/odb_checkpoint.py (LEF + Verilog + DEF)
+  read_db $design_db
+} else {
+  read_verilog $design_dir/contest.v
+  read_def     $design_dir/contest.def
+}
+read_sdc     $design_dir/contest.sdc
+
+# -------------------------------
+# 3) RC model
+# -------------------------------
+set_ideal_network [all_clocks]
+
+set end_setting [clock seconds]
+
+source $tech_dir/util/setRC.tcl
+estimate_parasitics -placement
+
+# Keep units exactly as requested
+set_cmd_units -time ns -capacitance pF -current mA -voltage V -resistance kOhm -distance um
+set_units -power mW
+
+set start_rsz [prof_clock]
+puts "\[INFO\] Setup runtime:   [expr {([clock milliseconds] - $start_ms) / 1000.0}] second"
+prof_end setup
+prof_begin rsz
+# -------------------------------
+# 4) Baseline resizer
+# -------------------------------
+puts "\[INFO\] Start OpenROAD RSZ ..."
+
+repair_design $::env(REPAIR_DESIGN_ARGS)
+repair_timing -setup $::env(REPAIR_TIMING_ARGS)
+detailed_placement $::env(DETAILED_PLACEMENT_ARGS)
+prof_end rsz
+
+# -------------------------------
+# 5) Write outputs
+# -------------------------------
+set end_rsz [prof_clock]
+puts "\[INFO\] OR RSZ runtime:   [prof_elapsed $start_rsz $end_rsz] second"
+
+write_verilog $out_dir/$design_name.v
+write_def     $out_dir/$design_name.def
+
+exit
@@ -0,0 +1,205 @@
+# ===============================
+# GA optimizer I/O (solution/ga_buffer_optimizer.py)
+# ===============================
+# ga_export_context <file> ?max_paths?
+#   Writes the timing context of the worst setup paths:
+#     design <name> <insts> <wns_ns> <tns_ns>
+#     lib    <master> <input_cap_pF> <drive_res_kOhm>      (when available)
+#     path   <endpoint> <slack_ns>
+#     stage  <inst> <master> <out_pin> <net> <slack_ns>   (driver pins, in path order)
+#     net    <net> <driver_inst> <fanout>
+#     sink   <net> <inst> <pin> <master> <slack_ns>
+#     inst   <inst> <master> <x_um> <y_um>
+# ga_apply_changelist <file>
+#   Applies a changelist written by solution/tools/changelist.py.
+
+namespace eval ga {}
+
+# Nets with more loads than this are not listed sink by sink.
+set ga_max_sinks 64
+
+proc ga::pin_slack {pin default} {
+  if {[catch {get_property $pin slack_max} slack] || $slack eq "" || $slack eq "INF"} {
+    return $default
+  }
+  return $slack
+}
+
+proc ga_export_context {file_name {max_paths 500}} {
+  global ga_max_sinks
+  set block [ord::get_db_block]
+  set fp [open $file_name w]
+  puts $fp "design [$block getName] [llength [$block getInsts]]\
+            [sta::worst_slack -max] [sta::total_negative_slack -max]"
+
+  # Input cap / drive resistance per master, in the command units (pF, kOhm).
+  foreach cell [get_lib_cells *] {
+    set name [get_property $cell name]
+    set cap ""
+    set res ""
+    foreach port [get_lib_pins -of_objects $cell] {
+      set dir [get_property $port direction]
+      if {$dir eq "input" && $cap eq ""} {
+        catch {set cap [get_property $port capacitance]}
+      } elseif {$dir eq "output" && $res eq ""} {
+        catch {set res [get_property $port drive_resistance]}
+      }
+    }
+    if {$cap ne "" && $res ne ""} {
+      puts $fp "lib $name $cap $res"
+    }
+  }
+
+  set insts [dict create]
+  set nets [dict create]
+  set paths [find_timing_paths -path_delay max -group_path_count $max_paths \
+               -endpoint_path_count 1 -slack_max 0]
+  foreach path_end $paths {
+    set path_slack [sta::time_sta_ui [$path_end slack]]
+    puts $fp "path [get_full_name [$path_end pin]] $path_slack"
+    foreach pin [[$path_end path] pins] {
+      set iterm [sta::sta_to_db_pin $pin]
+      if {$iterm eq "NULL" || $iterm eq ""} {
+        continue
+      }
+      if {[[$iterm getMTerm] getIoType] ne "OUTPUT"} {
+        continue
+      }
+      set inst [$iterm getInst]
+      set net [$iterm getNet]
+      if {$net eq "NULL"} {
+        continue
+      }
+      set inst_name [$inst getName]
+      set net_name [$net getName]
+      puts $fp "stage $inst_name [[$inst getMaster] getName] [[$iterm getMTerm] getName]\
+                $net_name [ga::pin_slack $pin $path_slack]"
+      dict set insts $inst_name $inst
+      dict set nets $net_name [list $inst_name $pin]
+    }
+  }
+
+  dict for {net_name driver} $nets {
+    lassign $driver driver_name driver_pin
+    set loads [get_pins -quiet -of_objects [get_nets -of_objects $driver_pin] \
+                 -filter "direction == input"]
+    set fanout [llength $loads]
+    puts $fp "net $net_name $driver_name $fanout"
+    if {$fanout > $ga_max_sinks} {
+      continue
+    }
+    foreach pin $loads {
+      set iterm [sta::sta_to_db_pin $pin]
+      if {$iterm eq "NULL" || $iterm eq ""} {
+        continue
+      }
+      set inst [$iterm getInst]
+      puts $fp "sink $net_name [$inst getName] [[$iterm getMTerm] getName]\
+                [[$inst getMaster] getName] [ga::pin_slack $pin 1e30]"
+      dict set insts [$inst getName] $inst
+    }
+  }
+
+  dict for {inst_name inst} $insts {
+    set ll [$inst getLocation]
+    puts $fp "inst $inst_name [[$inst getMaster] getName]\
+              [$block dbuToMicrons [lindex $ll 0]] [$block dbuToMicrons [lindex $ll 1]]"
+  }
+  close $fp
+  return [llength $paths]
+}
+
+proc ga::master {name} {
+  set master [[ord::get_db] findMaster $name]
+  if {$master eq "NULL"} {
+    error "unknown master $name"
+  }
+  return $master
+}
+
+proc ga::pin_by_type {master type} {
+  foreach mterm [$master getMTerms] {
+    if {[$mterm getIoType] eq $type && [$mterm getSigType] eq "SIGNAL"} {
+      return [$mterm getName]
+    }
+  }
+  error "[$master getName] has no $type signal pin"
+}
+
+# Returns the number of applied changes; bad lines are reported and skipped.
+proc ga_apply_changelist {file_name} {
+  set block [ord::get_db_block]
+  set fp [open $file_name r]
+  set applied 0
+  while {[gets $fp line] >= 0} {
+    set f [regexp -all -inline {\S+} $line]
+    if {[llength $f] == 0 || [string index [lindex $f 0] 0] eq "#"} {
+      continue
+    }
+    if {[catch {ga::apply_change $block $f} err]} {
+      puts "\[WARN\] changelist: skipped '$line': $err"
+    } else {
+      incr applied
+    }
+  }
+  close $fp
+  return $applied
+}
+
+# Everything a change refers to is looked up before the netlist is edited,
+# so a bad line leaves the block untouched.
+proc ga::apply_change {block f} {
+  switch -- [lindex $f 0] {
+    resize {
+      lassign $f - inst_name master_name
+      set inst [$block findInst $inst_name]
+      if {$inst eq "NULL"} { error "unknown instance" }
+      if {![$inst swapMaster [ga::master $master_name]]} {
+        error "cannot swap $inst_name to $master_name"
+      }
+    }
+    buffer {
+      lassign $f - buf_name master_name x y net_name new_net_name
+      set net [$block findNet $net_name]
+      if {$net eq "NULL"} { error "unknown net" }
+      if {![string is double -strict $x] || ![string is double -strict $y]} {
+        error "bad location $x $y"
+      }
+      if {[$block findInst $buf_name] ne "NULL"} { error "instance $buf_name exists" }
+      if {[$block findNet $new_net_name] ne "NULL"} { error "net $new_net_name exists" }
+      set master [ga::master $master_name]
+      set in_pin [ga::pin_by_type $master INPUT]
+      set out_pin [ga::pin_by_type $master OUTPUT]
+      set iterms {}
+      foreach sink [lrange $f 7 end] {
+        set idx [string last "/" $sink]
+        set inst [$block findInst [string range $sink 0 [expr {$idx - 1}]]]
+        if {$inst eq "NULL"} { error "unknown sink $sink" }
+        set iterm [$inst findITerm [string range $sink [expr {$idx + 1}] end]]
+        if {$iterm eq "NULL"} { error "unknown sink $sink" }
+        if {[$iterm getNet] ne $net} { error "sink $sink is not on $net_name" }
+        lappend iterms $iterm
+      }
+
+      set buf [odb::dbInst_create $block $master $buf_name]
+      if {$buf eq "NULL"} { error "cannot create $buf_name" }
+      set new_net [odb::dbNet_create $block $new_net_name]
+      if {$new_net eq "NULL"} {
+        odb::dbInst_destroy $buf
+        error "cannot create net $new_net_name"
+      }
+      # Drive the new net before any sink moves onto it.
+      [$buf findITerm $in_pin] connect $net
+      [$buf findITerm $out_pin] connect $new_net
+      foreach iterm $iterms {
+        $iterm disconnect
+        $iterm connect $new_net
+      }
+      $buf setLocation [$block micronsToDbu $x] [$block micronsToDbu $y]
+      $buf setPlacementStatus PLACED
+    }
+    default {
+      error "unknown change type"
+    }
+  }
+}
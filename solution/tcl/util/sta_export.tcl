@@ -0,0 +1,66 @@
+# ===============================
+# OpenSTA dumps for the Python tools
+# ===============================
+# sta_export_endpoint_slacks <file> ?max_endpoints?
+#   One line per constrained setup endpoint, command units (ns):
+#     endpoint <pin> <slack_ns>
+#   Read by solution/tools/surrogate_sta.py (correlate).
+# sta_export_instance_slacks <file>
+#   One line per instance with a timed pin, command units (ns):
+#     inst <name> <master> <worst_slack_ns|INF> <max_input_slew_ns>
+#   Names as in node.csv (or_utils.tcl). Read by solution/tools/leakage_recovery.py.
+# sta_export_paths <file> ?max_endpoints?
+#   report_checks -format full_clock_expanded of the worst setup path per
+#   endpoint, with slew/cap/fanout/net columns. Read by solution/tools/timing_paths.py.
+
+proc sta_export_endpoint_slacks {file_name {max_endpoints 1000000}} {
+  set fp [open $file_name w]
+  set n 0
+  foreach path_end [find_timing_paths -path_delay max -group_path_count $max_endpoints \
+                      -endpoint_path_count 1] {
+    puts $fp "endpoint [get_full_name [$path_end pin]] [sta::time_sta_ui [$path_end slack]]"
+    incr n
+  }
+  close $fp
+  return $n
+}
+
+proc sta_export_instance_slacks {file_name} {
+  set fp [open $file_name w]
+  set n 0
+  foreach cell [get_cells *] {
+    set inst ""
+    set slack INF
+    set slew 0.0
+    foreach pin [get_pins -of_objects $cell] {
+      set iterm [sta::sta_to_db_pin $pin]
+      if {$iterm eq "NULL" || $iterm eq ""} {
+        continue
+      }
+      set inst [$iterm getInst]
+      if {![catch {get_property $pin slack_max} s] && $s ne "" && $s ne "INF"
+          && ($slack eq "INF" || $s < $slack)} {
+        set slack $s
+      }
+      if {[get_property $pin direction] eq "input"
+          && ![catch {get_property $pin slew_max} s] && $s ne "" && $s > $slew} {
+        set slew $s
+      }
+    }
+    if {$inst eq ""} {
+      continue
+    }
+    puts $fp "inst [string map {\\ ""} [$inst getName]] [[$inst getMaster] getName]\
+              $slack $slew"
+    incr n
+  }
+  close $fp
+  return $n
+}
+
+proc sta_export_paths {file_name {max_endpoints 1000}} {
+  report_checks -path_delay max -group_path_count $max_endpoints -endpoint_path_count 1 \
+    -sort_by_slack -format full_clock_expanded -fields {slew cap input_pins nets fanout} \
+    -digits 4 > $file_name
+  return $max_endpoints
+}
@@ -0,0 +1,198 @@
+# ===============================
+# What-if worker (solution/tools/or_worker_pool.py)
+# ===============================
+# OpenROAD started with -no_init (no -exit, no script) reads Tcl from its
+# stdin pipe. The pool sends one line per batch
+#   wp::run <id> <base64 script>
+# and waits for the reply line
+#   @@WP <id> <rc> <base64 result>
+# Anything else the process prints ends up in the worker log.
+#
+# wp_load <def> <verilog> <odb> <parasitics>
+#   Reads the design like scripts/evaluation.tcl (lib_setup.tcl and
+#   design_setup.tcl of the design, Liberty "best" set, SDC, setRC, units),
+#   or the ODB checkpoint instead of LEF/DEF/Verilog when <odb> is given,
+#   then routes it once and estimates parasitics: the baseline state.
+#   <parasitics> is global_routing (incremental global_route per query)
+#   or placement (estimate_parasitics -placement, no routing).
+# wp_whatif <changelist> <report>
+#   Applies a changelist (ga::apply_change) and records the inverse of
+#   every change, updates routes/parasitics, writes the metrics section of
+#   evaluation.log to <report> (parse_log.py reads it) and rolls back.
+# wp_report <report>
+#   The metrics section alone, for the baseline and --verify.
+
+source [file join [file dirname [info script]] ga.tcl]
+
+namespace eval wp {
+  variable undo {}
+  variable parasitics global_routing
+}
+
+proc wp::run {id encoded} {
+  set script [encoding convertfrom utf-8 [binary decode base64 $encoded]]
+  set rc [catch {uplevel #0 $script} result]
+  puts "@@WP $id $rc [binary encode base64 [encoding convertto utf-8 $result]]"
+  flush stdout
+}
+
+proc wp_load {def_file verilog_file db_file parasitics} {
+  global top_proj_dir design_name
+  set wp::parasitics $parasitics
+  uplevel #0 [list source $top_proj_dir/scripts/$design_name/lib_setup.tcl]
+  uplevel #0 [list source $top_proj_dir/scripts/$design_name/design_setup.tcl]
+
+  if {$db_file ne ""} {
+    read_db $db_file
+    foreach lib_file $::libbest { read_liberty $lib_file }
+  } else {
+    foreach lef_file $::lefs     { read_lef     $lef_file }
+    foreach lib_file $::libbest  { read_liberty $lib_file }
+    read_def     $def_file
+    read_verilog $verilog_file
+  }
+  read_sdc $::sdc_file
+  set_ideal_network [all_clocks]
+  source $::rc_file
+  set_cmd_units -time ns -capacitance pF -current mA -voltage V -resistance kOhm -distance um -power mW
+  set_units -power mW
+
+  if {$parasitics eq "global_routing"} {
+    if {[info exists ::route_signal_layers]} { set sig $::route_signal_layers } else { set sig "M2-M9" }
+    if {[info exists ::route_clock_layers]}  { set clk $::route_clock_layers }  else { set clk "M2-M9" }
+    set_routing_layers -signal $sig -clock $clk
+    global_route -skip_large_fanout_nets 300 -allow_congestion
+  }
+  wp::estimate
+  return [llength [get_cells *]]
+}
+
+proc wp::estimate {} {
+  variable parasitics
+  if {$parasitics eq "global_routing"} {
+    estimate_parasitics -global_routing
+  } else {
+    estimate_parasitics -placement
+  }
+}
+
+# Runs body between global_route -start_incremental / -end_incremental
+# when the design is routed, so only the nets it touches are rerouted.
+proc wp::incremental {body} {
+  variable parasitics
+  set routed [expr {$parasitics eq "global_routing"}]
+  if {$routed} { global_route -start_incremental }
+  set rc [catch {uplevel 1 $body} result]
+  if {$routed} { global_route -end_incremental }
+  return -code $rc $result
+}
+
+proc wp_report {file_name} {
+  set fp [open $file_name w]
+  puts $fp "design:                 [[ord::get_db_block] getName]"
+  puts $fp [format "total_insts:            %d" [llength [get_cells *]]]
+  close $fp
+  sta::redirect_file_append_begin $file_name
+  set rc [catch {
+    report_units
+    report_tns
+    report_wns
+    report_power
+  } err]
+  sta::redirect_file_end
+  if {$rc} { error $err }
+}
+
+proc wp_whatif {changelist report} {
+  set applied 0
+  set rc [catch {
+    wp::incremental { set applied [wp_apply_changelist $changelist] }
+    wp::estimate
+    wp_report $report
+  } err]
+  wp::incremental { wp_rollback }
+  if {$rc} { error $err }
+  return $applied
+}
+
+# ga_apply_changelist with an undo record; bad lines are reported and skipped.
+proc wp_apply_changelist {file_name} {
+  set block [ord::get_db_block]
+  set fp [open $file_name r]
+  set applied 0
+  while {[gets $fp line] >= 0} {
+    set f [regexp -all -inline {\S+} $line]
+    if {[llength $f] == 0 || [string index [lindex $f 0] 0] eq "#"} {
+      continue
+    }
+    if {[catch {wp::record $block $f; ga::apply_change $block $f} err]} {
+      puts "\[WARN\] changelist: skipped '$line': $err"
+    } else {
+      incr applied
+    }
+  }
+  close $fp
+  return $applied
+}
+
+proc wp::iterm {block sink} {
+  set idx [string last "/" $sink]
+  set inst [$block findInst [string range $sink 0 [expr {$idx - 1}]]]
+  if {$inst eq "NULL"} { return NULL }
+  return [$inst findITerm [string range $sink [expr {$idx + 1}] end]]
+}
+
+# Records how to undo a change before it is applied. A buffer whose
+# instance or net name is taken is refused here, so the undo never
+# destroys an object the change did not create.
+proc wp::record {block f} {
+  variable undo
+  switch -- [lindex $f 0] {
+    resize {
+      set inst [$block findInst [lindex $f 1]]
+      if {$inst ne "NULL"} {
+        lappend undo [list resize [lindex $f 1] [[$inst getMaster] getName]]
+      }
+    }
+    buffer {
+      lassign $f - buf_name - - - - new_net_name
+      if {[$block findInst $buf_name] ne "NULL"} { error "instance $buf_name exists" }
+      if {[$block findNet $new_net_name] ne "NULL"} { error "net $new_net_name exists" }
+      set sinks {}
+      foreach sink [lrange $f 7 end] {
+        set iterm [wp::iterm $block $sink]
+        if {$iterm eq "NULL"} { error "unknown sink $sink" }
+        set net [$iterm getNet]
+        lappend sinks $sink [expr {$net eq "NULL" ? "" : [$net getName]}]
+      }
+      lappend undo [list unbuffer $buf_name $new_net_name $sinks]
+    }
+  }
+}
+
+proc wp_rollback {} {
+  variable ::wp::undo
+  set block [ord::get_db_block]
+  foreach entry [lreverse $undo] {
+    switch -- [lindex $entry 0] {
+      resize {
+        lassign $entry - inst_name master_name
+        [$block findInst $inst_name] swapMaster [ga::master $master_name]
+      }
+      unbuffer {
+        lassign $entry - buf_name new_net_name sinks
+        foreach {sink net_name} $sinks {
+          set iterm [wp::iterm $block $sink]
+          if {$iterm eq "NULL"} { continue }
+          $iterm disconnect
+          if {$net_name ne ""} { $iterm connect [$block findNet $net_name] }
+        }
+        set buf [$block findInst $buf_name]
+        if {$buf ne "NULL"} { odb::dbInst_destroy $buf }
+        set net [$block findNet $new_net_name]
+        if {$net ne "NULL"} { odb::dbNet_destroy $net }
+      }
+    }
+  }
+  set undo {}
+}
@@ -248,7 +248,14 @@ def main() -> int:
         header = header + [f"extra_{i}" for i in range(len(header), len(last_row))]
 
     row_dict = {header[i]: last_row[i] for i in range(len(header))}
-    s_final = compute_s_final(row_dict)
+    run_status = row_dict.get("run_status") or "ok"
+    if run_status != "ok":
+        # Partial log of a run stopped by the watchdog: no meaningful score.
+        print(f"Warning: run_status={run_status}, leaving S_final empty: {csv_path}",
+              file=sys.stderr)
+        s_final = ""
+    else:
+        s_final = compute_s_final(row_dict)
 
     if "S_final" in header:
         s_col = header.index("S_final")
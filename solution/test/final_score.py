@@ -3,8 +3,6 @@ from pathlib import Path
 import csv
 
 out_dir="/ISPD26-Contest/solution/output"
-tcl_name = Path(sys.argv[1])
-csv_path = Path(out_dir) / tcl_name
 
 chips={
     "aes_cipher_top": 1,
@@ -19,37 +17,46 @@ chips={
 
 
 
-output_csv = csv_path / "final_score.csv"
+def main():
+    tcl_name = Path(sys.argv[1])
+    csv_path = Path(out_dir) / tcl_name
 
-rows = []
-weighted_sum = 0.0
+    output_csv = csv_path / "final_score.csv"
 
-for chip, weight in chips.items():
+    rows = []
+    weighted_sum = 0.0
 
-    metrics_list = list((csv_path / chip).glob("*/metrics.csv"))
-    assert len(metrics_list) == 1
-    metrics_csv = metrics_list[0]
+    for chip, weight in chips.items():
 
-    with open(metrics_csv, newline="") as f:
-        reader = csv.DictReader(f)
-        data = next(reader)          # 假設只有一行結果
-        score = float(data["S_final"])
+        metrics_list = list((csv_path / chip).glob("*/metrics.csv"))
+        assert len(metrics_list) == 1
+        metrics_csv = metrics_list[0]
 
-    rows.append({
-        "chip": chip,
-        "score": score,
-        "weighted_score": score * weight,
-    })
+        with open(metrics_csv, newline="") as f:
+            reader = csv.DictReader(f)
+            data = next(reader)          # 假設只有一行結果
+            # Empty for runs stopped by the watchdog (run_status != ok).
+            score = float(data.get("S_final") or "nan")
 
-    weighted_sum += score * weight
+        rows.append({
+            "chip": chip,
+            "score": score,
+            "weighted_score": score * weight,
+        })
 
-with open(output_csv, "w", newline="") as f:
-    fieldnames = ["chip", "score", "weighted_score"]
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(rows)
-    writer.writerow({
-        "chip": "final_score",
-        "score": "",
-        "weighted_score": weighted_sum,
-    })
+        weighted_sum += score * weight
+
+    with open(output_csv, "w", newline="") as f:
+        fieldnames = ["chip", "score", "weighted_score"]
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+        writer.writerow({
+            "chip": "final_score",
+            "score": "",
+            "weighted_score": weighted_sum,
+        })
+
+
+if __name__ == "__main__":
+    main()
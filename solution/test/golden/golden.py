@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+Golden-corpus differential tests and throughput benchmark for the scoring
+pipeline: scripts/parse_log.py -> cal_total_score.py -> final_score.py.
+
+Their exact numeric output decides what we submit, so any change to them
+(speed-ups included) must reproduce the recorded outputs byte for byte.
+
+corpus/<case>/  one OpenROAD log per case (evaluation.log, run.log, or a
+                .gz of either), optionally with metrics.prev.csv, an older
+                metrics.csv the row is appended to
+expected/<case>.json
+                golden output of the case: the parse_log() dict, the
+                print_metrics() report, metrics.csv after parse_log --csv
+                and cal_total_score.py, and the scorer's exit code/error
+expected/final_<set>.csv
+                final_score.csv over one case per design
+throughput.json reference parse MB/s and scoring rows/s for `check`, with
+                the calibration speed of the machine that recorded them
+
+The synthetic cases are generated deterministically in OpenROAD/OpenSTA
+output formats by `corpus`: the eight designs at their baseline magnitudes,
+plus illegal placements, DPL failures/retries, missing sections, power-unit
+variants, the older per-gcell GR dump, watchdog kills, ANSI/CRLF output, a
+compressed log, an unknown design, an append to an older metrics.csv and a
+[DISPLACEMENT] marker on each design whose baseline displacement is 0 (their
+S_final is also checked against a recomputation without the term).
+`add` copies a recorded log of a real run into the corpus; `check` warns
+while there is none, since synthetic goldens only pin the current output.
+
+check   compare every case with its golden (exit 1 on any difference), then
+        measure throughput (exit 3 when it falls more than --tolerance
+        below throughput.json in two measurements); --no-bench skips
+        the second part
+bench   measure only; --record stores the result as the new reference
+update  rewrite the goldens from the current code (after an intended change)
+
+Absolute MB/s vary by tens of percent between runs and machines, so each
+measurement is divided by the speed of a fixed calibration workload (regex
+and float parsing of the same lines, no repo code) timed in the same
+process, and `check` compares those ratios with the recorded ones.
+
+python3 solution/test/golden/golden.py check
+python3 solution/test/golden/golden.py bench --record
+python3 solution/test/golden/golden.py add ariane_run42 <run>/evaluation.log
+python3 solution/test/golden/golden.py corpus && python3 solution/test/golden/golden.py update
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+GOLDEN_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(GOLDEN_DIR.parents[1] / "tools"))
+
+from common import SCENARIOS  # noqa: E402  (puts scripts/ and solution/test/ on sys.path)
+
+import cal_total_score  # noqa: E402
+import final_score  # noqa: E402
+import parse_log  # noqa: E402
+
+CORPUS_DIR = GOLDEN_DIR / "corpus"
+EXPECTED_DIR = GOLDEN_DIR / "expected"
+THROUGHPUT_FILE = GOLDEN_DIR / "throughput.json"
+LOG_NAMES = ("evaluation.log", "evaluation.log.gz", "run.log", "run.log.gz")
+DEFAULT_TOLERANCE = 0.30
+
+# final_score.csv sets: design -> case
+FINAL_SETS = {
+    "nominal": {d: d for d in SCENARIOS},
+    "killed": dict({d: d for d in SCENARIOS}, ariane="ariane_killed",
+                   bsg_chip="bsg_chip_flow_killed"),
+    "displaced": {d: f"{d}_displaced" if cal_total_score.baseline[d]["displacement"] == 0
+                  else d for d in SCENARIOS},
+}
+
+
+# ---------------- synthetic OpenROAD logs ----------------
+def _banner(design: str) -> List[str]:
+    return [
+        "OpenROAD v2.0-17598-ga008522d8 ",
+        "Features included (+) or not (-): +GPU +GUI +Python",
+        "This program is licensed under the BSD-3 license. See the LICENSE file for details.",
+        "Components of this program may be licensed under more restrictive licenses which must be honored.",
+        "[INFO ODB-0227] LEF file: /ISPD26-Contest/Platform/ASAP7/lef/asap7_tech_1x_201209.lef, "
+        "created 30 layers, 9 vias",
+        "[INFO ODB-0227] LEF file: /ISPD26-Contest/Platform/ASAP7/lef/asap7sc7p5t_28_R_1x_220121a.lef, "
+        "created 212 library cells",
+        "[INFO ODB-0128] Design: " + design,
+        "[INFO ODB-0130]     Created 390 pins.",
+        "[INFO ODB-0131]     Created 14006 components and 73412 component-terminals.",
+        "[INFO ODB-0133]     Created 14268 nets and 45391 connections.",
+    ]
+
+
+def _units(power: Optional[str] = "pW") -> List[str]:
+    lines = [" time 1ns", " capacitance 1pF", " resistance 1kohm", " voltage 1v",
+             " current 1mA"]
+    if power is not None:
+        lines.append(f" power 1{power}")
+    lines.append(" distance 1um")
+    return lines
+
+
+def _power_table(dyn_w: float, leak_w: float, rng: random.Random,
+                 header: str = "Power (Watts)") -> List[str]:
+    shares = [("Sequential", 0.22), ("Combinational", 0.61), ("Clock", 0.17),
+              ("Macro", 0.0), ("Pad", 0.0)]
+    rows, tot = [], [0.0, 0.0, 0.0]
+    for name, share in shares:
+        d = dyn_w * share * rng.uniform(0.97, 1.03)
+        internal, switching = d * 0.58, d * 0.42
+        leak = leak_w * share
+        tot = [tot[0] + internal, tot[1] + switching, tot[2] + leak]
+        total = internal + switching + leak
+        rows.append(f"{name:<22s} {internal:10.2e} {switching:10.2e} {leak:10.2e} "
+                    f"{total:10.2e} {100.0 * total / max(dyn_w + leak_w, 1e-30):5.1f}%")
+    grand = sum(tot)
+    return (["Group                  Internal  Switching    Leakage      Total",
+             f"                          Power      Power      Power      {header}",
+             "-" * 64] + rows + ["-" * 64,
+            f"{'Total':<22s} {tot[0]:10.2e} {tot[1]:10.2e} {tot[2]:10.2e} {grand:10.2e} 100.0%",
+            f"{'':22s} {100 * tot[0] / grand:9.1f}% {100 * tot[1] / grand:9.1f}% "
+            f"{100 * tot[2] / grand:9.1f}%", ""])
+
+
+def _violators(kind: str, total: float, rng: random.Random, max_rows: int = 1500) -> List[str]:
+    """report_check_types -violators table whose overs sum to about `total`."""
+    title, col, limit, fmt = {
+        "slew": ("max slew", "Slew", 0.32, "{:8.2f}"),
+        "cap": ("max capacitance", "Cap", 0.0461, "{:8.4f}"),
+        "fanout": ("max fanout", "Fanout", 32.0, "{:8.0f}"),
+    }[kind]
+    if kind == "fanout" and total < 1:
+        total = 0.0  # whole-pin overs: a fractional baseline means none
+    lines = [title, "", f"{'Pin':<40s} {'Limit':>8s} {col:>8s} {'Slack':>8s}", "-" * 68]
+    n = 0 if total <= 0 else max(3, min(max_rows, int(total ** 0.5)))
+    for i in range(n):
+        over = total / n * rng.uniform(0.5, 1.5)
+        if kind == "fanout":
+            over = max(1.0, round(over))
+        value = limit + over
+        pin = f"_{rng.randrange(10000, 99999)}_/{rng.choice(['A', 'B', 'Y', 'D', 'CLK'])}"
+        lines.append(f"{pin:<40s} {fmt.format(limit)} {fmt.format(value)} "
+                     f"{fmt.format(limit - value)} (VIOLATED)")
+    return lines + [""]
+
+
+def _gr_summary(rng: random.Random, max_over: int = 0, total_over: int = 0) -> List[str]:
+    nx, ny = rng.randrange(80, 400), rng.randrange(80, 400)
+    return [f"[GCELL_DUMP] file=/ISPD26-Contest/solution/output/baseline/gcell_usage.bin "
+            f"nx={nx} ny={ny} layers=9",
+            f"max_gr_overflow:        {max_over}",
+            f"total_gr_overflow:      {total_over}"]
+
+
+def _gr_report(rng: random.Random) -> List[str]:
+    lines = ["[INFO GRT-0020] Min routing layer: M2", "[INFO GRT-0021] Max routing layer: M9",
+             "[INFO GRT-0022] Global adjustment: 0%", "[INFO GRT-0096] Final congestion report:",
+             "Layer         Resource        Demand        Usage (%)    Max H / Max V / Total Overflow",
+             "-" * 87]
+    res_tot = dem_tot = 0
+    for layer in ("M1", "M2", "M3", "M4", "M5", "M6", "M7", "M8", "M9"):
+        res = 0 if layer == "M1" else rng.randrange(20000, 90000)
+        dem = int(res * rng.uniform(0.2, 0.6))
+        res_tot, dem_tot = res_tot + res, dem_tot + dem
+        usage = 100.0 * dem / res if res else 0.0
+        lines.append(f"{layer:<12s} {res:>10d} {dem:>13d} {usage:>15.2f}% {0:>13d} / {0:>2d} / {0:>2d}")
+    lines += ["-" * 87,
+              f"{'Total':<12s} {res_tot:>10d} {dem_tot:>13d} {100.0 * dem_tot / res_tot:>15.2f}%"
+              f" {0:>13d} / {0:>2d} / {0:>2d}", "",
+              f"[INFO GRT-0018] Total wirelength: {rng.randrange(100000, 9000000)} um"]
+    return lines
+
+
+def nominal(design: str, seed: int, *, power_unit: Optional[str] = "pW",
+            power_header: str = "Power (Watts)", power_scale: float = 1e-12,
+            sections: Tuple[str, ...] = ("units", "timing", "power", "gr", "checks"),
+            gr: str = "summary", displacement: Optional[float] = None,
+            rsz_line: str = "[INFO] OR RSZ runtime:   {t} second",
+            tail: Optional[List[str]] = None) -> str:
+    """An evaluation.log of `design` near its cal_total_score baseline.
+
+    displacement: the [DISPLACEMENT] average to append (um); by default the
+    design's baseline, jittered, when that is nonzero, else no marker."""
+    rng = random.Random(seed)
+    base = cal_total_score.baseline.get(design, cal_total_score.baseline["aes_cipher_top"])
+    out = _banner(design)
+    out += [f"[INFO] Total RSZ runtime: {int(base['tool_runtime'] * rng.uniform(0.8, 1.1))} seconds",
+            rsz_line.format(t=int(base["tool_runtime"] * rng.uniform(0.8, 1.1))),
+            "### Check placement legality ###", "Placement is legal; skip legalization.",
+            "### Global routing (first attempt) ###"]
+    out += _gr_report(rng)
+    out += ["===== METRICS =====", f"design:                 {design}",
+            "placement_legal:        1",
+            f"total_insts:            {rng.randrange(10000, 900000)}"]
+    if "units" in sections:
+        out += _units(power_unit)
+    if "timing" in sections:
+        tns = base["tns"] * rng.uniform(0.85, 1.02)
+        out += [f"tns max {tns:.2f}", f"wns max {tns / rng.uniform(200, 2000):.2f}"]
+    if "power" in sections:
+        out += _power_table(base["dpower"] * power_scale * rng.uniform(0.95, 1.02),
+                            base["lpower"] * power_scale * rng.uniform(0.9, 1.01), rng,
+                            power_header)
+    if "gr" in sections:
+        if gr == "summary":
+            out += _gr_summary(rng)
+        elif gr == "text":
+            out += ["Start Global Routing Results Analysis"]
+            for x in range(48):
+                for y in range(40):
+                    cap = rng.randrange(20, 60)
+                    use = cap + rng.randrange(-30, 4)
+                    out.append(f"{x} {y} {cap} {max(use, 0)} {max(use, 0) * 100.0 / cap!r}")
+            out += ["End Global Routing Results Analysis"]
+        elif gr == "hv":
+            out += ["max H overflow: 3", "max V overflow: 5", "total overflow: 12"]
+    if "checks" in sections:
+        out += _violators("slew", base["slew_over_sum"] * rng.uniform(0.8, 1.05), rng)
+        out += _violators("cap", base["cap_over_sum"] * rng.uniform(0.8, 1.05), rng)
+        out += _violators("fanout", base["fanout_over_sum"] * rng.uniform(0.8, 1.05), rng)
+    out.append(f"[INFO] Flow running time:   {int(base['flow_runtime'] * rng.uniform(0.8, 1.2))} second")
+    if displacement is None and base["displacement"] > 0:
+        displacement = base["displacement"] * rng.uniform(0.8, 1.2)
+    if displacement is not None:
+        out.append(f"[DISPLACEMENT] avg={displacement:.4f} "
+                   f"cells={rng.randrange(10000, 900000)} moved={rng.randrange(100, 5000)} "
+                   f"max={rng.uniform(1, 9):.3f} inserted={rng.randrange(0, 300)} removed=0")
+    out += tail or []
+    return "\n".join(out) + "\n"
+
+
+def _illegal(design: str, seed: int) -> str:
+    rng = random.Random(seed)
+    out = _banner(design) + ["### Check placement legality ###"]
+    for code, name in (("DPL-0005", "Overlap check failed"), ("DPL-0006", "Site alignment check failed"),
+                       ("DPL-0007", "Row check failed")):
+        out.append(f"[WARNING {code}] {name} ({rng.randrange(1, 400)}).")
+    out.append("[WARNING DPL-0005] Overlap check failed (7).")
+    out.append("check_placement reported errors: [ERROR DPL-0033] detailed placement checks failed.")
+    return "\n".join(out) + "\n"
+
+
+def _dpl_retry(design: str, seed: int) -> str:
+    head = ["INFO: global_route failed on first attempt: [ERROR GRT-0076] Instance _43120_ is not placed.",
+            "INFO: running detailed_placement, then retrying global_route...",
+            "Placement Analysis",
+            "---------------------------------",
+            "total displacement        312.4 u",
+            "average displacement        0.0 u",
+            "max displacement            4.2 u",
+            "original HPWL           41235.1 u",
+            "legalized HPWL          41301.7 u",
+            "delta HPWL                    0 %",
+            "",
+            "Placement legalized."]
+    text = nominal(design, seed)
+    return text.replace("### Global routing (first attempt) ###\n",
+                        "### Global routing (first attempt) ###\n" + "\n".join(head) + "\n", 1)
+
+
+def _dpl_failed(design: str, seed: int) -> str:
+    out = _banner(design) + [
+        "### Check placement legality ###", "Placement is legal; skip legalization.",
+        "### Global routing (first attempt) ###",
+        "INFO: global_route failed on first attempt: [ERROR GRT-0076] Instance _1201_ is not placed.",
+        "INFO: running detailed_placement, then retrying global_route...",
+        "[WARNING DPL-0004] Placed in rows check failed (12).",
+        "[ERROR DPL-0036] Detailed placement failed.",
+        "Error: evaluation.tcl, 86 DPL-0036"]
+    return "\n".join(out) + "\n"
+
+
+def _killed(design: str, seed: int) -> str:
+    text = nominal(design, seed, sections=("units", "timing"))
+    return text + (f"[WATCHDOG] killed stage=eval design={design} reason=wall_timeout "
+                   f"elapsed=7200.4 peak_rss=12.3G\n")
+
+
+def _flow_killed(design: str, seed: int) -> str:
+    rng = random.Random(seed)
+    out = _banner(design) + ["[INFO RSZ-0027] Inserted 512 input buffers.",
+                             "[INFO RSZ-0028] Inserted 1024 output buffers."]
+    for i in range(40):
+        out.append(f"[PROFILE] begin repair_timing {1000 * i} {rng.randrange(10**6, 10**7)} "
+                   f"{rng.randrange(10**7, 2 * 10**7)}")
+    out.append(f"[WATCHDOG] killed stage=flow design={design} reason=rss_budget "
+               "elapsed=3121.7 peak_rss=48.0G")
+    return "\n".join(out) + "\n"
+
+
+def _ansi_crlf(design: str, seed: int) -> str:
+    text = nominal(design, seed)
+    lines = []
+    for k, line in enumerate(text.splitlines()):
+        if line.startswith("[INFO") or line.startswith("tns") or k % 7 == 0:
+            line = f"\x1b[32m{line}\x1b[0m"
+        lines.append(line)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def _baseline_format(design: str, seed: int) -> str:
+    text = nominal(design, seed, rsz_line="[INFO] OpenROAD RSZ running time:   {t} second")
+    # evaluation_baseline.tcl reports timing twice (before and after repair)
+    extra = "tns max -999.99\nwns max -9.99\n"
+    return text + extra
+
+
+CASES: Dict[str, Tuple[str, Callable[[], str]]] = {}
+
+
+def _case(name: str, log_name: str, fn: Callable[[], str]) -> None:
+    CASES[name] = (log_name, fn)
+
+
+for _k, _d in enumerate(SCENARIOS):
+    _case(_d, "evaluation.log", lambda d=_d, s=_k: nominal(d, 1000 + s))
+_case("aes_cipher_top_illegal", "evaluation.log", lambda: _illegal("aes_cipher_top", 1))
+_case("jpeg_encoder_dpl_retry", "evaluation.log", lambda: _dpl_retry("jpeg_encoder", 2))
+_case("ariane_dpl_failed", "evaluation.log", lambda: _dpl_failed("ariane", 3))
+_case("bsg_chip_v2_missing_sections", "evaluation.log",
+      lambda: nominal("bsg_chip_v2", 4, sections=()))
+_case("aes_cipher_top_v2_power_mw", "evaluation.log",
+      lambda: nominal("aes_cipher_top_v2", 5, power_unit="mW"))
+_case("jpeg_encoder_v2_power_no_banner", "evaluation.log",
+      lambda: nominal("jpeg_encoder_v2", 6, power_unit=None))
+_case("ariane_v2_power_table_mw", "evaluation.log",
+      lambda: nominal("ariane_v2", 7, power_unit="uW", power_header="Power (mW)",
+                      power_scale=1e-9))
+_case("bsg_chip_power_unknown_unit", "evaluation.log",
+      lambda: nominal("bsg_chip", 8, power_unit="kW"))
+_case("aes_cipher_top_gr_text", "evaluation.log",
+      lambda: nominal("aes_cipher_top", 9, gr="text"))
+_case("jpeg_encoder_gr_hv", "evaluation.log", lambda: nominal("jpeg_encoder", 10, gr="hv"))
+_case("ariane_killed", "evaluation.log", lambda: _killed("ariane", 11))
+_case("bsg_chip_flow_killed", "run.log", lambda: _flow_killed("bsg_chip", 12))
+_case("aes_cipher_top_v2_ansi_crlf", "evaluation.log", lambda: _ansi_crlf("aes_cipher_top_v2", 13))
+_case("jpeg_encoder_v2_gz", "evaluation.log.gz", lambda: nominal("jpeg_encoder_v2", 14))
+_case("aes_cipher_top_append", "evaluation.log", lambda: nominal("aes_cipher_top", 15))
+_case("aes_cipher_top_baseline_format", "evaluation.log",
+      lambda: _baseline_format("aes_cipher_top", 16))
+_case("unknown_design", "evaluation.log", lambda: nominal("spm", 17))
+# A displacement marker in the log of a design whose baseline displacement is
+# 0: compute_s_final divides by (0 + 1e-8), so parse_log must drop it.
+ZERO_DISPLACEMENT = [d for d in SCENARIOS if cal_total_score.baseline[d]["displacement"] == 0]
+for _k, _d in enumerate(ZERO_DISPLACEMENT):
+    _case(f"{_d}_displaced", "evaluation.log",
+          lambda d=_d, s=_k: nominal(d, 20 + s, displacement=0.05))
+
+# metrics.csv left by an earlier run of the same directory (older columns, S_final)
+PREV_METRICS = {
+    "aes_cipher_top_append": (
+        "design,placement_legal,total_insts,wns,tns,time_unit,slew_over_sum,slew_over_count,"
+        "cap_over_sum,cap_over_count,cap_unit,fanout_over_sum,fanout_over_count,leakage_power,"
+        "total_power,power_unit,max_gr_overflow,total_gr_overflow,legal_fail_summary,"
+        "tool_runtime,flow_runtime,S_final\n"
+        "aes_cipher_top,,14006,-0.61,-301.5,ns,512.4,61,0.29,4,pF,0.0,0,109123456.0,"
+        "70200000000.0,pw,0.0,0.0,,51.0,7.0,0.7734\n"),
+}
+
+
+def write_corpus() -> int:
+    for name, (log_name, fn) in CASES.items():
+        d = CORPUS_DIR / name
+        shutil.rmtree(d, ignore_errors=True)
+        d.mkdir(parents=True)
+        text = fn()
+        if log_name.endswith(".gz"):
+            # mtime=0: the same bytes on every regeneration
+            with gzip.GzipFile(d / log_name, "wb", compresslevel=9, mtime=0) as f:
+                f.write(text.encode())
+        else:
+            (d / log_name).write_bytes(text.encode())
+        if name in PREV_METRICS:
+            (d / "metrics.prev.csv").write_text(PREV_METRICS[name])
+    return len(CASES)
+
+
+# ---------------- running the pipeline ----------------
+def case_log(case_dir: Path) -> Path:
+    for name in LOG_NAMES:
+        if (case_dir / name).is_file():
+            return case_dir / name
+    raise FileNotFoundError(f"{case_dir}: no log ({', '.join(LOG_NAMES)})")
+
+
+def _score(out_dir: Path) -> Tuple[int, Optional[str], str]:
+    """cal_total_score.py <out_dir> in process: (exit code, exception, stderr)."""
+    argv, err = sys.argv, io.StringIO()
+    sys.argv = ["cal_total_score.py", str(out_dir)]
+    try:
+        with contextlib.redirect_stderr(err):
+            rc = cal_total_score.main()
+        exc = None
+    except Exception as e:  # noqa: BLE001 - the golden records how it fails
+        rc, exc = 1, type(e).__name__
+    finally:
+        sys.argv = argv
+    return rc, exc, err.getvalue()
+
+
+def run_case(case_dir: Path, work: Path) -> Dict:
+    """Everything the golden of one case records."""
+    work.mkdir(parents=True, exist_ok=True)
+    metrics = parse_log.parse_log(case_log(case_dir))
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        parse_log.print_metrics(metrics)
+    csv_path = work / "metrics.csv"
+    if (case_dir / "metrics.prev.csv").is_file():
+        shutil.copyfile(case_dir / "metrics.prev.csv", csv_path)
+    parse_log.append_csv(csv_path, metrics)
+    rc, exc, err = _score(work)
+    return {"metrics": metrics, "report": report.getvalue(),
+            "metrics_csv": csv_path.read_text(), "score_exit": rc, "score_error": exc,
+            "score_stderr": err.replace(str(work), "<out_dir>")}
+
+
+def run_final(cases: Dict[str, str], work: Path) -> str:
+    """final_score.csv of one (design -> case) set, via final_score.main()."""
+    tcl = "golden"
+    for design, case in cases.items():
+        out = work / tcl / design / SCENARIOS[design]
+        run_case(CORPUS_DIR / case, out)
+    argv, saved = sys.argv, final_score.out_dir
+    sys.argv, final_score.out_dir = ["final_score.py", tcl], str(work)
+    try:
+        final_score.main()
+    finally:
+        sys.argv, final_score.out_dir = argv, saved
+    return (work / tcl / "final_score.csv").read_text()
+
+
+def case_names() -> List[str]:
+    return sorted(p.name for p in CORPUS_DIR.iterdir() if p.is_dir()) if CORPUS_DIR.is_dir() else []
+
+
+def _diff(name: str, got: Dict, want: Dict) -> List[str]:
+    out = []
+    for key in sorted(set(got) | set(want)):
+        g, w = got.get(key), want.get(key)
+        if key == "metrics" and isinstance(g, dict) and isinstance(w, dict):
+            for f in sorted(set(g) | set(w)):
+                if g.get(f) != w.get(f):
+                    out.append(f"  {name}: metrics[{f}] = {g.get(f)!r}, golden {w.get(f)!r}")
+        elif g != w:
+            gl, wl = str(g).splitlines(), str(w).splitlines()
+            for k in range(max(len(gl), len(wl))):
+                a = gl[k] if k < len(gl) else "<missing>"
+                b = wl[k] if k < len(wl) else "<missing>"
+                if a != b:
+                    out.append(f"  {name}: {key} line {k + 1}:\n    got    {a}\n    golden {b}")
+                    break
+    return out
+
+
+def _displacement_invariant(name: str, res: Dict) -> List[str]:
+    """Independent of the goldens: a marker in the log of a zero-baseline
+    design must not move S_final (the score would divide it by 1e-8)."""
+    r = list(csv.reader(io.StringIO(res["metrics_csv"])))
+    row = dict(zip(r[0], r[-1]))
+    if row.get("displacement"):
+        return [f"  {name}: displacement column {row['displacement']!r}, want empty"]
+    want = float(cal_total_score.compute_s_final(dict(row, displacement="0")))
+    if row.get("S_final") in (None, "") or abs(float(row["S_final"]) - want) > 1e-9:
+        return [f"  {name}: S_final {row.get('S_final')!r}, want {want!r} (no displacement term)"]
+    return []
+
+
+def check_goldens() -> Tuple[int, List[str]]:
+    """(cases compared, differences)."""
+    diffs: List[str] = []
+    n = 0
+    with tempfile.TemporaryDirectory(prefix="golden_") as tmp:
+        for name in case_names():
+            exp = EXPECTED_DIR / f"{name}.json"
+            if not exp.is_file():
+                diffs.append(f"  {name}: no golden (run `update`)")
+                continue
+            got = json.loads(json.dumps(run_case(CORPUS_DIR / name, Path(tmp) / name)))
+            diffs += _diff(name, got, json.loads(exp.read_text()))
+            if name.endswith("_displaced"):
+                diffs += _displacement_invariant(name, got)
+            n += 1
+        for set_name, cases in FINAL_SETS.items():
+            exp = EXPECTED_DIR / f"final_{set_name}.csv"
+            got = run_final(cases, Path(tmp) / f"final_{set_name}")
+            if not exp.is_file():
+                diffs.append(f"  final_{set_name}: no golden (run `update`)")
+            elif got != exp.read_text():
+                diffs += _diff(f"final_{set_name}", {"csv": got}, {"csv": exp.read_text()})
+            n += 1
+    return n, diffs
+
+
+def update_goldens() -> int:
+    EXPECTED_DIR.mkdir(parents=True, exist_ok=True)
+    for old in EXPECTED_DIR.glob("*"):
+        old.unlink()
+    with tempfile.TemporaryDirectory(prefix="golden_") as tmp:
+        names = case_names()
+        for name in names:
+            res = run_case(CORPUS_DIR / name, Path(tmp) / name)
+            (EXPECTED_DIR / f"{name}.json").write_text(json.dumps(res, indent=1) + "\n")
+        for set_name, cases in FINAL_SETS.items():
+            (EXPECTED_DIR / f"final_{set_name}.csv").write_text(
+                run_final(cases, Path(tmp) / f"final_{set_name}"))
+    return len(names) + len(FINAL_SETS)
+
+
+# ---------------- throughput ----------------
+THROUGHPUT_KEYS = ("parse_corpus_mb_s", "parse_large_mb_s", "score_rows_s")
+CALIBRATION_KEY = "calibration_mb_s"
+_CALIBRATION_RE = re.compile(r"[-+]?\d+\.?\d*(?:[eE][-+]?\d+)?")
+
+
+def large_log() -> str:
+    """A bsg_chip_v2-sized log: long violator tables and a text GR dump."""
+    rng = random.Random(99)
+    text = nominal("bsg_chip_v2", 99, gr="text")
+    rows = _violators("slew", 1.0e10, rng, max_rows=60000)
+    return text + "\n".join(rows) + "\n"
+
+
+def _calibrate(lines: List[str]) -> float:
+    """Reference work in the shape of parse_log (regex + float per line)."""
+    acc = 0.0
+    seen: Dict[str, float] = {}
+    for line in lines:
+        stripped = line.strip()
+        for tok in _CALIBRATION_RE.findall(stripped):
+            acc += float(tok)
+        seen[stripped[:12]] = acc
+    return acc
+
+
+def _paired(fn, units: float, cal_lines: List[str], cal_mb: float,
+            repeat: int) -> Tuple[float, float, float]:
+    """(best units/s, best calibration MB/s, best ratio of the two); every
+    fn() runs right after a calibration pass, so both see the same load."""
+    best = best_cal = best_ratio = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _calibrate(cal_lines)
+        t1 = time.perf_counter()
+        fn()
+        t2 = time.perf_counter()
+        rate, cal = units / (t2 - t1), cal_mb / (t1 - t0)
+        best, best_cal = max(best, rate), max(best_cal, cal)
+        best_ratio = max(best_ratio, rate / cal)
+    return best, best_cal, best_ratio
+
+
+def measure(repeat: int = 5) -> Dict[str, float]:
+    """parse_log MB/s (corpus and one large log), compute_s_final rows/s, the
+    calibration MB/s, and each throughput in calibration units (<key>_cal)."""
+    with tempfile.TemporaryDirectory(prefix="golden_bench_") as tmp:
+        big = Path(tmp) / "evaluation.log"
+        text = large_log()
+        big.write_text(text)
+        big_mb = big.stat().st_size / 1e6
+        cal_lines = text.splitlines()
+        plain = [p for p in (case_log(CORPUS_DIR / n) for n in case_names())
+                 if p.suffix != ".gz"]
+        corpus_mb = sum(p.stat().st_size for p in plain) / 1e6
+
+        rows = []
+        for n in case_names():
+            res = run_case(CORPUS_DIR / n, Path(tmp) / n)
+            r = list(csv.reader(io.StringIO(res["metrics_csv"])))
+            row = dict(zip(r[0], r[-1]))
+            if row.get("design") in cal_total_score.baseline:
+                rows.append(row)
+        rows = (rows * (20000 // max(len(rows), 1) + 1))[:20000]
+
+        def parse_corpus():
+            for p in plain:
+                parse_log.parse_log(p)
+
+        def score_all():
+            for row in rows:
+                cal_total_score.compute_s_final(row)
+
+        out = {"large_log_mb": big_mb}
+        cals = []
+        for key, fn, units in (("parse_corpus_mb_s", parse_corpus, corpus_mb),
+                               ("parse_large_mb_s", lambda: parse_log.parse_log(big), big_mb),
+                               ("score_rows_s", score_all, len(rows))):
+            out[key], cal, out[key + "_cal"] = _paired(fn, units, cal_lines, big_mb, repeat)
+            cals.append(cal)
+    out[CALIBRATION_KEY] = max(cals)
+    return out
+
+
+def print_throughput(cur: Dict[str, float], ref: Optional[Dict[str, float]]) -> None:
+    """Raw values; the ratio column compares the calibrated values."""
+    ref = ref or {}
+    print(f"{'metric':20s} {'now':>12s} {'reference':>12s} {'ratio':>7s}")
+    for k in THROUGHPUT_KEYS + (CALIBRATION_KEY,):
+        r, rc = ref.get(k), ref.get(k + "_cal")
+        ratio = f"{cur[k + '_cal'] / rc:7.2f}" if rc else ""
+        print(f"{k:20s} {cur[k]:12.1f} {'' if r is None else f'{r:12.1f}':>12s} {ratio:>7s}")
+
+
+def regressions(cur: Dict[str, float], ref: Dict[str, float], tolerance: float) -> List[str]:
+    out = []
+    for k in THROUGHPUT_KEYS:
+        rc = ref.get(k + "_cal")
+        if rc and cur[k + "_cal"] < (1 - tolerance) * rc:
+            out.append(f"  {k}: {cur[k + '_cal'] / rc:.0%} of the reference after calibration "
+                       f"(limit {1 - tolerance:.0%}; {cur[k]:.1f} now, {ref.get(k, 0):.1f} "
+                       f"recorded)")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Golden corpus for parse_log / scoring.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("check", help="Compare with the goldens, then check throughput")
+    c.add_argument("--no-bench", action="store_true")
+    c.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                   help="Allowed throughput drop vs throughput.json (fraction)")
+    c.add_argument("--repeat", type=int, default=5)
+    b = sub.add_parser("bench", help="Measure parse MB/s and scoring rows/s")
+    b.add_argument("--record", action="store_true", help="Store as the reference")
+    b.add_argument("--repeat", type=int, default=5)
+    sub.add_parser("update", help="Rewrite the goldens from the current code")
+    sub.add_parser("corpus", help="Regenerate the synthetic cases")
+    a = sub.add_parser("add", help="Add a recorded log as a case")
+    a.add_argument("name")
+    a.add_argument("log")
+    a.add_argument("--prev-metrics", default=None, help="metrics.csv to append to")
+    args = ap.parse_args()
+
+    if args.cmd == "corpus":
+        print(f"wrote {write_corpus()} cases to {CORPUS_DIR}")
+        return 0
+    if args.cmd == "add":
+        src = parse_log.resolve_input(Path(args.log))
+        if not src.is_file():
+            print(f"ERROR: log not found: {args.log}", file=sys.stderr)
+            return 1
+        if args.name in CASES:
+            print(f"ERROR: {args.name} is a synthetic case name", file=sys.stderr)
+            return 1
+        d = CORPUS_DIR / args.name
+        d.mkdir(parents=True, exist_ok=True)
+        base = "run.log" if src.name.startswith("run.log") else "evaluation.log"
+        shutil.copyfile(src, d / (base + (".gz" if src.suffix == ".gz" else "")))
+        if args.prev_metrics:
+            shutil.copyfile(args.prev_metrics, d / "metrics.prev.csv")
+        print(f"added {d}; run `update` to record its golden")
+        return 0
+    if args.cmd == "update":
+        print(f"wrote {update_goldens()} goldens to {EXPECTED_DIR}")
+        return 0
+
+    ref = json.loads(THROUGHPUT_FILE.read_text()) if THROUGHPUT_FILE.is_file() else None
+    if args.cmd == "bench":
+        cur = measure(args.repeat)
+        print_throughput(cur, ref)
+        if args.record:
+            keys = THROUGHPUT_KEYS + (CALIBRATION_KEY,)
+            rec = {k: round(cur[k], 1) for k in keys}
+            rec.update({k + "_cal": round(cur[k + "_cal"], 4) for k in THROUGHPUT_KEYS})
+            THROUGHPUT_FILE.write_text(json.dumps(rec, indent=1) + "\n")
+            print(f"recorded {THROUGHPUT_FILE}")
+        return 0
+
+    t0 = time.perf_counter()
+    n, diffs = check_goldens()
+    if diffs:
+        print(f"FAIL: output differs from the goldens ({len(diffs)} differences):")
+        print("\n".join(diffs))
+        return 1
+    print(f"goldens: {n} cases identical ({time.perf_counter() - t0:.2f}s)")
+    if not [c for c in case_names() if c not in CASES]:
+        print("[WARN] every case is synthetic and its golden came from the code under test; "
+              "`add` a recorded evaluation.log of a real run")
+    if args.no_bench:
+        return 0
+    cur = measure(args.repeat)
+    if ref is None or not any(k + "_cal" in ref for k in THROUGHPUT_KEYS):
+        print_throughput(cur, ref)
+        print("[WARN] no calibrated throughput.json; run `bench --record` to set the reference")
+        return 0
+    slow = regressions(cur, ref, args.tolerance)
+    if slow:
+        # a regression has to show in two measurements, not in one noisy one
+        again = measure(args.repeat)
+        cur = {k: max(v, again[k]) for k, v in cur.items()}
+        slow = regressions(cur, ref, args.tolerance)
+    print_throughput(cur, ref)
+    if slow:
+        print("FAIL: throughput regression:")
+        print("\n".join(slow))
+        return 3
+    print(f"calibrated throughput within {args.tolerance:.0%} of the reference")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,11 +9,19 @@ TECH_DIR="/ISPD26-Contest/Platform/ASAP7"
 BENCH_ROOT="/ISPD26-Contest/Benchmarks"
 OUT_ROOT="/ISPD26-Contest/solution/output"
 TEST_DIR="/ISPD26-Contest/solution/test"
+TCL_TEMP_DIR="/ISPD26-Contest/solution/tcl/temp"
+CACHE_PY="/ISPD26-Contest/solution/tools/result_cache.py"
+ODB_PY="/ISPD26-Contest/solution/tools/odb_checkpoint.py"
+PARSE_LOG_PY="/ISPD26-Contest/scripts/parse_log.py"
+WATCHDOG_EXIT=124   # or_supervisor.py: run stopped over its wall/RSS budget
 
 #######################################
 # Default options
 #######################################
 TCL_NAME="ga_baseline"
+USE_CACHE=true
+USE_ODB=false
+SWEEP_ID="$(date +%Y%m%d_%H%M%S)_$$"
 
 #######################################
 # Benchmark list
@@ -46,13 +54,15 @@ list_available_designs() {
 #######################################
 usage() {
   echo "Usage:"
-  echo "  $0 -a [-t <tcl_name>]"
-  echo "  $0 -d <design1> <design2> ... [-t <tcl_name>]"
+  echo "  $0 -a [-t <tcl_name>] [--no-cache] [--odb]"
+  echo "  $0 -d <design1> <design2> ... [-t <tcl_name>] [--no-cache] [--odb]"
   echo
   echo "Options:"
   echo "  -a               Run all benchmark cases"
   echo "  -d <design...>   Run specified design(s)"
   echo "  -t <tcl_name>    Use specified tcl script (default: baseline)"
+  echo "  --no-cache       Always rerun; do not read or write the result cache"
+  echo "  --odb            Start flows from cached ODB checkpoints (read_db)"
   echo
   list_available_designs
   exit 1
@@ -82,6 +92,14 @@ while [[ $# -gt 0 ]]; do
       TCL_NAME="$2"
       shift 2
       ;;
+    --no-cache)
+      USE_CACHE=false
+      shift
+      ;;
+    --odb)
+      USE_ODB=true
+      shift
+      ;;
     -h|--help)
       usage
       ;;
@@ -144,6 +162,38 @@ for entry in "${benchmarks[@]}"; do
 
   mkdir -p "$out_dir"
 
+  declare -a run_opts=(-t "$TCL_NAME")
+  if [[ "$USE_ODB" = true ]]; then
+    odb_file=$(python3 "$ODB_PY" build -d "$design_name")
+    if [[ $? -eq 0 && -f "$odb_file" ]]; then
+      echo "ODB checkpoint: $odb_file"
+      run_opts+=(-b "$odb_file")
+    else
+      echo "Warning: ODB checkpoint build failed, reading LEF/DEF/Verilog"
+    fi
+  fi
+
+  ###################################
+  # Step 0: result cache lookup
+  # Key = generated Tcl + inputs + platform + OpenROAD + scripts
+  ###################################
+  cache_key=""
+  if [[ "$USE_CACHE" = true ]]; then
+    "$RUN_SH" "$design_dir" "$TECH_DIR" "$out_dir" "$design_name" \
+      "${run_opts[@]}" -n > /dev/null
+    cache_key=$(python3 "$CACHE_PY" lookup \
+      --design "$design_name" \
+      --scenario "$scenario" \
+      --tcl "$TCL_TEMP_DIR/$design_name/$scenario/${TCL_NAME}.tcl" \
+      --design-dir "$design_dir" \
+      --out-dir "$out_dir" \
+      --sweep "$SWEEP_ID")
+    if [[ $? -eq 0 ]]; then
+      echo "Cache hit ($cache_key): reusing outputs, evaluation.log and metrics.csv"
+      continue
+    fi
+  fi
+
   ###################################
   # Step 1: run main flow
   ###################################
@@ -152,8 +202,17 @@ for entry in "${benchmarks[@]}"; do
     "$TECH_DIR" \
     "$out_dir" \
     "$design_name" \
-    -t "$TCL_NAME" \
+    "${run_opts[@]}" \
     > "$log_file"
+  flow_status=$?
+
+  if [[ $flow_status -eq $WATCHDOG_EXIT ]]; then
+    # Record the partial run (run_status column) and skip its evaluation;
+    # the outputs are incomplete or left over from an earlier run.
+    echo "Watchdog stopped the flow: $(grep '^\[WATCHDOG\]' "$log_file" | tail -1)"
+    python3 "$PARSE_LOG_PY" "$log_file" --csv "$out_dir/metrics.csv" > /dev/null
+    continue
+  fi
 
   ###################################
   # Step 2: run evaluation script
@@ -169,7 +228,16 @@ for entry in "${benchmarks[@]}"; do
     cd "$current_dir"
 
     python "$TEST_DIR/cal_total_score.py" "$out_dir"
-    
+
+    if [[ -n "$cache_key" ]]; then
+      python3 "$CACHE_PY" store \
+        --key "$cache_key" \
+        --design "$design_name" \
+        --scenario "$scenario" \
+        --tcl-name "$TCL_NAME" \
+        --out-dir "$out_dir"
+    fi
+
   else
     echo "Warning: eval.sh not found for $design_name"
   fi
@@ -180,3 +248,7 @@ done
   ###################################
 
 python "$TEST_DIR/final_score.py" "$TCL_NAME"
+
+if [[ "$USE_CACHE" = true ]]; then
+  python3 "$CACHE_PY" stats --sweep "$SWEEP_ID"
+fi
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Versioned binary container for NumPy arrays, loaded through mmap.
+
+Layout (little endian):
+
+  magic "ISPDBIN\\0" | u32 format version | u32 header length | header JSON
+  | padding | array data, every array starting on a 64-byte boundary
+
+The header records the payload kind and version, the key of the source the
+arrays were built from (usually a file digest), free-form metadata and
+name -> (dtype, shape, offset) for every array. read_arrays() maps the file
+read-only and returns zero-copy views, so a cached table set of a few MB is
+available in about a millisecond regardless of its size.
+
+Used by liberty.py (CACHE_ROOT/liberty) and the other tools that cache
+parsed inputs.
+"""
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"ISPDBIN\0"
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_arrays(path: Path, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None,
+                 kind: str = "", version: int = 0, key: str = "") -> int:
+    """Write arrays atomically (tmp file + rename); returns the file size."""
+    path = Path(path)
+    prepared = {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        if arr.dtype.byteorder == ">" or (arr.dtype.byteorder == "=" and not np.little_endian):
+            arr = arr.astype(arr.dtype.newbyteorder("<"))
+        if arr.dtype.hasobject:
+            raise ValueError(f"array {name} has object dtype")
+        prepared[name] = arr
+
+    # The header lists absolute offsets and its own length decides where the
+    # data starts: grow the data start until the header fits in front of it.
+    rel, pos = {}, 0
+    for name, arr in prepared.items():
+        rel[name] = pos
+        pos = _align(pos + arr.nbytes)
+    entries = {name: [arr.dtype.str, list(arr.shape), 0, arr.nbytes]
+               for name, arr in prepared.items()}
+    header = {"kind": kind, "version": version, "key": key, "meta": meta or {},
+              "arrays": entries}
+    data_start = 0
+    while True:
+        for name, e in entries.items():
+            e[2] = data_start + rel[name]
+        blob = json.dumps(header, separators=(",", ":")).encode()
+        need = _align(_PREFIX.size + len(blob))
+        if need <= data_start:
+            break
+        data_start = need
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(blob)))
+        f.write(blob)
+        for name, arr in prepared.items():
+            f.seek(entries[name][2])
+            f.write(arr.tobytes())
+        end = f.tell()
+    os.replace(tmp, path)
+    return end
+
+
+def read_header(path: Path) -> Dict:
+    with Path(path).open("rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path}: truncated cache file")
+        magic, fmt, hlen = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a cache file")
+        if fmt != FORMAT_VERSION:
+            raise ValueError(f"{path}: cache format {fmt}, expected {FORMAT_VERSION}")
+        return json.loads(f.read(hlen))
+
+
+def read_arrays(path: Path, kind: Optional[str] = None, version: Optional[int] = None,
+                key: Optional[str] = None) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, arrays) of a cache file; arrays are read-only views on an mmap.
+
+    Raises ValueError if the file is damaged or kind/version/key do not match,
+    which callers treat as a cache miss.
+    """
+    path = Path(path)
+    header = read_header(path)
+    for field, want in (("kind", kind), ("version", version), ("key", key)):
+        if want is not None and header.get(field) != want:
+            raise ValueError(f"{path}: {field} {header.get(field)!r}, expected {want!r}")
+    with path.open("rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {}
+    for name, (dtype, shape, offset, nbytes) in header["arrays"].items():
+        if offset + nbytes > len(mm):
+            raise ValueError(f"{path}: array {name} is truncated")
+        dt = np.dtype(dtype)
+        count = nbytes // dt.itemsize
+        # The views keep the mmap alive after this function returns.
+        arrays[name] = np.frombuffer(mm, dtype=dt, count=count, offset=offset).reshape(shape)
+    return header["meta"], arrays
+
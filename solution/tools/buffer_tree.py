@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Placement-aware buffer trees for high-fanout nets.
+
+repair_design splits large nets with generic heuristics; this planner
+builds the trees from the placement instead, for every net with at least
+--min-fanout sinks at once:
+
+- clustering: the sinks of all selected nets are split by recursive
+  bisection (the longer side of each cluster's bounding box, at the
+  position that keeps the leaves equal in size), batched over all nets
+  and clusters in NumPy, until no cluster has more than --max-fanout
+  members. Each leaf cluster gets a buffer at its centroid; while a net
+  still has more than --max-fanout buffers, the buffers are clustered the
+  same way into the next level
+- sizing: each level is sized bottom-up from the buffer group of
+  asap7_equivalent_cell_list.csv (BUFx*, one Vt flavor): the smallest
+  buffer whose output transition (NLDM tables, surrogate_sta.TableBank)
+  stays under --max-slew at its load, i.e. the input caps of its children
+  plus C_PER_UM * HPWL * Steiner factor of their bounding box
+- output: a changelist (changelist.py) of `buffer` lines, top level first,
+  each moving all sinks of its subtree onto the new net so the next level
+  can split them again. Every original driver-sink pair is then joined by
+  a chain of new buffers, which is what Check 2 of netlist_equiv_check.py
+  accepts; I/O sinks stay on the original net
+- placement: with the design's DEF the buffers are moved to the nearest
+  free sites (placement_index.legalize_buffers)
+
+Nets with a clock pin among their sinks are skipped unless --clock is
+given (the clock is ideal before CTS).
+
+python3 buffer_tree.py plan -d aes_cipher_top -o trees.changelist
+python3 buffer_tree.py plan -d aes_cipher_top --nodes node.csv --nets nets.csv \\
+    --min-fanout 32 --max-fanout 16 -o trees.changelist --check
+python3 buffer_tree.py bench -d aes_cipher_top --copies 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from changelist import InsertBuffer, write_changelist
+from common import BENCH_ROOT, EQUIV_CELLS, SCENARIOS, TECH_DIR
+from liberty import load_libraries
+from name_table import NameTable, Nets, Nodes, load_netlist
+from netlist_equiv_check import load_equiv_cells
+from parse_log import resolve_input
+from surrogate_sta import ARC_EDGE, C_PER_UM, TableBank, steiner_factor
+
+MIN_FANOUT = 64
+MAX_FANOUT = 24
+MAX_SLEW = 0.060            # ns, target output transition of every buffer
+VT = "R"
+PREFIX = "bt_"
+
+
+class BufferLib:
+    """Buffer masters of one Vt flavor, smallest first, with their tables."""
+
+    def __init__(self, bank: TableBank, masters: Sequence[str]):
+        rows = []
+        for m in masters:
+            info = bank.masters.get(m)
+            if info is None:
+                continue
+            arcs = [tabs for (a, b, kind), (tabs, _) in info.arcs.items() if kind == ARC_EDGE]
+            inputs = [cap for d, cap, _ in info.pins.values() if d == 0]
+            if len(arcs) == 1 and len(inputs) == 1:
+                rows.append((bank.libs.area(m), m, inputs[0], arcs[0]))
+        if not rows:
+            raise ValueError("no usable buffer masters")
+        rows.sort()
+        self.bank = bank
+        self.names = [r[1] for r in rows]
+        self.in_cap = np.array([r[2] for r in rows])
+        self.trans = [(np.array([r[3][2]]), np.array([r[3][3]])) for r in rows]
+
+    def size(self, load: np.ndarray, max_slew: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(master index, output transition) of the smallest buffer meeting max_slew."""
+        pick = np.full(len(load), len(self.names) - 1)
+        slew = np.zeros(len(load))
+        todo = np.ones(len(load), dtype=bool)
+        for k, (ta, tb) in enumerate(self.trans):
+            idx = np.flatnonzero(todo)
+            if idx.size == 0:
+                break
+            t = self.bank.worst(np.repeat(ta, idx.size), np.repeat(tb, idx.size),
+                                max_slew, load[idx])
+            ok = (t <= max_slew) | (k == len(self.trans) - 1)
+            pick[idx[ok]] = k
+            slew[idx[ok]] = t[ok]
+            todo[idx[ok]] = False
+        return pick, slew
+
+
+def buffer_masters(vt: str = VT, equiv_file: Path = EQUIV_CELLS) -> List[str]:
+    _, bufs, _ = load_equiv_cells(str(equiv_file))
+    return sorted(m for m in bufs if m.startswith("BUFx") and m.endswith(f"_{vt}"))
+
+
+def bisect(x: np.ndarray, y: np.ndarray, group: np.ndarray, cap: int) -> np.ndarray:
+    """Cluster labels (0..k-1, never shared across groups) of at most cap points.
+
+    Every oversized cluster is cut across the longer side of its bounding
+    box; with k = ceil(n / cap) leaves still needed, the cut puts
+    ceil(k / 2) / k of the points on one side, so all leaves end up with
+    floor or ceil of n / k points. All clusters are cut in the same pass.
+    """
+    label = np.unique(group, return_inverse=True)[1].astype(np.int64)
+    while True:
+        size = np.bincount(label)
+        idx = np.flatnonzero(size[label] > cap)
+        if idx.size == 0:
+            return label
+        lab = label[idx]
+        order = np.argsort(lab, kind="stable")
+        sl = lab[order]
+        starts = np.flatnonzero(np.r_[True, sl[1:] != sl[:-1]])
+        xs, ys = x[idx][order], y[idx][order]
+        wide = np.zeros(len(size), dtype=bool)
+        wide[sl[starts]] = (np.maximum.reduceat(xs, starts) - np.minimum.reduceat(xs, starts)
+                            >= np.maximum.reduceat(ys, starts) - np.minimum.reduceat(ys, starts))
+        key = np.where(wide[lab], x[idx], y[idx])
+        order = np.lexsort((key, lab))
+        sl = lab[order]
+        starts = np.flatnonzero(np.r_[True, sl[1:] != sl[:-1]])
+        rank = np.arange(len(sl)) - np.repeat(starts, np.diff(np.r_[starts, len(sl)]))
+        n = size[sl]
+        k = -(-n // cap)
+        left = (n * ((k + 1) // 2) + k // 2) // k
+        label = label * 2
+        label[idx[order]] += rank >= left
+        label = np.unique(label, return_inverse=True)[1].astype(np.int64)
+
+
+@dataclass
+class Plan:
+    changes: List[InsertBuffer]
+    nets: int                       # nets given a tree
+    skipped_clock: int
+    levels: Dict[int, int]          # tree depth -> nets
+    masters: Dict[str, int]         # buffer master -> count
+    worst_slew: float               # ns, estimated
+    unplaced: int = 0
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenated arange(start, start + count) of every pair."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+
+def plan_trees(names: NameTable, nodes: Nodes, nets: Nets, bank: TableBank, bufs: BufferLib,
+               min_fanout: int = MIN_FANOUT, max_fanout: int = MAX_FANOUT,
+               max_slew: float = MAX_SLEW, clock: bool = False, prefix: str = PREFIX) -> Plan:
+    if max_fanout < 2:
+        raise ValueError("max_fanout must be at least 2")
+    min_fanout = max(min_fanout, max_fanout + 1)
+    t0 = time.perf_counter()
+
+    # ---- sinks of the selected nets as flat arrays ----
+    fanout = nets.fanout()
+    cand = np.flatnonzero(fanout >= min_fanout)
+    idx = _ranges(nets.ptr[cand] + 1, fanout[cand])
+    owner = np.repeat(np.arange(len(cand)), fanout[cand])
+    row = nodes.row_of(len(names))[nets.inst[idx]]
+    io = nets.pins.index("_IO_") if "_IO_" in nets.pins else -1
+    keep = (row >= 0) & (nets.pin[idx] != io)
+    idx, owner, row = idx[keep], owner[keep], row[keep]
+    # pin cap and clock flag per distinct (master, pin)
+    combo, inv = np.unique(nodes.master[row].astype(np.int64) * len(nets.pins) + nets.pin[idx],
+                           return_inverse=True)
+    combo_cap = np.zeros(len(combo))
+    combo_clock = np.zeros(len(combo), dtype=bool)
+    for k, c in enumerate(combo.tolist()):
+        info = bank.masters.get(nodes.masters[c // len(nets.pins)])
+        pin = info.pins.get(nets.pins[c % len(nets.pins)]) if info else None
+        if pin:
+            combo_cap[k], combo_clock[k] = pin[1], pin[2]
+    count = np.bincount(owner, minlength=len(cand))
+    is_clock = np.bincount(owner, combo_clock[inv], minlength=len(cand)) > 0
+    chosen = (count > max_fanout) & (clock | ~is_clock)
+    skipped_clock = int(((count > max_fanout) & ~chosen).sum())
+    dense = np.cumsum(chosen) - 1
+    keep = chosen[owner]
+    idx, row, inv = idx[keep], row[keep], inv[keep]
+    x, y = nodes.x[row].astype(np.float64), nodes.y[row].astype(np.float64)
+    cap, net = combo_cap[inv], dense[owner[keep]]
+    net_names = names.names(nets.ids[cand[chosen]])
+    uniq, back = np.unique(nets.inst[idx], return_inverse=True)
+    inst_names = names.names(uniq)
+    pins = [(inst_names[i], nets.pins[p]) for i, p in zip(back.tolist(), nets.pin[idx].tolist())]
+    t1 = time.perf_counter()
+
+    # ---- bottom-up: cluster, place, size one level at a time ----
+    node_x: List[np.ndarray] = []
+    node_y: List[np.ndarray] = []
+    node_net: List[np.ndarray] = []
+    node_master: List[np.ndarray] = []
+    node_parent: List[np.ndarray] = []      # per level, index into the next level or -1
+    sink_leaf = np.zeros(len(x), dtype=np.int64)
+    worst_slew = 0.0
+    items = np.arange(len(x))               # level-0 items are the sinks
+    while items.size:
+        lab = bisect(x, y, net, max_fanout)
+        nn = int(lab.max()) + 1
+        cnt = np.bincount(lab, minlength=nn)
+        cx = np.bincount(lab, x, nn) / cnt
+        cy = np.bincount(lab, y, nn) / cnt
+        cnet = np.zeros(nn, dtype=np.int64)
+        cnet[lab] = net
+        lo_x = np.full(nn, np.inf)
+        hi_x = np.full(nn, -np.inf)
+        lo_y = np.full(nn, np.inf)
+        hi_y = np.full(nn, -np.inf)
+        np.minimum.at(lo_x, lab, x)
+        np.maximum.at(hi_x, lab, x)
+        np.minimum.at(lo_y, lab, y)
+        np.maximum.at(hi_y, lab, y)
+        hpwl = (hi_x - lo_x) + (hi_y - lo_y)
+        load = np.bincount(lab, cap, nn) + C_PER_UM * steiner_factor(cnt + 1) * hpwl
+        pick, slew = bufs.size(load, max_slew)
+        worst_slew = max(worst_slew, float(slew.max(initial=0.0)))
+
+        if not node_x:
+            sink_leaf = lab
+        else:
+            node_parent[-1][items] = lab
+        node_x.append(cx)
+        node_y.append(cy)
+        node_net.append(cnet)
+        node_master.append(pick)
+        node_parent.append(np.full(nn, -1, dtype=np.int64))
+
+        # nets with more than max_fanout buffers get another level
+        per_net = np.bincount(cnet, minlength=len(net_names))
+        items = np.flatnonzero(per_net[cnet] > max_fanout)
+        x, y, net = cx[items], cy[items], cnet[items]
+        cap = bufs.in_cap[pick[items]]
+    t2 = time.perf_counter()
+
+    # ---- top-down changelist ----
+    offset = np.cumsum([0] + [len(v) for v in node_x])
+    ancestors = [sink_leaf]
+    for lvl in range(len(node_x) - 1):
+        a = ancestors[-1]
+        ancestors.append(np.where(a >= 0, node_parent[lvl][np.maximum(a, 0)], -1))
+    changes: List[InsertBuffer] = []
+    for lvl in range(len(node_x) - 1, -1, -1):
+        anc = ancestors[lvl]
+        has = np.flatnonzero(anc >= 0)
+        order = has[np.argsort(anc[has], kind="stable")]
+        bounds = np.searchsorted(anc[order], np.arange(len(node_x[lvl]) + 1))
+        parent = node_parent[lvl]
+        for j in range(len(node_x[lvl])):
+            gid = int(offset[lvl] + j)
+            src = (net_names[int(node_net[lvl][j])] if parent[j] < 0
+                   else f"{prefix}net_{int(offset[lvl + 1] + parent[j])}")
+            members = order[bounds[j]:bounds[j + 1]]
+            changes.append(InsertBuffer(
+                f"{prefix}buf_{gid}", bufs.names[int(node_master[lvl][j])],
+                round(float(node_x[lvl][j]), 4), round(float(node_y[lvl][j]), 4),
+                src, f"{prefix}net_{gid}", tuple(pins[i] for i in members.tolist())))
+    clash = [n for c in changes for n in (c.name, c.new_net) if n in names]
+    if clash:
+        raise ValueError(f"names already exist: {' '.join(clash[:5])}")
+    t3 = time.perf_counter()
+
+    depth = np.zeros(len(net_names), dtype=np.int64)
+    for lvl, nets_at in enumerate(node_net):
+        depth[np.unique(nets_at)] = lvl + 1
+    levels = {int(d): int(c) for d, c in zip(*np.unique(depth, return_counts=True))}
+    used: Dict[str, int] = {}
+    for c in changes:
+        used[c.master] = used.get(c.master, 0) + 1
+    return Plan(changes, len(net_names), skipped_clock, levels, used, worst_slew,
+                seconds={"select": t1 - t0, "cluster": t2 - t1, "emit": t3 - t2})
+
+
+def legalize(plan: Plan, def_path: Path) -> None:
+    """Move the planned buffers onto free sites of the placement in def_path."""
+    from placement_index import build_index, legalize_buffers
+    t0 = time.perf_counter()
+    index = build_index(def_path, sorted((TECH_DIR / "lef").glob("*.lef")) or None,
+                        use_cache=True)
+    plan.changes, plan.unplaced = legalize_buffers(plan.changes, index)
+    plan.seconds["legalize"] = time.perf_counter() - t0
+
+
+def check_equiv(design: str, design_dir: Path, changelist: Path) -> Tuple[bool, str]:
+    """Patch the benchmark with the changelist and run netlist_equiv_check.py."""
+    from netlist_patch import equiv_check, patch_design
+    with tempfile.TemporaryDirectory(prefix="buffer_tree_") as tmp:
+        patch_design(design_dir, design, changelist, Path(tmp))
+        return equiv_check(design_dir, Path(tmp))
+
+
+def _print(design: str, plan: Plan) -> None:
+    secs = "  ".join(f"{k} {v:.2f}s" for k, v in plan.seconds.items())
+    print(f"{design}: {plan.nets} nets, {len(plan.changes)} buffers "
+          f"({plan.skipped_clock} clock nets skipped)  {secs}")
+    print("  depth: " + ", ".join(f"{d} level{'s' if d > 1 else ''} x{n}"
+                                  for d, n in sorted(plan.levels.items())))
+    print("  masters: " + ", ".join(f"{m} x{n}" for m, n in sorted(plan.masters.items())))
+    print(f"  worst estimated buffer transition {plan.worst_slew * 1e3:.1f} ps"
+          + (f", {plan.unplaced} buffers left to detailed_placement" if plan.unplaced else ""))
+
+
+def _replicate(nets: Nets, copies: int) -> Nets:
+    """The benchmark's high-fanout nets repeated `copies` times (bench input)."""
+    big = np.flatnonzero(nets.fanout() >= MIN_FANOUT)
+    size = np.diff(nets.ptr)[big]
+    idx = np.tile(_ranges(nets.ptr[big], size), copies)
+    ptr = np.zeros(len(big) * copies + 1, dtype=np.int64)
+    np.cumsum(np.tile(size, copies), out=ptr[1:])
+    return Nets(np.tile(nets.ids[big], copies), ptr, nets.inst[idx], nets.pin[idx], nets.pins)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Buffer trees for high-fanout nets.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan", help="Write a buffer-tree changelist")
+    p.add_argument("--nodes", default=None, help="node.csv (default: the benchmark's)")
+    p.add_argument("--nets", default=None, help="nets.csv (default: the benchmark's)")
+    p.add_argument("--def", dest="def_path", default=None,
+                   help="Placement to legalize against (default: the benchmark's contest.def)")
+    p.add_argument("--no-legalize", action="store_true", help="Keep the centroid locations")
+    p.add_argument("-o", "--out", required=True, help="Changelist to write")
+    p.add_argument("--check", action="store_true",
+                   help="Patch the benchmark and run netlist_equiv_check.py")
+    b = sub.add_parser("bench", help="Time the planner on replicated high-fanout nets")
+    b.add_argument("--copies", type=int, default=100)
+    for q in (p, b):
+        q.add_argument("-d", "--design", required=True)
+        q.add_argument("--min-fanout", type=int, default=MIN_FANOUT)
+        q.add_argument("--max-fanout", type=int, default=MAX_FANOUT)
+        q.add_argument("--max-slew", type=float, default=MAX_SLEW, help="ns")
+        q.add_argument("--vt", default=VT, choices=("L", "R", "SL"))
+        q.add_argument("--clock", action="store_true", help="Also buffer clock nets")
+    args = ap.parse_args()
+
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    design_dir = BENCH_ROOT / args.design / SCENARIOS[args.design]
+    nodes_path = resolve_input(Path(getattr(args, "nodes", None) or design_dir / "node.csv"))
+    nets_path = resolve_input(Path(getattr(args, "nets", None) or design_dir / "nets.csv"))
+    for f in (nodes_path, nets_path):
+        if not f.is_file():
+            print(f"ERROR: file not found: {f}", file=sys.stderr)
+            return 1
+    bank = TableBank(load_libraries())
+    try:
+        bufs = BufferLib(bank, buffer_masters(args.vt))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    names, nodes, nets = load_netlist(nodes_path, nets_path)
+    if args.cmd == "bench":
+        nets = _replicate(nets, args.copies)
+    try:
+        plan = plan_trees(names, nodes, nets, bank, bufs, args.min_fanout, args.max_fanout,
+                          args.max_slew, args.clock)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if args.cmd == "bench":
+        _print(args.design, plan)
+        return 0
+
+    if not args.no_legalize and plan.changes:
+        def_path = Path(args.def_path) if args.def_path else design_dir / "contest.def"
+        if def_path.is_file():
+            legalize(plan, def_path)
+        else:
+            print(f"[WARN] placement not found: {def_path}", file=sys.stderr)
+    _print(args.design, plan)
+    n = write_changelist(Path(args.out), plan.changes)
+    print(f"wrote {n} changes to {args.out}")
+    if args.check:
+        if args.nodes or args.nets:
+            print("[WARN] --check patches the benchmark netlist, not --nodes/--nets",
+                  file=sys.stderr)
+        try:
+            ok, report = check_equiv(args.design, design_dir, Path(args.out))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        print(report.rstrip())
+        return 0 if ok else 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
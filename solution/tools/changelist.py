@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Netlist changelist shared by the Python optimizers and the flow Tcl.
+
+One change per line, names as in OpenDB (no Verilog escapes), coordinates
+in microns:
+
+  resize <inst> <new_master>
+  buffer <buf_inst> <master> <x> <y> <net> <new_net> <sink_inst>/<pin> ...
+
+`buffer` inserts <buf_inst> driven by <net>, creates <new_net> on its output
+and moves the listed sinks from <net> to <new_net>. Lines starting with '#'
+are comments. solution/tcl/util/ga.tcl (ga_apply_changelist) applies a file
+inside OpenROAD.
+
+python3 changelist.py show <file>
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+HEADER = "# ISPD26 changelist v1"
+
+
+@dataclass(frozen=True)
+class Resize:
+    inst: str
+    master: str
+
+    def line(self) -> str:
+        return f"resize {self.inst} {self.master}"
+
+
+@dataclass(frozen=True)
+class InsertBuffer:
+    name: str
+    master: str
+    x: float
+    y: float
+    net: str
+    new_net: str
+    sinks: Tuple[Tuple[str, str], ...] = field(default_factory=tuple)   # (inst, pin)
+
+    def line(self) -> str:
+        sinks = " ".join(f"{inst}/{pin}" for inst, pin in self.sinks)
+        return (f"buffer {self.name} {self.master} {self.x:.4f} {self.y:.4f} "
+                f"{self.net} {self.new_net} {sinks}")
+
+
+Change = Union[Resize, InsertBuffer]
+
+
+def parse_line(line: str) -> Change:
+    f = line.split()
+    if f[0] == "resize" and len(f) == 3:
+        return Resize(f[1], f[2])
+    if f[0] == "buffer" and len(f) >= 8:
+        sinks = tuple(tuple(s.rsplit("/", 1)) for s in f[7:])
+        if any(len(s) != 2 for s in sinks):
+            raise ValueError(f"bad sink in: {line}")
+        return InsertBuffer(f[1], f[2], float(f[3]), float(f[4]), f[5], f[6], sinks)
+    raise ValueError(f"bad changelist line: {line}")
+
+
+def read_changelist(path: Path) -> List[Change]:
+    changes = []
+    with Path(path).open() as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                changes.append(parse_line(line))
+    return changes
+
+
+def write_changelist(path: Path, changes: Iterable[Change]) -> int:
+    n = 0
+    with Path(path).open("w") as f:
+        f.write(HEADER + "\n")
+        for c in changes:
+            f.write(c.line() + "\n")
+            n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect a netlist changelist.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sh = sub.add_parser("show", help="Validate a changelist and summarize it")
+    sh.add_argument("file")
+    args = ap.parse_args()
+
+    try:
+        changes = read_changelist(Path(args.file))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    resizes = [c for c in changes if isinstance(c, Resize)]
+    buffers = [c for c in changes if isinstance(c, InsertBuffer)]
+    print(f"resize: {len(resizes)}")
+    print(f"buffer: {len(buffers)} ({sum(len(b.sinks) for b in buffers)} sinks moved)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Shared paths and helpers for the solution tools.
+
+All tools in this directory locate the repository relative to this file, so
+they work both inside the contest container (/ISPD26-Contest) and from a
+plain checkout. Importing this module also makes the standalone evaluation
+scripts (parse_log.py, netlist_equiv_check.py, cal_total_score.py) importable.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SOLUTION_DIR = REPO_ROOT / "solution"
+TOOLS_DIR = SOLUTION_DIR / "tools"
+TCL_DIR = SOLUTION_DIR / "tcl"
+TEST_DIR = SOLUTION_DIR / "test"
+OUT_ROOT = SOLUTION_DIR / "output"
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+EQUIV_DIR = REPO_ROOT / "equiv_check"
+BENCH_ROOT = REPO_ROOT / "Benchmarks"
+TECH_DIR = REPO_ROOT / "Platform" / "ASAP7"
+EQUIV_CELLS = EQUIV_DIR / "asap7_equivalent_cell_list.csv"
+
+# Cache root shared by the result cache and the other caching tools.
+CACHE_ROOT = Path(os.environ.get("ISPD26_CACHE_DIR", SOLUTION_DIR / "cache"))
+
+# OpenROAD binaries used by run.sh (flow) and scripts/<design>/eval.sh (eval).
+FLOW_OPENROAD = os.environ.get(
+    "OPENROAD_BIN", "/home/mitch24/ISPD26-Contest/openroad/openroad")
+EVAL_OPENROAD = os.environ.get("EVAL_OPENROAD_BIN", "/OpenROAD/build/bin/openroad")
+
+# Same list as solution/test/test_bench.sh: (design_name, scenario)
+BENCHMARKS: List[Tuple[str, str]] = [
+    ("aes_cipher_top", "TCP_250_UTIL_0.40"),
+    ("aes_cipher_top_v2", "TCP_200_UTIL_0.40"),
+    ("ariane", "TCP_900_UTIL_0.30"),
+    ("ariane_v2", "TCP_950_UTIL_0.45"),
+    ("bsg_chip", "TCP_1200_UTIL_0.30"),
+    ("bsg_chip_v2", "TCP_1300_UTIL_0.50"),
+    ("jpeg_encoder", "TCP_350_UTIL_0.70"),
+    ("jpeg_encoder_v2", "TCP_450_UTIL_0.65"),
+]
+SCENARIOS: Dict[str, str] = dict(BENCHMARKS)
+
+for _p in (SCRIPTS_DIR, EQUIV_DIR, TEST_DIR):
+    if str(_p) not in sys.path:
+        sys.path.append(str(_p))
+
+
+def tmp_tag() -> str:
+    """host.pid.thread: unique temp-file tag when workers on several hosts
+    (or several slots of one worker) share the cache directories."""
+    return f"{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}"
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """blake2b hex digest of a file's content."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DigestMemo:
+    """Persistent file digest memo keyed by (size, mtime, inode).
+
+    Hashing the OpenROAD binary and the Liberty set on every lookup would cost
+    more than the lookup itself, so digests are reused until the file changes.
+    """
+
+    def __init__(self, memo_file: Path):
+        self.memo_file = memo_file
+        self.entries: Dict[str, List] = {}
+        self.dirty = False
+        if memo_file.exists():
+            try:
+                self.entries = json.loads(memo_file.read_text())
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def digest(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return "missing"
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+        key = str(path.resolve())
+        hit = self.entries.get(key)
+        if hit and hit[:3] == stamp:
+            return hit[3]
+        d = file_digest(path)
+        self.entries[key] = stamp + [d]
+        self.dirty = True
+        return d
+
+    def combined(self, paths: Iterable[Path]) -> str:
+        """Digest of a set of files (order independent, names included)."""
+        h = hashlib.blake2b(digest_size=20)
+        for p in sorted(Path(p) for p in paths):
+            h.update(p.name.encode())
+            h.update(self.digest(p).encode())
+        return h.hexdigest()
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.memo_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.memo_file.with_suffix(f".{tmp_tag()}.tmp")
+        tmp.write_text(json.dumps(self.entries))
+        os.replace(tmp, self.memo_file)
+        self.dirty = False
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like '512M', '20G' or plain bytes."""
+    s = text.strip().upper().rstrip("B")
+    mult = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    if s and s[-1] in mult:
+        return int(float(s[:-1]) * mult[s[-1]])
+    return int(s)
+
+
+def format_size(n: float) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if abs(n) < 1024:
+            return f"{n:.1f}{unit}"
+        n /= 1024.0
+    return f"{n:.1f}T"
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Repeated-run comparison of two flow variants, with the runtime noise in it.
+
+The R term of cal_total_score.compute_s_final() charges tool_runtime and
+flow_runtime against the baseline. Both change from run to run with the
+load of the machine, so one run each of A and B cannot show whether B is
+really faster. This tool runs (or collects) repeats of both variants and
+reports, per design:
+- mean and standard deviation of tool_runtime / flow_runtime per variant
+- the S_final delta B - A with a bootstrap confidence interval, split into
+  its runtime part (the R term) and the rest (QoR: timing, power, checks,
+  overflow, displacement); a split is "real" when its interval excludes 0
+- how many repeats per variant would resolve the observed runtime delta
+and the same for the chip-weighted total (final_score.py weights).
+
+Runtimes are whole seconds by default, as the contest evaluation prints
+them. `run` sets OR_TIMING_MS=1 so the flow and evaluation Tcl print them
+with millisecond resolution (solution/tcl/util/profile.tcl); metrics.csv
+then carries fractional runtimes and S_final is scored on those.
+
+- run: run A and B (-a/-b Tcl names) n times per design, interleaved
+  (ABAB..., BABA... on odd repeats) so that slow drifts in machine load hit
+  both, without the result cache; each run's metrics.csv, run.log and
+  evaluation.log are kept under output/compare/<name>/<tcl>/<design>/rNN
+- report: compare two directories of such runs; every metrics.csv below a
+  directory is one run (its last row), so copies of output/<tcl> work too
+
+S_final is recomputed from the metrics with compute_s_final(): runs whose
+metrics.csv has no tool_runtime (the evaluation log does not print it) take
+it from the run's run.log. Runs stopped by the watchdog are left out.
+
+python3 compare_runs.py run -a baseline -b sweep/rt1/v004 -d aes_cipher_top jpeg_encoder -n 5
+python3 compare_runs.py report output/compare/rt1/baseline output/compare/rt1/sweep/rt1/v004
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from common import OUT_ROOT, SCENARIOS
+from flow_runner import read_last_metrics, run_design
+
+import cal_total_score
+import final_score
+from parse_log import parse_log, resolve_input
+
+COMPARE_ROOT = OUT_ROOT / "compare"
+KEEP_FILES = ["metrics.csv", "run.log", "evaluation.log"]
+RUNTIMES = ("tool_runtime", "flow_runtime")
+Z_80 = 1.96 + 0.84  # two-sided 5%, 80% power
+
+
+# ---------------- collecting runs ----------------
+def run_metrics(run_dir: Path) -> Optional[Dict[str, str]]:
+    """Last metrics.csv row of a run, tool_runtime filled from run.log."""
+    row = read_last_metrics(run_dir)
+    if not row or (row.get("run_status") or "ok") != "ok":
+        return None
+    if not row.get("tool_runtime"):
+        run_log = resolve_input(run_dir / "run.log")
+        if run_log.is_file():
+            t = parse_log(run_log).get("tool_runtime")
+            row["tool_runtime"] = "" if t is None else str(t)
+    return row
+
+
+def collect(root: Path) -> Tuple[Dict[str, List[Dict[str, str]]], int]:
+    """design -> metrics rows of the runs below root; and the skipped count."""
+    runs: Dict[str, List[Dict[str, str]]] = {}
+    skipped = 0
+    for csv_path in sorted(root.rglob("metrics.csv")):
+        row = run_metrics(csv_path.parent)
+        if row is None or row.get("design") not in cal_total_score.baseline:
+            skipped += 1
+            continue
+        runs.setdefault(row["design"], []).append(row)
+    return runs, skipped
+
+
+def split_score(row: Dict[str, str]) -> Tuple[float, float]:
+    """(S_final, its runtime part): the score minus the score at baseline runtimes."""
+    base = cal_total_score.baseline[row["design"]]
+    total = float(cal_total_score.compute_s_final(row))
+    at_base = dict(row, **{k: str(base[k]) for k in RUNTIMES})
+    return total, total - float(cal_total_score.compute_s_final(at_base))
+
+
+# ---------------- statistics ----------------
+def mean_sd(xs: Sequence[float]) -> Tuple[float, float]:
+    if not xs:
+        return math.nan, math.nan
+    return statistics.fmean(xs), statistics.stdev(xs) if len(xs) > 1 else math.nan
+
+
+def bootstrap_delta(groups: Sequence[Tuple[Sequence[float], Sequence[float], float]],
+                    iters: int, conf: float, rng: random.Random) -> Tuple[float, float, float]:
+    """Weighted sum of mean(B) - mean(A) over (A, B, weight) groups, with a
+    percentile bootstrap interval (runs resampled within each variant)."""
+    point = sum(w * (statistics.fmean(b) - statistics.fmean(a)) for a, b, w in groups)
+    draws = []
+    for _ in range(iters):
+        d = 0.0
+        for a, b, w in groups:
+            d += w * (sum(rng.choices(b, k=len(b))) / len(b)
+                      - sum(rng.choices(a, k=len(a))) / len(a))
+        draws.append(d)
+    draws.sort()
+    lo = draws[int((1 - conf) / 2 * (iters - 1))]
+    hi = draws[int((1 + conf) / 2 * (iters - 1))]
+    return point, lo, hi
+
+
+def repeats_needed(a: Sequence[float], b: Sequence[float]) -> Optional[int]:
+    """Runs per variant to resolve the observed mean delta (5%, 80% power)."""
+    if len(a) < 2 or len(b) < 2:
+        return None
+    delta = statistics.fmean(b) - statistics.fmean(a)
+    var = (statistics.variance(a) + statistics.variance(b)) / 2
+    if delta == 0:
+        return None
+    return max(2, math.ceil(2 * Z_80 ** 2 * var / delta ** 2))
+
+
+def compare(runs_a: Dict[str, List[Dict[str, str]]], runs_b: Dict[str, List[Dict[str, str]]],
+            iters: int = 4000, conf: float = 0.95, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    rows = []
+    groups: Dict[str, List] = {"score": [], "runtime": [], "qor": []}
+    for design in sorted(set(runs_a) & set(runs_b)):
+        a, b = runs_a[design], runs_b[design]
+        if len(a) < 2 or len(b) < 2:
+            print(f"[WARN] {design}: {len(a)}/{len(b)} runs, need 2+ of each", file=sys.stderr)
+            continue
+        sa, sb = [split_score(r) for r in a], [split_score(r) for r in b]
+        series = {"score": ([s for s, _ in sa], [s for s, _ in sb]),
+                  "runtime": ([r for _, r in sa], [r for _, r in sb]),
+                  "qor": ([s - r for s, r in sa], [s - r for s, r in sb])}
+        row = {"design": design, "runs": (len(a), len(b))}
+        for k in RUNTIMES:
+            xa = [cal_total_score.to_float(r.get(k)) for r in a]
+            xb = [cal_total_score.to_float(r.get(k)) for r in b]
+            row[k] = {"a": mean_sd(xa), "b": mean_sd(xb),
+                      "whole_seconds": all(float(x).is_integer() for x in xa + xb),
+                      "repeats_needed": repeats_needed(xa, xb)}
+        w = final_score.chips.get(design, 1.0)
+        for name, (xa, xb) in series.items():
+            row[name] = bootstrap_delta([(xa, xb, 1.0)], iters, conf, rng)
+            groups[name].append((xa, xb, w))
+        rows.append(row)
+    if len(rows) > 1:
+        total = {"design": "weighted total", "runs": None}
+        for name, g in groups.items():
+            total[name] = bootstrap_delta(g, iters, conf, rng)
+        rows.append(total)
+    return rows
+
+
+def _interval(d: Tuple[float, float, float]) -> str:
+    point, lo, hi = d
+    mark = "*" if lo > 0 or hi < 0 else " "
+    return f"{point:+9.3f} [{lo:+8.3f},{hi:+8.3f}]{mark}"
+
+
+def print_report(rows: List[Dict], conf: float) -> None:
+    print("runtime per variant (mean ± sd, s)")
+    print(f"{'design':20s} {'runs':>6s} {'tool A':>16s} {'tool B':>16s} {'n80':>5s} "
+          f"{'flow A':>14s} {'flow B':>14s} {'n80':>5s}")
+    coarse = False
+    for r in rows:
+        if r["runs"] is None:
+            continue
+        cells = []
+        for k in RUNTIMES:
+            t = r[k]
+            coarse |= t["whole_seconds"]
+            cells += [f"{t['a'][0]:8.2f} ± {t['a'][1]:5.2f}", f"{t['b'][0]:8.2f} ± {t['b'][1]:5.2f}",
+                      f"{t['repeats_needed'] or '-':>5}"]
+        print(f"{r['design']:20s} {'%d/%d' % r['runs']:>6s} {cells[0]:>16s} {cells[1]:>16s} "
+              f"{cells[2]} {cells[3]:>14s} {cells[4]:>14s} {cells[5]}")
+    print()
+    print(f"S_final delta B - A [{conf:.0%} bootstrap interval], * = interval excludes 0")
+    print(f"{'design':20s} {'S_final':>30s} {'runtime (R)':>30s} {'QoR':>30s}")
+    for r in rows:
+        print(f"{r['design']:20s} {_interval(r['score']):>30s} {_interval(r['runtime']):>30s} "
+              f"{_interval(r['qor']):>30s}")
+    if coarse:
+        print("\n[WARN] some runtimes are whole seconds; rerun with OR_TIMING_MS=1 "
+              "(`run` sets it) for millisecond resolution")
+
+
+# ---------------- running repeats ----------------
+def _keep(out_dir: Path, dst: Path) -> None:
+    dst.mkdir(parents=True, exist_ok=True)
+    for name in KEEP_FILES:
+        src = resolve_input(out_dir / name)
+        if src.is_file():
+            shutil.copy2(src, dst / src.name)
+
+
+def run_repeats(name: str, tcl_a: str, tcl_b: str, designs: List[str], n: int,
+                checkpoint: bool) -> Tuple[Path, Path]:
+    os.environ.setdefault("OR_TIMING_MS", "1")
+    root = COMPARE_ROOT / name
+    for rep in range(n):
+        order = (tcl_a, tcl_b) if rep % 2 == 0 else (tcl_b, tcl_a)
+        for design in designs:
+            for tcl in order:
+                res = run_design(design, tcl, checkpoint=checkpoint)
+                dst = root / tcl / design / f"r{rep:02d}"
+                _keep(res.out_dir, dst)
+                rt = res.metrics.get("tool_runtime") or "?"
+                print(f"[{rep + 1}/{n}] {design:18s} {tcl:24s} {res.status:11s} "
+                      f"tool_runtime={rt} S_final={res.metrics.get('S_final') or '-'}")
+    return root / tcl_a, root / tcl_b
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare repeated runs of two flow variants.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Run both variants n times, then report")
+    r.add_argument("-a", required=True, help="Tcl name of variant A (reference)")
+    r.add_argument("-b", required=True, help="Tcl name of variant B")
+    r.add_argument("-d", "--designs", nargs="+", required=True)
+    r.add_argument("-n", "--repeats", type=int, default=5)
+    r.add_argument("--name", default=None, help="output/compare/<name> (default: <a>_vs_<b>)")
+    r.add_argument("--odb", action="store_true", help="Start flows from ODB checkpoints")
+    p = sub.add_parser("report", help="Compare two directories of runs")
+    p.add_argument("dir_a")
+    p.add_argument("dir_b")
+    for s in (r, p):
+        s.add_argument("--iters", type=int, default=4000, help="Bootstrap resamples")
+        s.add_argument("--conf", type=float, default=0.95, help="Interval coverage")
+        s.add_argument("--seed", type=int, default=0)
+        s.add_argument("--json", default=None, help="Also write the report as JSON")
+    args = ap.parse_args()
+
+    if args.cmd == "run":
+        unknown = [d for d in args.designs if d not in SCENARIOS]
+        if unknown:
+            print(f"ERROR: unknown design(s): {' '.join(unknown)}", file=sys.stderr)
+            return 1
+        if args.repeats < 2:
+            print("ERROR: need at least 2 repeats per variant", file=sys.stderr)
+            return 1
+        name = args.name or f"{args.a}_vs_{args.b}".replace("/", "_")
+        dir_a, dir_b = run_repeats(name, args.a, args.b, args.designs, args.repeats, args.odb)
+    else:
+        dir_a, dir_b = Path(args.dir_a), Path(args.dir_b)
+        for d in (dir_a, dir_b):
+            if not d.is_dir():
+                print(f"ERROR: not a directory: {d}", file=sys.stderr)
+                return 1
+
+    runs_a, skipped_a = collect(dir_a)
+    runs_b, skipped_b = collect(dir_b)
+    if skipped_a or skipped_b:
+        print(f"[WARN] left out {skipped_a}/{skipped_b} runs (killed, unscored or unknown design)",
+              file=sys.stderr)
+    rows = compare(runs_a, runs_b, args.iters, args.conf, args.seed)
+    if not rows:
+        print("ERROR: no design with 2+ runs in both directories", file=sys.stderr)
+        return 1
+    print(f"A: {dir_a}\nB: {dir_b}\n")
+    print_report(rows, args.conf)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=1) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Compressed evaluation logs and netlist exports.
+
+scripts/<design>/eval.sh pipes OpenROAD through `zstd` or `gzip` when
+EVAL_LOG_COMPRESS=zstd|gzip is set and writes evaluation.log.zst/.gz; the
+readers (parse_log.py, profile_log, gr_overflow, rudy, timing_paths,
+name_table, netlist_patch and netlist_check) open a plain path's
+.zst/.gz sibling when only that one exists and stream-decompress it with
+1 MiB reads (parse_log.open_text). .zst needs the zstandard module; gzip
+is always available.
+
+- pack: compress the logs/exports of finished run directories in place
+  (evaluation.log, run.log, node.csv, nets.csv by default), replacing the
+  plain file only after the compressed copy is complete
+- bench: disk footprint and end-to-end read time of one log and one
+  nets.csv as plain, .gz and (with zstandard) .zst; parse_log() for the
+  log, read_nets() for the netlist export
+
+python3 compress_runs.py pack solution/output/<run>/*/* --codec gz
+python3 compress_runs.py bench -d aes_cipher_top_v2 --log <run>/evaluation.log
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import BENCH_ROOT, SCENARIOS, format_size
+from name_table import NameTable, read_nets
+from parse_log import COMPRESSED_SUFFIXES, READ_BUFFER, open_text, parse_log
+
+PACK_NAMES = ["evaluation.log", "run.log", "node.csv", "nets.csv"]
+
+
+def codecs() -> List[str]:
+    """Suffixes usable here: plain, .gz and .zst when zstandard imports."""
+    out = ["", ".gz"]
+    try:
+        import zstandard  # noqa: F401
+        out.append(".zst")
+    except ImportError:
+        pass
+    return out
+
+
+def compress(src: Path, suffix: str, keep: bool = False) -> Path:
+    """Write src + suffix next to src (atomically); drop src unless keep."""
+    dst = src.with_name(src.name + suffix)
+    tmp = dst.with_name(f".{src.name}.{os.getpid()}{suffix}")
+    try:
+        # surrogateescape: the bytes round-trip exactly, whatever the encoding
+        with open(src, "rb") as fin, open_text(tmp, "w", errors="surrogateescape") as fout:
+            while True:
+                chunk = fin.read(READ_BUFFER)
+                if not chunk:
+                    break
+                fout.write(chunk.decode("utf-8", errors="surrogateescape"))
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    shutil.copystat(src, dst)
+    if not keep:
+        src.unlink()
+    return dst
+
+
+def pack(run_dirs: List[Path], names: List[str], suffix: str, keep: bool) -> Dict[str, int]:
+    stats = {"files": 0, "before": 0, "after": 0}
+    for d in run_dirs:
+        for name in names:
+            src = d / name
+            if not src.is_file() or src.suffix in COMPRESSED_SUFFIXES:
+                continue
+            size = src.stat().st_size
+            dst = compress(src, suffix, keep)
+            stats["files"] += 1
+            stats["before"] += size
+            stats["after"] += dst.stat().st_size
+            print(f"{dst}  {format_size(size)} -> {format_size(dst.stat().st_size)}")
+    return stats
+
+
+def _timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(log: Optional[Path], nets: Optional[Path], repeat: int) -> List[Dict]:
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="compress_bench_") as tmp:
+        for kind, src in (("log", log), ("nets", nets)):
+            if src is None:
+                continue
+            plain = Path(tmp) / src.name
+            shutil.copyfile(src, plain)
+            for suffix in codecs():
+                path = compress(plain, suffix, keep=True) if suffix else plain
+                if kind == "log":
+                    secs = _timed(lambda: parse_log(path), repeat)
+                else:
+                    secs = _timed(lambda: read_nets(path, NameTable()), repeat)
+                rows.append({"input": kind, "file": path.name,
+                             "bytes": path.stat().st_size, "seconds": secs})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compressed evaluation logs and netlist exports.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("pack", help="Compress the logs/exports of run directories in place")
+    p.add_argument("run_dirs", nargs="+")
+    p.add_argument("--codec", choices=("gz", "zst"), default="gz")
+    p.add_argument("--names", nargs="+", default=PACK_NAMES, help="Files to compress")
+    p.add_argument("--keep", action="store_true", help="Keep the plain files")
+    b = sub.add_parser("bench", help="Footprint and read time, plain vs compressed")
+    b.add_argument("-d", "--design", default=None,
+                   help="Benchmark whose nets.csv is read (default: none)")
+    b.add_argument("--nets", default=None, help="nets.csv to read instead of the benchmark's")
+    b.add_argument("--log", default=None, help="evaluation.log to parse")
+    b.add_argument("--repeat", type=int, default=3, help="Best of N reads")
+    args = ap.parse_args()
+
+    if args.cmd == "pack":
+        suffix = "." + args.codec
+        if suffix not in codecs():
+            print("ERROR: --codec zst needs the zstandard module", file=sys.stderr)
+            return 1
+        stats = pack([Path(d) for d in args.run_dirs], args.names, suffix, args.keep)
+        if stats["files"]:
+            print(f"{stats['files']} files, {format_size(stats['before'])} -> "
+                  f"{format_size(stats['after'])} "
+                  f"({stats['after'] / max(stats['before'], 1):.1%})")
+        return 0
+
+    nets = Path(args.nets) if args.nets else None
+    if nets is None and args.design:
+        if args.design not in SCENARIOS:
+            print(f"ERROR: unknown design {args.design}", file=sys.stderr)
+            return 1
+        nets = BENCH_ROOT / args.design / SCENARIOS[args.design] / "nets.csv"
+    log = Path(args.log) if args.log else None
+    if nets is None and log is None:
+        print("ERROR: give --log and/or -d/--nets", file=sys.stderr)
+        return 1
+    for path in (log, nets):
+        if path is not None and not path.is_file():
+            print(f"ERROR: file not found: {path}", file=sys.stderr)
+            return 1
+    if ".zst" not in codecs():
+        print("[WARN] zstandard not installed: .zst skipped", file=sys.stderr)
+
+    rows = bench(log, nets, args.repeat)
+    print(f"{'input':6s} {'file':24s} {'size':>10s} {'ratio':>7s} {'read':>9s}")
+    base: Dict[str, Dict] = {}
+    for r in rows:
+        ref = base.setdefault(r["input"], r)
+        print(f"{r['input']:6s} {r['file']:24s} {format_size(r['bytes']):>10s} "
+              f"{r['bytes'] / ref['bytes']:7.1%} {r['seconds'] * 1000:7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
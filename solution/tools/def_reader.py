@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Fast, NumPy-backed reader for the placement part of a DEF file.
+
+Only what the placement tools need is parsed: UNITS, DIEAREA, ROWs, TRACKS,
+the COMPONENTS section and placement BLOCKAGES. COMPONENTS is scanned with one
+regular expression over the raw bytes and converted to columns without a
+Python loop per component; nets, pins and specials are skipped. Coordinates
+stay in DEF database units (DEF.dbu per um).
+
+load_def() keeps the parsed columns of an input DEF (contest.def) in
+CACHE_ROOT/def, keyed by the file digest, so repeated runs map them in
+instead of re-parsing (bincache.py).
+
+python3 def_reader.py Benchmarks/aes_cipher_top/TCP_250_UTIL_0.40/contest.def
+"""
+
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from bincache import read_arrays, write_arrays
+from common import CACHE_ROOT, DigestMemo
+
+DEF_CACHE_VERSION = 3
+DEF_CACHE = CACHE_ROOT / "def"
+
+# Placement status codes of Components.status
+UNPLACED, PLACED, FIXED, COVER = 0, 1, 2, 3
+STATUS_CODES = {b"UNPLACED": UNPLACED, b"PLACED": PLACED, b"FIXED": FIXED, b"COVER": COVER}
+
+_UNITS_RE = re.compile(rb"^\s*UNITS\s+DISTANCE\s+MICRONS\s+(\d+)\s*;", re.M)
+_DIEAREA_RE = re.compile(rb"^\s*DIEAREA\s+((?:\(\s*-?\d+\s+-?\d+\s*\)\s*)+);", re.M)
+_SECTION_RE = re.compile(rb"^\s*COMPONENTS\s+\d+\s*;", re.M)
+_ROW_RE = re.compile(
+    rb"^\s*ROW\s+(\S+)\s+(\S+)\s+(-?\d+)\s+(-?\d+)\s+(\S+)"
+    rb"(?:\s+DO\s+(\d+)\s+BY\s+(\d+)(?:\s+STEP\s+(\d+)\s+(\d+))?)?\s*;", re.M)
+_TRACKS_RE = re.compile(
+    rb"^\s*TRACKS\s+([XY])\s+(-?\d+)\s+DO\s+(\d+)\s+STEP\s+(\d+)"
+    rb"(?:\s+MASK\s+\d+(?:\s+SAMEMASK)?)?\s+LAYER\s+([^;]+?)\s*;", re.M)
+_BLOCKAGES_RE = re.compile(rb"^\s*BLOCKAGES\s+\d+\s*;(.*?)^\s*END\s+BLOCKAGES", re.M | re.S)
+_RECT_RE = re.compile(rb"RECT\s*\(\s*(-?\d+)\s+(-?\d+)\s*\)\s*\(\s*(-?\d+)\s+(-?\d+)\s*\)")
+# "- name master [+ ...] + PLACED ( x y ) orient [+ ...] ;", possibly over several lines
+_COMP_RE = re.compile(
+    rb"-\s+(\S+)\s+(\S+)(?:[^;]*?\+\s*(PLACED|FIXED|COVER|UNPLACED)"
+    rb"(?:\s*\(\s*(-?\d+)\s+(-?\d+)\s*\)\s*(\S+))?)?[^;]*;")
+
+
+@dataclass
+class Components:
+    """Columns of the COMPONENTS section (one row per component)."""
+    names: np.ndarray      # str
+    masters: np.ndarray    # str
+    status: np.ndarray     # int8, UNPLACED/PLACED/FIXED/COVER
+    x: np.ndarray          # int64 DBU (lower-left), 0 when unplaced
+    y: np.ndarray
+    orient: np.ndarray     # str
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass
+class Rows:
+    """One entry per ROW statement; x/y/step in DBU."""
+    names: np.ndarray      # str
+    sites: np.ndarray      # str
+    x: np.ndarray          # int64
+    y: np.ndarray
+    orient: np.ndarray     # str
+    num_x: np.ndarray      # int64
+    num_y: np.ndarray
+    step_x: np.ndarray
+    step_y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass
+class Tracks:
+    """One entry per TRACKS statement; X tracks are vertical lines at x =
+    start + k * step. layers holds the space-separated LAYER names."""
+    axis: np.ndarray       # str, "X" or "Y"
+    start: np.ndarray      # int64 DBU
+    num: np.ndarray
+    step: np.ndarray
+    layers: np.ndarray     # str
+
+    def __len__(self) -> int:
+        return len(self.axis)
+
+    def positions(self, layer: str, axis: str) -> np.ndarray:
+        """Sorted, de-duplicated track coordinates (DBU) of one layer and axis."""
+        pos = [np.arange(s, s + n * st, st, dtype=np.int64) if st > 0 else
+               np.array([s], dtype=np.int64)
+               for a, s, n, st, names in zip(self.axis, self.start, self.num, self.step,
+                                             self.layers)
+               if a == axis and layer in names.split()]
+        return np.unique(np.concatenate(pos)) if pos else np.zeros(0, dtype=np.int64)
+
+
+@dataclass
+class Blockages:
+    """Placement blockage rectangles (xlo, ylo, xhi, yhi) in DBU.
+
+    soft: "+ SOFT" (only global placement keeps out); density: max
+    utilization of "+ PARTIAL", 0 for hard and soft blockages.
+    """
+    rects: np.ndarray      # int64 [n, 4]
+    soft: np.ndarray       # bool
+    density: np.ndarray    # float64, 0..100
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+
+@dataclass
+class DEF:
+    path: Path
+    design: str
+    dbu: int
+    die: Tuple[int, int, int, int]
+    components: Components
+    rows: Rows
+    blockages: Blockages
+    tracks: Tracks
+
+
+def _parse(path: Path) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, arrays) of a DEF; strings are kept as bytes for the cache."""
+    data = Path(path).read_bytes()
+    m = _SECTION_RE.search(data)
+    start = m.end() if m else len(data)
+    end = data.find(b"END COMPONENTS", start)
+    head = data[:start]
+
+    m = re.search(rb"^\s*DESIGN\s+(\S+)\s*;", head, re.M)
+    design = m.group(1).decode() if m else Path(path).stem
+    m = _UNITS_RE.search(head)
+    dbu = int(m.group(1)) if m else 1000
+    m = _DIEAREA_RE.search(head)
+    if m:
+        pts = np.array(re.findall(rb"-?\d+", m.group(1)), dtype=np.int64).reshape(-1, 2)
+        die = [int(pts[:, 0].min()), int(pts[:, 1].min()),
+               int(pts[:, 0].max()), int(pts[:, 1].max())]
+    else:
+        die = [0, 0, 0, 0]
+
+    rows = np.array(_ROW_RE.findall(head), dtype=bytes).reshape(-1, 9)
+    row_num = rows[:, 5:9].copy()
+    row_num[row_num == b""] = b"1"
+    row_num = row_num.astype(np.int64)
+    tracks = np.array(_TRACKS_RE.findall(head), dtype=bytes).reshape(-1, 5)
+    rects, soft, density = [], [], []
+    m = _BLOCKAGES_RE.search(data, end if end >= 0 else start)
+    for item in (m.group(1).split(b";") if m else []):
+        words = item.split()
+        if len(words) < 2 or words[0] != b"-" or words[1] != b"PLACEMENT":
+            continue
+        is_soft = b"SOFT" in words
+        dens = float(words[words.index(b"PARTIAL") + 1]) if b"PARTIAL" in words else 0.0
+        for r in _RECT_RE.findall(item):
+            rects.append([int(v) for v in r])
+            soft.append(is_soft)
+            density.append(dens)
+
+    comps = _COMP_RE.findall(data, start, end) if end >= 0 else []
+    cols = np.array(comps, dtype=bytes).reshape(-1, 6)
+    status = np.full(len(cols), UNPLACED, dtype=np.int8)
+    for key, code in STATUS_CODES.items():
+        status[cols[:, 2] == key] = code
+    xy = cols[:, 3:5].copy()
+    xy[xy == b""] = b"0"
+    xy = xy.astype(np.int64)
+    arrays = {
+        "names": cols[:, 0].copy(),
+        "masters": cols[:, 1].copy(),
+        "status": status,
+        "x": xy[:, 0].copy(),
+        "y": xy[:, 1].copy(),
+        "orient": cols[:, 5].copy(),
+        "row_names": rows[:, 0].copy(),
+        "row_sites": rows[:, 1].copy(),
+        "row_xy": rows[:, 2:4].astype(np.int64),
+        "row_orient": rows[:, 4].copy(),
+        "row_num": row_num,
+        "blk_rects": np.array(rects, dtype=np.int64).reshape(-1, 4),
+        "blk_soft": np.array(soft, dtype=bool),
+        "blk_density": np.array(density, dtype=np.float64),
+        "trk_axis": tracks[:, 0].copy(),
+        "trk_num": tracks[:, 1:4].astype(np.int64),
+        "trk_layers": tracks[:, 4].copy(),
+    }
+    return {"design": design, "dbu": dbu, "die": die}, arrays
+
+
+def _build(path: Path, meta: Dict, arrays: Dict[str, np.ndarray]) -> DEF:
+    comps = Components(
+        names=arrays["names"].astype(str),
+        masters=arrays["masters"].astype(str),
+        status=np.asarray(arrays["status"]),
+        x=np.asarray(arrays["x"]),
+        y=np.asarray(arrays["y"]),
+        orient=arrays["orient"].astype(str),
+    )
+    num = np.asarray(arrays["row_num"])
+    rows = Rows(
+        names=arrays["row_names"].astype(str),
+        sites=arrays["row_sites"].astype(str),
+        x=np.asarray(arrays["row_xy"][:, 0]),
+        y=np.asarray(arrays["row_xy"][:, 1]),
+        orient=arrays["row_orient"].astype(str),
+        num_x=num[:, 0], num_y=num[:, 1], step_x=num[:, 2], step_y=num[:, 3],
+    )
+    blockages = Blockages(np.asarray(arrays["blk_rects"]), np.asarray(arrays["blk_soft"]),
+                          np.asarray(arrays["blk_density"]))
+    trk = np.asarray(arrays["trk_num"])
+    tracks = Tracks(arrays["trk_axis"].astype(str), trk[:, 0], trk[:, 1], trk[:, 2],
+                    arrays["trk_layers"].astype(str))
+    return DEF(Path(path), meta["design"], meta["dbu"], tuple(meta["die"]), comps, rows,
+               blockages, tracks)
+
+
+def read_def(path: Path) -> DEF:
+    """UNITS, DIEAREA, ROWs, TRACKS, COMPONENTS and placement BLOCKAGES of a DEF file."""
+    return _build(path, *_parse(path))
+
+
+def load_def(path: Path, use_cache: bool = True, memo: Optional[DigestMemo] = None) -> DEF:
+    """read_def() through the binary cache, for inputs read more than once."""
+    path = Path(path)
+    if not use_cache:
+        return read_def(path)
+    own_memo = memo is None
+    memo = memo or DigestMemo(DEF_CACHE / "digests.json")
+    digest = memo.digest(path)
+    cached = DEF_CACHE / f"{digest[:24]}.bin"
+    try:
+        meta, arrays = read_arrays(cached, kind="def", version=DEF_CACHE_VERSION, key=digest)
+    except (OSError, ValueError):
+        meta, arrays = _parse(path)
+        write_arrays(cached, arrays, meta, kind="def", version=DEF_CACHE_VERSION, key=digest)
+    if own_memo:
+        memo.save()
+    return _build(path, meta, arrays)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(f"Usage: {Path(sys.argv[0]).name} <file.def>", file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    d = read_def(Path(sys.argv[1]))
+    elapsed = time.perf_counter() - t0
+    c = d.components
+    counts = {name.decode().lower(): int((c.status == code).sum())
+              for name, code in STATUS_CODES.items()}
+    print(f"design {d.design}  dbu {d.dbu}  die {d.die}  ({elapsed:.2f}s)")
+    print(f"components {len(c)}  " + "  ".join(f"{k} {v}" for k, v in counts.items()))
+    print(f"rows {len(d.rows)}  tracks {len(d.tracks)}  placement blockages {len(d.blockages)} "
+          f"({int(d.blockages.soft.sum())} soft)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Average displacement of the movable cells between two placements.
+
+The contest penalizes the average Manhattan displacement per movable cell
+from its original position (P_dis in compute_s_final of cal_total_score.py,
+in um). Following the contest rules:
+
+- movable cells are the pre-opt instances with status PLACED; FIXED macros,
+  tap cells and I/Os do not count
+- repeaters are exempt: instances that only exist in the post-opt
+  placement (inserted buffers/inverters) and pre-opt buffers and inverters
+  (the BUF/INV groups of the equivalent-cell list) are skipped
+- instances are joined by name, so resized cells (new master, same name)
+  are measured like any other cell; pre-opt instances missing from the
+  post-opt placement are reported as removed and skipped
+
+Either side can be a DEF (contest.def, <design>.def) or a node.csv. node.csv
+carries no placement status, so with two node.csv files every instance
+counts as movable.
+
+With --log the result is appended to the evaluation log as
+
+  [DISPLACEMENT] avg=0.3131 cells=14006 moved=812 max=4.212 inserted=35 removed=0
+
+which parse_log.py turns into the displacement column of metrics.csv
+(scripts/<design>/eval.sh does this after every evaluation).
+
+python3 displacement.py Benchmarks/aes_cipher_top_v2/TCP_200_UTIL_0.40/contest.def \\
+    solution/output/baseline/aes_cipher_top_v2/TCP_200_UTIL_0.40/aes_cipher_top_v2.def
+python3 displacement.py <pre> <post> --log evaluation.log --top 20
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from common import EQUIV_CELLS
+from def_reader import FIXED, PLACED, UNPLACED, Components, load_def, read_def
+from netlist_equiv_check import load_equiv_cells
+from parse_log import open_text
+
+
+@dataclass
+class Placement:
+    components: Components
+    dbu: int
+    has_status: bool
+
+
+def read_node_csv(path: Path, dbu: int = 1000) -> Components:
+    """node.csv (Name,Master,Type,llx,lly in um) as Components in DBU.
+
+    Inst rows are PLACED and IO rows FIXED; node.csv has no real status.
+    """
+    with Path(path).open() as f:
+        lines = f.read().splitlines()
+    rows = [ln.split(",") for ln in lines[1:] if ln]
+    if not rows:
+        cols = [[] for _ in range(5)]
+    else:
+        cols = list(zip(*rows))
+    kinds = np.array(cols[2], dtype=str)
+    return Components(
+        names=np.array(cols[0], dtype=str),
+        masters=np.array(cols[1], dtype=str),
+        status=np.where(kinds == "IO", FIXED, PLACED).astype(np.int8),
+        x=np.rint(np.array(cols[3], dtype=np.float64) * dbu).astype(np.int64),
+        y=np.rint(np.array(cols[4], dtype=np.float64) * dbu).astype(np.int64),
+        orient=np.full(len(rows), "N"),
+    )
+
+
+def load_placement(path: Path, dbu: int = 1000, use_cache: bool = False) -> Placement:
+    path = Path(path)
+    if path.suffix == ".csv":
+        return Placement(read_node_csv(path, dbu), dbu, has_status=False)
+    d = load_def(path) if use_cache else read_def(path)
+    return Placement(d.components, d.dbu, has_status=True)
+
+
+def join_by_name(pre: np.ndarray, post: np.ndarray):
+    """(found, idx): post[idx[i]] == pre[i] wherever found[i]."""
+    if len(post) == 0:
+        return np.zeros(len(pre), dtype=bool), np.zeros(len(pre), dtype=np.int64)
+    order = np.argsort(post, kind="stable")
+    ranked = post[order]
+    pos = np.minimum(np.searchsorted(ranked, pre), len(ranked) - 1)
+    found = ranked[pos] == pre
+    return found, order[pos]
+
+
+def displacement(pre_path: Path, post_path: Path,
+                 repeater_masters: Optional[set] = None) -> Dict:
+    """Contest displacement metric between two placements (um)."""
+    post = load_placement(post_path)
+    # contest.def is the same for every run of a design: parse it once.
+    pre = load_placement(pre_path, post.dbu, use_cache=True)
+    if post.dbu != pre.dbu and not post.has_status:
+        post = load_placement(post_path, pre.dbu)
+    if pre.dbu != post.dbu:
+        raise ValueError(f"DEF units differ: {pre.dbu} vs {post.dbu}")
+    a, b = pre.components, post.components
+    found, idx = join_by_name(a.names, b.names)
+
+    status = a.status
+    if not pre.has_status and post.has_status:
+        # node.csv vs DEF: take FIXED/PLACED from the DEF side
+        status = np.where(found, b.status[idx], status)
+    movable = status == PLACED
+    if repeater_masters:
+        masters, inv = np.unique(a.masters, return_inverse=True)
+        movable &= ~np.isin(masters, list(repeater_masters))[inv]
+    removed = movable & ~found
+    counted = movable & found
+    if post.has_status:
+        unplaced = counted & (b.status[idx] == UNPLACED)
+        if unplaced.any():
+            print(f"[WARN] {int(unplaced.sum())} movable cells are unplaced in {post_path}",
+                  file=sys.stderr)
+
+    i = np.flatnonzero(counted)
+    j = idx[i]
+    dist = (np.abs(b.x[j] - a.x[i]) + np.abs(b.y[j] - a.y[i])) / pre.dbu
+    post_found, _ = join_by_name(b.names, a.names)
+    return {
+        "avg": float(dist.mean()) if len(dist) else 0.0,
+        "cells": int(len(dist)),
+        "moved": int((dist > 0).sum()),
+        "max": float(dist.max()) if len(dist) else 0.0,
+        "total": float(dist.sum()),
+        "inserted": int((~post_found).sum()),
+        "removed": int(removed.sum()),
+        "names": a.names[i],
+        "dist": dist,
+    }
+
+
+def marker(r: Dict) -> str:
+    return (f"[DISPLACEMENT] avg={r['avg']:.6g} cells={r['cells']} moved={r['moved']} "
+            f"max={r['max']:.6g} inserted={r['inserted']} removed={r['removed']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Average displacement of the movable cells.")
+    ap.add_argument("pre", help="Pre-opt placement (contest.def or node.csv)")
+    ap.add_argument("post", help="Post-opt placement (<design>.def or node.csv)")
+    ap.add_argument("--log", default=None, help="Append the [DISPLACEMENT] marker to this log")
+    ap.add_argument("--top", type=int, default=0, help="List the N largest movers")
+    ap.add_argument("--count-repeaters", "--count-buffers", action="store_true",
+                    help="Also count pre-opt buffers and inverters as movable cells")
+    args = ap.parse_args()
+
+    for p in (args.pre, args.post):
+        if not Path(p).is_file():
+            print(f"ERROR: placement not found: {p}", file=sys.stderr)
+            return 1
+    repeaters = None
+    if not args.count_repeaters:
+        _, buffers, inverters = load_equiv_cells(str(EQUIV_CELLS))
+        repeaters = buffers | inverters
+
+    t0 = time.perf_counter()
+    try:
+        r = displacement(Path(args.pre), Path(args.post), repeaters)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - t0
+
+    line = marker(r)
+    print(line)
+    print(f"total {r['total']:.3f} um over {r['cells']} movable cells ({elapsed:.2f}s)")
+    if args.top:
+        for k in np.argsort(-r["dist"], kind="stable")[:args.top]:
+            print(f"  {r['dist'][k]:10.3f}  {r['names'][k]}")
+    if args.log:
+        with open_text(args.log, "a") as f:   # appends a frame to .gz/.zst logs
+            f.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
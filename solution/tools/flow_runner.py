@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Run one benchmark end to end from Python.
+
+Mirrors one iteration of solution/test/test_bench.sh:
+  0) optionally build/reuse the design's ODB checkpoint (odb_checkpoint.py)
+  1) generate the Tcl (run.sh -n) and look the run up in the result cache
+  2) run the flow (run.sh) with its stdout captured in run.log
+  3) run scripts/<design>/eval.sh (evaluation.log + metrics.csv)
+  4) score the run with cal_total_score.py and store it in the cache
+
+run.sh and eval.sh run OpenROAD under or_supervisor.py. A run it stops is
+reported with status "killed" (metrics.csv run_status gives the reason) and
+is retried up to `retries` times. evaluate_design() runs steps 3-4 alone on
+an existing flow output.
+
+eval.sh gets TOP_PROJ_DIR set to this checkout, so runs work wherever the
+repository is mounted (job_queue.py workers on other hosts), not only at
+/ISPD26-Contest.
+
+python3 flow_runner.py -d aes_cipher_top jpeg_encoder -t baseline [--no-cache] [--odb]
+"""
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from common import (
+    BENCH_ROOT, OUT_ROOT, REPO_ROOT, SCENARIOS, SCRIPTS_DIR, SOLUTION_DIR, TCL_DIR,
+    TECH_DIR, TEST_DIR,
+)
+from odb_checkpoint import ensure_checkpoint
+from or_supervisor import KILLED_EXIT_CODE
+from result_cache import ResultCache
+
+RUN_SH = SOLUTION_DIR / "run.sh"
+
+
+@dataclass
+class RunResult:
+    design: str
+    scenario: str
+    tcl_name: str
+    out_dir: Path
+    status: str = "ok"          # ok | cached | flow_failed | eval_failed | killed
+    cached: bool = False
+    runtime: float = 0.0
+    metrics: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def score(self) -> Optional[float]:
+        try:
+            return float(self.metrics["S_final"])
+        except (KeyError, ValueError):
+            return None
+
+    @property
+    def run_status(self) -> str:
+        return self.metrics.get("run_status") or "ok"
+
+
+def out_dir_for(design: str, scenario: str, tcl_name: str) -> Path:
+    """Same layout as test_bench.sh / eval.sh: output/<tcl>/<design>/<scenario>."""
+    return OUT_ROOT / tcl_name / design / scenario
+
+
+def generated_tcl_for(design: str, scenario: str, tcl_name: str) -> Path:
+    return TCL_DIR / "temp" / design / scenario / f"{tcl_name}.tcl"
+
+
+def read_last_metrics(out_dir: Path) -> Dict[str, str]:
+    csv_path = out_dir / "metrics.csv"
+    if not csv_path.is_file():
+        return {}
+    with csv_path.open(newline="") as f:
+        rows = list(csv.reader(f))
+    if len(rows) < 2:
+        return {}
+    header, last = rows[0], rows[-1]
+    return {h: (last[i] if i < len(last) else "") for i, h in enumerate(header)}
+
+
+def run_design(design: str, tcl_name: str, scenario: Optional[str] = None,
+               cache: Optional[ResultCache] = None, sweep: Optional[str] = None,
+               checkpoint: bool = False, quiet: bool = True,
+               retries: int = 0) -> RunResult:
+    """Run one design; runs stopped by the watchdog are retried `retries` times."""
+    t0 = time.time()
+    for attempt in range(retries + 1):
+        result = _run_once(design, tcl_name, scenario, cache, sweep if attempt == 0 else None,
+                           checkpoint, quiet)
+        if result.status != "killed":
+            break
+        print(f"[WARN] {design} ({tcl_name}) stopped by watchdog: {result.run_status}"
+              f" (attempt {attempt + 1}/{retries + 1})", file=sys.stderr)
+    result.runtime = time.time() - t0
+    return result
+
+
+def _run_once(design: str, tcl_name: str, scenario: Optional[str],
+              cache: Optional[ResultCache], sweep: Optional[str],
+              checkpoint: bool, quiet: bool) -> RunResult:
+    scenario = scenario or SCENARIOS[design]
+    design_dir = BENCH_ROOT / design / scenario
+    out_dir = out_dir_for(design, scenario, tcl_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    result = RunResult(design, scenario, tcl_name, out_dir)
+    t0 = time.time()
+
+    run_cmd = [str(RUN_SH), str(design_dir), str(TECH_DIR), str(out_dir), design,
+               "-t", tcl_name]
+    if checkpoint:
+        try:
+            run_cmd += ["-b", str(ensure_checkpoint(design, scenario))]
+        except RuntimeError as e:
+            print(f"[WARN] {e}; reading LEF/DEF/Verilog instead", file=sys.stderr)
+
+    key = None
+    if cache is not None:
+        subprocess.run(run_cmd + ["-n"], stdout=subprocess.DEVNULL, check=False)
+        key = cache.key(design, scenario, generated_tcl_for(design, scenario, tcl_name),
+                        design_dir)
+        hit = cache.restore(key, out_dir)
+        if sweep:
+            cache.record(sweep, design, hit)
+        if hit:
+            result.status, result.cached = "cached", True
+            result.metrics = read_last_metrics(out_dir)
+            result.runtime = time.time() - t0
+            return result
+
+    run_log = out_dir / "run.log"
+    with run_log.open("w") as log:
+        flow = subprocess.run(run_cmd, stdout=log, stderr=subprocess.STDOUT, check=False)
+    if flow.returncode == KILLED_EXIT_CODE:
+        # Same as test_bench.sh: record the partial run, skip the evaluation.
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / "parse_log.py"), str(run_log),
+                        "--csv", str(out_dir / "metrics.csv")], stdout=subprocess.DEVNULL,
+                       check=False)
+        result.status = "killed"
+        result.metrics = read_last_metrics(out_dir)
+        result.runtime = time.time() - t0
+        return result
+    if flow.returncode != 0:
+        result.status = "flow_failed"
+
+    _evaluate(result, quiet)
+    if key is not None and result.status == "ok":
+        cache.store(key, design, out_dir, scenario=scenario, tcl_name=tcl_name)
+    result.runtime = time.time() - t0
+    return result
+
+
+def _evaluate(result: RunResult, quiet: bool) -> None:
+    """eval.sh + cal_total_score.py on result.out_dir; fills metrics/status."""
+    sink = subprocess.DEVNULL if quiet else None
+    eval_dir = SCRIPTS_DIR / result.design
+    eval_rc = 0
+    if (eval_dir / "eval.sh").is_file():
+        env = dict(os.environ, TOP_PROJ_DIR=str(REPO_ROOT))
+        eval_rc = subprocess.run(["bash", "eval.sh", result.tcl_name], cwd=eval_dir, env=env,
+                                 stdout=sink, stderr=sink, check=False).returncode
+        subprocess.run([sys.executable, str(TEST_DIR / "cal_total_score.py"),
+                        str(result.out_dir)], stdout=sink, check=False)
+    result.metrics = read_last_metrics(result.out_dir)
+    if result.status == "ok" and result.run_status != "ok":
+        result.status = "killed"
+    elif result.status == "ok" and (eval_rc != 0 or result.score is None):
+        result.status = "eval_failed"
+
+
+def evaluate_design(design: str, tcl_name: str, scenario: Optional[str] = None,
+                    quiet: bool = True) -> RunResult:
+    """Re-evaluate an existing flow output (steps 3-4 only)."""
+    scenario = scenario or SCENARIOS[design]
+    out_dir = out_dir_for(design, scenario, tcl_name)
+    result = RunResult(design, scenario, tcl_name, out_dir)
+    t0 = time.time()
+    if not (out_dir / f"{design}.def").is_file():
+        result.status = "flow_failed"
+    else:
+        _evaluate(result, quiet)
+    result.runtime = time.time() - t0
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run benchmarks through run.sh + eval.sh.")
+    ap.add_argument("-d", "--designs", nargs="+", required=True)
+    ap.add_argument("-t", "--tcl", default="baseline", help="solution/tcl/<tcl>.tcl")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--odb", action="store_true", help="Start flows from ODB checkpoints")
+    ap.add_argument("--retries", type=int, default=0,
+                    help="Rerun designs stopped by the watchdog up to N times")
+    args = ap.parse_args()
+
+    cache = None if args.no_cache else ResultCache()
+    for design in args.designs:
+        if design not in SCENARIOS:
+            print(f"ERROR: unknown design: {design}", file=sys.stderr)
+            return 2
+        r = run_design(design, args.tcl, cache=cache, checkpoint=args.odb, quiet=False,
+                       retries=args.retries)
+        print(f"{r.design:20s} {r.status:12s} S_final={r.metrics.get('S_final', '')} "
+              f"({r.runtime:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
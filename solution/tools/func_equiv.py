@@ -0,0 +1,670 @@
+#!/usr/bin/env python3
+"""
+Functional equivalence of two gate-level netlists by bit-parallel random
+simulation.
+
+netlist_equiv_check.py compares structure only: instance presence, the
+parity of buffer/inverter paths and locations. A swapped pin mapping after
+a resize or a mis-wired inverter pair can pass it. This check simulates
+both contest.v netlists with the Liberty pin functions instead:
+
+- flip-flops, latches, macros and any cell whose output function is not a
+  plain combinational expression of its input pins are cut: their outputs
+  are pseudo-inputs and their input pins (D, SE, SI, CLK, ...) compared
+  pseudo-outputs, matched by (instance, pin) across the two netlists
+- primary inputs and pseudo-inputs get the same random patterns in both
+  netlists, 64 per uint64 word
+- the combinational cells are levelized (Kahn's algorithm, one NumPy pass
+  per level) and every level is evaluated per Liberty function in one
+  batch over all its instances and all words of the batch
+- every primary output and pseudo-output must agree on every pattern
+
+A difference is a counterexample; agreement on --patterns random patterns
+is evidence, not proof. A cell with LEF but no Liberty data is cut like a
+flop (a black box on its LEF pin directions); one without either is
+skipped (tap and filler cells have no signal pins). A net nothing drives
+reads 0.
+
+python3 func_equiv.py check -d aes_cipher_top out/aes_cipher_top.v
+python3 func_equiv.py check --pre pre.v post.v --patterns 16384
+python3 func_equiv.py bench -d aes_cipher_top --replicate 40           # bsg_chip-sized
+python3 func_equiv.py bench -d aes_cipher_top --mutate 20              # inverted outputs
+"""
+
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common import BENCH_ROOT, SCENARIOS
+from lef import Lef, load_lef
+from liberty import CELL_MACRO, CELL_SEQUENTIAL, LibertySet, load_libraries
+from netlist_patch import _CONN_RE, _INST_RE, _KEYWORDS, _statements, _unescape
+from parse_log import open_text, resolve_input
+
+Pin = Tuple[str, str]          # (instance, pin); ports are (name, "_IO_") as in nets.csv
+
+CONST0, CONST1 = 0, 1          # net ids of 1'b0 / 1'b1
+PATTERNS = 4096
+BATCH = 2048                   # patterns simulated per pass
+SEED = 1
+MAX_SHOW = 10
+COMB, CUT, BLACK_BOX = range(3)   # how Model treats a master
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+_PORT_RE = re.compile(r"^\s*(input|output|inout)\s*(?:\[\s*(\d+)\s*:\s*(\d+)\s*\])?\s*(.*?)\s*;",
+                      re.S)
+_ASSIGN_RE = re.compile(r"^\s*assign\s+(.+?)\s*=\s*(.+?)\s*;", re.S)
+_CONST_RE = re.compile(r"^1'[bBhHdD]([01])$")
+
+
+# ---------------- Liberty functions ----------------
+_FUNC_TOKEN_RE = re.compile(r"\s*([()!'*&+|^]|[A-Za-z_][A-Za-z0-9_\[\]]*|[01])")
+
+
+class _FunctionParser:
+    """Liberty function syntax to a Python expression on uint64 words.
+
+    Precedence, high to low: postfix ', prefix !, ^, * & or juxtaposition,
+    + |. Variables become x[i] in order of first use.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _FUNC_TOKEN_RE.findall(text)
+        if "".join(self.tokens) != re.sub(r"\s+", "", text):
+            raise ValueError(f"cannot parse function {text!r}")
+        self.pos = 0
+        self.variables: List[str] = []
+
+    def parse(self) -> str:
+        src = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"trailing {self.tokens[self.pos]!r} in function")
+        return src
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or(self) -> str:
+        terms = [self._and()]
+        while self._peek() in ("+", "|"):
+            self.pos += 1
+            terms.append(self._and())
+        return terms[0] if len(terms) == 1 else "(" + " | ".join(terms) + ")"
+
+    def _and(self) -> str:
+        terms = [self._xor()]
+        while True:
+            tok = self._peek()
+            if tok in ("*", "&"):
+                self.pos += 1
+            elif tok is None or tok in ("+", "|", ")", "^", "'"):
+                break
+            terms.append(self._xor())
+        return terms[0] if len(terms) == 1 else "(" + " & ".join(terms) + ")"
+
+    def _xor(self) -> str:
+        terms = [self._unary()]
+        while self._peek() == "^":
+            self.pos += 1
+            terms.append(self._unary())
+        return terms[0] if len(terms) == 1 else "(" + " ^ ".join(terms) + ")"
+
+    def _unary(self) -> str:
+        if self._peek() == "!":
+            self.pos += 1
+            return f"(~{self._unary()})"
+        src = self._primary()
+        while self._peek() == "'":
+            self.pos += 1
+            src = f"(~{src})"
+        return src
+
+    def _primary(self) -> str:
+        tok = self._peek()
+        if tok is None:
+            raise ValueError("unexpected end of function")
+        self.pos += 1
+        if tok == "(":
+            src = self._or()
+            if self._peek() != ")":
+                raise ValueError("unbalanced parenthesis in function")
+            self.pos += 1
+            return src
+        if tok == "0":
+            return "Z"
+        if tok == "1":
+            return "O"
+        if not (tok[0].isalpha() or tok[0] == "_"):
+            raise ValueError(f"unexpected {tok!r} in function")
+        if tok not in self.variables:
+            self.variables.append(tok)
+        return f"x[{self.variables.index(tok)}]"
+
+
+def compile_function(text: str) -> Tuple[Callable, List[str]]:
+    """(f(x, Z, O), variables): f maps a list of word arrays to the output words."""
+    p = _FunctionParser(text)
+    src = p.parse()
+    return eval(f"lambda x, Z, O: {src}", {}), p.variables
+
+
+# ---------------- netlist ----------------
+@dataclass
+class Netlist:
+    """The top module of a structural Verilog file, names as OpenDB has them."""
+    module: str = ""
+    inputs: List[str] = field(default_factory=list)       # port bits
+    outputs: List[str] = field(default_factory=list)
+    gates: List[Tuple[str, str, Dict[str, str]]] = field(default_factory=list)   # inst, master, pin -> net
+    assigns: List[Tuple[str, str]] = field(default_factory=list)                  # lhs, rhs
+
+    def tile(self, k: int) -> "Netlist":
+        """k independent copies, names prefixed per copy (as lr_sizer.tile)."""
+        out = Netlist(self.module)
+        for c in range(k):
+            def ren(name: str) -> str:
+                return name if c == 0 or _CONST_RE.match(name) else f"t{c}_{name}"
+            out.inputs += [ren(p) for p in self.inputs]
+            out.outputs += [ren(p) for p in self.outputs]
+            out.gates += [(ren(i), m, {p: ren(n) for p, n in conns.items()})
+                          for i, m, conns in self.gates]
+            out.assigns += [(ren(a), ren(b)) for a, b in self.assigns]
+        return out
+
+
+def _port_bits(msb: Optional[str], lsb: Optional[str], names: str) -> List[str]:
+    bits = []
+    for name in (n for n in names.split(",") if n.strip()):
+        name = _unescape(name)
+        if msb is None:
+            bits.append(name)
+        else:
+            hi, lo = int(msb), int(lsb)
+            step = -1 if hi >= lo else 1
+            bits += [f"{name}[{i}]" for i in range(hi, lo + step, step)]
+    return bits
+
+
+def _net_name(expr: str) -> str:
+    name = _unescape(expr)
+    if name.startswith("{"):
+        raise ValueError(f"concatenation {expr!r} in a port connection is not supported")
+    return re.sub(r"\s+", "", name)
+
+
+def read_verilog(path: Path) -> Netlist:
+    """Parse the first module of a flat gate-level netlist (write_verilog output)."""
+    nl = Netlist()
+    with open_text(resolve_input(path)) as f:
+        for stmt in _statements(f):
+            words = stmt.split(None, 2)
+            if not words or words[0].startswith("//"):
+                continue
+            head = words[0]
+            if head == "endmodule":
+                break
+            if head == "module":
+                nl.module = words[1].split("(")[0]
+                continue
+            if head in ("input", "output", "inout") or head.startswith(("input[", "output[")):
+                m = _PORT_RE.match(stmt)
+                if m:
+                    bits = _port_bits(m.group(2), m.group(3), m.group(4))
+                    (nl.outputs if m.group(1) == "output" else nl.inputs).extend(bits)
+                continue
+            if head == "assign":
+                m = _ASSIGN_RE.match(stmt)
+                if m:
+                    nl.assigns.append((_net_name(m.group(1)), _net_name(m.group(2))))
+                continue
+            if head in _KEYWORDS or head.startswith("`") or len(words) < 2:
+                continue
+            m = _INST_RE.match(stmt)
+            if not m:
+                continue
+            _, master, _, name, rest = m.groups()
+            conns = {c.group(1): _net_name(c.group(2)) for c in _CONN_RE.finditer(rest)
+                     if c.group(2).strip()}
+            nl.gates.append((_unescape(name), master, conns))
+    if not nl.module:
+        raise ValueError(f"no module in {path}")
+    return nl
+
+
+# ---------------- simulation model ----------------
+class Model:
+    """A netlist cut at sequential cells and levelized for word-parallel evaluation.
+
+    sources     net ids fed by patterns (primary inputs, pseudo-inputs), keyed
+                by source_keys
+    compare     net ids read at primary outputs and pseudo-outputs, keyed by
+                compare_keys
+    schedule    (function index, input nets [k, arity], output nets [k]) in
+                level order
+    """
+
+    def __init__(self, nl: Netlist, libs: LibertySet, lef: Optional[Lef] = None):
+        self.net_id: Dict[str, int] = {"1'b0": CONST0, "1'b1": CONST1}
+        self.functions: List[Tuple[Callable, List[str]]] = []
+        self.function_index: Dict[str, int] = {}
+        self.unknown_masters: Dict[str, int] = {}
+        self.black_boxes: Dict[str, int] = {}     # LEF-only masters, cut like flops
+        self.cut_cells = 0
+        self.source_keys: List[Pin] = []
+        self.compare_keys: List[Pin] = []
+        sources: List[int] = []
+        compare: List[int] = []
+        out_nets: List[int] = []
+        node_func: List[int] = []
+        node_in: List[List[int]] = []
+        self.unconnected = 0
+        cell_info: Dict[str, Optional[Tuple[int, List[Tuple[str, int, Optional[str]]]]]] = {}
+
+        for bit in nl.inputs:
+            self.source_keys.append((bit, "_IO_"))
+            sources.append(self.net(bit))
+        for bit in nl.outputs:
+            self.compare_keys.append((bit, "_IO_"))
+            compare.append(self.net(bit))
+
+        identity = self.function("A")
+        for lhs, rhs in nl.assigns:
+            out_nets.append(self.net(lhs))
+            node_func.append(identity[0])
+            node_in.append([self.net(rhs)])
+
+        for inst, master, conns in nl.gates:
+            if master not in cell_info:
+                cell_info[master] = self._cell(master, libs, lef)
+            info = cell_info[master]
+            if info is None:
+                if conns:
+                    self.unknown_masters[master] = self.unknown_masters.get(master, 0) + 1
+                continue
+            kind, pins = info
+            if kind != COMB:
+                self.cut_cells += 1
+                if kind == BLACK_BOX and conns:
+                    self.black_boxes[master] = self.black_boxes.get(master, 0) + 1
+                for pin, direction, _ in pins:
+                    net = conns.get(pin)
+                    if net is None:
+                        continue
+                    if direction == 0:
+                        self.compare_keys.append((inst, pin))
+                        compare.append(self.net(net))
+                    else:
+                        self.source_keys.append((inst, pin))
+                        sources.append(self.net(net))
+                continue
+            for pin, direction, func in pins:
+                if func is None or pin not in conns:
+                    continue
+                fid, variables = self.function(func)
+                ins = []
+                for v in variables:
+                    if v in conns:
+                        ins.append(self.net(conns[v]))
+                    else:
+                        self.unconnected += 1
+                        ins.append(CONST0)
+                out_nets.append(self.net(conns[pin]))
+                node_func.append(fid)
+                node_in.append(ins)
+
+        self.n_nets = len(self.net_id)
+        self.sources = np.array(sources, dtype=np.int64)
+        self.compare = np.array(compare, dtype=np.int64)
+        self.n_nodes = len(out_nets)
+        self._levelize(np.array(out_nets, dtype=np.int64), np.array(node_func, dtype=np.int32),
+                       node_in)
+
+    def net(self, name: str) -> int:
+        nid = self.net_id.get(name)
+        if nid is None:
+            nid = self.net_id[name] = len(self.net_id)
+        return nid
+
+    def function(self, text: str) -> Tuple[int, List[str]]:
+        key = re.sub(r"\s+", "", text)
+        fid = self.function_index.get(key)
+        if fid is None:
+            fn, variables = compile_function(text)
+            fid = self.function_index[key] = len(self.functions)
+            self.functions.append((fn, variables))
+        return fid, self.functions[fid][1]
+
+    @staticmethod
+    def _cell(master: str, libs: LibertySet, lef: Optional[Lef] = None):
+        """(COMB/CUT/BLACK_BOX, [(pin, 0 in / 1 out, function)]) of a master.
+
+        A master without Liberty data is a black box with its LEF pin
+        directions, or None when LEF does not know it either.
+        """
+        if master not in libs:
+            macro = lef.macros.get(master) if lef else None
+            if macro is None:
+                return None
+            return BLACK_BOX, ([(p, 0, None) for p in macro.signal_pins("INPUT")]
+                               + [(p, 1, None) for p in macro.signal_pins("OUTPUT")])
+        lib, cid = libs[master]
+        pins = []
+        for p in lib.pins(cid):
+            f = int(lib.pin_func[p])
+            pins.append((lib.pin_name_of(p), int(lib.pin_dir[p]),
+                         lib.strings[f] if f >= 0 else None))
+        inputs = {name for name, d, _ in pins if d == 0}
+        cut = bool(lib.cell_flags[cid] & (CELL_SEQUENTIAL | CELL_MACRO))
+        for name, d, func in pins:
+            if d == 0 or cut:
+                continue
+            if func is None:
+                cut = True
+                continue
+            try:
+                _, variables = compile_function(func)
+            except ValueError:
+                cut = True
+                continue
+            cut = cut or not set(variables) <= inputs
+        return (CUT if cut else COMB,
+                [(name, 0 if d == 0 else 1, func) for name, d, func in pins if d != 3])
+
+    def _levelize(self, out_nets: np.ndarray, node_func: np.ndarray,
+                  node_in: List[List[int]]) -> None:
+        n = self.n_nodes
+        driver = np.full(self.n_nets, -1, dtype=np.int64)
+        driver[out_nets] = np.arange(n)
+        counts = np.bincount(out_nets, minlength=self.n_nets)
+        multi = np.nonzero(counts > 1)[0]
+        clash = np.intersect1d(out_nets, np.concatenate([self.sources, [CONST0, CONST1]]))
+        if len(multi) or len(clash):
+            names = self._names(np.concatenate([multi, clash])[:5])
+            raise ValueError(f"net(s) with more than one driver: {' '.join(names)}")
+
+        arity = np.array([len(x) for x in node_in], dtype=np.int64)
+        flat = np.fromiter((i for x in node_in for i in x), dtype=np.int64, count=int(arity.sum()))
+        dst = np.repeat(np.arange(n), arity)
+        src = driver[flat]
+        keep = src >= 0
+        src, dst = src[keep], dst[keep]
+        order = np.argsort(src, kind="stable")
+        fan_dst = dst[order]
+        fan_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=fan_ptr[1:])
+
+        indeg = np.bincount(dst, minlength=n)
+        level = np.full(n, -1, dtype=np.int64)
+        frontier = np.nonzero(indeg == 0)[0]
+        lvl = 0
+        while len(frontier):
+            level[frontier] = lvl
+            lo, hi = fan_ptr[frontier], fan_ptr[frontier + 1]
+            size = hi - lo
+            if not size.sum():
+                break
+            idx = np.repeat(lo - np.cumsum(size) + size, size) + np.arange(size.sum())
+            hit = fan_dst[idx]
+            indeg -= np.bincount(hit, minlength=n)
+            hit = np.unique(hit)
+            frontier = hit[indeg[hit] == 0]
+            lvl += 1
+        stuck = np.nonzero(level < 0)[0]
+        if len(stuck):
+            names = self._names(out_nets[stuck[:5]])
+            raise ValueError(f"combinational loop through {len(stuck)} cell outputs, "
+                             f"e.g. net(s) {' '.join(names)}")
+        self.levels = lvl + 1 if n else 0
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(arity, out=offsets[1:])
+        key = level * len(self.functions) + node_func
+        order = np.argsort(key, kind="stable")
+        bounds = np.nonzero(np.diff(key[order]))[0] + 1
+        self.schedule: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        for group in np.split(order, bounds) if n else []:
+            fid = int(node_func[group[0]])
+            k = len(self.functions[fid][1])
+            ins = flat[(offsets[group][:, None] + np.arange(k)).ravel()].reshape(len(group), k)
+            self.schedule.append((fid, ins, out_nets[group]))
+
+        sourced = np.zeros(self.n_nets, dtype=bool)
+        sourced[self.sources] = True
+        sourced[[CONST0, CONST1]] = True
+        sourced[out_nets] = True
+        read = np.zeros(self.n_nets, dtype=bool)
+        read[flat] = True
+        read[self.compare] = True
+        self.undriven = int((read & ~sourced).sum())
+
+    def _names(self, ids: Sequence[int]) -> List[str]:
+        wanted = {int(i) for i in ids}
+        return [name for name, nid in self.net_id.items() if nid in wanted]
+
+    def simulate(self, patterns: np.ndarray, key_pos: np.ndarray) -> np.ndarray:
+        """Compare-point words [len(compare), W] for source patterns[key_pos]."""
+        words = patterns.shape[1]
+        v = np.zeros((self.n_nets, words), dtype=np.uint64)
+        v[CONST1] = ALL_ONES
+        v[self.sources] = patterns[key_pos]
+        zero, ones = np.uint64(0), ALL_ONES
+        for fid, ins, outs in self.schedule:
+            fn = self.functions[fid][0]
+            v[outs] = fn([v[ins[:, j]] for j in range(ins.shape[1])], zero, ones)
+        return v[self.compare]
+
+
+# ---------------- check ----------------
+@dataclass
+class Mismatch:
+    key: Pin
+    patterns: int          # patterns that differ
+    first: int             # index of the first one
+
+
+@dataclass
+class Report:
+    patterns: int
+    compared: int
+    missing: List[Pin]             # compare points of pre not in post
+    extra: List[Pin]               # compare points of post not in pre
+    unmatched_sources: List[Pin]   # sources of one netlist only (given own patterns)
+    mismatches: List[Mismatch]
+    seconds: float
+
+    @property
+    def equivalent(self) -> bool:
+        return not (self.missing or self.extra or self.mismatches)
+
+
+def compare(pre: Model, post: Model, patterns: int = PATTERNS, batch: int = BATCH,
+            seed: int = SEED) -> Report:
+    t0 = time.perf_counter()
+    keys = sorted(set(pre.source_keys) | set(post.source_keys))
+    pos = {k: i for i, k in enumerate(keys)}
+    pre_pos = np.array([pos[k] for k in pre.source_keys], dtype=np.int64)
+    post_pos = np.array([pos[k] for k in post.source_keys], dtype=np.int64)
+    unmatched = sorted(set(pre.source_keys) ^ set(post.source_keys))
+
+    post_index = {k: i for i, k in enumerate(post.compare_keys)}
+    pairs = [(i, post_index[k]) for i, k in enumerate(pre.compare_keys) if k in post_index]
+    pre_sel = np.array([a for a, _ in pairs], dtype=np.int64)
+    post_sel = np.array([b for _, b in pairs], dtype=np.int64)
+    pre_set = set(pre.compare_keys)
+    missing = [k for k in pre.compare_keys if k not in post_index]
+    extra = [k for k in post.compare_keys if k not in pre_set]
+
+    words = max(1, batch // 64)
+    total = max(1, -(-patterns // 64))
+    rng = np.random.default_rng(seed)
+    diff_count = np.zeros(len(pairs), dtype=np.int64)
+    first = np.full(len(pairs), -1, dtype=np.int64)
+    done = 0
+    while done < total:
+        w = min(words, total - done)
+        pat = np.frombuffer(rng.bytes(len(keys) * w * 8), dtype=np.uint64).reshape(len(keys), w)
+        d = pre.simulate(pat, pre_pos)[pre_sel] ^ post.simulate(pat, post_pos)[post_sel]
+        bad = np.nonzero(d.any(axis=1))[0]
+        if len(bad):
+            diff_count[bad] += np.bitwise_count(d[bad]).sum(axis=1, dtype=np.int64)
+            fresh = bad[first[bad] < 0]
+            for r in fresh.tolist():
+                word = int(np.nonzero(d[r])[0][0])
+                bits = int(d[r, word])
+                first[r] = (done + word) * 64 + (bits & -bits).bit_length() - 1
+        done += w
+    mismatches = [Mismatch(pre.compare_keys[pre_sel[r]], int(diff_count[r]), int(first[r]))
+                  for r in np.nonzero(diff_count)[0].tolist()]
+    return Report(total * 64, len(pairs), missing, extra, unmatched, mismatches,
+                  time.perf_counter() - t0)
+
+
+def _key(k: Pin) -> str:
+    return k[0] if k[1] == "_IO_" else f"{k[0]}/{k[1]}"
+
+
+def _summary(name: str, m: Model) -> str:
+    return (f"{name}: {m.n_nodes} cell outputs on {m.levels} levels, {m.cut_cells} cut cells, "
+            f"{len(m.sources)} sources, {len(m.compare)} compare points")
+
+
+def _warn(name: str, m: Model) -> None:
+    if m.unknown_masters:
+        masters = " ".join(sorted(m.unknown_masters)[:5])
+        print(f"[WARN] {name}: {sum(m.unknown_masters.values())} connected instances "
+              f"without Liberty data skipped ({masters})", file=sys.stderr)
+    if m.black_boxes:
+        masters = " ".join(sorted(m.black_boxes)[:5])
+        print(f"[WARN] {name}: {sum(m.black_boxes.values())} instances of "
+              f"{len(m.black_boxes)} masters without Liberty functions cut as black boxes "
+              f"({masters} ...)", file=sys.stderr)
+    if m.unconnected:
+        print(f"[WARN] {name}: {m.unconnected} unconnected function inputs read as 0",
+              file=sys.stderr)
+    if m.undriven:
+        print(f"[WARN] {name}: {m.undriven} undriven nets read as 0", file=sys.stderr)
+
+
+def print_report(r: Report, max_show: int = MAX_SHOW) -> None:
+    print(f"{r.compared} compare points x {r.patterns} patterns in {r.seconds:.2f}s")
+    if r.unmatched_sources:
+        print(f"[WARN] {len(r.unmatched_sources)} sources in one netlist only, e.g. "
+              f"{' '.join(_key(k) for k in r.unmatched_sources[:max_show])}", file=sys.stderr)
+    for label, keys in (("missing in post", r.missing), ("only in post", r.extra)):
+        if keys:
+            print(f"FAIL: {len(keys)} compare points {label}, e.g. "
+                  f"{' '.join(_key(k) for k in keys[:max_show])}")
+    if r.mismatches:
+        print(f"FAIL: {len(r.mismatches)} compare points differ")
+        for m in sorted(r.mismatches, key=lambda m: m.first)[:max_show]:
+            print(f"  - {_key(m.key)}: {m.patterns}/{r.patterns} patterns, first #{m.first}")
+        if len(r.mismatches) > max_show:
+            print(f"  ... and {len(r.mismatches) - max_show} more")
+    print(f"RESULT: {'EQUIVALENT' if r.equivalent else 'NOT EQUIV'}")
+
+
+def mutate(nl: Netlist, libs: LibertySet, lef: Lef, n: int, seed: int) -> List[str]:
+    """Insert an inverter after n random cell outputs (for bench)."""
+    rng = np.random.default_rng(seed)
+    inv_in, inv_out = "A", "Y"
+    candidates = []
+    cells: Dict[str, Optional[Tuple[int, List]]] = {}
+    for gi, (inst, master, conns) in enumerate(nl.gates):
+        if master not in cells:
+            cells[master] = Model._cell(master, libs, lef)
+        info = cells[master]
+        if info is None:
+            continue
+        outs = [p for p, d, _ in info[1] if d == 1 and p in conns]
+        if outs:
+            candidates.append((gi, outs[0]))
+    picked = rng.choice(len(candidates), size=min(n, len(candidates)), replace=False)
+    names = []
+    for j, c in enumerate(sorted(picked.tolist())):
+        gi, pin = candidates[c]
+        inst, master, conns = nl.gates[gi]
+        net = conns[pin]
+        fresh = f"mutant_{j}_net"
+        nl.gates[gi] = (inst, master, {**conns, pin: fresh})
+        nl.gates.append((f"mutant_{j}", "INVx1_ASAP7_75t_R", {inv_in: fresh, inv_out: net}))
+        names.append(f"{inst}/{pin}")
+    return names
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Random-simulation equivalence of two netlists.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("check", help="Compare a post-optimization netlist with the original")
+    c.add_argument("post", help="Post-optimization Verilog (write_verilog / netlist_patch.py)")
+    c.add_argument("-d", "--design", default=None, help="Benchmark whose contest.v is the reference")
+    c.add_argument("--pre", default=None, help="Reference Verilog (default: the benchmark's)")
+    b = sub.add_parser("bench", help="Simulate a benchmark against itself, optionally tiled")
+    b.add_argument("-d", "--design", required=True)
+    b.add_argument("--replicate", type=int, default=1,
+                   help="Tile the netlist N times (ariane/bsg_chip-sized inputs)")
+    b.add_argument("--mutate", type=int, default=0,
+                   help="Insert inverters after N random cell outputs of the copy")
+    for p in (c, b):
+        p.add_argument("--patterns", type=int, default=PATTERNS)
+        p.add_argument("--batch", type=int, default=BATCH, help="Patterns per simulation pass")
+        p.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    if args.design is not None and args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    if args.cmd == "check":
+        if args.pre:
+            pre_path = Path(args.pre)
+        elif args.design:
+            pre_path = BENCH_ROOT / args.design / SCENARIOS[args.design] / "contest.v"
+        else:
+            print("ERROR: give --pre or -d", file=sys.stderr)
+            return 1
+        paths = [resolve_input(pre_path), resolve_input(Path(args.post))]
+    else:
+        paths = [resolve_input(BENCH_ROOT / args.design / SCENARIOS[args.design] / "contest.v")]
+    for p in paths:
+        if not p.is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+
+    t0 = time.perf_counter()
+    libs, lef = load_libraries(), load_lef()
+    try:
+        pre_nl = read_verilog(paths[0])
+        if args.cmd == "check":
+            post_nl = read_verilog(paths[1])
+        else:
+            if args.replicate > 1:
+                pre_nl = pre_nl.tile(args.replicate)
+            post_nl = Netlist(pre_nl.module, pre_nl.inputs, pre_nl.outputs, list(pre_nl.gates),
+                              pre_nl.assigns)
+            if args.mutate:
+                mutated = mutate(post_nl, libs, lef, args.mutate, args.seed)
+                print(f"mutated: {' '.join(mutated[:MAX_SHOW])}"
+                      f"{' ...' if len(mutated) > MAX_SHOW else ''}")
+        t_parse = time.perf_counter() - t0
+        pre, post = Model(pre_nl, libs, lef), Model(post_nl, libs, lef)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    t_model = time.perf_counter() - t0 - t_parse
+    for name, m in (("pre", pre), ("post", post)):
+        print(_summary(name, m))
+        _warn(name, m)
+    print(f"parse {t_parse:.2f}s, levelize {t_model:.2f}s")
+    report = compare(pre, post, args.patterns, args.batch, args.seed)
+    print_report(report)
+    print(f"TOTAL TIME: {time.perf_counter() - t0:.2f}s")
+    return 0 if report.equivalent else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Global-routing overflow from the bulk gcell dump of an evaluation run.
+
+scripts/evaluation.tcl (gcell_usage_report in scripts/gcell_usage.tcl)
+writes the capacity/usage of every routing layer and gcell once, as
+<out_dir>/gcell_usage.bin, and logs
+
+  [GCELL_DUMP] file=<out_dir>/gcell_usage.bin nx=.. ny=.. layers=..
+  max_gr_overflow:        <max>
+  total_gr_overflow:      <sum>
+
+instead of a `x y capacity usage congestion%` line per gcell. This module
+reads the dump with NumPy:
+
+- max/total GR overflow exactly as parse_log.py computed them from the
+  text lines: per gcell, capacity and usage are summed over the layers and
+  overflow = max(usage - capacity, 0); max and sum over the gcells
+- per-layer hotspots: overflow of each layer on its own, the worst gcells
+  per layer and the share of the total each layer contributes
+- `text` prints the old per-gcell lines, for diffing against older logs
+  or tools that still read them
+
+A log path is accepted wherever a dump is: the last [GCELL_DUMP] marker
+names the file (looked up next to the log when the absolute path is gone,
+e.g. for a copied output directory).
+
+python3 gr_overflow.py summary solution/output/<run>/aes_cipher_top/.../evaluation.log
+python3 gr_overflow.py hotspots <dump|log> --top 10 --layer M2
+python3 gr_overflow.py text <dump|log> > gr_lines.txt
+"""
+
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import common  # noqa: F401  (puts scripts/ on sys.path)
+from parse_log import open_text
+
+MAGIC = "GCUSAGE1"
+DUMP_RE = re.compile(r"^\[GCELL_DUMP\]\s+file=(\S+)")
+
+
+@dataclass
+class GcellUsage:
+    """Capacity/usage [layer, x, y] in tracks of the routing layers."""
+    layers: List[str]
+    capacity: np.ndarray
+    usage: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.capacity.shape[1], self.capacity.shape[2]
+
+    def totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(capacity, usage) [x, y] summed over the layers."""
+        return self.capacity.sum(axis=0), self.usage.sum(axis=0)
+
+    def overflow(self) -> np.ndarray:
+        """Overflow [x, y] of the layer sums (the evaluation's definition)."""
+        cap, use = self.totals()
+        return np.maximum(use - cap, 0)
+
+    def layer_overflow(self) -> np.ndarray:
+        """Overflow [layer, x, y] of each layer on its own."""
+        return np.maximum(self.usage - self.capacity, 0)
+
+
+def read_usage(path: Path) -> GcellUsage:
+    """Parse a gcell_usage.bin written by gcell_usage_report."""
+    data = Path(path).read_bytes()
+    nl_at = data.find(b"\n")
+    head = data[:nl_at].decode("ascii", errors="replace").split() if nl_at >= 0 else []
+    if len(head) < 4 or head[0] != MAGIC:
+        raise ValueError(f"{path}: not a {MAGIC} gcell dump")
+    nx, ny, nlayers = (int(v) for v in head[1:4])
+    layers = head[4:]
+    if len(layers) != nlayers:
+        raise ValueError(f"{path}: header names {len(layers)} layers, expected {nlayers}")
+    a = np.frombuffer(data, dtype="<i4", offset=nl_at + 1)
+    if a.size != nlayers * 2 * nx * ny:
+        raise ValueError(f"{path}: {a.size} values, expected {nlayers * 2 * nx * ny}")
+    a = a.reshape(nlayers, 2, nx, ny).astype(np.int64)
+    return GcellUsage(layers, a[:, 0], a[:, 1])
+
+
+def find_dump(log: Path) -> Optional[Path]:
+    """Dump named by the last [GCELL_DUMP] marker of an evaluation log."""
+    found = None
+    with open_text(log) as f:
+        for line in f:
+            g = DUMP_RE.match(line.strip())
+            if g:
+                found = g.group(1)
+    if found is None:
+        return None
+    p = Path(found)
+    if not p.is_file() and (Path(log).parent / p.name).is_file():   # copied run dir
+        p = Path(log).parent / p.name
+    return p
+
+
+def load_usage(path: Path) -> GcellUsage:
+    """GcellUsage of a dump file or of the dump an evaluation log names."""
+    path = Path(path)
+    with path.open("rb") as f:
+        is_dump = f.read(len(MAGIC)) == MAGIC.encode()
+    if not is_dump:
+        dump = find_dump(path)
+        if dump is None:
+            raise ValueError(f"{path}: no [GCELL_DUMP] marker")
+        path = dump
+    return read_usage(path)
+
+
+def gr_overflow(u: GcellUsage) -> Tuple[float, float]:
+    """(max_gr_overflow, total_gr_overflow) as in the evaluation log."""
+    over = u.overflow()
+    return float(over.max(initial=0)), float(over.sum())
+
+
+def layer_report(u: GcellUsage) -> List[Dict]:
+    """Per-layer capacity, usage and overflow figures."""
+    lo = u.layer_overflow()
+    rows = []
+    for k, name in enumerate(u.layers):
+        cap, use = u.capacity[k], u.usage[k]
+        rows.append({
+            "layer": name,
+            "capacity": int(cap.sum()),
+            "usage": int(use.sum()),
+            "max_overflow": int(lo[k].max(initial=0)),
+            "total_overflow": int(lo[k].sum()),
+            "overflow_gcells": int(np.count_nonzero(lo[k])),
+        })
+    return rows
+
+
+def hotspots(u: GcellUsage, top: int = 10, layer: Optional[str] = None) -> List[Tuple]:
+    """Worst (layer, x, y, capacity, usage, overflow) gcells, per layer."""
+    lo = u.layer_overflow()
+    out = []
+    for k, name in enumerate(u.layers):
+        if layer is not None and name != layer:
+            continue
+        flat = lo[k].ravel()
+        n = min(top, int(np.count_nonzero(flat)))
+        if n == 0:
+            continue
+        idx = np.argsort(-flat, kind="stable")[:n]
+        xs, ys = np.unravel_index(idx, lo[k].shape)
+        for x, y, i in zip(xs, ys, idx):
+            out.append((name, int(x), int(y), int(u.capacity[k].ravel()[i]),
+                        int(u.usage[k].ravel()[i]), int(flat[i])))
+    return out
+
+
+def text_lines(u: GcellUsage):
+    """The `x y capacity usage congestion%` lines of the old per-gcell dump."""
+    cap, use = u.totals()
+    nx, ny = u.shape
+    for x in range(nx):
+        for y in range(ny):
+            c, s = int(cap[x, y]), int(use[x, y])
+            congestion = s * 100.0 / c if c > 0 else 0
+            yield f"{x} {y} {c} {s} {congestion!r}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GR overflow from the bulk gcell dump.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_text in (("summary", "max/total overflow and per-layer table"),
+                            ("hotspots", "worst gcells per layer"),
+                            ("text", "print the per-gcell text lines")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("path", help="gcell_usage.bin or an evaluation log naming it")
+        if name == "hotspots":
+            p.add_argument("--top", type=int, default=10, help="Gcells per layer")
+            p.add_argument("--layer", default=None, help="Only this layer")
+    args = ap.parse_args()
+
+    if not Path(args.path).is_file():
+        print(f"ERROR: file not found: {args.path}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    try:
+        u = load_usage(Path(args.path))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    if args.cmd == "text":
+        for line in text_lines(u):
+            print(line)
+        return 0
+    if args.cmd == "summary":
+        mx, total = gr_overflow(u)
+        nx, ny = u.shape
+        print(f"grid {nx} x {ny}, {len(u.layers)} routing layers "
+              f"({time.perf_counter() - t0:.3f}s)")
+        print(f"max_gr_overflow:        {mx:g}")
+        print(f"total_gr_overflow:      {total:g}")
+        print(f"{'layer':8s} {'capacity':>10s} {'usage':>10s} {'max_ovf':>8s} "
+              f"{'total_ovf':>10s} {'gcells':>7s}")
+        for r in layer_report(u):
+            print(f"{r['layer']:8s} {r['capacity']:10d} {r['usage']:10d} "
+                  f"{r['max_overflow']:8d} {r['total_overflow']:10d} {r['overflow_gcells']:7d}")
+        return 0
+    rows = hotspots(u, args.top, args.layer)
+    if not rows:
+        print("no overflowing gcells")
+        return 0
+    print(f"{'layer':8s} {'x':>5s} {'y':>5s} {'cap':>6s} {'usage':>6s} {'ovf':>5s}")
+    for name, x, y, c, s, o in rows:
+        print(f"{name:8s} {x:5d} {y:5d} {c:6d} {s:6d} {o:5d}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
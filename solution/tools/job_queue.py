@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+Multi-host job queue for design runs, backed by one SQLite file.
+
+A job is one (sweep, design, scenario, tcl variant, stage) run:
+  stage "flow"  run.sh + eval.sh + cal_total_score.py (flow_runner.run_design)
+  stage "eval"  eval.sh + cal_total_score.py on an existing output
+                (flow_runner.evaluate_design)
+Results go through the same parse_log.py / cal_total_score.py pipeline as
+test_bench.sh and end up in solution/output/ and the result cache; the
+queue keeps status, S_final, runtime and the metrics row per job.
+
+The database lives on the filesystem every host mounts (default
+CACHE_ROOT/queue/jobs.sqlite, or ISPD26_QUEUE_DB), so no broker is needed.
+It uses rollback-journal mode (WAL needs shared memory, which NFS does not
+provide) and takes the write lock up front (BEGIN IMMEDIATE) for every
+state change, so exactly one worker wins each claim.
+
+- leases: a claimed job is leased to its worker for --lease seconds; the
+  worker renews the lease from a heartbeat thread while the run lasts
+- crash recovery: a claim first returns jobs whose lease ran out to the
+  queue (or marks them failed after max_attempts); a worker that lost its
+  lease does not record a result
+- workers: `worker --slots N` runs N jobs at a time; SIGTERM/SIGINT stop
+  claiming and let running jobs finish, a second signal hands them back
+- scaling: workers only touch the database to claim, heartbeat and
+  finish, a few short transactions per multi-minute run; `bench` measures
+  the makespan with 1..N workers on sleep jobs to check the speed-up
+
+python3 job_queue.py submit --sweep nightly -d aes_cipher_top ariane -t baseline
+python3 job_queue.py worker --slots 4            # on every host
+python3 job_queue.py status --sweep nightly
+python3 job_queue.py results --sweep nightly --csv nightly.csv
+python3 job_queue.py requeue --sweep nightly --state failed
+python3 job_queue.py bench --workers 1 2 4 8 --jobs 64 --seconds 0.5
+"""
+
+import argparse
+import csv
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from common import CACHE_ROOT, SCENARIOS
+from or_supervisor import process_tree
+
+QUEUE_DB = Path(os.environ.get("ISPD26_QUEUE_DB", CACHE_ROOT / "queue" / "jobs.sqlite"))
+SCHEMA_VERSION = 1
+STAGES = ("flow", "eval")
+STATES = ("queued", "running", "done", "failed", "cancelled")
+DEFAULT_LEASE = 300.0          # seconds; renewed every lease / 4
+DEFAULT_MAX_ATTEMPTS = 3
+POLL_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY,
+    sweep        TEXT NOT NULL,
+    design       TEXT NOT NULL,
+    scenario     TEXT NOT NULL,
+    tcl_name     TEXT NOT NULL,
+    stage        TEXT NOT NULL,
+    options      TEXT NOT NULL DEFAULT '{}',
+    priority     INTEGER NOT NULL DEFAULT 0,
+    state        TEXT NOT NULL DEFAULT 'queued',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    worker       TEXT,
+    lease_until  REAL,
+    created      REAL NOT NULL,
+    started      REAL,
+    finished     REAL,
+    status       TEXT,
+    score        REAL,
+    runtime      REAL,
+    metrics      TEXT,
+    error        TEXT,
+    UNIQUE (sweep, design, scenario, tcl_name, stage)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority DESC, id);
+CREATE TABLE IF NOT EXISTS workers (
+    name      TEXT PRIMARY KEY,
+    host      TEXT NOT NULL,
+    pid       INTEGER NOT NULL,
+    slots     INTEGER NOT NULL,
+    started   REAL NOT NULL,
+    seen      REAL NOT NULL,
+    jobs_done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    sweep: str
+    design: str
+    scenario: str
+    tcl_name: str
+    stage: str = "flow"
+    options: Dict = field(default_factory=dict)
+    attempts: int = 0
+    worker: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(row["id"], row["sweep"], row["design"], row["scenario"], row["tcl_name"],
+                   row["stage"], json.loads(row["options"] or "{}"), row["attempts"],
+                   row["worker"])
+
+
+class JobQueue:
+    """One connection to the queue database; use one per thread."""
+
+    def __init__(self, path: Path = QUEUE_DB, timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        with self._tx():
+            for stmt in SCHEMA.split(";"):
+                if stmt.strip():
+                    self.db.execute(stmt)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.db.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction holding the database lock from the start."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    # ---------------- producers ----------------
+    def submit(self, sweep: str, designs: Iterable[str], tcl_names: Iterable[str],
+               stage: str = "flow", scenario: Optional[str] = None,
+               options: Optional[Dict] = None, priority: int = 0,
+               max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[int]:
+        """Queue every (design, tcl) pair; already-submitted jobs are kept as they are."""
+        if stage not in STAGES:
+            raise ValueError(f"unknown stage {stage!r} (expected one of {', '.join(STAGES)})")
+        now = time.time()
+        opts = json.dumps(options or {}, sort_keys=True)
+        ids = []
+        with self._tx() as db:
+            for tcl_name in tcl_names:
+                for design in designs:
+                    sc = scenario or SCENARIOS[design]
+                    db.execute(
+                        "INSERT OR IGNORE INTO jobs (sweep, design, scenario, tcl_name, stage,"
+                        " options, priority, max_attempts, created) VALUES (?,?,?,?,?,?,?,?,?)",
+                        (sweep, design, sc, tcl_name, stage, opts, priority, max_attempts, now))
+                    ids.append(db.execute(
+                        "SELECT id FROM jobs WHERE sweep=? AND design=? AND scenario=?"
+                        " AND tcl_name=? AND stage=?",
+                        (sweep, design, sc, tcl_name, stage)).fetchone()[0])
+        return ids
+
+    def requeue(self, sweep: Optional[str] = None, states: Iterable[str] = ("failed",)) -> int:
+        """Put jobs in the given states back in the queue with fresh attempts."""
+        where, args = _filter(sweep, states)
+        with self._tx() as db:
+            return db.execute(
+                "UPDATE jobs SET state='queued', attempts=0, worker=NULL, lease_until=NULL,"
+                f" error=NULL WHERE {where}", args).rowcount
+
+    def cancel(self, sweep: Optional[str] = None) -> int:
+        where, args = _filter(sweep, ("queued",))
+        with self._tx() as db:
+            return db.execute(f"UPDATE jobs SET state='cancelled' WHERE {where}", args).rowcount
+
+    # ---------------- workers ----------------
+    def register(self, name: str, slots: int) -> None:
+        now = time.time()
+        with self._tx() as db:
+            db.execute("INSERT OR REPLACE INTO workers (name, host, pid, slots, started, seen)"
+                       " VALUES (?,?,?,?,?,?)",
+                       (name, socket.gethostname(), os.getpid(), slots, now, now))
+
+    def expire_leases(self, now: Optional[float] = None) -> int:
+        """Requeue (or fail, after max_attempts) running jobs whose lease ran out."""
+        now = time.time() if now is None else now
+        with self._tx() as db:
+            return self._expire(db, now)
+
+    @staticmethod
+    def _expire(db: sqlite3.Connection, now: float) -> int:
+        return db.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed'"
+            " ELSE 'queued' END, error = 'lease expired on ' || worker, worker=NULL,"
+            " lease_until=NULL WHERE state='running' AND lease_until < ?", (now,)).rowcount
+
+    def claim(self, worker: str, lease: float = DEFAULT_LEASE,
+              sweep: Optional[str] = None) -> Optional[Job]:
+        """Lease the next queued job to `worker`, or None when there is none."""
+        now = time.time()
+        with self._tx() as db:
+            self._expire(db, now)
+            q = "SELECT id FROM jobs WHERE state='queued'"
+            args: list = []
+            if sweep:
+                q += " AND sweep=?"
+                args.append(sweep)
+            row = db.execute(q + " ORDER BY priority DESC, id LIMIT 1", args).fetchone()
+            if row is None:
+                db.execute("UPDATE workers SET seen=? WHERE name=?", (now, worker))
+                return None
+            db.execute("UPDATE jobs SET state='running', worker=?, attempts=attempts+1,"
+                       " started=?, lease_until=?, error=NULL WHERE id=?",
+                       (worker, now, now + lease, row["id"]))
+            db.execute("UPDATE workers SET seen=? WHERE name=?", (now, worker))
+            return Job.from_row(db.execute("SELECT * FROM jobs WHERE id=?",
+                                           (row["id"],)).fetchone())
+
+    def heartbeat(self, job_id: int, worker: str, lease: float = DEFAULT_LEASE) -> bool:
+        """Renew a lease; False when the job no longer belongs to `worker`."""
+        now = time.time()
+        with self._tx() as db:
+            ok = db.execute("UPDATE jobs SET lease_until=? WHERE id=? AND worker=?"
+                            " AND state='running'", (now + lease, job_id, worker)).rowcount
+            db.execute("UPDATE workers SET seen=? WHERE name=?", (now, worker))
+        return ok == 1
+
+    def finish(self, job_id: int, worker: str, status: str, score: Optional[float] = None,
+               runtime: Optional[float] = None, metrics: Optional[Dict] = None) -> bool:
+        """Record a completed run; False when the lease was lost meanwhile."""
+        with self._tx() as db:
+            ok = db.execute(
+                "UPDATE jobs SET state='done', status=?, score=?, runtime=?, metrics=?,"
+                " finished=?, lease_until=NULL WHERE id=? AND worker=? AND state='running'",
+                (status, score, runtime, json.dumps(metrics or {}), time.time(),
+                 job_id, worker)).rowcount
+            if ok:
+                db.execute("UPDATE workers SET jobs_done=jobs_done+1 WHERE name=?", (worker,))
+        return ok == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """A run that raised: retry while attempts remain, else mark it failed."""
+        with self._tx() as db:
+            return db.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed'"
+                " ELSE 'queued' END, error=?, worker=NULL, lease_until=NULL, finished=?"
+                " WHERE id=? AND worker=? AND state='running'",
+                (error[-2000:], time.time(), job_id, worker)).rowcount == 1
+
+    def release(self, job_id: int, worker: str) -> bool:
+        """Hand a job back without counting the attempt (worker shutdown)."""
+        with self._tx() as db:
+            return db.execute(
+                "UPDATE jobs SET state='queued', attempts=MAX(attempts-1, 0), worker=NULL,"
+                " lease_until=NULL WHERE id=? AND worker=? AND state='running'",
+                (job_id, worker)).rowcount == 1
+
+    # ---------------- reports ----------------
+    def counts(self, sweep: Optional[str] = None) -> Dict[str, int]:
+        where, args = _filter(sweep, STATES)
+        rows = self.db.execute(f"SELECT state, COUNT(*) FROM jobs WHERE {where}"
+                               " GROUP BY state", args).fetchall()
+        return {s: n for s, n in rows}
+
+    def jobs(self, sweep: Optional[str] = None, states: Iterable[str] = STATES) -> List[Dict]:
+        where, args = _filter(sweep, states)
+        return [dict(r) for r in self.db.execute(
+            f"SELECT * FROM jobs WHERE {where} ORDER BY id", args)]
+
+    def workers(self) -> List[Dict]:
+        return [dict(r) for r in self.db.execute("SELECT * FROM workers ORDER BY name")]
+
+
+def _filter(sweep: Optional[str], states: Iterable[str]):
+    states = list(states)
+    where = f"state IN ({','.join('?' * len(states))})"
+    args: list = list(states)
+    if sweep:
+        where += " AND sweep=?"
+        args.append(sweep)
+    return where, args
+
+
+# ---------------- worker ----------------
+def run_job(job: Job) -> Dict:
+    """Run one job through flow_runner; returns status/score/runtime/metrics."""
+    if "sleep" in job.options:                       # bench jobs
+        time.sleep(float(job.options["sleep"]))
+        return {"status": "ok", "score": None, "runtime": float(job.options["sleep"]),
+                "metrics": {}}
+    from flow_runner import evaluate_design, run_design
+    from result_cache import ResultCache
+    if job.stage == "eval":
+        r = evaluate_design(job.design, job.tcl_name, job.scenario)
+    else:
+        cache = None if job.options.get("no_cache") else ResultCache()
+        r = run_design(job.design, job.tcl_name, job.scenario, cache=cache, sweep=job.sweep,
+                       checkpoint=bool(job.options.get("checkpoint")),
+                       retries=int(job.options.get("retries", 0)))
+    return {"status": r.status, "score": r.score, "runtime": r.runtime, "metrics": r.metrics}
+
+
+class _Heartbeat(threading.Thread):
+    """Renews one job's lease until stopped; notes a lost lease."""
+
+    def __init__(self, path: Path, job: Job, worker: str, lease: float):
+        super().__init__(daemon=True)
+        self.path, self.job, self.worker, self.lease = path, job, worker, lease
+        self.done = threading.Event()
+        self.lost = False
+
+    def run(self) -> None:
+        q = JobQueue(self.path)
+        try:
+            while not self.done.wait(self.lease / 4):
+                try:
+                    if not q.heartbeat(self.job.id, self.worker, self.lease):
+                        self.lost = True
+                        print(f"[WARN] job {self.job.id}: lease lost", file=sys.stderr)
+                        return
+                except sqlite3.Error as e:    # keep trying; the lease has slack
+                    print(f"[WARN] job {self.job.id}: heartbeat failed: {e}", file=sys.stderr)
+        finally:
+            q.close()
+
+
+class Worker:
+    def __init__(self, path: Path = QUEUE_DB, name: Optional[str] = None, slots: int = 1,
+                 lease: float = DEFAULT_LEASE, sweep: Optional[str] = None,
+                 exit_when_idle: bool = False, poll: float = POLL_SECONDS, quiet: bool = False):
+        self.path = Path(path)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.slots, self.lease, self.sweep = slots, lease, sweep
+        self.exit_when_idle, self.poll, self.quiet = exit_when_idle, poll, quiet
+        self.stop = threading.Event()       # no new claims
+        self.abort = threading.Event()      # hand running jobs back
+        self.current: Dict[str, Job] = {}   # slot name -> job it runs
+        self.done = 0
+
+    def _log(self, msg: str) -> None:
+        if not self.quiet:
+            print(f"[QUEUE] {self.name} {msg}", flush=True)
+
+    def _slot(self, k: int) -> None:
+        q = JobQueue(self.path)
+        worker = f"{self.name}/{k}"
+        q.register(worker, 1)
+        try:
+            while not self.stop.is_set():
+                job = q.claim(worker, self.lease, self.sweep)
+                if job is None:
+                    if self.exit_when_idle:
+                        return
+                    self.stop.wait(self.poll)
+                    continue
+                self._log(f"claimed job {job.id}: {job.design} {job.tcl_name} {job.stage}"
+                          f" (attempt {job.attempts})")
+                beat = _Heartbeat(self.path, job, worker, self.lease)
+                beat.start()
+                self.current[worker] = job
+                try:
+                    res = run_job(job)
+                except Exception as e:  # noqa: BLE001 - any failure is the job's
+                    q.fail(job.id, worker, f"{type(e).__name__}: {e}")
+                    self._log(f"job {job.id} raised {type(e).__name__}: {e}")
+                    continue
+                finally:
+                    beat.done.set()
+                    self.current.pop(worker, None)
+                if self.abort.is_set():
+                    return
+                if beat.lost or not q.finish(job.id, worker, res["status"], res["score"],
+                                             res["runtime"], res["metrics"]):
+                    self._log(f"job {job.id}: lease lost, result dropped")
+                    continue
+                self.done += 1
+                score = "" if res["score"] is None else f"{res['score']:.4f}"
+                self._log(f"job {job.id} {res['status']} S_final={score}"
+                          f" ({res['runtime']:.0f}s)")
+        finally:
+            q.close()
+
+    def run(self) -> int:
+        threads = [threading.Thread(target=self._slot, args=(k,), daemon=True)
+                   for k in range(self.slots)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            while t.is_alive() and not self.abort.is_set():
+                t.join(0.5)
+        if self.abort.is_set():
+            self._hand_back()
+        return self.done
+
+    def _hand_back(self) -> None:
+        """Stop the running flows and return their jobs to the queue."""
+        me = os.getpid()
+        for pid in process_tree(me):
+            if pid != me:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        q = JobQueue(self.path)
+        try:
+            for worker, job in list(self.current.items()):
+                if q.release(job.id, worker):
+                    self._log(f"job {job.id} handed back")
+        finally:
+            q.close()
+
+    def handle_signal(self, signum, _frame) -> None:
+        if self.stop.is_set():
+            self.abort.set()
+            self._log("second signal: handing running jobs back")
+        else:
+            self.stop.set()
+            self._log(f"signal {signum}: finishing running jobs, no new claims")
+
+
+# ---------------- bench ----------------
+def bench(worker_counts: List[int], jobs: int, seconds: float) -> List[Dict]:
+    """Makespan of `jobs` sleep jobs with each worker count (separate processes)."""
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="job_queue_bench_") as tmp:
+        for n in worker_counts:
+            db = Path(tmp) / f"bench_{n}.sqlite"
+            q = JobQueue(db)
+            q.submit("bench", ["aes_cipher_top"], [f"t{i:04d}" for i in range(jobs)],
+                     options={"sleep": seconds})
+            q.close()
+            t0 = time.time()
+            procs = [subprocess.Popen([sys.executable, __file__, "--db", str(db), "worker",
+                                       "--exit-when-idle", "--quiet", "--poll", "0.05"])
+                     for _ in range(n)]
+            for p in procs:
+                p.wait()
+            wall = time.time() - t0
+            q = JobQueue(db)
+            done = q.counts().get("done", 0)
+            q.close()
+            ideal = jobs * seconds / n
+            rows.append({"workers": n, "jobs": done, "wall": wall, "ideal": ideal,
+                         "efficiency": ideal / wall if wall > 0 else 0.0})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SQLite-backed multi-host job queue for flow runs.")
+    ap.add_argument("--db", default=str(QUEUE_DB), help="Queue database (shared filesystem)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("submit", help="Queue runs")
+    s.add_argument("--sweep", required=True, help="Group name for status/results")
+    s.add_argument("-d", "--designs", nargs="+", required=True)
+    s.add_argument("-t", "--tcl", nargs="+", default=["baseline"], help="solution/tcl/<tcl>.tcl")
+    s.add_argument("--stage", choices=STAGES, default="flow")
+    s.add_argument("--scenario", default=None, help="Default: the design's contest scenario")
+    s.add_argument("--priority", type=int, default=0, help="Higher runs first")
+    s.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+    s.add_argument("--retries", type=int, default=0,
+                   help="Watchdog retries inside one attempt (flow_runner --retries)")
+    s.add_argument("--no-cache", action="store_true")
+    s.add_argument("--odb", action="store_true", help="Start flows from ODB checkpoints")
+
+    w = sub.add_parser("worker", help="Claim and run jobs until stopped")
+    w.add_argument("--slots", type=int, default=1, help="Jobs run at the same time")
+    w.add_argument("--name", default=None, help="Default: <host>:<pid>")
+    w.add_argument("--lease", type=float, default=DEFAULT_LEASE, help="Lease seconds")
+    w.add_argument("--sweep", default=None, help="Only claim jobs of this sweep")
+    w.add_argument("--poll", type=float, default=POLL_SECONDS, help="Idle poll seconds")
+    w.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is empty")
+    w.add_argument("--quiet", action="store_true")
+
+    st = sub.add_parser("status", help="Job counts, running jobs and workers")
+    st.add_argument("--sweep", default=None)
+    r = sub.add_parser("results", help="Finished jobs")
+    r.add_argument("--sweep", default=None)
+    r.add_argument("--csv", default=None, help="Also write them to a CSV file")
+    rq = sub.add_parser("requeue", help="Run jobs again")
+    rq.add_argument("--sweep", default=None)
+    rq.add_argument("--state", nargs="+", choices=STATES, default=["failed"])
+    c = sub.add_parser("cancel", help="Drop queued jobs")
+    c.add_argument("--sweep", default=None)
+    b = sub.add_parser("bench", help="Throughput vs. number of workers on sleep jobs")
+    b.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    b.add_argument("--jobs", type=int, default=64)
+    b.add_argument("--seconds", type=float, default=0.5, help="Duration of one job")
+    args = ap.parse_args()
+
+    if args.cmd == "bench":
+        print(f"{'workers':>7s} {'jobs':>5s} {'wall':>8s} {'ideal':>8s} {'efficiency':>10s}")
+        for row in bench(args.workers, args.jobs, args.seconds):
+            print(f"{row['workers']:7d} {row['jobs']:5d} {row['wall']:7.2f}s "
+                  f"{row['ideal']:7.2f}s {row['efficiency']:10.1%}")
+        return 0
+
+    try:
+        q = JobQueue(Path(args.db))
+    except sqlite3.Error as e:
+        print(f"ERROR: cannot open queue {args.db}: {e}", file=sys.stderr)
+        return 1
+
+    if args.cmd == "submit":
+        unknown = [d for d in args.designs if d not in SCENARIOS]
+        if unknown:
+            print(f"ERROR: unknown design(s): {', '.join(unknown)}", file=sys.stderr)
+            return 1
+        opts = {k: v for k, v in (("retries", args.retries), ("no_cache", args.no_cache),
+                                  ("checkpoint", args.odb)) if v}
+        ids = q.submit(args.sweep, args.designs, args.tcl, args.stage, args.scenario, opts,
+                       args.priority, args.max_attempts)
+        print(f"{len(ids)} jobs in sweep {args.sweep} ({q.counts(args.sweep)})")
+        return 0
+
+    if args.cmd == "worker":
+        worker = Worker(Path(args.db), args.name, args.slots, args.lease, args.sweep,
+                        args.exit_when_idle, args.poll, args.quiet)
+        signal.signal(signal.SIGTERM, worker.handle_signal)
+        signal.signal(signal.SIGINT, worker.handle_signal)
+        worker._log(f"started: {args.slots} slot(s), lease {args.lease:.0f}s, db {args.db}")
+        done = worker.run()
+        worker._log(f"stopped after {done} job(s)")
+        return 0
+
+    if args.cmd == "status":
+        q.expire_leases()
+        counts = q.counts(args.sweep)
+        print("  ".join(f"{s}={counts.get(s, 0)}" for s in STATES))
+        now = time.time()
+        for j in q.jobs(args.sweep, ("running",)):
+            print(f"  running {j['id']:5d} {j['design']:20s} {j['tcl_name']:28s} "
+                  f"{j['worker']}  {now - j['started']:.0f}s (attempt {j['attempts']})")
+        for j in q.jobs(args.sweep, ("failed",)):
+            print(f"  failed  {j['id']:5d} {j['design']:20s} {j['tcl_name']:28s} {j['error']}")
+        done = q.jobs(args.sweep, ("done",))
+        if done:
+            span = max(j["finished"] for j in done) - min(j["started"] for j in done)
+            busy = sum(j["runtime"] or 0.0 for j in done)
+            print(f"done: {len(done)} jobs, {busy / 3600:.2f} run-hours in "
+                  f"{span / 3600:.2f} h wall ({busy / span if span > 0 else 0:.1f}x parallel)")
+        for wk in q.workers():
+            age = now - wk["seen"]
+            print(f"  worker {wk['name']:32s} {wk['jobs_done']:5d} done, "
+                  f"seen {age:.0f}s ago{'' if age < 2 * DEFAULT_LEASE else ' (stale)'}")
+        return 0
+
+    if args.cmd == "results":
+        rows = q.jobs(args.sweep, ("done",))
+        cols = ["id", "sweep", "design", "scenario", "tcl_name", "stage", "status", "score",
+                "runtime", "attempts", "worker"]
+        for j in rows:
+            score = "" if j["score"] is None else f"{j['score']:.4f}"
+            print(f"{j['design']:20s} {j['tcl_name']:28s} {j['stage']:5s} {j['status']:12s} "
+                  f"S_final={score} ({j['runtime'] or 0:.0f}s)")
+        if args.csv:
+            with open(args.csv, "w", newline="") as f:
+                wr = csv.writer(f)
+                wr.writerow(cols + ["metrics"])
+                for j in rows:
+                    wr.writerow([j[c] for c in cols] + [j["metrics"]])
+        return 0
+
+    if args.cmd == "requeue":
+        print(f"requeued {q.requeue(args.sweep, args.state)} jobs")
+        return 0
+    print(f"cancelled {q.cancel(args.sweep)} jobs")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Vt-swap leakage recovery over the equivalent-cell groups.
+
+Every group of asap7_equivalent_cell_list.csv (load_equiv_cells) holds the
+L/R/SL threshold variants of one function and drive. Instances with
+positive setup slack are moved to a lower-leakage variant of the same cell
+(Liberty leakage, liberty.py) as long as the slack they have pays for the
+extra delay. Inputs:
+
+- the netlist as node.csv / nets.csv: the benchmark's, or the current
+  OpenROAD database written with write_node_and_net_files (or_utils.tcl)
+- worst slack and input slew per instance from OpenSTA,
+  `sta_export_instance_slacks` of solution/tcl/util/sta_export.tcl
+- the NLDM tables (surrogate_sta.TableBank): delay increase of every arc at
+  the dumped slew and a placement-based load, the setup-time increase for
+  flip-flops
+
+Slack budget. The netlist is a DAG of instances, cut at flip-flops (a
+flip-flop is a launch node and a separate capture node). With d[v] the
+delay added by the swaps accepted so far, fin[v] / bout[v] the largest sum
+of d over any path into / out of v, a path through v loses at most
+fin[v] + d[v] + bout[v], and it had at least slack[v]. Candidates are taken
+in batches, highest slack first; a batch member v may add
+
+  d[v] <= (slack[v] - margin - fin[v] - bout[v]) / count[v]
+
+with count[v] the most batch members on one path through v, so no path
+loses more than its slack even if every member on it is accepted.
+fin/bout are brought up to date after each batch (longest-path sweeps
+over the levels in NumPy), which is the whole bookkeeping. Members that
+did not fit are retried in the next pass, in smaller batches (a fixed
+number per pass), so the bookkeeping runs a bounded number of times.
+
+The output is a changelist of resize lines (changelist.py) for
+ga_apply_changelist. The delay model is the surrogate's; `--margin`
+absorbs what it misses (slew changes seen by the fanout, input pin
+capacitance differences between variants).
+
+python3 leakage_recovery.py run -d ariane --nodes node.csv --nets nets.csv \\
+    --slacks inst_slacks.txt -o leakage.changelist
+python3 leakage_recovery.py run -d aes_cipher_top -o leakage.changelist   # runs OpenROAD for the slacks
+python3 leakage_recovery.py bench -d aes_cipher_top     # surrogate slacks, checked with the surrogate
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from changelist import Resize, write_changelist
+from common import BENCH_ROOT, EQUIV_CELLS, FLOW_OPENROAD, OUT_ROOT, SCENARIOS
+from liberty import LibertySet, load_libraries
+from netlist_equiv_check import load_equiv_cells, load_nets, load_nodes
+from surrogate_sta import (ARC_EDGE, ARC_SETUP, C_PER_UM, TableBank, _csr, _gather,
+                           dump_sta_slacks, load_timer, steiner_factor)
+
+VT_SUFFIX_RE = re.compile(r"_(L|R|SL)$")
+MARGIN = 0.005              # ns kept on every path
+SLEW_WEIGHT = 0.5           # share of an output slew increase charged as fanout delay
+BATCHES = 16                # per pass; a pass retries what did not fit in the last one
+DEFAULT_SLEW = 0.02         # ns, for instances the dump has no slew for
+_BUS_BIT_RE = re.compile(r"\[\d+\]$")
+
+
+def read_instance_slacks(path: Path) -> Dict[str, Tuple[str, float, float]]:
+    """{inst: (master, worst slack ns, max input slew ns)}; INF slack is math.inf."""
+    out = {}
+    with Path(path).open() as f:
+        for line in f:
+            tok = line.split()
+            if len(tok) != 5 or tok[0] != "inst":
+                continue
+            try:
+                slack = math.inf if tok[3] == "INF" else float(tok[3])
+                out[tok[1]] = (tok[2], slack, float(tok[4]))
+            except ValueError:
+                continue
+    return out
+
+
+def vt_variants(groups: Dict[str, int], libs: LibertySet) -> Dict[str, List[str]]:
+    """Lower-leakage threshold variants per master, lowest leakage first.
+
+    Groups may hold several drives (the buffer group does); only members
+    with the same name up to the Vt suffix are variants.
+    """
+    by_key: Dict[Tuple[int, str], List[str]] = {}
+    for cell, gid in groups.items():
+        if cell in libs and VT_SUFFIX_RE.search(cell):
+            by_key.setdefault((gid, VT_SUFFIX_RE.sub("", cell)), []).append(cell)
+    out = {}
+    for cells in by_key.values():
+        for cell in cells:
+            lower = sorted((c for c in cells if libs.leakage(c) < libs.leakage(cell)),
+                           key=libs.leakage)
+            if lower:
+                out[cell] = lower
+    return out
+
+
+@dataclass
+class Graph:
+    """Instance DAG cut at flip-flops, levelized. Nodes are the instances
+    followed by the capture nodes of the flip-flops."""
+    n: int
+    src: np.ndarray
+    dst: np.ndarray
+    fwd: List[np.ndarray]      # edges by source level, first level first
+    bwd: List[np.ndarray]      # edges by sink level, last level first
+    cyclic: np.ndarray         # nodes on a loop (their edges are dropped)
+
+    def longest(self, w: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(fin, bout): max sum of w over the paths into / out of each node."""
+        fin = np.zeros(self.n)
+        for e in self.fwd:
+            np.maximum.at(fin, self.dst[e], fin[self.src[e]] + w[self.src[e]])
+        bout = np.zeros(self.n)
+        for e in self.bwd:
+            np.maximum.at(bout, self.src[e], bout[self.dst[e]] + w[self.dst[e]])
+        return fin, bout
+
+
+def _by_level(level: np.ndarray, n_levels: int) -> List[np.ndarray]:
+    order = np.argsort(level, kind="stable")
+    bounds = np.searchsorted(level[order], np.arange(n_levels + 1))
+    return [order[bounds[l]:bounds[l + 1]] for l in range(n_levels)
+            if bounds[l + 1] > bounds[l]]
+
+
+def build_graph(n: int, src: np.ndarray, dst: np.ndarray) -> Graph:
+    """Kahn levelization in NumPy frontiers."""
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    out_ptr, out_edges = _csr(src, np.arange(len(src)), n)
+    indeg = np.bincount(dst, minlength=n)
+    level = np.full(n, -1, dtype=np.int64)
+    frontier = np.flatnonzero(indeg == 0)
+    lvl = 0
+    while frontier.size:
+        level[frontier] = lvl
+        e = _gather(out_ptr, out_edges, frontier)
+        np.subtract.at(indeg, dst[e], 1)
+        nxt = np.unique(dst[e])
+        frontier = nxt[(indeg[nxt] == 0) & (level[nxt] < 0)]
+        lvl += 1
+    ok = (level[src] >= 0) & (level[dst] >= 0)
+    src, dst = src[ok], dst[ok]
+    return Graph(n, src, dst, _by_level(level[src], lvl), _by_level(level[dst], lvl)[::-1],
+                 np.flatnonzero(level < 0))
+
+
+@dataclass
+class Result:
+    changes: List[Resize]
+    leakage_before: float       # Liberty units (nW), instances with Liberty data
+    leakage_after: float
+    candidates: int
+    passes: int
+    batches: int
+    seconds: float
+
+
+class LeakageRecovery:
+    def __init__(self, nodes: Dict[str, Tuple[str, str, float, float]],
+                 nets: Dict[str, Tuple[Tuple[str, str], List[Tuple[str, str]]]],
+                 slacks: Dict[str, Tuple[str, float, float]], bank: TableBank,
+                 variants: Dict[str, List[str]], margin: float = MARGIN):
+        self.bank = bank
+        self.libs = bank.libs
+        self.margin = margin
+        self.inst_names = [name for name, (_, kind, _, _) in nodes.items() if kind != "IO"]
+        self.inst_index = {name: i for i, name in enumerate(self.inst_names)}
+        self.master = [nodes[name][0] for name in self.inst_names]
+        n_inst = len(self.inst_names)
+
+        # Flip-flops (a clock pin) get a separate capture node.
+        self.capture = np.arange(n_inst)
+        seq = [i for i, m in enumerate(self.master)
+               if m in bank.masters and any(clk for _, _, clk in bank.masters[m].pins.values())]
+        self.capture[seq] = n_inst + np.arange(len(seq))
+        n = n_inst + len(seq)
+
+        # Timing edges driver -> sink and the load of every driver pin.
+        src, dst = [], []
+        self.load: Dict[Tuple[int, str], float] = {}
+        for driver, sinks in nets.values():
+            d = self.inst_index.get(driver[0])
+            xs, ys, cap, cells = [], [], 0.0, []
+            for inst, pin in (driver, *sinks):
+                if inst in nodes:
+                    xs.append(nodes[inst][2])
+                    ys.append(nodes[inst][3])
+            for inst, pin in sinks:
+                s = self.inst_index.get(inst)
+                if s is None:
+                    continue
+                info = bank.masters.get(self.master[s])
+                _, c, clk = (info.pins.get(_BUS_BIT_RE.sub("", pin), (0, 0.0, False))
+                             if info else (0, 0.0, False))
+                cap += c
+                if d is not None and not clk:
+                    cells.append(int(self.capture[s]))
+            if d is None:
+                continue
+            hpwl = (max(xs) - min(xs) + max(ys) - min(ys)) if xs else 0.0
+            self.load[(d, driver[1])] = (cap + C_PER_UM * hpwl
+                                         * float(steiner_factor(len(sinks) + 1)))
+            src.extend([d] * len(cells))
+            dst.extend(cells)
+        self.graph = build_graph(n, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+
+        # Slack and slew per node; instances without a dump line are not touched.
+        self.slack = np.full(n, -np.inf)
+        self.slew = np.full(n_inst, DEFAULT_SLEW)
+        for name, (_, slack, slew) in slacks.items():
+            i = self.inst_index.get(name)
+            if i is not None:
+                self.slack[[i, self.capture[i]]] = slack
+                self.slew[i] = slew if slew > 0 else DEFAULT_SLEW
+        self.slack[self.graph.cyclic] = -np.inf      # loops are not budgeted
+        self.variants = variants
+        self._pairs: Dict[Tuple[str, str], List[Tuple[str, int, tuple, tuple]]] = {}
+
+    # ---------------- delay increase per variant ----------------
+    def _arc_pairs(self, old: str, new: str):
+        """(out pin, kind, old delay tables, new delay tables) of arcs both masters have."""
+        key = (old, new)
+        if key not in self._pairs:
+            a, b = self.bank.masters[old].arcs, self.bank.masters[new].arcs
+            self._pairs[key] = [(k[1], k[2], a[k][0], b[k][0]) for k in a if k in b]
+        return self._pairs[key]
+
+    def options(self, cand: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """(candidate row, launch delta ns, capture delta ns, master) per (instance, variant)."""
+        rows, masters, arc_opt, arc_kind, old_t, new_t, slews, loads = [], [], [], [], [], [], [], []
+        for r, i in enumerate(cand.tolist()):
+            old = self.master[i]
+            for new in self.variants[old]:
+                o = len(masters)
+                rows.append(r)
+                masters.append(new)
+                for pin, kind, ta, tb in self._arc_pairs(old, new):
+                    arc_opt.append(o)
+                    arc_kind.append(kind)
+                    old_t.append(ta)
+                    new_t.append(tb)
+                    slews.append(self.slew[i])
+                    loads.append(self.load.get((i, pin), 0.0) if kind == ARC_EDGE else 0.0)
+        k = len(masters)
+        launch, capture = np.zeros(k), np.zeros(k)
+        if arc_opt:
+            opt = np.array(arc_opt, dtype=np.int64)
+            kind = np.array(arc_kind)
+            old_t = np.array(old_t, dtype=np.int64)
+            new_t = np.array(new_t, dtype=np.int64)
+            slews, loads = np.array(slews), np.array(loads)
+            delay = (self.bank.worst(new_t[:, 0], new_t[:, 1], slews, loads)
+                     - self.bank.worst(old_t[:, 0], old_t[:, 1], slews, loads))
+            edge = kind == ARC_EDGE
+            slew = (self.bank.worst(new_t[edge, 2], new_t[edge, 3], slews[edge], loads[edge])
+                    - self.bank.worst(old_t[edge, 2], old_t[edge, 3], slews[edge], loads[edge]))
+            delay[edge] += SLEW_WEIGHT * np.maximum(slew, 0.0)
+            np.maximum.at(launch, opt[edge], delay[edge])
+            setup = kind == ARC_SETUP
+            np.maximum.at(capture, opt[setup], delay[setup])
+        return np.array(rows, dtype=np.int64), launch, capture, masters
+
+    # ---------------- batched passes ----------------
+    def run(self, per_pass: int = BATCHES, max_passes: int = 4) -> Result:
+        t0 = time.perf_counter()
+        g = self.graph
+        n_inst = len(self.inst_names)
+        cand = np.array([i for i in range(n_inst)
+                         if self.master[i] in self.variants and self.master[i] in self.bank.masters
+                         and self.slack[i] > self.margin], dtype=np.int64)
+        cand = cand[np.argsort(-self.slack[cand], kind="stable")]
+        opt_row, opt_launch, opt_capture, opt_master = self.options(cand)
+        # Options of candidate r, lowest leakage first (vt_variants order).
+        opt_ptr = np.searchsorted(opt_row, np.arange(len(cand) + 1))
+
+        w = np.zeros(g.n)                   # delay added at each node so far
+        chosen: Dict[int, str] = {}
+        pending = np.arange(len(cand))
+        passes = batches = 0
+        while pending.size and passes < max_passes:
+            passes += 1
+            retry = []
+            size = -(-len(pending) // per_pass)
+            for b0 in range(0, len(pending), size):
+                members = pending[b0:b0 + size]
+                batches += 1
+                fin, bout = g.longest(w)
+                mark = np.zeros(g.n)
+                inst = cand[members]
+                mark[inst] = 1.0
+                mark[self.capture[inst]] = 1.0
+                cin, cout = g.longest(mark)
+                count = np.maximum(cin + mark + cout, 1.0)
+                with np.errstate(invalid="ignore"):
+                    room = (self.slack - self.margin - fin - w - bout) / count
+                # A variant that is not slower fits anywhere.
+                room = np.maximum(room, 0.0)
+                for r in members.tolist():
+                    i = int(cand[r])
+                    c = int(self.capture[i])
+                    lo, hi = opt_ptr[r], opt_ptr[r + 1]
+                    fits = np.flatnonzero((opt_launch[lo:hi] <= room[i])
+                                          & (opt_capture[lo:hi] <= room[c]))
+                    if not fits.size:
+                        if count[i] + count[c] > 2:
+                            retry.append(r)
+                        continue
+                    o = lo + int(fits[0])
+                    chosen[i] = opt_master[o]
+                    w[i] += max(opt_launch[o], 0.0)
+                    if c != i:
+                        w[c] += max(opt_capture[o], 0.0)
+            pending = np.array(retry, dtype=np.int64)
+
+        before = after = 0.0
+        for i, m in enumerate(self.master):
+            if m in self.libs:
+                before += self.libs.leakage(m)
+                after += self.libs.leakage(chosen.get(i, m))
+        changes = [Resize(self.inst_names[i], m) for i, m in sorted(chosen.items())]
+        return Result(changes, before, after, len(cand), passes, batches,
+                      time.perf_counter() - t0)
+
+
+def design_files(design: str, nodes: Optional[str], nets: Optional[str]) -> Tuple[Path, Path]:
+    base = BENCH_ROOT / design / SCENARIOS[design]
+    return Path(nodes) if nodes else base / "node.csv", Path(nets) if nets else base / "nets.csv"
+
+
+def recover(nodes_path: Path, nets_path: Path, slacks: Dict[str, Tuple[str, float, float]],
+            libs: Optional[LibertySet] = None, margin: float = MARGIN,
+            per_pass: int = BATCHES) -> Result:
+    bank = TableBank(libs or load_libraries())
+    groups, _, _ = load_equiv_cells(str(EQUIV_CELLS))
+    engine = LeakageRecovery(load_nodes(str(nodes_path)), load_nets(str(nets_path)), slacks,
+                             bank, vt_variants(groups, bank.libs), margin)
+    return engine.run(per_pass)
+
+
+def surrogate_slacks(timer) -> Dict[str, Tuple[str, float, float]]:
+    """Instance slacks/slews in the sta_export_instance_slacks form, from the surrogate."""
+    slack = timer.pin_slacks()
+    out = {}
+    for iid, pins in enumerate(timer.inst_pins):
+        if not pins:
+            continue
+        p = np.fromiter(pins.values(), dtype=np.int64)
+        s = slack[p]
+        s = s[np.isfinite(s)]
+        out[timer.inst_names[iid]] = (timer.inst_master[iid], float(s.min()) if s.size else math.inf,
+                                      float(timer.slew[p].max()))
+    return out
+
+
+def _print(design: str, res: Result) -> None:
+    saved = res.leakage_before - res.leakage_after
+    pct = 100.0 * saved / res.leakage_before if res.leakage_before else 0.0
+    print(f"{design}: {len(res.changes)} of {res.candidates} candidates swapped in "
+          f"{res.passes} passes / {res.batches} batches, {res.seconds:.2f}s")
+    print(f"leakage {res.leakage_before:.1f} -> {res.leakage_after:.1f} "
+          f"(-{saved:.1f}, -{pct:.1f}%)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vt-swap leakage recovery.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Changelist from an OpenSTA instance-slack dump")
+    r.add_argument("--slacks", default=None,
+                   help="sta_export_instance_slacks dump (default: run OpenROAD)")
+    r.add_argument("--nodes", default=None, help="node.csv (default: the benchmark's)")
+    r.add_argument("--nets", default=None, help="nets.csv (default: the benchmark's)")
+    r.add_argument("-o", "--out", required=True, help="Changelist to write")
+    r.add_argument("--openroad", default=FLOW_OPENROAD)
+    b = sub.add_parser("bench", help="Surrogate slacks in, surrogate WNS/TNS checked after")
+    for p in (r, b):
+        p.add_argument("-d", "--design", required=True)
+        p.add_argument("--margin", type=float, default=MARGIN, help="ns kept on every path")
+        p.add_argument("--batches", type=int, default=BATCHES, help="Batches per pass")
+    args = ap.parse_args()
+
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    nodes, nets = design_files(args.design, getattr(args, "nodes", None),
+                               getattr(args, "nets", None))
+    for p in (nodes, nets, getattr(args, "slacks", None)):
+        if p and not Path(p).is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+    libs = load_libraries()
+
+    if args.cmd == "bench":
+        timer = load_timer(args.design, libs=libs)
+        wns0, tns0 = timer.summary()
+        res = recover(nodes, nets, surrogate_slacks(timer), libs, args.margin, args.batches)
+        _print(args.design, res)
+        for c in res.changes:
+            timer.apply(c)
+        wns, tns = timer.summary()
+        print(f"surrogate WNS {wns0:.4f} -> {wns:.4f} ns  TNS {tns0:.3f} -> {tns:.3f} ns")
+        return 0
+
+    if args.slacks:
+        slacks_path = Path(args.slacks)
+    else:
+        slacks_path = OUT_ROOT / "leakage" / args.design / "inst_slacks.txt"
+        try:
+            dump_sta_slacks(args.design, slacks_path, args.openroad,
+                            export="sta_export_instance_slacks")
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+    slacks = read_instance_slacks(slacks_path)
+    if not slacks:
+        print(f"ERROR: no instance slacks in {slacks_path}", file=sys.stderr)
+        return 1
+    res = recover(nodes, nets, slacks, libs, args.margin, args.batches)
+    _print(args.design, res)
+    write_changelist(Path(args.out), res.changes)
+    print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+LEF reader for the Python placement tools.
+
+Reads what legal-site search, displacement and the congestion estimate need
+from the Platform LEFs, in microns:
+
+- SITEs: size and class
+- MACROs: footprint, class, site, and per PIN its direction, use and port
+  shapes (layer + rectangle; a POLYGON is kept as its bounding box), plus
+  the OBS shapes
+- routing/cut LAYERs of asap7_tech_1x_201209.lef: type, preferred
+  direction, pitch, width, spacing and offset
+
+The parsed tables are flat NumPy columns (macro -> pin -> shape ranges).
+load_lef() keeps them in CACHE_ROOT/lef keyed by the digest of the LEF
+set (bincache.py), so tools map them in instead of re-parsing; Lef wraps
+the columns in per-name dataclasses on load.
+
+python3 lef.py                                  # all Platform LEFs
+python3 lef.py Platform/ASAP7/lef/fakeram_256x64.lef --macro fakeram_256x64
+python3 lef.py --macro DFFHQNx1_ASAP7_75t_R --pins
+"""
+
+import argparse
+import hashlib
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bincache import read_arrays, write_arrays
+from common import CACHE_ROOT, TECH_DIR, DigestMemo
+
+LEF_CACHE_VERSION = 1
+LEF_CACHE = CACHE_ROOT / "lef"
+
+_SITE_RE = re.compile(r"^\s*SITE\s+(\S+)\s*$(.*?)^\s*END\s+\1\b", re.M | re.S)
+_MACRO_RE = re.compile(r"^\s*MACRO\s+(\S+)\s*$(.*?)^\s*END\s+\1\b", re.M | re.S)
+_PIN_RE = re.compile(r"^\s*PIN\s+(\S+)\s*$(.*?)^\s*END\s+\1\b", re.M | re.S)
+_OBS_RE = re.compile(r"^\s*OBS\s*$(.*?)^\s*END\b", re.M | re.S)
+_SIZE_RE = re.compile(r"^\s*SIZE\s+([-+\d.eE]+)\s+BY\s+([-+\d.eE]+)\s*;", re.M)
+_CLASS_RE = re.compile(r"^\s*CLASS\s+([^;]+?)\s*;", re.M)
+_LAYER_RE = re.compile(r"^\s*LAYER\s+(\S+)\s*$(.*?)^\s*END\s+\1\b", re.M | re.S)
+_TYPE_RE = re.compile(r"^\s*TYPE\s+(\S+)\s*;", re.M)
+_DIRECTION_RE = re.compile(r"^\s*DIRECTION\s+(\S+)", re.M)
+_USE_RE = re.compile(r"^\s*USE\s+(\S+)\s*;", re.M)
+_PITCH_RE = re.compile(r"^\s*PITCH\s+([-+\d.eE]+)(?:\s+([-+\d.eE]+))?\s*;", re.M)
+_OFFSET_RE = re.compile(r"^\s*OFFSET\s+([-+\d.eE]+)(?:\s+([-+\d.eE]+))?\s*;", re.M)
+_WIDTH_RE = re.compile(r"^\s*WIDTH\s+([-+\d.eE]+)\s*;", re.M)
+_SPACING_RE = re.compile(r"^\s*SPACING\s+([-+\d.eE]+)", re.M)
+_MACRO_SITE_RE = re.compile(r"^\s*SITE\s+(\S+)\s*;", re.M)
+# Geometry statements of a PORT/OBS, in order: the current LAYER applies to
+# the RECT/POLYGONs after it.
+_GEOM_RE = re.compile(r"\b(LAYER|RECT|POLYGON)\s+([^;]*);")
+_NUM_RE = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")
+
+PIN_DIRECTIONS = ("", "INPUT", "OUTPUT", "INOUT", "FEEDTHRU")
+PIN_USES = ("", "SIGNAL", "POWER", "GROUND", "CLOCK", "ANALOG", "SCAN", "TIEOFF")
+
+
+@dataclass
+class Site:
+    name: str
+    width: float
+    height: float
+    cls: str
+
+
+@dataclass
+class Pin:
+    name: str
+    direction: str       # "INPUT", "OUTPUT", "INOUT", ... ("" if not given)
+    use: str             # "SIGNAL", "POWER", "GROUND", "CLOCK", ...
+    layers: np.ndarray   # str, one per shape
+    rects: np.ndarray    # float64 [n, 4] xlo ylo xhi yhi, um from the macro origin
+
+    def center(self) -> Tuple[float, float]:
+        """Center of the shapes' bounding box (the access point of the pin, roughly)."""
+        if not len(self.rects):
+            return 0.0, 0.0
+        return (float(self.rects[:, 0].min() + self.rects[:, 2].max()) / 2.0,
+                float(self.rects[:, 1].min() + self.rects[:, 3].max()) / 2.0)
+
+
+@dataclass
+class Macro:
+    name: str
+    width: float
+    height: float
+    cls: str             # "CORE", "BLOCK", "CORE WELLTAP", ...
+    site: Optional[str]
+    pins: Dict[str, Pin] = field(default_factory=dict)
+    obs_layers: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=str))
+    obs_rects: np.ndarray = field(default_factory=lambda: np.zeros((0, 4)))
+
+    def signal_pins(self, direction: str) -> List[str]:
+        return [p.name for p in self.pins.values()
+                if p.direction == direction and p.use not in ("POWER", "GROUND")]
+
+
+@dataclass
+class Layer:
+    name: str
+    type: str            # "ROUTING", "CUT", ...
+    direction: str       # "HORIZONTAL" / "VERTICAL", "" for non-routing layers
+    pitch: float         # um, in the preferred direction; 0 if not given
+    width: float = 0.0   # default wire width, um
+    spacing: float = 0.0 # first SPACING rule, um
+    offset: float = 0.0  # track offset in the preferred direction, um
+
+
+@dataclass
+class Lef:
+    sites: Dict[str, Site]
+    macros: Dict[str, Macro]
+    layers: Dict[str, Layer]
+
+
+def platform_lefs() -> List[Path]:
+    return sorted((TECH_DIR / "lef").glob("*.lef"))
+
+
+def _strip_pins(body: str) -> str:
+    # PIN/OBS blocks have their own SIZE-free geometry but may repeat CLASS
+    cut = re.search(r"^\s*(PIN|OBS)\b", body, re.M)
+    return body[:cut.start()] if cut else body
+
+
+def _preferred(m: Optional[re.Match], direction: str) -> float:
+    # "PITCH x y" / "OFFSET x y" give both; the preferred one is across the tracks
+    if not m:
+        return 0.0
+    return float(m.group(2) if m.group(2) and direction == "HORIZONTAL" else m.group(1))
+
+
+def _shapes(body: str, layer_code, layers: List[int], rects: List[List[float]]) -> None:
+    layer = -1
+    for kind, args in _GEOM_RE.findall(body):
+        if kind == "LAYER":
+            layer = layer_code(args.split()[0])
+            continue
+        nums = [float(v) for v in _NUM_RE.findall(args.replace("MASK", " "))]
+        if kind == "RECT" and len(nums) >= 4:
+            x0, y0, x1, y1 = nums[-4:]
+        elif kind == "POLYGON" and len(nums) >= 6:
+            xs, ys = nums[-2 * (len(nums) // 2)::2], nums[-2 * (len(nums) // 2) + 1::2]
+            x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+        else:
+            continue
+        layers.append(layer)
+        rects.append([min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)])
+
+
+def _parse(paths: Iterable[Path]) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, arrays) of a LEF set, later files winning; strings as bytes for the cache."""
+    sites: Dict[str, Tuple[float, float, str]] = {}
+    layers: Dict[str, Tuple[str, str, float, float, float, float]] = {}
+    macros: Dict[str, Tuple] = {}
+    layer_names: Dict[str, int] = {}
+
+    def layer_code(name: str) -> int:
+        return layer_names.setdefault(name, len(layer_names))
+
+    for path in paths:
+        text = Path(path).read_text()
+        for name, body in _LAYER_RE.findall(text):
+            kind = _TYPE_RE.search(body)
+            direction = _DIRECTION_RE.search(body)
+            direction = direction.group(1) if direction else ""
+            width = _WIDTH_RE.search(body)
+            spacing = _SPACING_RE.search(body)
+            layers[name] = (kind.group(1) if kind else "", direction,
+                            _preferred(_PITCH_RE.search(body), direction),
+                            float(width.group(1)) if width else 0.0,
+                            float(spacing.group(1)) if spacing else 0.0,
+                            _preferred(_OFFSET_RE.search(body), direction))
+            layer_code(name)
+        for name, body in _SITE_RE.findall(text):
+            size = _SIZE_RE.search(body)
+            cls = _CLASS_RE.search(body)
+            if size:
+                sites[name] = (float(size.group(1)), float(size.group(2)),
+                               cls.group(1) if cls else "")
+        for name, body in _MACRO_RE.findall(text):
+            head = _strip_pins(body)
+            size = _SIZE_RE.search(head)
+            if not size:
+                continue
+            cls = _CLASS_RE.search(head)
+            site = _MACRO_SITE_RE.search(head)
+            pins = []
+            for pin, pbody in _PIN_RE.findall(body):
+                direction = _DIRECTION_RE.search(pbody)
+                use = _USE_RE.search(pbody)
+                p_layers, p_rects = [], []
+                _shapes(pbody, layer_code, p_layers, p_rects)
+                pins.append((pin, direction.group(1) if direction else "",
+                             use.group(1) if use else "", p_layers, p_rects))
+            o_layers, o_rects = [], []
+            for obody in _OBS_RE.findall(body):
+                _shapes(obody, layer_code, o_layers, o_rects)
+            macros[name] = (float(size.group(1)), float(size.group(2)),
+                            " ".join(cls.group(1).split()) if cls else "",
+                            site.group(1) if site else "", pins, o_layers, o_rects)
+
+    m_cols = {k: [] for k in ("name", "size", "cls", "site", "pin_ptr", "obs_ptr")}
+    p_cols = {k: [] for k in ("name", "dir", "use", "shape_ptr")}
+    shape_layer, shape_rect, obs_layer, obs_rect = [], [], [], []
+    for name, (w, h, cls, site, pins, o_layers, o_rects) in macros.items():
+        m_cols["name"].append(name)
+        m_cols["size"].append([w, h])
+        m_cols["cls"].append(cls)
+        m_cols["site"].append(site)
+        m_cols["pin_ptr"].append(len(p_cols["name"]))
+        m_cols["obs_ptr"].append(len(obs_layer))
+        for pin, direction, use, p_layers, p_rects in pins:
+            p_cols["name"].append(pin)
+            p_cols["dir"].append(PIN_DIRECTIONS.index(direction)
+                                 if direction in PIN_DIRECTIONS else 0)
+            p_cols["use"].append(PIN_USES.index(use) if use in PIN_USES else 0)
+            p_cols["shape_ptr"].append(len(shape_layer))
+            shape_layer.extend(p_layers)
+            shape_rect.extend(p_rects)
+        obs_layer.extend(o_layers)
+        obs_rect.extend(o_rects)
+    m_cols["pin_ptr"].append(len(p_cols["name"]))
+    m_cols["obs_ptr"].append(len(obs_layer))
+    p_cols["shape_ptr"].append(len(shape_layer))
+
+    def strings(values) -> np.ndarray:
+        return np.array(values, dtype=bytes) if values else np.zeros(0, dtype="S1")
+
+    layer_rows = list(layers.items())
+    arrays = {
+        "site_names": strings(list(sites)),
+        "site_cls": strings([s[2] for s in sites.values()]),
+        "site_size": np.array([s[:2] for s in sites.values()], dtype=np.float64).reshape(-1, 2),
+        "layer_table": strings(list(layer_names)),
+        "layer_names": strings([n for n, _ in layer_rows]),
+        "layer_type": strings([v[0] for _, v in layer_rows]),
+        "layer_dir": strings([v[1] for _, v in layer_rows]),
+        "layer_num": np.array([v[2:] for _, v in layer_rows], dtype=np.float64).reshape(-1, 4),
+        "macro_names": strings(m_cols["name"]),
+        "macro_size": np.array(m_cols["size"], dtype=np.float64).reshape(-1, 2),
+        "macro_cls": strings(m_cols["cls"]),
+        "macro_site": strings(m_cols["site"]),
+        "macro_pin_ptr": np.array(m_cols["pin_ptr"], dtype=np.int64),
+        "macro_obs_ptr": np.array(m_cols["obs_ptr"], dtype=np.int64),
+        "pin_names": strings(p_cols["name"]),
+        "pin_dir": np.array(p_cols["dir"], dtype=np.int8),
+        "pin_use": np.array(p_cols["use"], dtype=np.int8),
+        "pin_shape_ptr": np.array(p_cols["shape_ptr"], dtype=np.int64),
+        "shape_layer": np.array(shape_layer, dtype=np.int32),
+        "shape_rect": np.array(shape_rect, dtype=np.float64).reshape(-1, 4),
+        "obs_layer": np.array(obs_layer, dtype=np.int32),
+        "obs_rect": np.array(obs_rect, dtype=np.float64).reshape(-1, 4),
+    }
+    return {"files": [str(p) for p in paths]}, arrays
+
+
+def _build(arrays: Dict[str, np.ndarray]) -> Lef:
+    sites = {n: Site(n, float(w), float(h), c) for n, (w, h), c in
+             zip(arrays["site_names"].astype(str).tolist(), arrays["site_size"],
+                 arrays["site_cls"].astype(str).tolist())}
+    layers = {n: Layer(n, t, d, *(float(v) for v in num)) for n, t, d, num in
+              zip(arrays["layer_names"].astype(str).tolist(),
+                  arrays["layer_type"].astype(str).tolist(),
+                  arrays["layer_dir"].astype(str).tolist(), arrays["layer_num"])}
+    table = arrays["layer_table"].astype(str)
+    shape_layers = table[arrays["shape_layer"]] if len(table) else np.zeros(0, dtype=str)
+    obs_layers = table[arrays["obs_layer"]] if len(table) else np.zeros(0, dtype=str)
+    shape_rect, obs_rect = arrays["shape_rect"], arrays["obs_rect"]
+    pin_names = arrays["pin_names"].astype(str).tolist()
+    pin_dir, pin_use = arrays["pin_dir"].tolist(), arrays["pin_use"].tolist()
+    sp = arrays["pin_shape_ptr"].tolist()
+    pp, op = arrays["macro_pin_ptr"].tolist(), arrays["macro_obs_ptr"].tolist()
+    macros = {}
+    for k, (name, (w, h), cls, site) in enumerate(zip(
+            arrays["macro_names"].astype(str).tolist(), arrays["macro_size"].tolist(),
+            arrays["macro_cls"].astype(str).tolist(), arrays["macro_site"].astype(str).tolist())):
+        pins = {}
+        for p in range(pp[k], pp[k + 1]):
+            s = slice(sp[p], sp[p + 1])
+            pins[pin_names[p]] = Pin(pin_names[p], PIN_DIRECTIONS[pin_dir[p]],
+                                     PIN_USES[pin_use[p]], shape_layers[s], shape_rect[s])
+        o = slice(op[k], op[k + 1])
+        macros[name] = Macro(name, w, h, cls, site or None, pins, obs_layers[o], obs_rect[o])
+    return Lef(sites, macros, layers)
+
+
+def read_lef(paths: Iterable[Path]) -> Lef:
+    """Sites, macros (footprint, pins, obstructions) and layers of the given LEFs;
+    later files win."""
+    return _build(_parse([Path(p) for p in paths])[1])
+
+
+def load_lef(paths: Optional[Iterable[Path]] = None, use_cache: bool = True) -> Lef:
+    """read_lef() of the given LEFs (default: the Platform set) through the binary cache."""
+    paths = [Path(p) for p in (paths or platform_lefs())]
+    if not use_cache:
+        return read_lef(paths)
+    memo = DigestMemo(LEF_CACHE / "digests.json")
+    # Order matters (later files win), so it is part of the key.
+    key = hashlib.blake2b(f"{memo.combined(paths)}:{','.join(p.name for p in paths)}".encode(),
+                          digest_size=20).hexdigest()
+    memo.save()
+    cached = LEF_CACHE / f"{key[:24]}.bin"
+    try:
+        _, arrays = read_arrays(cached, kind="lef", version=LEF_CACHE_VERSION, key=key)
+    except (OSError, ValueError):
+        meta, arrays = _parse(paths)
+        write_arrays(cached, arrays, meta, kind="lef", version=LEF_CACHE_VERSION, key=key)
+    return _build(arrays)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LEF sites, macros, pins and layers.")
+    ap.add_argument("lefs", nargs="*", help="LEF files (default: Platform/ASAP7/lef/*.lef)")
+    ap.add_argument("--macro", default=None, help="Print one macro")
+    ap.add_argument("--pins", action="store_true", help="With --macro: pins and shapes")
+    ap.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+
+    paths = [Path(p) for p in args.lefs] or platform_lefs()
+    missing = [str(p) for p in paths if not p.is_file()]
+    if missing:
+        print(f"ERROR: LEF not found: {' '.join(missing)}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    lef = load_lef(paths, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - t0
+    if args.macro:
+        m = lef.macros.get(args.macro)
+        if m is None:
+            print(f"ERROR: unknown macro {args.macro}", file=sys.stderr)
+            return 1
+        print(f"{m.name}: {m.width} x {m.height} um, class {m.cls}, site {m.site}, "
+              f"{len(m.pins)} pins, {len(m.obs_rects)} obstructions")
+        if args.pins:
+            for p in m.pins.values():
+                x, y = p.center()
+                print(f"  {p.name:12s} {p.direction:6s} {p.use:7s} {len(p.rects)} shapes "
+                      f"({' '.join(sorted(set(p.layers.tolist())))}) center {x:.3f} {y:.3f}")
+        return 0
+    for s in lef.sites.values():
+        print(f"site {s.name}: {s.width} x {s.height} um ({s.cls})")
+    for layer in lef.layers.values():
+        if layer.type == "ROUTING":
+            print(f"layer {layer.name}: {layer.direction.lower()}, pitch {layer.pitch} um, "
+                  f"width {layer.width} um, spacing {layer.spacing} um")
+    classes: Dict[str, int] = {}
+    for m in lef.macros.values():
+        classes[m.cls] = classes.get(m.cls, 0) + 1
+    pins = sum(len(m.pins) for m in lef.macros.values())
+    print(f"{len(lef.macros)} macros, {pins} pins: "
+          + ", ".join(f"{k or '?'} {v}" for k, v in sorted(classes.items())))
+    print(f"loaded in {elapsed * 1e3:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
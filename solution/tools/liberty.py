@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Liberty NLDM loader with a binary cache.
+
+Parses the Platform .lib files into flat NumPy arrays (struct of arrays):
+
+  cells   name, area, leakage, flags, pin range
+  pins    name, cell, direction, capacitance (rise/fall), max_capacitance,
+          max_transition, function, arc range
+  arcs    to-pin, from-pin (related_pin), timing_sense, timing_type and four
+          table slots: rise/fall delay and rise/fall transition (setup/hold
+          style arcs keep rise/fall_constraint in the delay slots)
+  tables  shape, axis variables, offsets into the shared axis/value pools
+
+Values are converted to the flow's command units (set_cmd_units in the flow
+Tcl): time ns, capacitance pF, leakage nW. Power tables are not kept.
+
+The first load of a .lib parses it (about a second per ASAP7 library) and
+writes CACHE_ROOT/liberty/<lib>-<digest>.bin through bincache.py. Later loads
+only map that file, keyed by the blake2b digest of the .lib and
+LIBERTY_CACHE_VERSION, and take milliseconds.
+
+python3 liberty.py build                       # parse/cache all Platform libs
+python3 liberty.py info <lib> [--cell NAME]    # summary, or one cell's arcs
+python3 liberty.py bench                       # parse vs. cached load time
+python3 liberty.py clean
+"""
+
+import argparse
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bincache import read_arrays, write_arrays
+from common import CACHE_ROOT, TECH_DIR, DigestMemo, format_size
+
+LIBERTY_CACHE_VERSION = 1
+LIB_CACHE = CACHE_ROOT / "liberty"
+
+DIRECTIONS = ["input", "output", "inout", "internal"]
+TIMING_SENSES = ["positive_unate", "negative_unate", "non_unate"]
+TIMING_TYPES = [
+    "combinational", "combinational_rise", "combinational_fall",
+    "rising_edge", "falling_edge", "preset", "clear",
+    "setup_rising", "setup_falling", "hold_rising", "hold_falling",
+    "recovery_rising", "recovery_falling", "removal_rising", "removal_falling",
+    "non_seq_setup_rising", "non_seq_hold_rising", "min_pulse_width", "other",
+]
+# Axis variables of a table; lookup() maps (slew, load) onto them.
+VARIABLES = ["", "input_net_transition", "total_output_net_capacitance",
+             "constrained_pin_transition", "related_pin_transition"]
+VAR_SLEW = (1, 3)           # transition-like axes take the slew argument
+VAR_LOAD = (2,)
+VAR_RELATED = (4,)
+
+# Slots of arc_tables.
+RISE_DELAY, FALL_DELAY, RISE_SLEW, FALL_SLEW = range(4)
+TABLE_SLOTS = {
+    "cell_rise": RISE_DELAY, "cell_fall": FALL_DELAY,
+    "rise_transition": RISE_SLEW, "fall_transition": FALL_SLEW,
+    "rise_constraint": RISE_DELAY, "fall_constraint": FALL_DELAY,
+}
+
+CELL_DONT_USE = 1
+CELL_SEQUENTIAL = 2
+CELL_MACRO = 4
+PIN_BUS = 1
+PIN_CLOCK = 2
+
+
+# ---------------- parsing ----------------
+_COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*|\\\r?\n", re.S)
+_TOKEN_RE = re.compile(r'"[^"]*"|[{}();:,]|[^\s{}();:,"]+')
+
+
+class Group:
+    """One Liberty group: kind (name), args, simple/complex attributes, subgroups."""
+    __slots__ = ("kind", "args", "attrs", "complex", "groups")
+
+    def __init__(self, kind: str, args: List[str]):
+        self.kind = kind
+        self.args = args
+        self.attrs: Dict[str, str] = {}
+        self.complex: Dict[str, List[str]] = {}
+        self.groups: List["Group"] = []
+
+    @property
+    def name(self) -> str:
+        return self.args[0] if self.args else ""
+
+    def sub(self, kind: str) -> List["Group"]:
+        return [g for g in self.groups if g.kind == kind]
+
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    def num(self, name: str, default: float = float("nan")) -> float:
+        v = self.attrs.get(name)
+        try:
+            return float(v) if v is not None else default
+        except ValueError:
+            return default
+
+
+def _unquote(tok: str) -> str:
+    return tok[1:-1] if tok.startswith('"') else tok
+
+
+def parse_liberty(text: str) -> Group:
+    """Parse Liberty source into a Group tree; returns the library group."""
+    tokens = _TOKEN_RE.findall(_COMMENT_RE.sub(" ", text))
+    n = len(tokens)
+    root = Group("", [])
+    stack = [root]
+    i = 0
+    while i < n:
+        tok = tokens[i]
+        if tok == "}":
+            if len(stack) == 1:
+                raise ValueError("unbalanced '}'")
+            stack.pop()
+            i += 1
+            continue
+        if tok == ";":
+            i += 1
+            continue
+        nxt = tokens[i + 1] if i + 1 < n else ""
+        if nxt == ":":
+            # Simple attribute: name : value ;  (value may span tokens)
+            j = i + 2
+            parts = []
+            while j < n and tokens[j] not in (";", "}"):
+                parts.append(_unquote(tokens[j]))
+                j += 1
+            stack[-1].attrs[tok] = " ".join(parts)
+            i = j
+            continue
+        if nxt == "(":
+            j = i + 2
+            args = []
+            while j < n and tokens[j] != ")":
+                if tokens[j] != ",":
+                    args.append(_unquote(tokens[j]))
+                j += 1
+            j += 1
+            if j < n and tokens[j] == "{":
+                group = Group(tok, args)
+                stack[-1].groups.append(group)
+                stack.append(group)
+                i = j + 1
+            else:
+                stack[-1].complex[tok] = args
+                i = j
+            continue
+        raise ValueError(f"unexpected token {tok!r} near token {i}")
+    if len(stack) != 1:
+        raise ValueError("unterminated group")
+    libs = root.sub("library")
+    if not libs:
+        raise ValueError("no library group")
+    return libs[0]
+
+
+def _floats(args: Sequence[str]) -> List[float]:
+    out = []
+    for a in args:
+        out.extend(float(x) for x in a.replace(",", " ").split())
+    return out
+
+
+# ---------------- units ----------------
+_UNIT_RE = re.compile(r"^\s*([0-9.eE+-]+)\s*([a-zA-Z]+)\s*$")
+_TIME_SCALE = {"s": 1e9, "ms": 1e6, "us": 1e3, "ns": 1.0, "ps": 1e-3, "fs": 1e-6}
+_CAP_SCALE = {"f": 1e12, "mf": 1e9, "uf": 1e6, "nf": 1e3, "pf": 1.0, "ff": 1e-3}
+_POWER_SCALE = {"w": 1e9, "mw": 1e6, "uw": 1e3, "nw": 1.0, "pw": 1e-3, "fw": 1e-6}
+
+
+def _unit(text: Optional[str], table: Dict[str, float], default: float) -> float:
+    if not text:
+        return default
+    m = _UNIT_RE.match(text)
+    if not m or m.group(2).lower() not in table:
+        return default
+    return float(m.group(1)) * table[m.group(2).lower()]
+
+
+def library_units(lib: Group) -> Dict[str, float]:
+    """Scale factors from library units to ns / pF / nW."""
+    cap = lib.complex.get("capacitive_load_unit")
+    cap_scale = 1e-3
+    if cap and len(cap) == 2 and cap[1].lower() in _CAP_SCALE:
+        cap_scale = float(cap[0]) * _CAP_SCALE[cap[1].lower()]
+    return {
+        "time": _unit(lib.attr("time_unit"), _TIME_SCALE, 1.0),
+        "cap": cap_scale,
+        "power": _unit(lib.attr("leakage_power_unit"), _POWER_SCALE, 1.0),
+    }
+
+
+# ---------------- flattening ----------------
+class _Builder:
+    def __init__(self, lib: Group):
+        self.lib = lib
+        self.units = library_units(lib)
+        self.templates: Dict[str, Tuple[List[int], List[List[float]]]] = {}
+        for t in lib.sub("lu_table_template"):
+            var = [VARIABLES.index(t.attr(f"variable_{k}", "")) if
+                   t.attr(f"variable_{k}", "") in VARIABLES else 0 for k in (1, 2)]
+            idx = [_floats(t.complex.get(f"index_{k}", [])) for k in (1, 2)]
+            self.templates[t.name] = (var, idx)
+        self.strings: Dict[str, int] = {}
+        self.cells = {k: [] for k in ("name", "area", "leak", "flags", "pin_off")}
+        self.pins = {k: [] for k in ("name", "cell", "dir", "flags", "cap", "rise_cap",
+                                     "fall_cap", "max_cap", "max_tran", "func", "arc_off")}
+        self.arcs = {k: [] for k in ("to", "from", "sense", "type", "tables")}
+        self.tables = {k: [] for k in ("shape", "var", "axis_off", "val_off")}
+        self.axis: List[float] = []
+        self.values: List[float] = []
+
+    def string(self, s: str) -> int:
+        idx = self.strings.get(s)
+        if idx is None:
+            idx = self.strings[s] = len(self.strings)
+        return idx
+
+    def table(self, g: Group) -> int:
+        var, idx = self.templates.get(g.name, ([0, 0], [[], []]))
+        var = list(var)
+        idx = [_floats(g.complex[f"index_{k}"]) if f"index_{k}" in g.complex else idx[k - 1]
+               for k in (1, 2)]
+        values = _floats(g.complex.get("values", []))
+        if not values:
+            return -1
+        if g.name == "scalar" or not idx[0]:
+            idx, var = [[0.0], [0.0]], [0, 0]
+        elif not idx[1] or len(values) == len(idx[0]):
+            idx[1], var[1] = [0.0], 0
+        n1, n2 = len(idx[0]), len(idx[1])
+        if n1 * n2 != len(values):
+            raise ValueError(f"table {g.kind}({g.name}): {len(values)} values "
+                             f"for a {n1}x{n2} table")
+        u = self.units
+        axis_scale = [u["cap"] if v in VAR_LOAD else u["time"] for v in var]
+        tid = len(self.tables["shape"])
+        self.tables["shape"].append((n1, n2))
+        self.tables["var"].append(tuple(var))
+        self.tables["axis_off"].append((len(self.axis), len(self.axis) + n1))
+        self.axis.extend(x * axis_scale[0] for x in idx[0])
+        self.axis.extend(x * axis_scale[1] for x in idx[1])
+        self.tables["val_off"].append(len(self.values))
+        self.values.extend(v * u["time"] for v in values)
+        return tid
+
+    def leakage(self, cell: Group) -> float:
+        if "cell_leakage_power" in cell.attrs:
+            return cell.num("cell_leakage_power", 0.0)
+        # State-independent groups (no 'when') per power pin; fall back to the
+        # average over the conditional ones.
+        plain: Dict[str, float] = {}
+        cond: Dict[str, List[float]] = {}
+        for g in cell.sub("leakage_power"):
+            pg = g.attr("related_pg_pin", "")
+            if "when" in g.attrs:
+                cond.setdefault(pg, []).append(g.num("value", 0.0))
+            else:
+                plain[pg] = plain.get(pg, 0.0) + g.num("value", 0.0)
+        if plain:
+            return sum(plain.values())
+        return sum(sum(v) / len(v) for v in cond.values())
+
+    def add_cell(self, cell: Group) -> None:
+        u = self.units
+        flags = 0
+        if cell.attr("dont_use", "false").lower() == "true":
+            flags |= CELL_DONT_USE
+        if cell.sub("ff") or cell.sub("latch") or cell.sub("statetable"):
+            flags |= CELL_SEQUENTIAL
+        if cell.sub("memory") or cell.attr("is_macro_cell", "false").lower() == "true":
+            flags |= CELL_MACRO
+        cid = len(self.cells["name"])
+        self.cells["name"].append(self.string(cell.name))
+        self.cells["area"].append(cell.num("area", 0.0))
+        self.cells["leak"].append(self.leakage(cell) * u["power"])
+        self.cells["flags"].append(flags)
+        self.cells["pin_off"].append(len(self.pins["name"]))
+
+        pin_groups = [(g, 0) for g in cell.sub("pin")]
+        pin_groups += [(g, PIN_BUS) for g in cell.groups if g.kind in ("bus", "bundle")]
+        first = len(self.pins["name"])
+        local: Dict[str, int] = {}
+        for g, pflags in pin_groups:
+            local[g.name] = first + len(local)
+        pending = []
+        for g, pflags in pin_groups:
+            direction = g.attr("direction", "input")
+            if g.attr("clock", "false").lower() == "true":
+                pflags |= PIN_CLOCK
+            cap = g.num("capacitance", 0.0)
+            p = self.pins
+            p["name"].append(self.string(g.name))
+            p["cell"].append(cid)
+            p["dir"].append(DIRECTIONS.index(direction) if direction in DIRECTIONS else 3)
+            p["flags"].append(pflags)
+            p["cap"].append(cap * u["cap"])
+            p["rise_cap"].append(g.num("rise_capacitance", cap) * u["cap"])
+            p["fall_cap"].append(g.num("fall_capacitance", cap) * u["cap"])
+            p["max_cap"].append(g.num("max_capacitance") * u["cap"])
+            p["max_tran"].append(g.num("max_transition") * u["time"])
+            func = g.attr("function")
+            p["func"].append(self.string(func) if func else -1)
+            pending.append(g)
+        for pid, g in enumerate(pending, first):
+            self.pins["arc_off"].append(len(self.arcs["to"]))
+            for t in g.sub("timing"):
+                self.add_arcs(pid, t, local)
+
+    def add_arcs(self, pid: int, t: Group, local: Dict[str, int]) -> None:
+        sense = t.attr("timing_sense", "")
+        ttype = t.attr("timing_type", "combinational")
+        tables = [-1, -1, -1, -1]
+        for g in t.groups:
+            slot = TABLE_SLOTS.get(g.kind)
+            if slot is not None:
+                tables[slot] = self.table(g)
+        for related in (t.attr("related_pin") or "").split():
+            a = self.arcs
+            a["to"].append(pid)
+            a["from"].append(local.get(related, -1))
+            a["sense"].append(TIMING_SENSES.index(sense) if sense in TIMING_SENSES else 2)
+            a["type"].append(TIMING_TYPES.index(ttype) if ttype in TIMING_TYPES
+                             else len(TIMING_TYPES) - 1)
+            a["tables"].append(tables)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        c, p, a, t = self.cells, self.pins, self.arcs, self.tables
+        names = list(self.strings)
+        encoded = [s.encode() for s in names]
+        str_off = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=str_off[1:])
+        return {
+            "str_blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "str_off": str_off,
+            "cell_name": np.array(c["name"], dtype=np.int32),
+            "cell_area": np.array(c["area"], dtype=np.float64),
+            "cell_leakage": np.array(c["leak"], dtype=np.float64),
+            "cell_flags": np.array(c["flags"], dtype=np.uint8),
+            "cell_pin_off": np.array(c["pin_off"] + [len(p["name"])], dtype=np.int32),
+            "pin_name": np.array(p["name"], dtype=np.int32),
+            "pin_cell": np.array(p["cell"], dtype=np.int32),
+            "pin_dir": np.array(p["dir"], dtype=np.int8),
+            "pin_flags": np.array(p["flags"], dtype=np.uint8),
+            "pin_cap": np.array(p["cap"], dtype=np.float64),
+            "pin_rise_cap": np.array(p["rise_cap"], dtype=np.float64),
+            "pin_fall_cap": np.array(p["fall_cap"], dtype=np.float64),
+            "pin_max_cap": np.array(p["max_cap"], dtype=np.float64),
+            "pin_max_tran": np.array(p["max_tran"], dtype=np.float64),
+            "pin_func": np.array(p["func"], dtype=np.int32),
+            "pin_arc_off": np.array(p["arc_off"] + [len(a["to"])], dtype=np.int32),
+            "arc_to": np.array(a["to"], dtype=np.int32),
+            "arc_from": np.array(a["from"], dtype=np.int32),
+            "arc_sense": np.array(a["sense"], dtype=np.int8),
+            "arc_type": np.array(a["type"], dtype=np.int8),
+            "arc_tables": np.array(a["tables"], dtype=np.int32).reshape(-1, 4),
+            "tab_shape": np.array(t["shape"], dtype=np.int32).reshape(-1, 2),
+            "tab_var": np.array(t["var"], dtype=np.int8).reshape(-1, 2),
+            "tab_axis_off": np.array(t["axis_off"], dtype=np.int64).reshape(-1, 2),
+            "tab_val_off": np.array(t["val_off"], dtype=np.int64),
+            "axis": np.array(self.axis, dtype=np.float64),
+            "values": np.array(self.values, dtype=np.float64),
+        }
+
+
+def build_arrays(path: Path) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Parse a .lib file into (meta, arrays)."""
+    lib = parse_liberty(Path(path).read_text(errors="ignore"))
+    b = _Builder(lib)
+    for cell in lib.sub("cell"):
+        b.add_cell(cell)
+    meta = {
+        "library": lib.name,
+        "source": str(path),
+        "units": {"time": "ns", "cap": "pF", "leakage": "nW"},
+        "scale": b.units,
+        "nom_voltage": lib.num("nom_voltage", 0.0),
+    }
+    return meta, b.arrays()
+
+
+# ---------------- loaded library ----------------
+class Liberty:
+    """Read-only view of one library's arrays with name lookups."""
+
+    def __init__(self, meta: Dict, arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.name = meta["library"]
+        for k, v in arrays.items():
+            setattr(self, k, v)
+        blob = arrays["str_blob"].tobytes()
+        off = arrays["str_off"].tolist()
+        self.strings = [blob[off[i]:off[i + 1]].decode() for i in range(len(off) - 1)]
+        self.cell_names = [self.strings[i] for i in self.cell_name.tolist()]
+        self.cell_index = {n: i for i, n in enumerate(self.cell_names)}
+
+    def __len__(self) -> int:
+        return len(self.cell_names)
+
+    def __contains__(self, cell: str) -> bool:
+        return cell in self.cell_index
+
+    def pins(self, cell: int) -> range:
+        return range(int(self.cell_pin_off[cell]), int(self.cell_pin_off[cell + 1]))
+
+    def arcs(self, pin: int) -> range:
+        return range(int(self.pin_arc_off[pin]), int(self.pin_arc_off[pin + 1]))
+
+    def pin_name_of(self, pin: int) -> str:
+        return self.strings[int(self.pin_name[pin])]
+
+    def find_pin(self, cell: str, pin: str) -> int:
+        for p in self.pins(self.cell_index[cell]):
+            if self.pin_name_of(p) == pin:
+                return p
+        raise KeyError(f"{cell}/{pin}")
+
+    def input_cap(self, cell: str) -> float:
+        """Largest input pin capacitance of a cell, pF."""
+        pins = self.pins(self.cell_index[cell])
+        caps = [self.pin_cap[p] for p in pins if self.pin_dir[p] == 0]
+        return float(max(caps)) if caps else 0.0
+
+    def table(self, tid: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(index_1, index_2, values[n1, n2]) of a table."""
+        n1, n2 = (int(x) for x in self.tab_shape[tid])
+        a1, a2 = (int(x) for x in self.tab_axis_off[tid])
+        v = int(self.tab_val_off[tid])
+        return (self.axis[a1:a1 + n1], self.axis[a2:a2 + n2],
+                self.values[v:v + n1 * n2].reshape(n1, n2))
+
+    def lookup(self, tid: int, slew, load, related_slew=None) -> np.ndarray:
+        """Bilinear table lookup with linear extrapolation, like OpenSTA.
+
+        slew (ns) / load (pF) may be scalars or arrays; they are mapped onto
+        the table axes by variable, so 1-D load-only tables work too.
+        """
+        i1, i2, vals = self.table(tid)
+        args = []
+        for var in self.tab_var[tid]:
+            if var in VAR_LOAD:
+                args.append(load)
+            elif var in VAR_RELATED and related_slew is not None:
+                args.append(related_slew)
+            elif var != 0:
+                args.append(slew)
+            else:
+                args.append(0.0)
+        return interp2(i1, i2, vals, np.asarray(args[0], dtype=np.float64),
+                       np.asarray(args[1], dtype=np.float64))
+
+
+def _axis_weights(axis: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if len(axis) == 1:
+        return np.zeros(x.shape, dtype=np.int64), np.zeros(x.shape)
+    k = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+    lo, hi = axis[k], axis[k + 1]
+    return k, (x - lo) / (hi - lo)
+
+
+def interp2(i1: np.ndarray, i2: np.ndarray, vals: np.ndarray,
+            x1: np.ndarray, x2: np.ndarray) -> np.ndarray:
+    """Vectorized bilinear interpolation/extrapolation of an NLDM table."""
+    x1, x2 = np.broadcast_arrays(x1, x2)
+    k1, w1 = _axis_weights(i1, x1)
+    k2, w2 = _axis_weights(i2, x2)
+    k1b = np.minimum(k1 + 1, len(i1) - 1)
+    k2b = np.minimum(k2 + 1, len(i2) - 1)
+    v00, v01 = vals[k1, k2], vals[k1, k2b]
+    v10, v11 = vals[k1b, k2], vals[k1b, k2b]
+    return ((1 - w1) * ((1 - w2) * v00 + w2 * v01)
+            + w1 * ((1 - w2) * v10 + w2 * v11))
+
+
+# ---------------- cache ----------------
+def cache_path(lib_path: Path, digest: str) -> Path:
+    return LIB_CACHE / f"{Path(lib_path).stem}-{digest[:16]}.bin"
+
+
+def load_liberty(path: Path, use_cache: bool = True,
+                 memo: Optional[DigestMemo] = None) -> Liberty:
+    """Load a .lib through the binary cache, parsing it on a miss."""
+    path = Path(path)
+    if not use_cache:
+        return Liberty(*build_arrays(path))
+    own_memo = memo is None
+    memo = memo or DigestMemo(LIB_CACHE / "digests.json")
+    digest = memo.digest(path)
+    cached = cache_path(path, digest)
+    try:
+        meta, arrays = read_arrays(cached, kind="liberty", version=LIBERTY_CACHE_VERSION,
+                                   key=digest)
+    except (OSError, ValueError):
+        meta, arrays = build_arrays(path)
+        write_arrays(cached, arrays, meta, kind="liberty", version=LIBERTY_CACHE_VERSION,
+                     key=digest)
+        # Drop entries of older versions of the same .lib.
+        for old in LIB_CACHE.glob(f"{path.stem}-*.bin"):
+            if old != cached:
+                old.unlink(missing_ok=True)
+    if own_memo:
+        memo.save()
+    return Liberty(meta, arrays)
+
+
+class LibertySet:
+    """Several libraries with a cell name -> (library, cell index) map."""
+
+    def __init__(self, libs: Iterable[Liberty]):
+        self.libs = list(libs)
+        self.where: Dict[str, Tuple[Liberty, int]] = {}
+        for lib in self.libs:
+            for name, idx in lib.cell_index.items():
+                self.where.setdefault(name, (lib, idx))
+
+    def __contains__(self, cell: str) -> bool:
+        return cell in self.where
+
+    def __getitem__(self, cell: str) -> Tuple[Liberty, int]:
+        return self.where[cell]
+
+    def leakage(self, cell: str) -> float:
+        lib, idx = self.where[cell]
+        return float(lib.cell_leakage[idx])
+
+    def area(self, cell: str) -> float:
+        lib, idx = self.where[cell]
+        return float(lib.cell_area[idx])
+
+    def input_cap(self, cell: str) -> float:
+        return self.where[cell][0].input_cap(cell)
+
+
+def platform_libs(tech_dir: Path = TECH_DIR) -> List[Path]:
+    return sorted((Path(tech_dir) / "lib").glob("*.lib"))
+
+
+def load_libraries(paths: Optional[Iterable[Path]] = None, use_cache: bool = True) -> LibertySet:
+    memo = DigestMemo(LIB_CACHE / "digests.json")
+    libs = [load_liberty(p, use_cache, memo) for p in (paths or platform_libs())]
+    memo.save()
+    return LibertySet(libs)
+
+
+# ---------------- CLI ----------------
+def _print_cell(lib: Liberty, cell: str) -> None:
+    cid = lib.cell_index[cell]
+    print(f"{cell}: area {lib.cell_area[cid]:.5f} leakage {lib.cell_leakage[cid]:.4f} nW "
+          f"flags {int(lib.cell_flags[cid])}")
+    for p in lib.pins(cid):
+        print(f"  pin {lib.pin_name_of(p):12s} {DIRECTIONS[lib.pin_dir[p]]:8s} "
+              f"cap {lib.pin_cap[p] * 1e3:8.4f} fF")
+        for a in lib.arcs(p):
+            src = lib.pin_name_of(lib.arc_from[a]) if lib.arc_from[a] >= 0 else "?"
+            desc = f"    {src} -> {lib.pin_name_of(p)} {TIMING_TYPES[lib.arc_type[a]]}"
+            rise = lib.arc_tables[a][RISE_DELAY]
+            if rise >= 0:
+                d = lib.lookup(rise, 0.02, 0.001, related_slew=0.02)
+                desc += f"  rise@(20ps,1fF) {float(d) * 1e3:.2f} ps"
+            print(desc)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Liberty NLDM loader with a binary cache.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Parse and cache libraries (default: Platform libs)")
+    b.add_argument("libs", nargs="*")
+    i = sub.add_parser("info", help="Summarize a library or one cell")
+    i.add_argument("lib")
+    i.add_argument("--cell", default=None)
+    be = sub.add_parser("bench", help="Compare parse time with cached load time")
+    be.add_argument("libs", nargs="*")
+    sub.add_parser("clean", help="Remove the Liberty cache")
+    args = ap.parse_args()
+
+    if args.cmd == "clean":
+        shutil.rmtree(LIB_CACHE, ignore_errors=True)
+        return 0
+    if args.cmd == "info":
+        try:
+            lib = load_liberty(Path(args.lib))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        if args.cell:
+            if args.cell not in lib:
+                print(f"ERROR: no cell {args.cell} in {lib.name}", file=sys.stderr)
+                return 1
+            _print_cell(lib, args.cell)
+            return 0
+        print(f"{lib.name}: {len(lib)} cells, {len(lib.pin_name)} pins, "
+              f"{len(lib.arc_to)} arcs, {len(lib.tab_shape)} tables")
+        return 0
+
+    paths = [Path(p) for p in args.libs] or platform_libs()
+    if args.cmd == "build":
+        memo = DigestMemo(LIB_CACHE / "digests.json")
+        for p in paths:
+            t0 = time.perf_counter()
+            try:
+                lib = load_liberty(p, memo=memo)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: {p}: {e}", file=sys.stderr)
+                return 1
+            print(f"{p.name:48s} {len(lib):5d} cells  {time.perf_counter() - t0:7.3f}s")
+        memo.save()
+        return 0
+
+    # bench
+    parse_s = load_s = 0.0
+    size = 0
+    for p in paths:
+        t0 = time.perf_counter()
+        meta, arrays = build_arrays(p)
+        parse_s += time.perf_counter() - t0
+        load_liberty(p)         # make sure the cache entry exists
+        memo = DigestMemo(LIB_CACHE / "digests.json")
+        t0 = time.perf_counter()
+        lib = load_liberty(p, memo=memo)
+        load_s += time.perf_counter() - t0
+        size += cache_path(p, memo.digest(p)).stat().st_size
+    print(f"{len(paths)} libraries: parse {parse_s:.3f}s, cached load {load_s * 1e3:.1f}ms, "
+          f"cache {format_size(size)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
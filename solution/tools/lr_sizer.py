@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Lagrangian-relaxation gate sizing over the equivalent-cell groups.
+
+Every combinational instance may take any member of its group in
+asap7_equivalent_cell_list.csv (load_equiv_cells) with the same pins and
+arcs: the other drives and the L/R/SL threshold variants. The objective is
+the part of compute_s_final (solution/test/cal_total_score.py) sizing can
+move, relative to the input netlist:
+
+  J = 80 * TNS / TNS0 + 40 * Cdyn / Cdyn0 + 40 * Leak / Leak0
+
+TNS from the surrogate timer (surrogate_sta.py), Leak the Liberty leakage
+sum, Cdyn the switched capacitance (wire + pin load of every driver) as the
+proxy for dynamic power; liberty.py keeps no power tables, so internal
+power is not modeled.
+
+One iteration on the levelized timing graph of the surrogate:
+1. multipliers: every endpoint gets 1 when it fails and a weight fading to
+   0 over a guard band of the period when it passes, at least MEMORY times
+   its last one (so paths relieved in one iteration are not all downsized
+   in the next), scaled by 80 / TNS0. Going back level by level, the
+   multiplier mass of a pin is split over its fanin edges by criticality
+   (exp of the edge's arrival shortfall over a fraction of the period), so
+   the multipliers satisfy flow conservation.
+2. subproblem, level by level going forward: all gates whose outputs are
+   on the level pick, in one NumPy batch over every (gate, option) pair,
+   the option with the least
+     sum of multiplier x (arc delay + SLEW_WEIGHT x output transition)
+     + input caps x (fanin driver's multiplier x its delay per pF + power weight)
+     + leakage weight x leakage
+   with arc delays from the NLDM tables at the slews just recomputed for
+   the level below. The new masters are applied in bulk and the level is
+   re-timed before the next one. Iteration k takes only the STEP_DECAY^(k-1)
+   share of the wanted moves with the largest gain.
+3. full re-propagation, J; the best solution seen is kept.
+
+It stops when J has not improved by --tol for --patience iterations. The
+output is a changelist of resize lines (changelist.py) for
+ga_apply_changelist. Flip-flops keep their master; leakage_recovery.py
+swaps their Vt.
+
+python3 lr_sizer.py run -d ariane --nodes node.csv --nets nets.csv -o lr.changelist
+python3 lr_sizer.py run -d aes_cipher_top -o lr.changelist
+python3 lr_sizer.py bench -d aes_cipher_top --replicate 10     # aes tiled 10x
+"""
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from changelist import Resize, write_changelist
+from common import BENCH_ROOT, EQUIV_CELLS, SCENARIOS
+from leakage_recovery import SLEW_WEIGHT, design_files
+from liberty import LibertySet, load_libraries
+from netlist_equiv_check import load_equiv_cells, load_nets, load_nodes
+from surrogate_sta import (ARC_EDGE, CELL, Constraints, SurrogateTimer, TableBank, _BUS_BIT_RE,
+                           _gather, read_sdc)
+
+# compute_s_final weights of the terms sizing moves
+W_TNS = 80.0
+W_DPOWER = 40.0
+W_LPOWER = 40.0
+
+GUARD = 0.1                # of the period: passing endpoints keep a fading multiplier
+SPLIT_TAU = 0.1            # of the period: criticality scale of the fanin split
+MEMORY = 0.8                # endpoint multiplier = max(target, MEMORY * last one)
+DELTA_C = 0.002             # pF, finite difference for the driver delay per pF
+TNS_FLOOR = 0.01            # of the period: TNS0 used when the input has no violations
+STEP_DECAY = 0.7           # share of the wanted moves taken in iteration k: STEP_DECAY^(k-1)
+MIN_STEP = 0.05
+MAX_ITERS = 30
+PATIENCE = 3
+TOL = 1e-4
+
+
+@dataclass
+class Iteration:
+    wns: float
+    tns: float
+    leakage: float
+    cap: float
+    objective: float
+    changed: int
+    seconds: float
+
+
+@dataclass
+class Result:
+    changes: List[Resize]
+    gates: int
+    history: List[Iteration] = field(default_factory=list)
+    best: int = 0
+    seconds: float = 0.0
+
+
+class LRSizer:
+    def __init__(self, timer: SurrogateTimer, groups: Dict[str, int]):
+        self.timer = t = timer
+        self.bank = bank = timer.bank
+        members: Dict[int, List[str]] = {}
+        for cell, gid in groups.items():
+            if cell in bank.masters:
+                members.setdefault(gid, []).append(cell)
+
+        # Options per master: group members with the same input pins and arcs.
+        opt_master: List[str] = []
+        opt_ptr = [0]
+        keys_of: List[List[Tuple[str, str, int]]] = []
+        pins_of: List[List[str]] = []
+        master_idx: Dict[str, int] = {}
+        for name in sorted(set(t.inst_master)):
+            info = bank.masters.get(name)
+            if info is None or name not in groups or self._sequential(name):
+                continue
+            keys = sorted(info.arcs)
+            if any(k[2] != ARC_EDGE for k in keys):
+                continue
+            ins = sorted(p for p, (d, _, _) in info.pins.items() if d == 0)
+            opts = [m for m in members[groups[name]]
+                    if sorted(bank.masters[m].arcs) == keys
+                    and sorted(p for p, (d, _, _) in bank.masters[m].pins.items() if d == 0) == ins]
+            if len(opts) < 2:
+                continue
+            master_idx[name] = len(keys_of)
+            keys_of.append(keys)
+            pins_of.append(ins)
+            opt_master.extend(opts)
+            opt_ptr.append(len(opt_master))
+        self.opt_master = opt_master
+        self.opt_ptr = np.array(opt_ptr, dtype=np.int64)
+        self.opt_index = {(i, m): r for i in range(len(keys_of))
+                          for r, m in enumerate(opt_master[opt_ptr[i]:opt_ptr[i + 1]],
+                                                start=opt_ptr[i])}
+        n_arcs = max((len(k) for k in keys_of), default=1)
+        n_pins = max((len(p) for p in pins_of), default=1)
+        rows = len(opt_master)
+        self.opt_tab = np.full((rows, n_arcs, 4), -1, dtype=np.int64)
+        self.opt_cap = np.zeros((rows, n_pins))
+        self.opt_leak = np.zeros(rows)
+        for mi, (keys, ins) in enumerate(zip(keys_of, pins_of)):
+            for r in range(opt_ptr[mi], opt_ptr[mi + 1]):
+                info = bank.masters[opt_master[r]]
+                for a, key in enumerate(keys):
+                    self.opt_tab[r, a] = info.arcs[key][0]
+                for p, pin in enumerate(ins):
+                    self.opt_cap[r, p] = info.pins[pin][1]
+                self.opt_leak[r] = bank.libs.leakage(opt_master[r])
+
+        # Gates: instances with options, their arc edges and input pins in the
+        # order of their master's option tables.
+        gates = [i for i, m in enumerate(t.inst_master) if m in master_idx]
+        self.gate_inst = np.array(gates, dtype=np.int64)
+        self.gate_mi = np.array([master_idx[t.inst_master[i]] for i in gates], dtype=np.int64)
+        self.gate_row = np.array([self.opt_index[(master_idx[t.inst_master[i]], t.inst_master[i])]
+                                  for i in gates], dtype=np.int64)
+        self.gate_edges = np.full((len(gates), n_arcs), -1, dtype=np.int64)
+        self.gate_pins = np.full((len(gates), n_pins), -1, dtype=np.int64)
+        for g, i in enumerate(gates):
+            mi = self.gate_mi[g]
+            pins = {_BUS_BIT_RE.sub("", p): pid for p, pid in t.inst_pins[i].items()}
+            for a, key in enumerate(keys_of[mi]):
+                self.gate_edges[g, a] = t.inst_edges[i].get(key, -1)
+            for p, pin in enumerate(pins_of[mi]):
+                self.gate_pins[g, p] = pins.get(pin, -1)
+        self.original = self.gate_row.copy()
+
+        # Gates by the level of their outputs.
+        valid = self.gate_edges >= 0
+        out_lvl = np.where(valid, t.level[t.e_dst[np.maximum(self.gate_edges, 0)]], -1)
+        self.gate_level = out_lvl.max(axis=1) if len(gates) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(self.gate_level, kind="stable")
+        n_levels = len(t.lvl_ptr) - 1
+        bounds = np.searchsorted(self.gate_level[order], np.arange(n_levels + 1))
+        self.by_level = [order[bounds[l]:bounds[l + 1]] for l in range(n_levels)]
+
+        self.net_driver = np.array([p[0] for p in t.net_pins], dtype=np.int64)
+        self.drivers = np.unique(self.net_driver)
+        self.leak_fixed = sum(bank.libs.leakage(m) for i, m in enumerate(t.inst_master)
+                              if m in bank.libs) - float(self.opt_leak[self.gate_row].sum())
+        self.mu: Optional[np.ndarray] = None
+
+    def _sequential(self, master: str) -> bool:
+        return any(clk for _, _, clk in self.bank.masters[master].pins.values())
+
+    # ---------------- state ----------------
+    def leakage(self) -> float:
+        return self.leak_fixed + float(self.opt_leak[self.gate_row].sum())
+
+    def switched_cap(self) -> float:
+        return float(self.timer.load[self.drivers].sum())
+
+    def apply_rows(self, gates: np.ndarray, rows: np.ndarray) -> None:
+        self.gate_row[gates] = rows
+        self.timer.resize_many(self.gate_inst[gates].tolist(),
+                               [self.opt_master[r] for r in rows.tolist()])
+
+    # ---------------- multipliers ----------------
+    def multipliers(self, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(edge multipliers, pin multiplier mass) from the current timing."""
+        t = self.timer
+        period = t.sdc.period
+        pins, req = t.endpoint_required()
+        slack = req - t.arr[pins]
+        ok = np.isfinite(slack)
+        pins, slack = pins[ok], slack[ok]
+        target = np.where(slack < 0, 1.0, np.clip(1.0 - slack / (GUARD * period), 0.0, 1.0))
+        mu = np.zeros(len(t.x))
+        np.maximum.at(mu, pins, target)
+        if self.mu is not None and len(self.mu) == len(mu):
+            mu = np.maximum(mu, MEMORY * self.mu)
+        self.mu = mu
+
+        mass = mu * scale
+        lam = np.zeros(len(t.e_src))
+        tau = SPLIT_TAU * period
+        for lvl in range(len(t.lvl_ptr) - 2, 0, -1):
+            dst_pins = t.lvl_order[t.lvl_ptr[lvl]:t.lvl_ptr[lvl + 1]]
+            dst_pins = dst_pins[mass[dst_pins] > 0]
+            if not dst_pins.size:
+                continue
+            e = _gather(t.in_ptr, t.in_edges, dst_pins)
+            if not e.size:
+                continue
+            src, dst = t.e_src[e], t.e_dst[e]
+            with np.errstate(invalid="ignore"):
+                short = t.arr[src] + t.e_delay[e] - t.arr[dst]
+            w = np.where(np.isfinite(short), np.exp(np.minimum(short, 0.0) / tau), 0.0)
+            tot = np.zeros(len(t.x))
+            np.add.at(tot, dst, w)
+            share = np.where(tot[dst] > 0, w / np.where(tot[dst] > 0, tot[dst], 1.0), 0.0)
+            lam[e] = mass[dst] * share
+            np.add.at(mass, src, lam[e])
+        return lam, mass
+
+    def drive_resistance(self) -> np.ndarray:
+        """Delay per pF of load at every cell output pin (worst arc), ns/pF."""
+        t = self.timer
+        ce = np.flatnonzero(t.e_alive & (t.e_kind == CELL))
+        tab = t.e_tab[ce]
+        s, load = t.slew[t.e_src[ce]], t.load[t.e_dst[ce]]
+        d0 = self.bank.worst(tab[:, 0], tab[:, 1], s, load)
+        d1 = self.bank.worst(tab[:, 0], tab[:, 1], s, load + DELTA_C)
+        r = np.zeros(len(t.x))
+        np.maximum.at(r, t.e_dst[ce], (d1 - d0) / DELTA_C)
+        return r
+
+    # ---------------- subproblem ----------------
+    def _choose(self, gates: np.ndarray, lam: np.ndarray, cap_w: np.ndarray,
+                w_leak: float, step: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Best option row per gate: (gates that change, their rows)."""
+        t = self.timer
+        rows = _gather(self.opt_ptr, np.arange(len(self.opt_master)), self.gate_mi[gates])
+        counts = self.opt_ptr[self.gate_mi[gates] + 1] - self.opt_ptr[self.gate_mi[gates]]
+        pg = np.repeat(gates, counts)
+        cost = w_leak * self.opt_leak[rows]
+        for a in range(self.gate_edges.shape[1]):
+            e = self.gate_edges[pg, a]
+            m = np.flatnonzero(e >= 0)
+            if not m.size:
+                continue
+            e = e[m]
+            tab = self.opt_tab[rows[m], a]
+            s, load = t.slew[t.e_src[e]], t.load[t.e_dst[e]]
+            delay = self.bank.worst(tab[:, 0], tab[:, 1], s, load)
+            trans = self.bank.worst(tab[:, 2], tab[:, 3], s, load)
+            cost[m] += lam[e] * (delay + SLEW_WEIGHT * trans)
+        for p in range(self.gate_pins.shape[1]):
+            pin = self.gate_pins[pg, p]
+            m = np.flatnonzero(pin >= 0)
+            if m.size:
+                cost[m] += cap_w[pin[m]] * self.opt_cap[rows[m], p]
+
+        # Lowest cost per gate; the current option wins ties.
+        cur = rows == self.gate_row[pg]
+        order = np.lexsort((~cur, cost, np.repeat(np.arange(len(gates)), counts)))
+        first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        best = rows[order[first]]
+        moved = np.flatnonzero(best != self.gate_row[gates])
+        if step < 1.0 and moved.size:
+            # Damping: only the moves with the largest gain this iteration.
+            gain = cost[np.flatnonzero(cur)][moved] - cost[order[first]][moved]
+            keep = max(1, int(math.ceil(step * moved.size)))
+            moved = moved[np.argsort(-gain, kind="stable")[:keep]]
+        return gates[moved], best[moved]
+
+    def iterate(self, scale: float, w_cap: float, w_leak: float, step: float = 1.0) -> int:
+        """One multiplier update and forward sizing sweep; returns gates changed."""
+        t = self.timer
+        lam, mass = self.multipliers(scale)
+        cap_w = np.zeros(len(t.x))
+        pins = np.flatnonzero(t.pin_net >= 0)
+        drv = self.net_driver[t.pin_net[pins]]
+        cap_w[pins] = mass[drv] * self.drive_resistance()[drv] + w_cap
+        changed = 0
+        for lvl in range(1, len(t.lvl_ptr) - 1):
+            gates = self.by_level[lvl]
+            if gates.size:
+                moved, rows = self._choose(gates, lam, cap_w, w_leak, step)
+                if moved.size:
+                    self.apply_rows(moved, rows)
+                    changed += len(moved)
+            t.recompute_level(lvl)
+        t.update_timing()
+        return changed
+
+    def run(self, max_iters: int = MAX_ITERS, tol: float = TOL, patience: int = PATIENCE,
+            log=None) -> Result:
+        t0 = time.perf_counter()
+        t = self.timer
+        wns, tns = t.summary()
+        tns0 = max(-tns, TNS_FLOOR * t.sdc.period)
+        cap0, leak0 = self.switched_cap(), self.leakage()
+        scale, w_cap, w_leak = W_TNS / tns0, W_DPOWER / cap0, W_LPOWER / max(leak0, 1e-30)
+
+        def objective(tns_now: float) -> float:
+            return (W_TNS * -tns_now / tns0 + W_DPOWER * self.switched_cap() / cap0
+                    + W_LPOWER * self.leakage() / max(leak0, 1e-30))
+
+        res = Result([], len(self.gate_inst))
+        res.history.append(Iteration(wns, tns, leak0, cap0, objective(tns), 0, 0.0))
+        best_rows, best_j, stale = self.gate_row.copy(), res.history[0].objective, 0
+        for it in range(1, max_iters + 1):
+            ti = time.perf_counter()
+            changed = self.iterate(scale, w_cap, w_leak, max(MIN_STEP, STEP_DECAY ** (it - 1)))
+            wns, tns = t.summary()
+            j = objective(tns)
+            res.history.append(Iteration(wns, tns, self.leakage(), self.switched_cap(), j,
+                                         changed, time.perf_counter() - ti))
+            if log:
+                log(it, res.history[-1])
+            if j < best_j - tol * abs(best_j):
+                best_rows, best_j, res.best, stale = self.gate_row.copy(), j, it, 0
+            else:
+                stale += 1
+            if not changed or stale >= patience:
+                break
+
+        diff = np.flatnonzero(self.gate_row != best_rows)
+        if diff.size:
+            self.apply_rows(diff, best_rows[diff])
+            t.update_timing()
+        out = np.flatnonzero(self.gate_row != self.original)
+        res.changes = [Resize(t.inst_names[self.gate_inst[g]], self.opt_master[self.gate_row[g]])
+                       for g in out.tolist()]
+        res.seconds = time.perf_counter() - t0
+        return res
+
+
+# ---------------- inputs ----------------
+def tile(nodes: Dict, nets: Dict, sdc: Constraints, k: int) -> Tuple[Dict, Dict, Constraints]:
+    """k side-by-side copies of a netlist (ports and SDC entries renamed per copy)."""
+    width = max((v[2] for v in nodes.values()), default=0.0) + 10.0
+    out_nodes, out_nets = {}, {}
+    out_sdc = Constraints(sdc.period, list(sdc.clock_ports), dict(sdc.input_delay),
+                          dict(sdc.output_delay))
+    for c in range(k):
+        def ren(name: str) -> str:
+            return name if c == 0 else f"t{c}_{name}"
+        for name, (master, kind, x, y) in nodes.items():
+            out_nodes[ren(name)] = (master, kind, x + c * width, y)
+        for name, (driver, sinks) in nets.items():
+            out_nets[ren(name)] = ((ren(driver[0]), driver[1]),
+                                   [(ren(i), p) for i, p in sinks])
+        if c:
+            out_sdc.clock_ports += [ren(p) for p in sdc.clock_ports]
+            out_sdc.input_delay.update({ren(p): d for p, d in sdc.input_delay.items()})
+            out_sdc.output_delay.update({ren(p): d for p, d in sdc.output_delay.items()})
+    return out_nodes, out_nets, out_sdc
+
+
+def build(design: str, nodes_path: Path, nets_path: Path, libs: Optional[LibertySet] = None,
+          replicate: int = 1) -> Tuple[SurrogateTimer, Dict[str, int]]:
+    bank = TableBank(libs or load_libraries())
+    nodes, nets = load_nodes(str(nodes_path)), load_nets(str(nets_path))
+    sdc = read_sdc(BENCH_ROOT / design / SCENARIOS[design] / "contest.sdc")
+    if replicate > 1:
+        nodes, nets, sdc = tile(nodes, nets, sdc, replicate)
+    groups, _, _ = load_equiv_cells(str(EQUIV_CELLS))
+    return SurrogateTimer(nodes, nets, bank, sdc), groups
+
+
+def _log(it: int, r: Iteration) -> None:
+    print(f"{it:4d} {r.wns:9.4f} {r.tns:11.3f} {r.leakage:13.1f} {r.cap:9.4f} "
+          f"{r.objective:9.4f} {r.changed:8d} {r.seconds:7.2f}s")
+
+
+def _print(design: str, res: Result, setup: float) -> None:
+    h0, hb = res.history[0], res.history[res.best]
+    print(f"{design}: {res.gates} sizable gates, {len(res.history) - 1} iterations "
+          f"(best {res.best}), {res.seconds:.1f}s + {setup:.1f}s setup")
+    print(f"surrogate TNS {h0.tns:.3f} -> {hb.tns:.3f} ns, WNS {h0.wns:.4f} -> {hb.wns:.4f} ns")
+    print(f"leakage {h0.leakage:.1f} -> {hb.leakage:.1f} ({hb.leakage / h0.leakage - 1:+.1%}), "
+          f"switched cap {h0.cap:.4f} -> {hb.cap:.4f} pF ({hb.cap / h0.cap - 1:+.1%})")
+    print(f"objective {h0.objective:.4f} -> {hb.objective:.4f} "
+          f"(score proxy {h0.objective - hb.objective:+.3f}), {len(res.changes)} resizes")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lagrangian-relaxation gate sizing.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Size a netlist and write the changelist")
+    r.add_argument("--nodes", default=None, help="node.csv (default: the benchmark's)")
+    r.add_argument("--nets", default=None, help="nets.csv (default: the benchmark's)")
+    r.add_argument("-o", "--out", required=True, help="Changelist to write")
+    b = sub.add_parser("bench", help="Convergence and runtime, optionally on a tiled netlist")
+    b.add_argument("--replicate", type=int, default=1,
+                   help="Tile the netlist N times (ariane/bsg_chip-sized inputs)")
+    for p in (r, b):
+        p.add_argument("-d", "--design", required=True)
+        p.add_argument("--iters", type=int, default=MAX_ITERS)
+        p.add_argument("--tol", type=float, default=TOL, help="Relative improvement that counts")
+        p.add_argument("--patience", type=int, default=PATIENCE)
+        p.add_argument("-q", "--quiet", action="store_true", help="No per-iteration lines")
+    args = ap.parse_args()
+
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    nodes, nets = design_files(args.design, getattr(args, "nodes", None),
+                               getattr(args, "nets", None))
+    for p in (nodes, nets):
+        if not p.is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+
+    t0 = time.perf_counter()
+    timer, groups = build(args.design, nodes, nets, replicate=getattr(args, "replicate", 1))
+    sizer = LRSizer(timer, groups)
+    setup = time.perf_counter() - t0
+    if timer.unknown_masters:
+        print(f"[WARN] {len(timer.unknown_masters)} masters without Liberty data",
+              file=sys.stderr)
+    if not args.quiet:
+        print(f"{'iter':>4s} {'WNS':>9s} {'TNS':>11s} {'leakage':>13s} {'cap pF':>9s} "
+              f"{'J':>9s} {'changed':>8s} {'time':>8s}")
+    res = sizer.run(args.iters, args.tol, args.patience, log=None if args.quiet else _log)
+    _print(args.design, res, setup)
+    if args.cmd == "run":
+        write_changelist(Path(args.out), res.changes)
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
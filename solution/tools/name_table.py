@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Shared name table: hierarchical netlist names <-> dense integer IDs.
+
+Instance and net names are '/'-separated hierarchy paths (i43/i45/i7, and
+far longer in ariane and bsg_chip). The table stores each distinct path
+segment once and every name as a trie node (parent node, segment), so a
+name costs two int32 entries plus its share of the segment text instead
+of a Python string per copy. IDs are the trie node numbers: dense,
+stable once assigned, and hierarchy prefixes get an ID of their own.
+
+- lookups: add(name) / get(name) walk the trie one segment at a time;
+  name(id) joins the segments back, exactly reproducing the input string
+- storage: parent/segment columns, the segment text as one byte blob, and
+  the trie edges as sorted int64 keys, so a frozen table answers lookups
+  by binary search without rebuilding Python dicts; save()/load() go
+  through bincache, i.e. a loaded table is an mmap view
+- sharing: load the pre-opt netlist, then the post-opt one into the same
+  table, and every name they have in common gets the same ID
+
+read_nodes()/read_nets() load node.csv/nets.csv like load_nodes/load_nets
+of netlist_equiv_check.py, but as ID columns (Nodes, Nets) on a table;
+load_netlist() caches the result in CACHE_ROOT/names keyed by the two
+file digests. `bench` reports the memory of the checker's dict loaders
+against the shared table, pre and post loaded together.
+
+python3 name_table.py bench -d aes_cipher_top_v2
+python3 name_table.py bench --nodes pre/node.csv --nets pre/nets.csv \\
+    --post-nodes post/node.csv --post-nets post/nets.csv
+python3 name_table.py lookup -d aes_cipher_top clk _16598_
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bincache import read_arrays, write_arrays
+from common import BENCH_ROOT, CACHE_ROOT, SCENARIOS, DigestMemo
+from parse_log import open_text, resolve_input
+
+SEP = "/"
+NAMES_CACHE = CACHE_ROOT / "names"
+NAMES_CACHE_VERSION = 1
+
+
+def _key(parent: int, seg: int) -> int:
+    return ((parent + 1) << 32) | seg
+
+
+class NameTable:
+    """Segment-interned trie of names; IDs are trie node numbers."""
+
+    def __init__(self):
+        self._parent = array("i")
+        self._seg = array("i")
+        self._segs: List[str] = []
+        self._seg_index: Optional[Dict[str, int]] = {}
+        self._blob: Optional[np.ndarray] = None          # segment text of a loaded table
+        self._off: Optional[np.ndarray] = None
+        self._keys = np.zeros(0, dtype=np.int64)          # frozen trie edges, sorted
+        self._key_node = np.zeros(0, dtype=np.int32)
+        self._pending: Dict[int, int] = {}                # edges added since freeze()
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) >= 0
+
+    # ---- segments ----
+    def _segment_index(self) -> Dict[str, int]:
+        if self._seg_index is None:
+            self._segs = [self._segment(s) for s in range(len(self._off) - 1)]
+            self._seg_index = {s: i for i, s in enumerate(self._segs)}
+            self._blob = self._off = None
+        return self._seg_index
+
+    def _segment(self, s: int) -> str:
+        if self._blob is None:
+            return self._segs[s]
+        return self._blob[self._off[s]:self._off[s + 1]].tobytes().decode()
+
+    # ---- trie ----
+    def _child(self, parent: int, seg: int) -> int:
+        key = _key(parent, seg)
+        hit = self._pending.get(key)
+        if hit is not None:
+            return hit
+        k = int(np.searchsorted(self._keys, key))
+        if k < len(self._keys) and self._keys[k] == key:
+            return int(self._key_node[k])
+        return -1
+
+    def add(self, name: str) -> int:
+        """ID of name, assigning new IDs to it and any missing prefix."""
+        index = self._segment_index()
+        node = -1
+        for part in name.split(SEP):
+            seg = index.get(part)
+            if seg is None:
+                seg = index[part] = len(self._segs)
+                self._segs.append(part)
+            nxt = self._child(node, seg)
+            if nxt < 0:
+                nxt = len(self._parent)
+                self._parent.append(node)
+                self._seg.append(seg)
+                self._pending[_key(node, seg)] = nxt
+            node = nxt
+        return node
+
+    def add_many(self, names: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.add(n) for n in names), dtype=np.int32)
+
+    def get(self, name: str, default: int = -1) -> int:
+        """ID of name, or default when it was never added."""
+        index = self._segment_index()
+        node = -1
+        for part in name.split(SEP):
+            seg = index.get(part)
+            if seg is None:
+                return default
+            node = self._child(node, seg)
+            if node < 0:
+                return default
+        return node
+
+    def name(self, i: int) -> str:
+        parts = []
+        while i >= 0:
+            parts.append(self._segment(self._seg[i]))
+            i = self._parent[i]
+        return SEP.join(reversed(parts))
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        return [self.name(int(i)) for i in ids]
+
+    # ---- storage ----
+    def freeze(self) -> None:
+        """Fold the edges added since the last freeze into the sorted arrays."""
+        if not self._pending:
+            return
+        keys = np.fromiter(self._pending.keys(), dtype=np.int64, count=len(self._pending))
+        nodes = np.fromiter(self._pending.values(), dtype=np.int32, count=len(self._pending))
+        keys = np.concatenate([self._keys, keys])
+        nodes = np.concatenate([self._key_node, nodes])
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._key_node = keys[order], nodes[order]
+        self._pending = {}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        self.freeze()
+        if self._seg_index is None:
+            blob, off = np.asarray(self._blob), np.asarray(self._off)
+        else:
+            enc = [s.encode() for s in self._segs]
+            off = np.zeros(len(enc) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in enc], out=off[1:])
+            blob = np.frombuffer(b"".join(enc), dtype=np.uint8)
+        return {"parent": np.frombuffer(self._parent, dtype=np.int32).copy(),
+                "seg": np.frombuffer(self._seg, dtype=np.int32).copy(),
+                "seg_blob": blob, "seg_off": off,
+                "keys": self._keys, "key_node": self._key_node}
+
+    @classmethod
+    def from_arrays(cls, a: Dict[str, np.ndarray]) -> "NameTable":
+        t = cls()
+        t._parent = array("i", np.asarray(a["parent"], dtype=np.int32).tobytes())
+        t._seg = array("i", np.asarray(a["seg"], dtype=np.int32).tobytes())
+        t._blob, t._off = a["seg_blob"], a["seg_off"]
+        t._segs, t._seg_index = [], None
+        t._keys, t._key_node = a["keys"], a["key_node"]
+        return t
+
+    def save(self, path: Path, key: str = "") -> int:
+        return write_arrays(path, self.arrays(), kind="names",
+                            version=NAMES_CACHE_VERSION, key=key)
+
+    @classmethod
+    def load(cls, path: Path, key: Optional[str] = None) -> "NameTable":
+        _, arrays = read_arrays(path, kind="names", version=NAMES_CACHE_VERSION, key=key)
+        return cls.from_arrays(arrays)
+
+    def nbytes(self) -> int:
+        """Size of the table's arrays and segment text."""
+        return sum(a.nbytes for a in self.arrays().values())
+
+
+# ---------------- node.csv / nets.csv as ID columns ----------------
+@dataclass
+class Nodes:
+    """node.csv rows: name ID, master, type, lower-left x/y in um."""
+    ids: np.ndarray
+    master: np.ndarray          # index into masters
+    masters: List[str]
+    kind: np.ndarray            # index into kinds ("Inst", "IO", ...)
+    kinds: List[str]
+    x: np.ndarray
+    y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, n_names: int) -> np.ndarray:
+        """Row of every name ID (-1 for names without a node)."""
+        lut = np.full(n_names, -1, dtype=np.int64)
+        lut[self.ids] = np.arange(len(self.ids))
+        return lut
+
+
+@dataclass
+class Nets:
+    """nets.csv rows in CSR form; the driver is the first pin of every net."""
+    ids: np.ndarray             # net name IDs
+    ptr: np.ndarray             # pins of net k: ptr[k]:ptr[k + 1]
+    inst: np.ndarray            # instance (or I/O port) name ID per pin
+    pin: np.ndarray             # index into pins; I/O ports have "_IO_"
+    pins: List[str]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def fanout(self) -> np.ndarray:
+        return np.diff(self.ptr) - 1
+
+
+def _small_index(values: Iterable[str], table: List[str], index: Dict[str, int]) -> np.ndarray:
+    out = array("i")
+    for v in values:
+        k = index.get(v)
+        if k is None:
+            k = index[v] = len(table)
+            table.append(v)
+        out.append(k)
+    return np.frombuffer(out, dtype=np.int32)
+
+
+def read_nodes(path: Path, names: NameTable) -> Nodes:
+    """node.csv as load_nodes() reads it (header skipped, short rows dropped)."""
+    rows = []
+    with open_text(path) as f:
+        next(f, None)
+        for line in f:
+            row = line.rstrip("\r\n").split(",")
+            if len(row) >= 5:
+                rows.append(row)
+    masters: List[str] = []
+    kinds: List[str] = []
+    return Nodes(names.add_many(r[0] for r in rows),
+                 _small_index((r[1] for r in rows), masters, {}), masters,
+                 _small_index((r[2] for r in rows), kinds, {}), kinds,
+                 np.array([float(r[3]) for r in rows]), np.array([float(r[4]) for r in rows]))
+
+
+def read_nets(path: Path, names: NameTable) -> Nets:
+    """nets.csv as load_nets() reads it ("inst pin" entries, first one drives)."""
+    net_ids, ptr, inst = array("i"), array("q", [0]), array("i")
+    pin_names: List[str] = []
+    pin_index: Dict[str, int] = {}
+    pin = array("i")
+    with open_text(path) as f:
+        for line in f:
+            parts = line.strip().split(",")
+            if len(parts) < 2:
+                continue
+            n = 0
+            for p in parts[1:]:
+                p = p.strip()
+                if not p:
+                    continue
+                i, _, name = p.rpartition(" ") if " " in p else (p, "", "")
+                inst.append(names.add(i))
+                k = pin_index.get(name)
+                if k is None:
+                    k = pin_index[name] = len(pin_names)
+                    pin_names.append(name)
+                pin.append(k)
+                n += 1
+            if n:
+                net_ids.append(names.add(parts[0]))
+                ptr.append(ptr[-1] + n)
+    return Nets(np.frombuffer(net_ids, dtype=np.int32), np.frombuffer(ptr, dtype=np.int64),
+                np.frombuffer(inst, dtype=np.int32), np.frombuffer(pin, dtype=np.int32),
+                pin_names)
+
+
+def load_netlist(nodes_path: Path, nets_path: Path, names: Optional[NameTable] = None,
+                 use_cache: bool = True) -> Tuple[NameTable, Nodes, Nets]:
+    """(table, nodes, nets); with a fresh table the result is cached by file digests.
+
+    Pass the table of an earlier load (pre-opt) to give the names both
+    netlists share the same IDs; such loads are not cached.
+    """
+    nodes_path, nets_path = resolve_input(nodes_path), resolve_input(nets_path)
+    if names is not None or not use_cache:
+        names = names if names is not None else NameTable()
+        return names, read_nodes(nodes_path, names), read_nets(nets_path, names)
+    memo = DigestMemo(NAMES_CACHE / "digests.json")
+    key = memo.combined([nodes_path, nets_path])
+    memo.save()
+    cached = NAMES_CACHE / f"{key[:24]}.bin"
+    try:
+        meta, a = read_arrays(cached, kind="netlist", version=NAMES_CACHE_VERSION, key=key)
+    except (OSError, ValueError):
+        names = NameTable()
+        nodes, nets = read_nodes(nodes_path, names), read_nets(nets_path, names)
+        arrays = {f"t_{k}": v for k, v in names.arrays().items()}
+        arrays.update({"n_ids": nodes.ids, "n_master": nodes.master, "n_kind": nodes.kind,
+                       "n_x": nodes.x, "n_y": nodes.y, "e_ids": nets.ids, "e_ptr": nets.ptr,
+                       "e_inst": nets.inst, "e_pin": nets.pin})
+        meta = {"masters": nodes.masters, "kinds": nodes.kinds, "pins": nets.pins}
+        write_arrays(cached, arrays, meta, kind="netlist", version=NAMES_CACHE_VERSION, key=key)
+        return names, nodes, nets
+    names = NameTable.from_arrays({k[2:]: v for k, v in a.items() if k.startswith("t_")})
+    return (names,
+            Nodes(a["n_ids"], a["n_master"], meta["masters"], a["n_kind"], meta["kinds"],
+                  a["n_x"], a["n_y"]),
+            Nets(a["e_ids"], a["e_ptr"], a["e_inst"], a["e_pin"], meta["pins"]))
+
+
+# ---------------- CLI ----------------
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Shared netlist name table.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="Memory of dict loaders vs. the shared table")
+    b.add_argument("--post-nodes", default=None, help="Post-opt node.csv (default: pre again)")
+    b.add_argument("--post-nets", default=None, help="Post-opt nets.csv (default: pre again)")
+    k = sub.add_parser("lookup", help="Name <-> ID of a netlist's table")
+    k.add_argument("names", nargs="+", help="Names, or IDs with --ids")
+    k.add_argument("--ids", action="store_true")
+    for p in (b, k):
+        p.add_argument("-d", "--design", default=None)
+        p.add_argument("--nodes", default=None, help="node.csv (default: the benchmark's)")
+        p.add_argument("--nets", default=None, help="nets.csv (default: the benchmark's)")
+    args = ap.parse_args()
+
+    if args.design is not None and args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    base = BENCH_ROOT / args.design / SCENARIOS[args.design] if args.design else None
+    nodes_path = Path(args.nodes) if args.nodes else (base / "node.csv" if base else None)
+    nets_path = Path(args.nets) if args.nets else (base / "nets.csv" if base else None)
+    if nodes_path is None or nets_path is None:
+        print("ERROR: give -d or --nodes/--nets", file=sys.stderr)
+        return 1
+    post_nodes = Path(getattr(args, "post_nodes", None) or nodes_path)
+    post_nets = Path(getattr(args, "post_nets", None) or nets_path)
+    nodes_path, nets_path, post_nodes, post_nets = (
+        resolve_input(p) for p in (nodes_path, nets_path, post_nodes, post_nets))
+    for p in {nodes_path, nets_path, post_nodes, post_nets}:
+        if not p.is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+
+    if args.cmd == "lookup":
+        names, _, _ = load_netlist(nodes_path, nets_path)
+        for q in args.names:
+            if args.ids:
+                i = int(q)
+                print(f"{i}\t{names.name(i) if 0 <= i < len(names) else '-'}")
+            else:
+                print(f"{q}\t{names.get(q)}")
+        return 0
+
+    from netlist_equiv_check import load_nets, load_nodes
+
+    def dicts():
+        return (load_nodes(str(nodes_path)), load_nets(str(nets_path)),
+                load_nodes(str(post_nodes)), load_nets(str(post_nets)))
+
+    def table():
+        names = NameTable()
+        loaded = (read_nodes(nodes_path, names), read_nets(nets_path, names),
+                  read_nodes(post_nodes, names), read_nets(post_nets, names))
+        names.freeze()
+        return names, loaded
+
+    ref, ref_bytes, ref_s = _measure(dicts)
+    (names, loaded), tab_bytes, tab_s = _measure(table)
+    pins = sum(len(v[1]) + 1 for v in ref[1].values())
+    print(f"{len(ref[0])} nodes, {len(ref[1])} nets, {pins} pins (pre and post loaded)")
+    print(f"dict loaders (netlist_equiv_check)   {ref_bytes / 2**20:8.1f} MB  {ref_s:.2f}s")
+    print(f"shared name table + ID columns       {tab_bytes / 2**20:8.1f} MB  {tab_s:.2f}s")
+    print(f"  table: {len(names)} IDs, {names.nbytes() / 2**20:.1f} MB "
+          f"({ref_bytes / max(tab_bytes, 1):.1f}x smaller overall)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
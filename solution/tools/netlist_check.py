@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run the contest's equiv_check/netlist_equiv_check.py on plain or compressed
+netlist exports.
+
+The reference checker stays as shipped and only opens node.csv/nets.csv.
+When a --pre_opt/--post_opt directory holds node.csv.gz/.zst or
+nets.csv.gz/.zst instead (compress_runs.py pack, netlist_patch.py on
+compressed inputs), its exports are stream-decompressed into a temporary
+directory and the checker is pointed there; plain directories are passed
+through untouched. Output and exit code are the checker's.
+
+python3 netlist_check.py --pre_opt Benchmarks/aes_cipher_top/TCP_250_UTIL_0.40 \\
+    --post_opt solution/output/<run>/aes_cipher_top/TCP_250_UTIL_0.40
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from common import EQUIV_CELLS, EQUIV_DIR
+from parse_log import READ_BUFFER, open_text, resolve_input
+
+CHECKER = EQUIV_DIR / "netlist_equiv_check.py"
+EXPORTS = ("node.csv", "nets.csv")
+
+
+def plain_exports(export_dir: Path, tmp_dir: Path) -> Path:
+    """export_dir when its exports are plain, else tmp_dir holding them decompressed."""
+    sources = [resolve_input(export_dir / name) for name in EXPORTS]
+    if all(src.name in EXPORTS for src in sources):
+        return export_dir
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    for name, src in zip(EXPORTS, sources):
+        with open_text(src) as fin, (tmp_dir / name).open("w") as fout:
+            shutil.copyfileobj(fin, fout, READ_BUFFER)
+    return tmp_dir
+
+
+def run_check(pre_opt: Path, post_opt: Path, equiv_cells: Path = EQUIV_CELLS,
+              capture: bool = False) -> subprocess.CompletedProcess:
+    with tempfile.TemporaryDirectory(prefix="netlist_check.") as tmp:
+        pre = plain_exports(Path(pre_opt), Path(tmp) / "pre")
+        post = plain_exports(Path(post_opt), Path(tmp) / "post")
+        return subprocess.run([sys.executable, str(CHECKER), "--pre_opt", str(pre),
+                               "--post_opt", str(post), "--equiv_cells", str(equiv_cells)],
+                              capture_output=capture, text=True, check=False)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="netlist_equiv_check.py on plain or .gz/.zst node.csv/nets.csv")
+    ap.add_argument("--pre_opt", required=True, help="Pre-optimization directory")
+    ap.add_argument("--post_opt", required=True, help="Post-optimization directory")
+    ap.add_argument("--equiv_cells", default=str(EQUIV_CELLS), help="Equivalent cells CSV")
+    args = ap.parse_args()
+    try:
+        return run_check(args.pre_opt, args.post_opt, args.equiv_cells).returncode
+    except (OSError, RuntimeError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
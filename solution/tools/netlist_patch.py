@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Streaming netlist patcher: applies a changelist to contest.v / contest.def
+without OpenROAD.
+
+Every input file is read once, statement by statement, and written straight
+to the output, so memory is bounded by the changelist, not the design:
+
+- <design>.v    resized masters, moved sink connections, new wires and
+                buffer instances (before endmodule)
+- <design>.def  resized COMPONENTS, new buffer components (PLACED at the
+                changelist x/y, orientation of the row they sit on),
+                rewritten NETS for the touched nets, updated section counts
+- node.csv / nets.csv   the same changes in the equivalence checker's
+                format, so the result can go straight to
+                equiv_check/netlist_equiv_check.py (--check runs it through
+                netlist_check.py, which also takes compressed exports)
+
+Changelist semantics are those of ga_apply_changelist (changelist.py): a
+buffer takes its input from <net> and drives <new_net> with the listed
+sinks; coordinates are the lower-left corner in um. Buffer pin names come
+from Liberty. A change that references an unknown instance, net or sink
+makes the whole patch fail, where the Tcl applier would skip the line.
+
+Several changelists are patched in parallel (--jobs), each into
+<out>/<changelist stem>/ when more than one is given.
+
+python3 netlist_patch.py -d aes_cipher_top best_solution.changelist -o out/
+python3 netlist_patch.py -d aes_cipher_top cand_*.changelist -o out/ --jobs 8 --check
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from changelist import Change, InsertBuffer, Resize, read_changelist
+from common import BENCH_ROOT, SCENARIOS
+from netlist_check import run_check
+from parse_log import COMPRESSED_SUFFIXES, open_text, resolve_input
+
+Pin = Tuple[str, str]          # (instance, pin); I/Os are (name, "_IO_") / ("PIN", name)
+
+_PLAIN_ID = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*$")
+_CONN_RE = re.compile(r"\.\s*([A-Za-z_][A-Za-z0-9_$]*)\s*\(\s*((?:\\\S+\s)?[^()]*?)\s*\)")
+_INST_RE = re.compile(r"^(\s*)(\S+)(\s+)(\\\S+|[^\s(]+)(.*)$", re.S)
+_DEF_PAIR_RE = re.compile(r"\(\s*(\S+)\s+(\S+)\s*\)")
+_DEF_NET_RE = re.compile(r"^\s*-\s+(\S+)((?:\s*\(\s*\S+\s+\S+\s*\))*)(.*)$", re.S)
+_DEF_COMP_RE = re.compile(r"^(\s*-\s+\S+\s+)(\S+)(.*)$", re.S)
+_SECTION_RE = re.compile(r"^(\s*(COMPONENTS|NETS)\s+)(\d+)(\s*;.*)$", re.S)
+_DEF_ESCAPE_RE = re.compile(r"([\[\]])")
+_ROW_RE = re.compile(r"^\s*ROW\s+\S+\s+\S+\s+(-?\d+)\s+(-?\d+)\s+(\S+)")
+_KEYWORDS = {"module", "input", "output", "inout", "wire", "reg", "assign", "tri",
+             "supply0", "supply1", "parameter", "localparam", "wand", "wor"}
+
+
+def verilog_name(name: str) -> str:
+    """Escaped identifier for names that are not plain Verilog identifiers."""
+    return name if _PLAIN_ID.match(name) else f"\\{name} "
+
+
+def _unescape(expr: str) -> str:
+    """OpenDB name of a Verilog identifier or bit select ("\\a/b [3]" -> "a/b[3]")."""
+    expr = expr.strip()
+    if not expr.startswith("\\"):
+        return expr
+    name, _, bit = expr[1:].partition(" ")
+    return name + bit.strip()
+
+
+@dataclass
+class NewInst:
+    name: str
+    master: str
+    x: float
+    y: float
+    pins: Dict[str, str] = field(default_factory=dict)    # pin -> net
+
+
+class Patch:
+    """The net effect of a changelist, keyed for streaming lookups."""
+
+    def __init__(self, changes: Sequence[Change], buffer_pins=None):
+        self.masters: Dict[str, str] = {}          # existing instance -> new master
+        self.buffers: Dict[str, NewInst] = {}
+        self.net_of: Dict[Pin, str] = {}           # final net of every reconnected pin
+        self.expected: Dict[Pin, str] = {}         # original net of moved existing pins
+        self.new_nets: List[str] = []
+        self.drivers: Set[Pin] = set()             # buffer outputs
+        for change in changes:
+            if isinstance(change, Resize):
+                if change.inst in self.buffers:
+                    self.buffers[change.inst].master = change.master
+                else:
+                    self.masters[change.inst] = change.master
+            elif isinstance(change, InsertBuffer):
+                self._buffer(change, buffer_pins)
+            else:
+                raise ValueError(f"unsupported change {change!r}")
+        self.joining: Dict[str, List[Pin]] = {}
+        for pin, net in self.net_of.items():
+            self.joining.setdefault(net, []).append(pin)
+        for pins in self.joining.values():
+            pins.sort(key=lambda p: p not in self.drivers)     # buffer output first
+        self.moved_insts: Set[str] = {inst for inst, _ in self.net_of}
+        self.source_nets: Set[str] = {n for b in self.buffers.values() for n in b.pins.values()}
+        self.exprs: Dict[str, str] = {}            # Verilog expression seen per net name
+        self.seen_pins: Set[Pin] = set()
+        self.seen_nets: Set[str] = set()
+        self.seen_insts: Set[str] = set()          # resized or clashing with a buffer
+
+    def instance(self, name: str) -> Optional[str]:
+        """New master of an existing instance (None: unchanged)."""
+        if name in self.masters:
+            self.seen_insts.add(name)
+            return self.masters[name]
+        if name in self.buffers:
+            raise ValueError(f"buffer {name} already exists")
+        return None
+
+    def _buffer(self, c: InsertBuffer, buffer_pins) -> None:
+        if c.name in self.buffers or c.new_net in self.new_nets:
+            raise ValueError(f"buffer {c.name} / net {c.new_net} inserted twice")
+        in_pin, out_pin = buffer_pins(c.master)
+        for inst, pin in c.sinks:
+            current = self.net_of.get((inst, pin))
+            if current is None:
+                self.expected[(inst, pin)] = c.net
+            elif current != c.net:
+                raise ValueError(f"{inst}/{pin} is on {current}, not {c.net}")
+            self.net_of[(inst, pin)] = c.new_net
+        self.buffers[c.name] = NewInst(c.name, c.master, c.x, c.y,
+                                       {in_pin: c.net, out_pin: c.new_net})
+        self.net_of[(c.name, in_pin)] = c.net
+        self.net_of[(c.name, out_pin)] = c.new_net
+        self.drivers.add((c.name, out_pin))
+        self.new_nets.append(c.new_net)
+
+    def members(self, net: str, pins: Sequence[Pin]) -> List[Pin]:
+        """Final pins of an existing net, given its original pins in order."""
+        self.seen_nets.add(net)
+        kept = []
+        for p in pins:
+            target = self.net_of.get(p)
+            if p in self.expected:
+                self.seen_pins.add(p)
+                if self.expected[p] != net:
+                    raise ValueError(f"{p[0]}/{p[1]} is on {net}, not {self.expected[p]}")
+            if target is None or target == net:
+                kept.append(p)
+        have = set(kept)
+        return kept + [p for p in self.joining.get(net, []) if p not in have]
+
+    def verify(self, instances: bool = True) -> None:
+        """Raise for references the streamed file never contained."""
+        unknown = sorted(set(self.masters) - self.seen_insts) if instances else []
+        if unknown:
+            raise ValueError(f"unknown instance(s): {' '.join(unknown[:5])}")
+        clash = [n for n in self.new_nets if n in self.seen_nets]
+        if clash:
+            raise ValueError(f"new net(s) already exist: {' '.join(clash[:5])}")
+        missing = [f"{i}/{p}" for i, p in self.expected if (i, p) not in self.seen_pins]
+        if missing:
+            raise ValueError(f"sink(s) not found on their net: {' '.join(missing[:5])}")
+        known = self.seen_nets | set(self.new_nets)
+        unknown = sorted({n for b in self.buffers.values() for n in b.pins.values()} - known)
+        if unknown:
+            raise ValueError(f"unknown net(s): {' '.join(unknown[:5])}")
+
+
+# ---------------- streaming ----------------
+def _statements(lines: Iterator[str]) -> Iterator[str]:
+    """Verilog statements (';'-terminated, possibly multi-line) and other lines."""
+    buf: List[str] = []
+    for line in lines:
+        if not buf:
+            s = line.strip()
+            if not s or s.startswith("//") or s.startswith("endmodule") or ";" in line:
+                yield line
+                continue
+        buf.append(line)
+        if ";" in line:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+def patch_verilog(src: Path, dst: Path, patch: Patch) -> None:
+    declared = False
+    with open_text(src) as fin, open_text(dst, "w") as fout:
+        for stmt in _statements(fin):
+            words = stmt.split(None, 2)
+            if not words or words[0].startswith("//"):
+                fout.write(stmt)
+                continue
+            if words[0] == "endmodule":
+                for b in patch.buffers.values():
+                    conns = ", ".join(f".{pin}({patch.exprs.get(net, verilog_name(net))})"
+                                      for pin, net in b.pins.items())
+                    fout.write(f" {b.master} {verilog_name(b.name)} ({conns});\n")
+                fout.write(stmt)
+                continue
+            if words[0] in _KEYWORDS or words[0].startswith("`") or len(words) < 2:
+                fout.write(stmt)
+                continue
+            if not declared:
+                for net in patch.new_nets:
+                    fout.write(f" wire {verilog_name(net)};\n")
+                declared = True
+            fout.write(_patch_instance(stmt, patch))
+
+
+def _patch_instance(stmt: str, patch: Patch) -> str:
+    m = _INST_RE.match(stmt)
+    if not m:
+        return stmt
+    lead, master, gap, name, rest = m.groups()
+    inst = _unescape(name)
+    out = f"{lead}{patch.instance(inst) or master}{gap}{name}{rest}"
+    if not patch.source_nets and inst not in patch.moved_insts:
+        return out
+
+    def conn(c):
+        pin, expr = c.group(1), c.group(2)
+        net = _unescape(expr)
+        if net in patch.source_nets and net not in patch.exprs:
+            # an escaped name needs its terminating space: "\\a/b " but "\\a/b [3]"
+            expr = expr.strip()
+            patch.exprs[net] = expr + " " if expr.startswith("\\") and " " not in expr else expr
+        target = patch.net_of.get((inst, pin))
+        if target is None or target == net:
+            return c.group(0)
+        return f".{pin}({verilog_name(target)})"
+    return _CONN_RE.sub(conn, out)
+
+
+def _row_orients(lines, orients: Dict[int, str]) -> Iterator[str]:
+    for line in lines:
+        m = _ROW_RE.match(line)
+        if m:
+            orients.setdefault(int(m.group(2)), m.group(3))
+        yield line
+
+
+def _def_items(lines: Iterator[str], section: str) -> Iterator[str]:
+    """The ';'-terminated items of a DEF section; consumes its END line."""
+    buf: List[str] = []
+    for line in lines:
+        if not buf and line.strip().startswith(f"END {section}"):
+            return
+        buf.append(line)
+        if line.rstrip().endswith(";"):
+            yield "".join(buf)
+            buf = []
+
+
+def _def_unescape(name: str) -> str:
+    """OpenDB name of a DEF identifier ("u0.w\\[3\\]" -> "u0.w[3]")."""
+    return name.replace("\\", "")
+
+
+def _def_escape(name: str) -> str:
+    return _DEF_ESCAPE_RE.sub(r"\\\1", name)
+
+
+def _format_pairs(pairs: Sequence[Pin]) -> str:
+    chunks = []
+    for k in range(0, len(pairs), 8):
+        chunks.append(" ".join(f"( {_def_escape(a)} {b} )" for a, b in pairs[k:k + 8]))
+    return "\n      ".join(chunks)
+
+
+def patch_def(src: Path, dst: Path, patch: Patch) -> None:
+    orients: Dict[int, str] = {}
+    dbu = 1000
+    with open_text(src) as fin, open_text(dst, "w") as fout:
+        lines = _row_orients(fin, orients)
+        for line in lines:
+            m = _SECTION_RE.match(line)
+            if not m:
+                u = re.match(r"^\s*UNITS\s+DISTANCE\s+MICRONS\s+(\d+)", line)
+                if u:
+                    dbu = int(u.group(1))
+                fout.write(line)
+                continue
+            section = m.group(2)
+            extra = len(patch.buffers) if section == "COMPONENTS" else len(patch.new_nets)
+            fout.write(f"{m.group(1)}{int(m.group(3)) + extra}{m.group(4)}")
+            for stmt in _def_items(lines, section):
+                fout.write(_patch_component(stmt, patch) if section == "COMPONENTS"
+                           else _patch_net(stmt, patch))
+            if section == "COMPONENTS":
+                for b in patch.buffers.values():
+                    x, y = round(b.x * dbu), round(b.y * dbu)
+                    fout.write(f"    - {b.name} {b.master} + SOURCE TIMING + PLACED "
+                               f"( {x} {y} ) {orients.get(y, 'N')} ;\n")
+            else:
+                for net in patch.new_nets:
+                    pins = _format_pairs(patch.joining.get(net, []))
+                    fout.write(f"    - {net} {pins} + USE SIGNAL ;\n")
+            fout.write(f"END {section}\n")
+
+
+def _patch_component(stmt: str, patch: Patch) -> str:
+    m = _DEF_COMP_RE.match(stmt)
+    if not m:
+        return stmt
+    master = patch.instance(_def_unescape(m.group(1).split()[1]))
+    return stmt if master is None else f"{m.group(1)}{master}{m.group(3)}"
+
+
+def _patch_net(stmt: str, patch: Patch) -> str:
+    m = _DEF_NET_RE.match(stmt)
+    if not m:
+        return stmt
+    net = _def_unescape(m.group(1))
+    pairs = [(_def_unescape(a), b) for a, b in _DEF_PAIR_RE.findall(m.group(2))]
+    if net not in patch.joining and not any(p in patch.net_of for p in pairs):
+        patch.seen_nets.add(net)
+        return stmt
+    members = patch.members(net, pairs)
+    return f"    - {m.group(1)} {_format_pairs(members)}{m.group(3).rstrip()}\n"
+
+
+def patch_node_csv(src: Path, dst: Path, patch: Patch) -> None:
+    with open_text(src) as fin, open_text(dst, "w") as fout:
+        for k, line in enumerate(fin):
+            if k:
+                name, _, rest = line.split(",", 2)
+                master = patch.instance(name)
+                if master:
+                    line = f"{name},{master},{rest}"
+            fout.write(line)
+        for b in patch.buffers.values():
+            fout.write(f"{b.name},{b.master},Inst,{round(b.x, 3):g},{round(b.y, 3):g}\n")
+
+
+def patch_nets_csv(src: Path, dst: Path, patch: Patch) -> None:
+    with open_text(src) as fin, open_text(dst, "w") as fout:
+        for line in fin:
+            parts = line.rstrip("\n").split(",")
+            if len(parts) < 2:
+                fout.write(line)
+                continue
+            net = parts[0]
+            pins = [tuple(p.rsplit(" ", 1)) if " " in p else (p, "") for p in parts[1:]]
+            if net not in patch.joining and not any(p in patch.net_of for p in pins):
+                patch.seen_nets.add(net)
+                fout.write(line)
+                continue
+            members = patch.members(net, [p for p in pins if p != ("", "")])
+            if pins and pins[0] == ("", ""):
+                members = [("", "")] + members      # no driver: keep the empty field
+            fout.write(",".join([net] + [f"{i} {p}".strip() for i, p in members]) + "\n")
+        for net in patch.new_nets:
+            fout.write(",".join([net] + [f"{i} {p}" for i, p in patch.joining.get(net, [])])
+                       + "\n")
+
+
+# ---------------- driver ----------------
+_LIBS = None
+
+
+def buffer_pins(master: str) -> Tuple[str, str]:
+    """(input, output) signal pin of a buffer master, from Liberty."""
+    global _LIBS
+    if _LIBS is None:
+        from liberty import load_libraries
+        _LIBS = load_libraries()
+    if master not in _LIBS:
+        raise ValueError(f"no Liberty for {master}")
+    lib, cid = _LIBS[master]
+    pins = {int(lib.pin_dir[p]): lib.pin_name_of(p) for p in lib.pins(cid)}
+    if 0 not in pins or 1 not in pins:
+        raise ValueError(f"{master} has no input/output pin pair")
+    return pins[0], pins[1]
+
+
+def patch_design(design_dir: Path, design: str, changelist: Path, out_dir: Path) -> Dict:
+    """Write the four patched files into out_dir; raises ValueError on a bad changelist."""
+    t0 = time.perf_counter()
+    changes = read_changelist(changelist)
+    patch = Patch(changes, buffer_pins)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    outputs = [(design_dir / "nets.csv", out_dir / "nets.csv", patch_nets_csv),
+               (design_dir / "node.csv", out_dir / "node.csv", patch_node_csv),
+               (design_dir / "contest.v", out_dir / f"{design}.v", patch_verilog),
+               (design_dir / "contest.def", out_dir / f"{design}.def", patch_def)]
+    written = []
+    try:
+        for src, dst, fn in outputs:
+            src = resolve_input(src)
+            if not src.is_file():
+                continue
+            if src.suffix in COMPRESSED_SUFFIXES and fn in (patch_nets_csv, patch_node_csv):
+                dst.unlink(missing_ok=True)
+                dst = dst.with_name(dst.name + src.suffix)     # exports stay compressed
+            checked = fn in (patch_nets_csv, patch_def)    # both list every net
+            patch.seen_insts = set()
+            if checked:
+                patch.seen_nets, patch.seen_pins = set(), set()
+            written.append(dst)
+            fn(src, dst, patch)
+            if checked:
+                patch.verify(instances=fn is patch_def)
+    except ValueError:
+        for dst in written:
+            dst.unlink(missing_ok=True)
+        raise
+    return {"changelist": str(changelist), "out": str(out_dir), "changes": len(changes),
+            "resizes": len(patch.masters), "buffers": len(patch.buffers),
+            "files": [p.name for p in written], "seconds": time.perf_counter() - t0}
+
+
+def equiv_check(design_dir: Path, out_dir: Path) -> Tuple[bool, str]:
+    proc = run_check(design_dir, out_dir, capture=True)
+    return proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def _job(args) -> Dict:
+    design_dir, design, changelist, out_dir, check = args
+    try:
+        res = patch_design(design_dir, design, changelist, out_dir)
+    except (OSError, ValueError) as e:
+        return {"changelist": str(changelist), "error": str(e)}
+    if check:
+        res["equiv"], report = equiv_check(design_dir, out_dir)
+        (out_dir / "equiv_check.log").write_text(report)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply changelists to contest.v/def without OpenROAD.")
+    ap.add_argument("changelists", nargs="+")
+    ap.add_argument("-d", "--design", required=True)
+    ap.add_argument("--design-dir", default=None,
+                    help="Directory with contest.v/def, node.csv, nets.csv "
+                         "(default: the benchmark)")
+    ap.add_argument("-o", "--out", required=True, help="Output directory")
+    ap.add_argument("-j", "--jobs", type=int, default=min(8, os.cpu_count() or 1))
+    ap.add_argument("--check", action="store_true", help="Run netlist_equiv_check.py on each")
+    args = ap.parse_args()
+
+    if args.design_dir:
+        design_dir = Path(args.design_dir)
+    elif args.design in SCENARIOS:
+        design_dir = BENCH_ROOT / args.design / SCENARIOS[args.design]
+    else:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    if not (design_dir / "contest.v").is_file():
+        print(f"ERROR: no contest.v in {design_dir}", file=sys.stderr)
+        return 1
+    missing = [c for c in args.changelists if not Path(c).is_file()]
+    if missing:
+        print(f"ERROR: changelist not found: {' '.join(missing)}", file=sys.stderr)
+        return 1
+
+    out = Path(args.out)
+    single = len(args.changelists) == 1
+    jobs = [(design_dir, args.design, Path(c), out if single else out / Path(c).stem,
+             args.check) for c in args.changelists]
+    if single or args.jobs <= 1:
+        results = [_job(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_job, jobs))
+
+    failed = 0
+    for r in results:
+        if "error" in r:
+            failed += 1
+            print(f"ERROR: {r['changelist']}: {r['error']}", file=sys.stderr)
+            continue
+        equiv = ""
+        if "equiv" in r:
+            equiv = "  equiv PASS" if r["equiv"] else "  equiv FAIL"
+            failed += not r["equiv"]
+        print(f"{r['changelist']}: {r['resizes']} resizes, {r['buffers']} buffers -> "
+              f"{r['out']} ({r['seconds']:.2f}s){equiv}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+ODB checkpoint cache for the flow Tcl scripts.
+
+Every flow re-reads the ASAP7 LEFs, contest.v and contest.def before it can
+start optimizing. This tool loads them once per design in OpenROAD, saves the
+result with write_db and caches the .odb by a hash of its inputs (LEF set,
+contest.v, contest.def, OpenROAD binary). Flows started with
+`run.sh ... -b <odb>` then call read_db instead.
+
+Liberty and SDC are not part of an OpenDB database, so flows still read
+them after read_db.
+
+python3 odb_checkpoint.py build -d aes_cipher_top jpeg_encoder    # prints .odb paths
+python3 odb_checkpoint.py bench -d aes_cipher_top -t baseline     # setup time, cold vs checkpoint
+python3 odb_checkpoint.py clean
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import (
+    BENCH_ROOT, CACHE_ROOT, FLOW_OPENROAD, SCENARIOS, TCL_DIR, TECH_DIR,
+    DigestMemo, tmp_tag,
+)
+
+CHECKPOINT_VERSION = 1
+ODB_CACHE = CACHE_ROOT / "odb"
+
+# Same read order as solution/tcl/baseline.tcl sections 1) and 2).
+BUILD_TCL = """\
+set tech_dir   "{tech_dir}"
+set design_dir "{design_dir}"
+
+read_lef  $tech_dir/lef/asap7_tech_1x_201209.lef
+foreach lef [lsort [glob -nocomplain $tech_dir/lef/asap7sc7p5t_28_*_1x_220121a.lef]] {{
+  read_lef $lef
+}}
+foreach lef [lsort [glob -nocomplain $tech_dir/lef/sram_asap7_*.lef]] {{
+  read_lef $lef
+}}
+read_lef $tech_dir/lef/fakeram_256x64.lef
+
+read_verilog $design_dir/contest.v
+read_def     $design_dir/contest.def
+
+write_db "{odb_tmp}"
+exit
+"""
+
+SETUP_RUNTIME_RE = re.compile(r"Setup\s+runtime\s*:\s*([-+]?\d*\.?\d+)")
+
+
+def checkpoint_inputs(design_dir: Path) -> List[Path]:
+    return (sorted((TECH_DIR / "lef").glob("*.lef"))
+            + [design_dir / "contest.v", design_dir / "contest.def"])
+
+
+def checkpoint_key(design_dir: Path, openroad: str, memo: DigestMemo) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CHECKPOINT_VERSION}".encode())
+    h.update(memo.combined(checkpoint_inputs(design_dir)).encode())
+    h.update(memo.digest(Path(openroad)).encode())
+    memo.save()
+    return h.hexdigest()
+
+
+def checkpoint_path(design: str, scenario: str, key: str) -> Path:
+    return ODB_CACHE / design / f"{scenario}-{key}.odb"
+
+
+def ensure_checkpoint(design: str, scenario: Optional[str] = None,
+                      openroad: str = FLOW_OPENROAD, rebuild: bool = False) -> Path:
+    """Return the cached checkpoint for a design, building it if needed."""
+    scenario = scenario or SCENARIOS[design]
+    design_dir = BENCH_ROOT / design / scenario
+    memo = DigestMemo(ODB_CACHE / "digests.json")
+    key = checkpoint_key(design_dir, openroad, memo)
+    odb = checkpoint_path(design, scenario, key)
+    if odb.is_file() and not rebuild:
+        os.utime(odb)
+        return odb
+
+    odb.parent.mkdir(parents=True, exist_ok=True)
+    odb_tmp = odb.with_name(odb.name + f".{tmp_tag()}.tmp")
+    log = odb.with_suffix(".log")
+    with tempfile.NamedTemporaryFile("w", suffix=".tcl", dir=odb.parent,
+                                     delete=False) as f:
+        f.write(BUILD_TCL.format(tech_dir=TECH_DIR, design_dir=design_dir, odb_tmp=odb_tmp))
+        build_tcl = f.name
+    t0 = time.time()
+    try:
+        with log.open("w") as lf:
+            proc = subprocess.run([openroad, "-no_init", "-exit", build_tcl],
+                                  stdout=lf, stderr=subprocess.STDOUT, check=False)
+    except OSError as e:
+        raise RuntimeError(f"cannot run OpenROAD ({openroad}): {e}") from e
+    finally:
+        os.unlink(build_tcl)
+    if proc.returncode != 0 or not odb_tmp.is_file():
+        odb_tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"checkpoint build failed for {design}, see {log}")
+    os.replace(odb_tmp, odb)
+
+    # Keep only the newest checkpoint per design/scenario.
+    for stale in odb.parent.glob(f"{scenario}-*.odb"):
+        if stale != odb:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".log").unlink(missing_ok=True)
+    print(f"[ODB] built {odb.name} for {design} in {time.time() - t0:.1f}s", file=sys.stderr)
+    return odb
+
+
+def setup_only_tcl(tcl_name: str) -> str:
+    """Flow template cut right before its optimization section starts."""
+    text = (TCL_DIR / f"{tcl_name}.tcl").read_text()
+    marker = text.find('puts "\\[INFO\\] Setup runtime:')
+    if marker < 0:
+        raise ValueError(f"{tcl_name}.tcl does not print a Setup runtime marker")
+    end = text.find("\n", marker)
+    return text[:end + 1] + "exit\n"
+
+
+def measure_setup(design: str, scenario: str, tcl_name: str, odb: Optional[Path],
+                  openroad: str) -> Optional[float]:
+    """Run the setup part of a flow and return its 'Setup runtime' in seconds.
+
+    The $::env() values are written in quoted, as run.sh does; the templates
+    bind them to variables (tcl_dir, tech_dir, ...) before building paths.
+    """
+    values = {
+        "DESIGN_NAME": design,
+        "TECH_DIR": str(TECH_DIR),
+        "DESIGN_DIR": str(BENCH_ROOT / design / scenario),
+        "OUTPUT_DIR": tempfile.gettempdir(),
+        "DESIGN_DB": str(odb) if odb else "",
+        "TCL_DIR": str(TCL_DIR),
+    }
+    text = setup_only_tcl(tcl_name)
+    for name, value in values.items():
+        text = text.replace(f"$::env({name})", f'"{value}"')
+    with tempfile.NamedTemporaryFile("w", suffix=".tcl", delete=False) as f:
+        f.write(text)
+        tcl = f.name
+    try:
+        proc = subprocess.run([openroad, "-no_init", "-exit", tcl], capture_output=True,
+                              text=True, check=False)
+    finally:
+        os.unlink(tcl)
+    m = SETUP_RUNTIME_RE.search(proc.stdout)
+    if not m:
+        tail = (proc.stdout + proc.stderr).strip().splitlines()[-1:] or ["no output"]
+        print(f"[WARN] {design} {tcl_name}: no Setup runtime (exit {proc.returncode}): "
+              f"{tail[0]}", file=sys.stderr)
+        return None
+    return float(m.group(1))
+
+
+def bench(designs: List[str], tcl_name: str, openroad: str, repeats: int) -> Dict[str, Dict]:
+    results = {}
+    for design in designs:
+        scenario = SCENARIOS[design]
+        t0 = time.time()
+        odb = ensure_checkpoint(design, scenario, openroad)
+        build_s = time.time() - t0
+        cold = [measure_setup(design, scenario, tcl_name, None, openroad) for _ in range(repeats)]
+        warm = [measure_setup(design, scenario, tcl_name, odb, openroad) for _ in range(repeats)]
+        cold = [c for c in cold if c is not None]
+        warm = [w for w in warm if w is not None]
+        results[design] = {
+            "cold": min(cold) if cold else None,
+            "checkpoint": min(warm) if warm else None,
+            "build": build_s,
+            "odb_size": odb.stat().st_size,
+        }
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build and manage ODB checkpoints.")
+    ap.add_argument("--openroad", default=FLOW_OPENROAD)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Build (or reuse) checkpoints and print their paths")
+    b.add_argument("-d", "--designs", nargs="+", required=True)
+    b.add_argument("--rebuild", action="store_true")
+
+    m = sub.add_parser("bench", help="Time-to-first-optimization, cold vs checkpoint")
+    m.add_argument("-d", "--designs", nargs="+", default=list(SCENARIOS))
+    m.add_argument("-t", "--tcl", default="baseline")
+    m.add_argument("--repeats", type=int, default=1)
+
+    sub.add_parser("clean", help="Remove all cached checkpoints")
+
+    args = ap.parse_args()
+    if args.cmd == "clean":
+        for f in ODB_CACHE.glob("*/*"):
+            f.unlink()
+        return 0
+
+    unknown = [d for d in args.designs if d not in SCENARIOS]
+    if unknown:
+        print(f"ERROR: unknown design(s): {' '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    if args.cmd == "build":
+        for design in args.designs:
+            try:
+                print(ensure_checkpoint(design, openroad=args.openroad, rebuild=args.rebuild))
+            except RuntimeError as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                return 1
+        return 0
+
+    results = bench(args.designs, args.tcl, args.openroad, args.repeats)
+    print("===== SETUP TIME (time to first optimization) =====")
+    print(f"{'design':20s} {'cold(s)':>9s} {'ckpt(s)':>9s} {'speedup':>8s} {'build(s)':>9s}")
+    for design, r in results.items():
+        cold, warm = r["cold"], r["checkpoint"]
+        speedup = f"{cold / warm:.2f}x" if cold and warm else "n/a"
+        print(f"{design:20s} {cold if cold is not None else float('nan'):9.2f} "
+              f"{warm if warm is not None else float('nan'):9.2f} {speedup:>8s} "
+              f"{r['build']:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
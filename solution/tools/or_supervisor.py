@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Watchdog around one OpenROAD invocation.
+
+Starts the command in its own session, samples CPU and RSS of the whole
+process tree from /proc every --interval seconds and writes the samples to
+<run-dir>/resource_<stage>.csv. If the run goes over its wall-clock or RSS
+budget the tree is stopped (SIGTERM, then SIGKILL after --grace seconds)
+and a marker line is appended to stdout, i.e. to the end of the partial
+run.log / evaluation.log:
+
+  [WATCHDOG] killed stage=flow design=bsg_chip_v2 reason=wall_timeout elapsed=7200.4 peak_rss=12.3G
+
+parse_log.py turns the marker into the run_status column of metrics.csv.
+A summary of every run is written to <run-dir>/watchdog_<stage>.json.
+
+Budgets come from --wall/--rss, then OR_WALL_BUDGET/OR_RSS_BUDGET, then the
+per-design table below. Exit code is the command's, or 124 if it was killed.
+
+python3 or_supervisor.py --design aes_cipher_top --stage flow --run-dir <out dir> \
+    -- openroad -no_init -exit flow.tcl
+"""
+
+import argparse
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from common import format_size, parse_size
+
+KILLED_EXIT_CODE = 124
+
+# design: (wall-clock seconds, RSS) per OpenROAD invocation. Roughly 4x the
+# baseline tool+flow runtime; RSS stays below the 64 GB evaluation machine.
+BUDGETS: Dict[str, Tuple[int, str]] = {
+    "aes_cipher_top": (900, "8G"),
+    "aes_cipher_top_v2": (900, "8G"),
+    "ariane": (3600, "32G"),
+    "ariane_v2": (5400, "32G"),
+    "bsg_chip": (14400, "48G"),
+    "bsg_chip_v2": (7200, "48G"),
+    "jpeg_encoder": (1800, "16G"),
+    "jpeg_encoder_v2": (1800, "16G"),
+}
+DEFAULT_BUDGET: Tuple[int, str] = (7200, "48G")
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def budget_for(design: str, wall: Optional[float] = None,
+               rss: Optional[str] = None) -> Tuple[float, int]:
+    default_wall, default_rss = BUDGETS.get(design, DEFAULT_BUDGET)
+    wall = wall if wall is not None else float(os.environ.get("OR_WALL_BUDGET", default_wall))
+    rss = rss if rss is not None else os.environ.get("OR_RSS_BUDGET", default_rss)
+    return wall, parse_size(rss)
+
+
+# ---------------- /proc sampling ----------------
+def _read_stat(pid: int) -> Optional[Tuple[int, int, int]]:
+    """(ppid, pgid, utime+stime ticks) of a process, None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces/parens; fields restart after the last ')'.
+    fields = data[data.rfind(b")") + 2:].split()
+    return int(fields[1]), int(fields[2]), int(fields[11]) + int(fields[12])
+
+
+def _read_rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree(root: int) -> Dict[int, int]:
+    """pid -> cpu ticks for root and all its descendants (or group members)."""
+    stats = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            st = _read_stat(int(entry))
+            if st is not None:
+                stats[int(entry)] = st
+    children: Dict[int, List[int]] = {}
+    for pid, (ppid, _, _) in stats.items():
+        children.setdefault(ppid, []).append(pid)
+    tree: Set[int] = {pid for pid, (_, pgid, _) in stats.items() if pgid == root}
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        if pid in stats:
+            tree.add(pid)
+        stack.extend(c for c in children.get(pid, []) if c not in tree)
+    return {pid: stats[pid][2] for pid in tree if pid in stats}
+
+
+def signal_tree(pids: Iterable[int], pgid: int, sig: int) -> None:
+    try:
+        os.killpg(pgid, sig)
+    except OSError:
+        pass
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+
+# ---------------- supervision ----------------
+def supervise(cmd: List[str], design: str, stage: str, run_dir: Path,
+              wall_budget: float, rss_budget: int, interval: float = 2.0,
+              grace: float = 10.0) -> int:
+    run_dir.mkdir(parents=True, exist_ok=True)
+    trace_path = run_dir / f"resource_{stage}.csv"
+    t0 = time.time()
+    sys.stdout.flush()
+    proc = subprocess.Popen(cmd, start_new_session=True)
+
+    reason = None
+    peak_rss, peak_procs = 0, 0
+    prev_ticks: Dict[int, int] = {}
+    prev_t = t0
+    with trace_path.open("w", newline="") as f:
+        trace = csv.writer(f)
+        trace.writerow(["time", "elapsed_s", "cpu_pct", "rss_bytes", "procs"])
+        while True:
+            try:
+                proc.wait(timeout=interval)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.time()
+            ticks = process_tree(proc.pid)
+            rss = sum(_read_rss(pid) for pid in ticks)
+            # Only count CPU of processes seen in both samples.
+            used = sum(t - prev_ticks[pid] for pid, t in ticks.items() if pid in prev_ticks)
+            cpu_pct = 100.0 * used / CLK_TCK / max(now - prev_t, 1e-6)
+            prev_ticks, prev_t = ticks, now
+            peak_rss, peak_procs = max(peak_rss, rss), max(peak_procs, len(ticks))
+            trace.writerow([f"{now:.3f}", f"{now - t0:.1f}", f"{cpu_pct:.0f}", rss, len(ticks)])
+            f.flush()
+
+            if now - t0 > wall_budget:
+                reason = "wall_timeout"
+            elif rss > rss_budget:
+                reason = "rss_limit"
+            if reason:
+                signal_tree(ticks, proc.pid, signal.SIGTERM)
+                try:
+                    proc.wait(timeout=grace)
+                except subprocess.TimeoutExpired:
+                    signal_tree(process_tree(proc.pid), proc.pid, signal.SIGKILL)
+                    proc.wait()
+                # Leftover children that ignored SIGTERM.
+                signal_tree(process_tree(proc.pid), proc.pid, signal.SIGKILL)
+                break
+
+    elapsed = time.time() - t0
+    rc = proc.returncode if proc.returncode >= 0 else 128 - proc.returncode
+    if reason:
+        print(f"[WATCHDOG] killed stage={stage} design={design} reason={reason} "
+              f"elapsed={elapsed:.1f} peak_rss={format_size(peak_rss)}", flush=True)
+        rc = KILLED_EXIT_CODE
+    summary = {
+        "design": design,
+        "stage": stage,
+        "cmd": cmd,
+        "status": reason or ("ok" if rc == 0 else "failed"),
+        "exit_code": rc,
+        "elapsed": round(elapsed, 1),
+        "peak_rss": peak_rss,
+        "peak_procs": peak_procs,
+        "wall_budget": wall_budget,
+        "rss_budget": rss_budget,
+    }
+    (run_dir / f"watchdog_{stage}.json").write_text(json.dumps(summary, indent=2))
+    return rc
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run OpenROAD under wall-clock/RSS budgets.")
+    ap.add_argument("--design", required=True)
+    ap.add_argument("--stage", default="flow", help="flow | eval; names the trace files")
+    ap.add_argument("--run-dir", required=True)
+    ap.add_argument("--wall", type=float, default=None, help="Wall-clock budget in seconds")
+    ap.add_argument("--rss", default=None, help="RSS budget of the process tree, e.g. 16G")
+    ap.add_argument("--interval", type=float, default=2.0, help="Sampling period in seconds")
+    ap.add_argument("--grace", type=float, default=10.0,
+                    help="Seconds between SIGTERM and SIGKILL")
+    ap.add_argument("cmd", nargs=argparse.REMAINDER)
+    args = ap.parse_args()
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        ap.error("missing command after --")
+    wall, rss = budget_for(args.design, args.wall, args.rss)
+    try:
+        return supervise(cmd, args.design, args.stage, Path(args.run_dir), wall, rss,
+                         args.interval, args.grace)
+    except OSError as e:
+        print(f"ERROR: cannot run {cmd[0]}: {e}", file=sys.stderr)
+        return 127
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
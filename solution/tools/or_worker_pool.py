@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Pool of persistent OpenROAD processes for what-if evaluation of changelists.
+
+Scoring a candidate today is a flow run plus eval.sh: a fresh `openroad
+-exit` that reads LEF/Liberty/DEF/Verilog, routes the whole design and
+extracts parasitics before it reports anything. The pool starts N OpenROAD
+processes per design once (wp_load in solution/tcl/util/worker.tcl: the
+scripts/evaluation.tcl setup, global_route, estimate_parasitics) and then
+answers what-if queries against that baseline over their stdin/stdout
+pipes. One query (wp_whatif) is:
+
+  1. apply the changelist through OpenDB (ga::apply_change), recording the
+     inverse of every change
+  2. reroute only the touched nets (global_route -start_incremental /
+     -end_incremental) and estimate_parasitics -global_routing;
+     --parasitics placement uses estimate_parasitics -placement instead
+  3. report_tns / report_wns / report_power into a per-query report that
+     parse_log.py reads like evaluation.log
+  4. undo the recorded changes (rerouted the same way): the worker is back
+     at its baseline for the next query
+
+submit() returns a Future; the next idle worker takes the query. A worker
+whose query fails, runs over --timeout or dies is restarted (a full reload)
+and the query is reported as failed, not retried. --verify re-reports each
+worker after the rollback and restarts it when WNS/TNS differ from its
+baseline.
+
+bench compares the latency of the same queries on the cold-start path: a
+fresh `openroad -exit` per candidate that loads, routes, applies the
+changelist and reports, i.e. the work of eval.sh without writing the
+design out.
+
+python3 or_worker_pool.py run -d aes_cipher_top cand_*.changelist --workers 4 --csv whatif.csv
+python3 or_worker_pool.py run -d ariane lr.changelist --base solution/output/baseline/ariane/<scenario>
+python3 or_worker_pool.py bench -d aes_cipher_top cand_*.changelist --workers 2 --cold 3
+"""
+
+import argparse
+import base64
+import csv
+import os
+import queue
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from common import BENCH_ROOT, EVAL_OPENROAD, OUT_ROOT, REPO_ROOT, SCENARIOS, TCL_DIR
+from odb_checkpoint import ensure_checkpoint
+from parse_log import parse_log
+
+WORKER_TCL = TCL_DIR / "util" / "worker.tcl"
+REPLY_PREFIX = "@@WP "
+LOAD_TIMEOUT = 4 * 3600.0      # seconds for wp_load (bsg_chip global route)
+QUERY_TIMEOUT = 1800.0
+TNS_TOLERANCE = 1e-6           # ns, --verify
+METRICS = ("wns", "tns", "total_power", "leakage_power")
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+@dataclass
+class Design:
+    """What a worker loads: the benchmark, or a flow output (--base)."""
+    name: str
+    scenario: str
+    def_file: Path
+    verilog: Path
+    odb: Optional[Path] = None
+    parasitics: str = "global_routing"
+
+    def startup_tcl(self) -> str:
+        q = _tcl_quote
+        return "\n".join([
+            f"set top_proj_dir {q(REPO_ROOT)}",
+            f"set design_name {q(self.name)}",
+            f"set folder {q(self.scenario)}",
+            f"set out_dir {q(self.def_file.parent)}",
+            f"wp_load {q(self.def_file)} {q(self.verilog)} {q(self.odb or '')} {self.parasitics}",
+        ])
+
+
+def _tcl_quote(value) -> str:
+    return "{" + str(value) + "}"
+
+
+def _metrics(report: Path) -> Dict[str, Optional[float]]:
+    m = parse_log(report)
+    return {k: m.get(k) for k in METRICS}
+
+
+# ---------------- one worker ----------------
+class Worker:
+    """One OpenROAD process speaking the wp::run protocol over its pipes."""
+
+    def __init__(self, wid: int, design: Design, openroad: str, log_dir: Path):
+        self.wid = wid
+        self.design = design
+        self.openroad = openroad
+        self.log_path = log_dir / f"worker{wid}.log"
+        self.proc: Optional[subprocess.Popen] = None
+        self.replies: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.next_id = 0
+        self.baseline: Dict[str, Optional[float]] = {}
+        self.insts = 0
+        self.load_seconds = 0.0
+        self.queries = 0
+        self.restarts = -1
+
+    def start(self, report_dir: Path) -> None:
+        self.stop()
+        self.restarts += 1
+        self.replies = queue.Queue()
+        log = self.log_path.open("a")
+        self.proc = subprocess.Popen([self.openroad, "-no_init", "-no_splash"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, text=True, bufsize=1,
+                                     start_new_session=True)
+        threading.Thread(target=self._read, args=(self.proc, log, self.replies),
+                         daemon=True).start()
+        # wp::run itself comes from worker.tcl: this one line is plain Tcl
+        # that replies in the same format, as batch 0.
+        self._send(f"if {{[catch {{source {_tcl_quote(WORKER_TCL)}}} e]}} "
+                   f"{{puts \"{REPLY_PREFIX}0 1 [binary encode base64 $e]\"}} "
+                   f"else {{puts \"{REPLY_PREFIX}0 0\"}}; flush stdout")
+        self._wait(0, QUERY_TIMEOUT)
+        t0 = time.perf_counter()
+        self.insts = int(self.call(self.design.startup_tcl(), LOAD_TIMEOUT) or 0)
+        self.load_seconds = time.perf_counter() - t0
+        self.baseline = self.report(report_dir / f"baseline_w{self.wid}.rpt")
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, log, replies: queue.Queue) -> None:
+        with log:
+            for line in proc.stdout:
+                if line.startswith(REPLY_PREFIX):
+                    parts = line.split()
+                    result = base64.b64decode(parts[3]).decode() if len(parts) > 3 else ""
+                    replies.put((int(parts[1]), int(parts[2]), result))
+                else:
+                    log.write(line)
+                    log.flush()
+        replies.put(None)              # EOF: the process is gone
+
+    def _send(self, line: str) -> None:
+        if self.proc is None or self.proc.poll() is not None:
+            raise WorkerError(f"worker {self.wid} is not running")
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise WorkerError(f"worker {self.wid}: {e}") from e
+
+    def _wait(self, rid: int, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                reply = self.replies.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                self.stop(kill=True)
+                raise WorkerError(f"worker {self.wid}: no reply in {timeout:.0f}s") from None
+            if reply is None:
+                raise WorkerError(f"worker {self.wid} exited (see {self.log_path})")
+            if reply[0] == rid:
+                if reply[1] != 0:
+                    raise WorkerError(f"worker {self.wid}: {reply[2].strip()}")
+                return reply[2]
+
+    def call(self, script: str, timeout: float = QUERY_TIMEOUT) -> str:
+        """Run a Tcl batch, return its result; WorkerError on a Tcl error or a dead worker."""
+        self.next_id += 1
+        encoded = base64.b64encode(script.encode()).decode()
+        self._send(f"wp::run {self.next_id} {encoded}")
+        return self._wait(self.next_id, timeout)
+
+    def report(self, path: Path) -> Dict[str, Optional[float]]:
+        self.call(f"wp_report {_tcl_quote(path)}")
+        return _metrics(path)
+
+    def whatif(self, changelist: Path, report: Path, timeout: float = QUERY_TIMEOUT) -> int:
+        applied = self.call(f"wp_whatif {_tcl_quote(changelist.resolve())} {_tcl_quote(report)}",
+                            timeout)
+        self.queries += 1
+        return int(applied or 0)
+
+    def stop(self, kill: bool = False) -> None:
+        if self.proc is None:
+            return
+        if not kill and self.proc.poll() is None:
+            try:
+                self.proc.stdin.write("exit\n")
+                self.proc.stdin.close()
+                self.proc.wait(timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        if self.proc.poll() is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            self.proc.wait()
+        self.proc = None
+
+
+# ---------------- pool ----------------
+@dataclass
+class WhatIf:
+    changelist: str
+    worker: int = -1
+    applied: int = 0
+    metrics: Dict[str, Optional[float]] = field(default_factory=dict)
+    latency: float = 0.0          # submit -> result, including the wait for a worker
+    service: float = 0.0          # on the worker
+    error: Optional[str] = None
+
+
+class WorkerPool:
+    def __init__(self, design: Design, workers: int = 2, openroad: str = EVAL_OPENROAD,
+                 run_dir: Optional[Path] = None, timeout: float = QUERY_TIMEOUT,
+                 verify: bool = False):
+        self.design = design
+        self.run_dir = Path(run_dir or OUT_ROOT / "whatif" / design.name)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.verify = verify
+        self.workers = [Worker(i, design, openroad, self.run_dir) for i in range(workers)]
+        self.idle: "queue.Queue[Worker]" = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.count = 0
+        self.lock = threading.Lock()
+        self.start_seconds = 0.0
+
+    def start(self) -> None:
+        """Load the design in every worker (in parallel); raises WorkerError."""
+        t0 = time.perf_counter()
+        errors = []
+
+        def boot(w: Worker) -> None:
+            try:
+                w.start(self.run_dir)
+            except WorkerError as e:
+                errors.append(str(e))
+        threads = [threading.Thread(target=boot, args=(w,)) for w in self.workers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            self.close()
+            raise WorkerError("; ".join(errors))
+        for w in self.workers:
+            self.idle.put(w)
+        self.start_seconds = time.perf_counter() - t0
+
+    def submit(self, changelist: Path) -> "Future[WhatIf]":
+        with self.lock:
+            self.count += 1
+            report = self.run_dir / f"q{self.count:05d}_{Path(changelist).stem}.rpt"
+        return self.executor.submit(self._run, Path(changelist), report, time.perf_counter())
+
+    def _run(self, changelist: Path, report: Path, submitted: float) -> WhatIf:
+        res = WhatIf(str(changelist))
+        w = self.idle.get()
+        res.worker = w.wid
+        t0 = time.perf_counter()
+        try:
+            res.applied = w.whatif(changelist, report, self.timeout)
+            res.metrics = _metrics(report)
+            if self.verify:
+                now = w.report(report.with_suffix(".verify.rpt"))
+                drift = [k for k in ("wns", "tns") if now.get(k) is None
+                         or abs(now[k] - (w.baseline.get(k) or 0.0)) > TNS_TOLERANCE]
+                if drift:
+                    raise WorkerError(f"worker {w.wid}: {'/'.join(drift)} off baseline "
+                                      f"after rollback")
+        except WorkerError as e:
+            res.error = str(e)
+            try:
+                w.start(self.run_dir)
+            except WorkerError as e2:
+                res.error += f"; restart failed: {e2}"
+        finally:
+            res.service = time.perf_counter() - t0
+            res.latency = time.perf_counter() - submitted
+            self.idle.put(w)
+        return res
+
+    def map(self, changelists: Sequence[Path]) -> List[WhatIf]:
+        return [f.result() for f in [self.submit(c) for c in changelists]]
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        for w in self.workers:
+            w.stop()
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------- cold-start path ----------------
+def cold_query(design: Design, changelist: Path, report: Path,
+               openroad: str = EVAL_OPENROAD) -> WhatIf:
+    """The same query in a fresh `openroad -exit` (load, route, apply, report)."""
+    res = WhatIf(str(changelist))
+    script = report.with_suffix(".tcl")
+    script.write_text(f"source {_tcl_quote(WORKER_TCL)}\n" + design.startup_tcl() + "\n"
+                      + f"wp_whatif {_tcl_quote(changelist.resolve())} {_tcl_quote(report)}\n")
+    t0 = time.perf_counter()
+    with report.with_suffix(".log").open("w") as log:
+        proc = subprocess.run([openroad, "-no_init", "-exit", str(script)], stdout=log,
+                              stderr=subprocess.STDOUT, check=False)
+    res.latency = res.service = time.perf_counter() - t0
+    if proc.returncode != 0 or not report.is_file():
+        res.error = f"openroad exited with {proc.returncode} (see {report.with_suffix('.log')})"
+    else:
+        res.metrics = _metrics(report)
+    return res
+
+
+# ---------------- CLI ----------------
+def resolve_design(args) -> Design:
+    scenario = SCENARIOS[args.design]
+    if args.base:
+        base = Path(args.base)
+        def_file, verilog = base / f"{args.design}.def", base / f"{args.design}.v"
+    else:
+        base = BENCH_ROOT / args.design / scenario
+        def_file, verilog = base / "contest.def", base / "contest.v"
+    odb = None
+    if args.odb:
+        if args.base:
+            raise ValueError("--odb checkpoints hold the benchmark, not --base")
+        odb = ensure_checkpoint(args.design, scenario, args.openroad)
+    return Design(args.design, scenario, def_file.resolve(), verilog.resolve(), odb,
+                  args.parasitics)
+
+
+def _fmt(v: Optional[float], spec: str) -> str:
+    return format(v, spec) if v is not None else "n/a"
+
+
+def _print_results(results: Sequence[WhatIf], baseline: Dict[str, Optional[float]]) -> None:
+    print(f"{'changelist':32s} {'wkr':>3s} {'applied':>7s} {'WNS':>9s} {'TNS':>10s} "
+          f"{'dTNS':>9s} {'power':>10s} {'leakage':>10s} {'latency':>8s}")
+    for r in results:
+        name = Path(r.changelist).name
+        if r.error:
+            print(f"{name:32s} {r.worker:3d} ERROR: {r.error}")
+            continue
+        m = r.metrics
+        dtns = (m["tns"] - baseline["tns"]
+                if m.get("tns") is not None and baseline.get("tns") is not None else None)
+        print(f"{name:32s} {r.worker:3d} {r.applied:7d} {_fmt(m.get('wns'), '9.4f')} "
+              f"{_fmt(m.get('tns'), '10.3f')} {_fmt(dtns, '+9.3f')} "
+              f"{_fmt(m.get('total_power'), '10.4g')} {_fmt(m.get('leakage_power'), '10.4g')} "
+              f"{r.latency:7.2f}s")
+
+
+def _latency(label: str, values: Sequence[float]) -> str:
+    if not values:
+        return f"{label:10s} n/a"
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return (f"{label:10s} n={len(values):3d}  mean {statistics.mean(values):8.2f}s  "
+            f"median {statistics.median(values):8.2f}s  p95 {p95:8.2f}s")
+
+
+def write_csv(path: Path, results: Sequence[WhatIf]) -> None:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["changelist", "worker", "applied", *METRICS, "latency_s", "service_s",
+                    "error"])
+        for r in results:
+            w.writerow([r.changelist, r.worker, r.applied,
+                        *(r.metrics.get(k, "") for k in METRICS),
+                        f"{r.latency:.3f}", f"{r.service:.3f}", r.error or ""])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Persistent OpenROAD workers for what-if queries.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="Evaluate changelists on a worker pool")
+    r.add_argument("--csv", default=None, help="Write one row per changelist")
+    b = sub.add_parser("bench", help="What-if latency, pool vs. cold start")
+    b.add_argument("--cold", type=int, default=3,
+                   help="Changelists to also run on the cold-start path")
+    b.add_argument("--repeat", type=int, default=1, help="Submit the changelists N times")
+    for p in (r, b):
+        p.add_argument("changelists", nargs="+")
+        p.add_argument("-d", "--design", required=True)
+        p.add_argument("-w", "--workers", type=int, default=2)
+        p.add_argument("--base", default=None,
+                       help="Flow output dir with <design>.def/.v (default: the benchmark)")
+        p.add_argument("--odb", action="store_true",
+                       help="Load the benchmark from its ODB checkpoint")
+        p.add_argument("--parasitics", choices=["global_routing", "placement"],
+                       default="global_routing")
+        p.add_argument("--openroad", default=EVAL_OPENROAD)
+        p.add_argument("--run-dir", default=None,
+                       help="Worker logs and reports (default: output/whatif/<design>)")
+        p.add_argument("--timeout", type=float, default=QUERY_TIMEOUT, help="Seconds per query")
+        p.add_argument("--verify", action="store_true",
+                       help="Check WNS/TNS against the baseline after every rollback")
+    args = ap.parse_args()
+
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    changelists = [Path(c) for c in args.changelists]
+    missing = [str(c) for c in changelists if not c.is_file()]
+    if missing:
+        print(f"ERROR: changelist not found: {' '.join(missing)}", file=sys.stderr)
+        return 1
+    try:
+        design = resolve_design(args)
+    except (ValueError, RuntimeError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    for p in (design.def_file, design.verilog):
+        if not design.odb and not p.is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+
+    pool = WorkerPool(design, args.workers, args.openroad, args.run_dir and Path(args.run_dir),
+                      args.timeout, args.verify)
+    try:
+        pool.start()
+    except (WorkerError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    w0 = pool.workers[0]
+    print(f"{args.design}: {len(pool.workers)} workers up in {pool.start_seconds:.1f}s "
+          f"({w0.insts} instances, load {w0.load_seconds:.1f}s), baseline WNS "
+          f"{_fmt(w0.baseline.get('wns'), '.4f')} TNS {_fmt(w0.baseline.get('tns'), '.3f')}")
+    try:
+        queued = changelists * (args.repeat if args.cmd == "bench" else 1)
+        t0 = time.perf_counter()
+        results = pool.map(queued)
+        wall = time.perf_counter() - t0
+    finally:
+        pool.close()
+    _print_results(results, w0.baseline)
+    restarts = sum(w.restarts for w in pool.workers)
+    print(f"{len(results)} queries in {wall:.1f}s on {len(pool.workers)} workers "
+          f"({restarts} restarts)")
+    if args.cmd == "run" and args.csv:
+        write_csv(Path(args.csv), results)
+        print(f"wrote {args.csv}")
+    failed = sum(1 for r in results if r.error)
+    if args.cmd == "run":
+        return 1 if failed else 0
+
+    cold_dir = pool.run_dir / "cold"
+    cold_dir.mkdir(parents=True, exist_ok=True)
+    cold = [cold_query(design, c, cold_dir / f"{c.stem}.rpt", args.openroad)
+            for c in changelists[:args.cold]]
+    warm_ok = [r for r in results if not r.error]
+    cold_ok = [r for r in cold if not r.error]
+    print("===== WHAT-IF LATENCY =====")
+    print(_latency("cold", [r.latency for r in cold_ok]))
+    print(_latency("pool", [r.service for r in warm_ok]))
+    print(_latency("pool+wait", [r.latency for r in warm_ok]))
+    if cold_ok and warm_ok:
+        cold_mean = statistics.mean(r.latency for r in cold_ok)
+        warm_mean = statistics.mean(r.service for r in warm_ok)
+        print(f"speedup {cold_mean / warm_mean:.1f}x per query; the pool start "
+              f"({pool.start_seconds:.1f}s) pays off after "
+              f"{pool.start_seconds / max(cold_mean - warm_mean, 1e-9):.1f} queries")
+        warm_by = {}
+        for r in warm_ok:
+            warm_by.setdefault(r.changelist, r.metrics)
+        diffs = [abs(r.metrics["tns"] - warm_by[r.changelist]["tns"]) for r in cold_ok
+                 if r.changelist in warm_by and r.metrics.get("tns") is not None
+                 and warm_by[r.changelist].get("tns") is not None]
+        if diffs:
+            print(f"max |TNS cold - TNS pool| {max(diffs):.4f} ns over {len(diffs)} changelists")
+    for r in cold:
+        if r.error:
+            print(f"[WARN] cold {Path(r.changelist).name}: {r.error}", file=sys.stderr)
+    return 1 if failed or len(cold_ok) < len(cold) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Occupancy index of the placement sites, for legal buffer insertion.
+
+Built from the DEF rows, components and placement blockages (def_reader.py)
+and the LEF footprints (lef.py):
+
+- per row, the free site intervals as sorted start/end arrays, so the
+  interval around a site is one searchsorted away
+- a 2D grid of bins (BIN_ROWS rows x BIN_SITES sites) holding, per bin, the
+  widest cell that can start inside it; nearest() walks the bins best-first
+  by their distance lower bound and skips bins the cell cannot fit in, so a
+  query touches a handful of bins instead of the whole die
+- insert()/remove() update the intervals of the touched rows and their bins
+  in place
+
+Soft and partial placement blockages (the v2 benchmarks) are kept free of
+new cells by default; cells already inside them stay where they are. The
+index assumes the input placement is legal: overlapping cells simply share
+occupied sites.
+
+python3 placement_index.py stats -d aes_cipher_top_v2
+python3 placement_index.py query -d aes_cipher_top_v2 --at 20.5 31.4 --master BUFx2_ASAP7_75t_R
+python3 placement_index.py bench -d aes_cipher_top_v2 --queries 2000
+python3 placement_index.py stats --def <out_dir>/<design>.def
+"""
+
+import argparse
+import heapq
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from changelist import InsertBuffer
+from common import BENCH_ROOT, SCENARIOS
+from def_reader import COVER, DEF, FIXED, PLACED, load_def, read_def
+from lef import Lef, load_lef
+
+BIN_ROWS = 8
+BIN_SITES = 64
+ROTATED = {"E", "W", "FE", "FW"}
+
+
+class PlacementIndex:
+    """Free-site intervals per row plus a coarse bin grid for nearest queries.
+
+    Public coordinates are um (lower-left corner of the cell), as in
+    changelists; internally rows and sites are integer indices.
+    """
+
+    def __init__(self, d: DEF, lef: Lef, soft_blocks: bool = True,
+                 bin_rows: int = BIN_ROWS, bin_sites: int = BIN_SITES):
+        rows = d.rows
+        keep = rows.num_y == 1
+        if not keep.any():
+            raise ValueError(f"{d.path}: no horizontal ROWs")
+        steps = np.unique(rows.step_x[keep])
+        if len(steps) != 1:
+            raise ValueError(f"{d.path}: rows with different site steps {steps.tolist()}")
+        self.dbu = d.dbu
+        self.site_w = int(steps[0])
+        site = lef.sites.get(str(rows.sites[keep][0]))
+        self.row_h = int(round(site.height * d.dbu)) if site else int(np.diff(
+            np.unique(rows.y)).min())
+        self.x0 = int(rows.x[keep].min())
+        self.lef = lef
+        self.bin_rows, self.bin_sites = bin_rows, bin_sites
+
+        # Rows are keyed by y; several ROW statements on one y are merged.
+        self.row_y, row_of = np.unique(rows.y[keep], return_inverse=True)
+        seg_c0 = (rows.x[keep] - self.x0) // self.site_w
+        seg_c1 = seg_c0 + rows.num_x[keep]
+        self.n_rows = len(self.row_y)
+        self.n_sites = int(seg_c1.max())
+        self.n_bx = -(-self.n_sites // bin_sites)
+        self.n_by = -(-self.n_rows // bin_rows)
+
+        # Occupied spans (row, c0, c1) of cells and blockages.
+        comps = d.components
+        placed = np.isin(comps.status, (PLACED, FIXED, COVER))
+        masters, inv = np.unique(comps.masters, return_inverse=True)
+        mw = np.zeros(len(masters), dtype=np.int64)
+        mh = np.zeros(len(masters), dtype=np.int64)
+        known = np.zeros(len(masters), dtype=bool)
+        for k, name in enumerate(masters):
+            m = lef.macros.get(str(name))
+            if m is not None:
+                mw[k] = int(round(m.width * d.dbu))
+                mh[k] = int(round(m.height * d.dbu))
+                known[k] = True
+        widths, heights = mw[inv], mh[inv]
+        rot = np.isin(comps.orient, list(ROTATED))
+        widths, heights = np.where(rot, heights, widths), np.where(rot, widths, heights)
+        self.unknown_masters = sorted(str(m) for m in masters[~known & np.isin(
+            np.arange(len(masters)), inv[placed])])
+        use = placed & known[inv]
+        spans = [self._spans(comps.x[use], comps.y[use], widths[use], heights[use])]
+
+        blk = d.blockages
+        if len(blk):
+            take = np.ones(len(blk), dtype=bool) if soft_blocks else ~blk.soft & (blk.density == 0)
+            r = blk.rects[take]
+            spans.append(self._spans(r[:, 0], r[:, 1], r[:, 2] - r[:, 0], r[:, 3] - r[:, 1]))
+        span_r, span_c0, span_c1 = (np.concatenate(v) for v in zip(*spans))
+
+        self.starts: List[np.ndarray] = []
+        self.ends: List[np.ndarray] = []
+        self._build_intervals(row_of, seg_c0, seg_c1, span_r, span_c0, span_c1)
+        self.cap = np.zeros((self.n_rows, self.n_bx), dtype=np.int32)
+        for r in range(self.n_rows):
+            self.cap[r] = self._row_cap(r)
+        self.band_cap = np.zeros((self.n_by, self.n_bx), dtype=np.int32)
+        for b in range(self.n_by):
+            self._update_band(b)
+        self.cells: Dict[str, Tuple[int, int, int]] = {}
+
+    # ---------------- build ----------------
+    def _spans(self, x, y, w, h) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rectangles (DBU) -> (row, first site, end site) per covered row."""
+        row_top = self.row_y + self.row_h
+        r_lo = np.searchsorted(row_top, y, side="right")
+        r_hi = np.searchsorted(self.row_y, y + h, side="left")
+        n = np.maximum(r_hi - r_lo, 0)
+        c0 = np.maximum((x - self.x0) // self.site_w, 0)
+        c1 = np.minimum(-(-(x + w - self.x0) // self.site_w), self.n_sites)
+        rep = np.repeat(np.arange(len(n)), n)
+        offs = np.arange(len(rep)) - np.repeat(np.cumsum(n) - n, n)
+        return r_lo[rep] + offs, c0[rep], c1[rep]
+
+    def _build_intervals(self, row_of, seg_c0, seg_c1, span_r, span_c0, span_c1,
+                         chunk: int = 256) -> None:
+        seg_order = np.argsort(row_of, kind="stable")
+        span_order = np.argsort(span_r, kind="stable")
+        seg_rows, span_rows = row_of[seg_order], span_r[span_order]
+        width = self.n_sites + 1
+        for lo in range(0, self.n_rows, chunk):
+            hi = min(lo + chunk, self.n_rows)
+            # free = inside a row segment and not covered by any span
+            diff = np.zeros((hi - lo, width + 1), dtype=np.int32)
+            a, b = np.searchsorted(seg_rows, [lo, hi])
+            k = seg_order[a:b]
+            np.add.at(diff, (row_of[k] - lo, seg_c0[k]), 1)
+            np.add.at(diff, (row_of[k] - lo, seg_c1[k]), -1)
+            a, b = np.searchsorted(span_rows, [lo, hi])
+            k = span_order[a:b]
+            k = k[span_c1[k] > span_c0[k]]
+            np.add.at(diff, (span_r[k] - lo, span_c0[k]), -(1 << 20))
+            np.add.at(diff, (span_r[k] - lo, span_c1[k]), 1 << 20)
+            free = np.cumsum(diff, axis=1)[:, :width] > 0
+            free[:, -1] = False
+            edge = np.diff(np.concatenate(
+                [np.zeros((hi - lo, 1), dtype=np.int8), free.astype(np.int8)], axis=1), axis=1)
+            sr, sc = np.nonzero(edge == 1)
+            er, ec = np.nonzero(edge == -1)
+            s_split = np.searchsorted(sr, np.arange(hi - lo + 1))
+            e_split = np.searchsorted(er, np.arange(hi - lo + 1))
+            for i in range(hi - lo):
+                self.starts.append(sc[s_split[i]:s_split[i + 1]].astype(np.int64))
+                self.ends.append(ec[e_split[i]:e_split[i + 1]].astype(np.int64))
+
+    def _row_cap(self, r: int) -> np.ndarray:
+        """Per bin of row r: widest cell (sites) that can start inside the bin."""
+        cap = np.zeros(self.n_bx, dtype=np.int32)
+        s, e = self.starts[r], self.ends[r]
+        if len(s) == 0:
+            return cap
+        bs = self.bin_sites
+        np.maximum.at(cap, s // bs, (e - s).astype(np.int32))
+        # intervals that run into a bin from the left
+        p = np.arange(self.n_bx) * bs
+        i = np.searchsorted(s, p, side="right") - 1
+        ok = (i >= 0) & (e[np.maximum(i, 0)] > p)
+        np.maximum(cap, np.where(ok, e[np.maximum(i, 0)] - p, 0).astype(np.int32), out=cap)
+        return cap
+
+    def _update_band(self, b: int) -> None:
+        lo = b * self.bin_rows
+        self.band_cap[b] = self.cap[lo:lo + self.bin_rows].max(axis=0)
+
+    def _touch(self, r: int) -> None:
+        self.cap[r] = self._row_cap(r)
+        self._update_band(r // self.bin_rows)
+
+    # ---------------- queries ----------------
+    def footprint(self, master: str) -> Tuple[int, int]:
+        """(sites, rows) of a master."""
+        m = self.lef.macros.get(master)
+        if m is None:
+            raise ValueError(f"unknown master {master}")
+        w = int(round(m.width * self.dbu))
+        h = int(round(m.height * self.dbu))
+        return -(-w // self.site_w), max(1, -(-h // self.row_h))
+
+    def site_xy(self, r: int, c: int) -> Tuple[float, float]:
+        return ((self.x0 + c * self.site_w) / self.dbu, float(self.row_y[r]) / self.dbu)
+
+    def is_free(self, r: int, c: int, w: int) -> bool:
+        s, e = self.starts[r], self.ends[r]
+        i = int(np.searchsorted(s, c, side="right")) - 1
+        return i >= 0 and c + w <= e[i]
+
+    def free_sites(self) -> int:
+        return int(sum(int((e - s).sum()) for s, e in zip(self.starts, self.ends)))
+
+    def nearest(self, master: str, x: float, y: float,
+                max_dist: Optional[float] = None) -> Optional[Tuple[float, float, float]]:
+        """Closest legal lower-left (x, y) for master to (x, y) um, and its distance.
+
+        Manhattan distance; single-row masters only. None if nothing fits
+        within max_dist.
+        """
+        w, h = self.footprint(master)
+        if h != 1:
+            raise ValueError(f"{master}: multi-row masters are not supported")
+        found = self._nearest(w, x * self.dbu, y * self.dbu,
+                              None if max_dist is None else max_dist * self.dbu)
+        if found is None:
+            return None
+        r, c, dist = found
+        return (*self.site_xy(r, c), dist / self.dbu)
+
+    def _nearest(self, w: int, xd: float, yd: float,
+                 limit: Optional[float]) -> Optional[Tuple[int, int, float]]:
+        sw, bs, br = self.site_w, self.bin_sites, self.bin_rows
+        cq = (xd - self.x0) / sw
+        rq = int(np.clip(np.searchsorted(self.row_y, yd), 0, self.n_rows - 1))
+        by0 = rq // br
+        bx0 = int(np.clip(cq // bs, 0, self.n_bx - 1))
+
+        def bound(by: int, bx: int) -> float:
+            lo, hi = bx * bs, (bx + 1) * bs - 1
+            dx = max(lo - cq, 0.0, cq - hi) * sw
+            ylo = self.row_y[by * br]
+            yhi = self.row_y[min((by + 1) * br, self.n_rows) - 1]
+            dy = max(ylo - yd, 0.0, yd - yhi)
+            return dx + dy
+
+        best: Optional[Tuple[int, int, float]] = None
+        best_d = float("inf") if limit is None else limit + 1e-9
+        heap = [(bound(by0, bx0), by0, bx0)]
+        seen = {(by0, bx0)}
+        while heap:
+            lb, by, bx = heapq.heappop(heap)
+            if lb >= best_d:
+                break
+            if self.band_cap[by, bx] >= w:
+                for r in range(by * br, min((by + 1) * br, self.n_rows)):
+                    if self.cap[r, bx] < w:
+                        continue
+                    dy = abs(float(self.row_y[r]) - yd)
+                    if dy >= best_d:
+                        continue
+                    hit = self._best_in_row(r, bx, w, cq)
+                    if hit is not None:
+                        c = hit
+                        d = abs(c - cq) * sw + dy
+                        if d < best_d:
+                            best, best_d = (r, c, d), d
+            for nby, nbx in ((by - 1, bx), (by + 1, bx), (by, bx - 1), (by, bx + 1)):
+                if 0 <= nby < self.n_by and 0 <= nbx < self.n_bx and (nby, nbx) not in seen:
+                    seen.add((nby, nbx))
+                    heapq.heappush(heap, (bound(nby, nbx), nby, nbx))
+        return best
+
+    def _best_in_row(self, r: int, bx: int, w: int, cq: float) -> Optional[int]:
+        """Start site in bin bx of row r closest to cq where w sites are free."""
+        p, q = bx * self.bin_sites, (bx + 1) * self.bin_sites
+        s, e = self.starts[r], self.ends[r]
+        i0 = max(int(np.searchsorted(s, p, side="right")) - 1, 0)
+        i1 = int(np.searchsorted(s, q, side="left"))
+        s, e = s[i0:i1], e[i0:i1]
+        lo = np.maximum(s, p)
+        hi = np.minimum(e - w, q - 1)
+        ok = hi >= lo
+        if not ok.any():
+            return None
+        lo, hi = lo[ok], hi[ok]
+        cand = np.clip(np.rint(cq), lo, hi)
+        k = int(np.argmin(np.abs(cand - cq)))
+        return int(cand[k])
+
+    # ---------------- updates ----------------
+    def _locate(self, x: float, y: float) -> Tuple[int, int]:
+        yd, xd = round(y * self.dbu), round(x * self.dbu)
+        r = int(np.searchsorted(self.row_y, yd))
+        if r >= self.n_rows or self.row_y[r] != yd or (xd - self.x0) % self.site_w:
+            raise ValueError(f"({x}, {y}) is not on a site")
+        return r, (xd - self.x0) // self.site_w
+
+    def insert(self, name: str, master: str, x: float, y: float) -> None:
+        """Occupy the sites of a new cell; raises ValueError if they are not free."""
+        if name in self.cells:
+            raise ValueError(f"{name} is already in the index")
+        w, _ = self.footprint(master)
+        r, c = self._locate(x, y)
+        s, e = self.starts[r], self.ends[r]
+        i = int(np.searchsorted(s, c, side="right")) - 1
+        if i < 0 or c + w > e[i]:
+            raise ValueError(f"{name}: sites {c}..{c + w - 1} of row {r} are not free")
+        a, b = int(s[i]), int(e[i])
+        ns = [v for v in (a,) if c > a] + [v for v in (c + w,) if c + w < b]
+        ne = [v for v in (c,) if c > a] + [v for v in (b,) if c + w < b]
+        self.starts[r] = np.concatenate([s[:i], np.array(ns, dtype=np.int64), s[i + 1:]])
+        self.ends[r] = np.concatenate([e[:i], np.array(ne, dtype=np.int64), e[i + 1:]])
+        self.cells[name] = (r, c, w)
+        self._touch(r)
+
+    def remove(self, name: str) -> None:
+        """Free the sites of a cell added with insert()."""
+        r, c, w = self.cells.pop(name)
+        s, e = self.starts[r], self.ends[r]
+        i = int(np.searchsorted(s, c))
+        a, b = c, c + w
+        lo, hi = i, i
+        if i > 0 and e[i - 1] == a:
+            a, lo = int(s[i - 1]), i - 1
+        if i < len(s) and s[i] == b:
+            b, hi = int(e[i]), i + 1
+        self.starts[r] = np.concatenate([s[:lo], np.array([a], dtype=np.int64), s[hi:]])
+        self.ends[r] = np.concatenate([e[:lo], np.array([b], dtype=np.int64), e[hi:]])
+        self._touch(r)
+
+    def place(self, name: str, master: str, x: float, y: float,
+              max_dist: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """nearest() + insert(); returns the chosen (x, y) or None."""
+        hit = self.nearest(master, x, y, max_dist)
+        if hit is None:
+            return None
+        self.insert(name, master, hit[0], hit[1])
+        return hit[0], hit[1]
+
+
+def build_index(def_path: Path, lef_paths: Optional[Sequence[Path]] = None,
+                soft_blocks: bool = True, use_cache: bool = False) -> PlacementIndex:
+    d = load_def(def_path) if use_cache else read_def(def_path)
+    return PlacementIndex(d, load_lef(lef_paths), soft_blocks)
+
+
+def legalize_buffers(changes: Sequence, index: PlacementIndex,
+                     max_dist: Optional[float] = None) -> Tuple[List, int]:
+    """Move InsertBuffer locations onto the nearest free sites.
+
+    Returns (changes, unplaced): buffers without a free site within
+    max_dist keep their location and are left to detailed_placement.
+    """
+    out, unplaced = [], 0
+    for ch in changes:
+        if isinstance(ch, InsertBuffer):
+            hit = index.place(ch.name, ch.master, ch.x, ch.y, max_dist)
+            if hit is None:
+                unplaced += 1
+            else:
+                ch = InsertBuffer(ch.name, ch.master, hit[0], hit[1], ch.net, ch.new_net,
+                                  ch.sinks)
+        out.append(ch)
+    return out, unplaced
+
+
+def _def_path(args) -> Optional[Path]:
+    if args.def_file:
+        return Path(args.def_file)
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return None
+    return BENCH_ROOT / args.design / SCENARIOS[args.design] / "contest.def"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Placement-site occupancy index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    parsers = [sub.add_parser("stats", help="Build the index and summarize it"),
+               sub.add_parser("query", help="Nearest free location for a master"),
+               sub.add_parser("bench", help="Random nearest+insert queries")]
+    for p in parsers:
+        p.add_argument("-d", "--design", default="aes_cipher_top")
+        p.add_argument("--def", dest="def_file", default=None, help="DEF instead of contest.def")
+        p.add_argument("--master", default="BUFx2_ASAP7_75t_R")
+        p.add_argument("--allow-soft", action="store_true",
+                       help="Let new cells into soft/partial placement blockages")
+    parsers[1].add_argument("--at", nargs=2, type=float, required=True, metavar=("X", "Y"))
+    parsers[2].add_argument("--queries", type=int, default=1000)
+    parsers[2].add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    def_path = _def_path(args)
+    if def_path is None:
+        return 1
+    if not def_path.is_file():
+        print(f"ERROR: DEF not found: {def_path}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    try:
+        index = build_index(def_path, soft_blocks=not args.allow_soft,
+                            use_cache=args.def_file is None)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    build_s = time.perf_counter() - t0
+    if index.unknown_masters:
+        print(f"[WARN] {len(index.unknown_masters)} masters without LEF (ignored): "
+              f"{' '.join(index.unknown_masters[:5])}", file=sys.stderr)
+
+    if args.cmd == "stats":
+        free = index.free_sites()
+        total = index.n_rows * index.n_sites
+        print(f"{def_path}: {index.n_rows} rows x {index.n_sites} sites, "
+              f"bins {index.n_by} x {index.n_bx}, built in {build_s:.2f}s")
+        print(f"free sites {free} ({100.0 * free / max(total, 1):.1f}%), "
+              f"free intervals {sum(len(s) for s in index.starts)}")
+    elif args.cmd == "query":
+        try:
+            hit = index.nearest(args.master, *args.at)
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        if hit is None:
+            print("no free location")
+        else:
+            print(f"{args.master} at ({hit[0]:.3f}, {hit[1]:.3f}) um, moved {hit[2]:.3f} um")
+    else:
+        rng = random.Random(args.seed)
+        xlo, ylo = index.site_xy(0, 0)
+        xhi, yhi = index.site_xy(index.n_rows - 1, index.n_sites - 1)
+        points = [(rng.uniform(xlo, xhi), rng.uniform(ylo, yhi)) for _ in range(args.queries)]
+        t0 = time.perf_counter()
+        dists, misses = [], 0
+        for k, (x, y) in enumerate(points):
+            hit = index.nearest(args.master, x, y)
+            if hit is None:
+                misses += 1
+                continue
+            index.insert(f"bench_{k}", args.master, hit[0], hit[1])
+            dists.append(hit[2])
+        elapsed = time.perf_counter() - t0
+        print(f"{len(points)} nearest+insert in {elapsed:.3f}s "
+              f"({elapsed / max(len(points), 1) * 1e6:.0f} us each), build {build_s:.2f}s")
+        if dists:
+            print(f"distance to free site: mean {np.mean(dists):.3f} um, "
+                  f"max {np.max(dists):.3f} um, {misses} without a site")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Per-stage runtime profile from the [PROFILE] markers in OpenROAD logs.
+
+The flow Tcl scripts (and scripts/evaluation.tcl, with OR_PROFILE=1) source
+solution/tcl/util/profile.tcl, which prints a begin/end marker around every
+major command (read_*, repair_design, repair_timing, detailed_placement,
+estimate_parasitics, global_route, ...) and around the setup/rsz sections:
+
+  [PROFILE] begin repair_timing <clock ms> <VmRSS kB> <VmHWM kB>
+
+This tool pairs the markers into stages (nested stages are allowed) and
+attaches the process-tree RSS sampled by or_supervisor.py
+(resource_flow.csv / resource_eval.csv) to each stage. It then
+- prints the stage timeline of every run,
+- aggregates stage time across designs (where does the budget go),
+- writes a Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev).
+
+python3 profile_log.py -t baseline                              # all designs of a flow
+python3 profile_log.py -t baseline -d ariane --trace ariane.json
+python3 profile_log.py path/to/run.log path/to/evaluation.log
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common import OUT_ROOT, SCENARIOS, format_size
+from parse_log import open_text, resolve_input
+
+PROFILE_RE = re.compile(r"^\[PROFILE\]\s+(begin|end)\s+(\S+)\s+(\d+)\s+(\d+)\s+(\d+)")
+
+# Log file -> (stage label, supervisor trace) inside an output directory.
+RUN_LOGS = {
+    "run.log": ("flow", "resource_flow.csv"),
+    "evaluation.log": ("eval", "resource_eval.csv"),
+}
+
+
+@dataclass
+class Stage:
+    name: str
+    start_ms: int
+    end_ms: int
+    depth: int
+    rss_kb: int             # VmRSS at the end marker
+    hwm_kb: int             # VmHWM (peak) at the end marker
+    tree_rss: Optional[int] = None   # peak process-tree RSS (bytes) while running
+    complete: bool = True
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ms - self.start_ms) / 1000.0
+
+
+@dataclass
+class Run:
+    label: str              # e.g. "ariane/flow"
+    log: Path
+    stages: List[Stage]
+
+    @property
+    def start_ms(self) -> int:
+        return min((s.start_ms for s in self.stages), default=0)
+
+    @property
+    def end_ms(self) -> int:
+        return max((s.end_ms for s in self.stages), default=0)
+
+
+def parse_profile(log_path: Path) -> List[Stage]:
+    """Pair begin/end markers; stages left open (killed run) end at the last marker."""
+    stack: List[Tuple[str, int, int, int]] = []
+    stages: List[Stage] = []
+    last_ms = 0
+    with open_text(log_path) as f:
+        for line in f:
+            m = PROFILE_RE.match(line)
+            if not m:
+                continue
+            what, name = m.group(1), m.group(2)
+            ms, rss, hwm = int(m.group(3)), int(m.group(4)), int(m.group(5))
+            last_ms = max(last_ms, ms)
+            if what == "begin":
+                stack.append((name, ms, rss, hwm))
+                continue
+            # Close the innermost open stage with this name.
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == name:
+                    _, start, _, _ = stack[i]
+                    stages.append(Stage(name, start, ms, i, rss, hwm))
+                    del stack[i:]
+                    break
+    for depth, (name, start, rss, hwm) in enumerate(stack):
+        stages.append(Stage(name, start, last_ms, depth, rss, hwm, complete=False))
+    stages.sort(key=lambda s: (s.start_ms, s.depth))
+    return stages
+
+
+def load_resource_trace(path: Path) -> List[Tuple[float, int]]:
+    """(epoch seconds, process-tree RSS bytes) samples from or_supervisor.py."""
+    if not path.is_file():
+        return []
+    samples = []
+    with path.open(newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                samples.append((float(row["time"]), int(row["rss_bytes"])))
+            except (KeyError, ValueError):
+                continue
+    return samples
+
+
+def attach_tree_rss(stages: List[Stage], samples: List[Tuple[float, int]]) -> None:
+    for s in stages:
+        lo, hi = s.start_ms / 1000.0, s.end_ms / 1000.0
+        inside = [rss for t, rss in samples if lo <= t <= hi]
+        if inside:
+            s.tree_rss = max(inside)
+
+
+def load_run(log_path: Path, label: str, trace_path: Optional[Path] = None) -> Run:
+    stages = parse_profile(log_path)
+    if trace_path is not None:
+        samples = load_resource_trace(trace_path)
+        if samples:
+            # A stage still open when the run was stopped lasted until the last sample.
+            for s in stages:
+                if not s.complete:
+                    s.end_ms = max(s.end_ms, int(samples[-1][0] * 1000))
+        attach_tree_rss(stages, samples)
+    return Run(label, log_path, stages)
+
+
+def find_runs(tcl_name: str, designs: List[str]) -> List[Run]:
+    runs = []
+    for design in designs:
+        for out_dir in sorted((OUT_ROOT / tcl_name / design).glob("*")):
+            for log_name, (stage_label, trace_name) in RUN_LOGS.items():
+                log = resolve_input(out_dir / log_name)
+                if log.is_file():
+                    run = load_run(log, f"{design}/{stage_label}", out_dir / trace_name)
+                    if run.stages:
+                        runs.append(run)
+    return runs
+
+
+# ---------------- reports ----------------
+def stage_rss(s: Stage) -> int:
+    return s.tree_rss if s.tree_rss is not None else s.hwm_kb * 1024
+
+
+def print_timeline(run: Run) -> None:
+    print(f"===== {run.label} ({run.log}) =====")
+    t0 = run.start_ms
+    for s in run.stages:
+        flag = "" if s.complete else "  (incomplete)"
+        print(f"{(s.start_ms - t0) / 1000.0:9.1f}s  {'  ' * s.depth}{s.name:<{28 - 2 * s.depth}s}"
+              f" {s.seconds:9.1f}s  rss {format_size(stage_rss(s)):>7s}{flag}")
+
+
+def aggregate(runs: List[Run]) -> Dict[str, Dict[str, float]]:
+    """Exclusive seconds per stage name: {stage: {label: seconds}}."""
+    agg: Dict[str, Dict[str, float]] = {}
+    for run in runs:
+        spans = sorted(run.stages, key=lambda s: (s.start_ms, s.depth))
+        for s in spans:
+            # Exclusive time: subtract directly nested children.
+            children = [c for c in spans if c.depth == s.depth + 1
+                        and s.start_ms <= c.start_ms and c.end_ms <= s.end_ms]
+            own = s.seconds - sum(c.seconds for c in children)
+            per = agg.setdefault(s.name, {})
+            per[run.label] = per.get(run.label, 0.0) + max(own, 0.0)
+    return agg
+
+
+def print_aggregate(runs: List[Run]) -> None:
+    agg = aggregate(runs)
+    total = sum(sum(v.values()) for v in agg.values()) or 1.0
+    labels = [r.label for r in runs]
+    print("===== STAGE TIME (exclusive seconds) =====")
+    print(f"{'stage':24s} {'total':>9s} {'share':>6s}  " + " ".join(f"{l:>18s}" for l in labels))
+    for name, per in sorted(agg.items(), key=lambda kv: -sum(kv[1].values())):
+        t = sum(per.values())
+        print(f"{name:24s} {t:9.1f} {100.0 * t / total:5.1f}%  "
+              + " ".join(f"{per.get(l, 0.0):18.1f}" for l in labels))
+
+
+def write_csv(path: Path, runs: List[Run]) -> None:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["run", "stage", "depth", "start_s", "seconds", "vm_rss_bytes",
+                    "vm_hwm_bytes", "tree_rss_bytes", "complete"])
+        for run in runs:
+            for s in run.stages:
+                w.writerow([run.label, s.name, s.depth, (s.start_ms - run.start_ms) / 1000.0,
+                            s.seconds, s.rss_kb * 1024, s.hwm_kb * 1024,
+                            "" if s.tree_rss is None else s.tree_rss, int(s.complete)])
+
+
+def chrome_trace(runs: List[Run]) -> Dict:
+    """One trace process per run, stages as complete ("X") events plus an RSS counter."""
+    events = []
+    for pid, run in enumerate(runs, 1):
+        events.append({"ph": "M", "pid": pid, "name": "process_name",
+                       "args": {"name": run.label}})
+        t0 = run.start_ms
+        for s in run.stages:
+            events.append({
+                "ph": "X", "pid": pid, "tid": 1, "name": s.name, "cat": "openroad",
+                "ts": (s.start_ms - t0) * 1000, "dur": (s.end_ms - s.start_ms) * 1000,
+                "args": {"rss_mb": round(stage_rss(s) / 2 ** 20, 1),
+                         "vm_hwm_mb": round(s.hwm_kb / 1024, 1),
+                         "complete": s.complete},
+            })
+            events.append({"ph": "C", "pid": pid, "name": "rss_mb",
+                           "ts": (s.end_ms - t0) * 1000,
+                           "args": {"rss": round(s.rss_kb / 1024, 1)}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-stage runtime profile from OpenROAD logs.")
+    ap.add_argument("logs", nargs="*", help="Log files (default: outputs of -t)")
+    ap.add_argument("-t", "--tcl", default="baseline", help="solution/output/<tcl>/...")
+    ap.add_argument("-d", "--designs", nargs="+", default=list(SCENARIOS))
+    ap.add_argument("--trace", default=None, help="Write Chrome trace-event JSON here")
+    ap.add_argument("--csv", default=None, help="Write all stages as CSV here")
+    ap.add_argument("-q", "--quiet", action="store_true", help="Only print the aggregate")
+    args = ap.parse_args()
+
+    if args.logs:
+        runs = []
+        for p in map(Path, args.logs):
+            stage_label, trace_name = RUN_LOGS.get(p.name, (p.stem, ""))
+            trace = p.parent / trace_name if trace_name else None
+            runs.append(load_run(p, f"{p.parent.name}/{stage_label}", trace))
+    else:
+        runs = find_runs(args.tcl, args.designs)
+    runs = [r for r in runs if r.stages]
+    if not runs:
+        print("ERROR: no [PROFILE] markers found", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        for run in runs:
+            print_timeline(run)
+    print_aggregate(runs)
+    if args.csv:
+        write_csv(Path(args.csv), runs)
+    if args.trace:
+        Path(args.trace).write_text(json.dumps(chrome_trace(runs)))
+        print(f"trace: {args.trace}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
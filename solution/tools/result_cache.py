@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Content-addressed result cache for flow runs.
+
+A cache key is the hash of everything that can change the outcome of one
+design run:
+- the generated Tcl under solution/tcl/temp/<design>/<scenario>/ and the
+  helpers it sources (solution/tcl/util/*.tcl, equiv_check/or_utils.tcl,
+  the ASAP7 equivalent-cell list)
+- contest.v / contest.def / contest.sdc of the scenario
+- the Platform LEF / Liberty / RC set
+- the flow and evaluation OpenROAD binaries
+- the Python optimizer scripts (solution/*.py, solution/tools/*.py)
+- the evaluation scripts (evaluation.tcl, gcell_usage.tcl, parse_log.py,
+  scripts/<design>/, cal_total_score.py)
+
+On a hit the output DEF/Verilog, evaluation.log (or the .gz/.zst the run
+wrote), gcell_usage.bin and metrics.csv are copied back into the output directory. Entries are evicted least-recently-used
+once the cache grows beyond its size limit.
+
+Used by solution/test/test_bench.sh:
+
+python3 result_cache.py lookup --design aes_cipher_top --scenario TCP_250_UTIL_0.40 \
+    --tcl <generated.tcl> --design-dir <bench dir> --out-dir <out dir> --sweep <id>
+python3 result_cache.py store --key <key> --design aes_cipher_top --out-dir <out dir>
+python3 result_cache.py stats --sweep <id>
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import (
+    CACHE_ROOT, EQUIV_CELLS, EQUIV_DIR, EVAL_OPENROAD, FLOW_OPENROAD, SCRIPTS_DIR,
+    SOLUTION_DIR, TCL_DIR, TECH_DIR, TEST_DIR, TOOLS_DIR, DigestMemo, format_size,
+    parse_size, tmp_tag,
+)
+from parse_log import COMPRESSED_SUFFIXES, resolve_input
+
+CACHE_VERSION = 1
+DEFAULT_MAX_SIZE = os.environ.get("RESULT_CACHE_MAX_SIZE", "20G")
+
+# Files restored on a hit; "{design}" is replaced by the design name.
+ARTIFACTS = [
+    "{design}.v",
+    "{design}.def",
+    "evaluation.log",
+    "metrics.csv",
+    "run.log",
+    "congestion_report.rpt",
+    "timing_report.txt",
+    "gcell_usage.bin",
+]
+REQUIRED_ARTIFACTS = ["{design}.v", "{design}.def", "evaluation.log", "metrics.csv"]
+
+
+class ResultCache:
+    def __init__(self, root: Path = CACHE_ROOT / "results",
+                 max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.entries_dir = self.root / "entries"
+        self.sweeps_dir = self.root / "sweeps"
+        self.max_bytes = max_bytes if max_bytes is not None else parse_size(DEFAULT_MAX_SIZE)
+        self.memo = DigestMemo(self.root / "digests.json")
+
+    # ---------------- keys ----------------
+    def input_files(self, design: str, design_dir: Path) -> Dict[str, List[Path]]:
+        """Input groups that make up a key (besides the generated Tcl)."""
+        design_dir = Path(design_dir)
+        return {
+            "design": [design_dir / f"contest.{ext}" for ext in ("v", "def", "sdc")],
+            "platform": sorted(
+                list((TECH_DIR / "lef").glob("*.lef"))
+                + list((TECH_DIR / "lib").glob("*.lib"))
+                + list((TECH_DIR / "util").glob("*.tcl"))
+            ),
+            "openroad": [Path(FLOW_OPENROAD), Path(EVAL_OPENROAD)],
+            "optimizer": sorted(list(SOLUTION_DIR.glob("*.py")) + list(TOOLS_DIR.glob("*.py"))),
+            "flow_util": sorted((TCL_DIR / "util").glob("*.tcl")),
+            "equiv": [EQUIV_DIR / "or_utils.tcl", EQUIV_CELLS],
+            "evaluation": sorted(
+                [SCRIPTS_DIR / "evaluation.tcl", SCRIPTS_DIR / "gcell_usage.tcl",
+                 SCRIPTS_DIR / "parse_log.py", TEST_DIR / "cal_total_score.py"]
+                + list((SCRIPTS_DIR / design).glob("*.tcl"))
+                + list((SCRIPTS_DIR / design).glob("*.sh"))
+            ),
+        }
+
+    def key(self, design: str, scenario: str, tcl_file: Path, design_dir: Path) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"v{CACHE_VERSION}|{design}|{scenario}".encode())
+        h.update(Path(tcl_file).read_bytes())
+        for group, files in sorted(self.input_files(design, design_dir).items()):
+            h.update(group.encode())
+            h.update(self.memo.combined(files).encode())
+        self.memo.save()
+        return h.hexdigest()
+
+    def entry_dir(self, key: str) -> Path:
+        return self.entries_dir / key[:2] / key
+
+    # ---------------- lookup / store ----------------
+    def restore(self, key: str, out_dir: Path) -> bool:
+        entry = self.entry_dir(key)
+        meta_file = entry / "meta.json"
+        if not meta_file.exists():
+            return False
+        meta = json.loads(meta_file.read_text())
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in meta["files"]:
+            for stale in _variants(out_dir / name):
+                stale.unlink(missing_ok=True)
+            shutil.copy2(entry / name, out_dir / name)
+        meta["last_access"] = time.time()
+        meta["hits"] = meta.get("hits", 0) + 1
+        _write_json(meta_file, meta)
+        return True
+
+    def store(self, key: str, design: str, out_dir: Path, **info) -> bool:
+        out_dir = Path(out_dir)
+        names = [a.format(design=design) for a in ARTIFACTS]
+        missing = [n for n in (a.format(design=design) for a in REQUIRED_ARTIFACTS)
+                   if not resolve_input(out_dir / n).is_file()]
+        if missing:
+            print(f"[CACHE] not storing {design}: missing {', '.join(missing)}",
+                  file=sys.stderr)
+            return False
+
+        entry = self.entry_dir(key)
+        tmp = entry.with_name(f".{key}.{tmp_tag()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        files, size = [], 0
+        for name in names:
+            src = resolve_input(out_dir / name)   # evaluation.log may be .gz/.zst
+            if not src.is_file():
+                continue
+            name = src.name
+            if name == "metrics.csv":
+                _copy_last_metrics_row(src, tmp / name)
+            else:
+                shutil.copy2(src, tmp / name)
+            files.append(name)
+            size += (tmp / name).stat().st_size
+        now = time.time()
+        meta = dict(info, design=design, key=key, files=files, size=size,
+                    created=now, last_access=now, hits=0)
+        _write_json(tmp / "meta.json", meta)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+        return True
+
+    # ---------------- eviction ----------------
+    def entries(self) -> List[Dict]:
+        metas = []
+        for meta_file in self.entries_dir.glob("*/*/meta.json"):
+            try:
+                meta = json.loads(meta_file.read_text())
+            except (OSError, ValueError):
+                continue
+            meta["path"] = str(meta_file.parent)
+            metas.append(meta)
+        return metas
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[str]:
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        metas = sorted(self.entries(), key=lambda m: m.get("last_access", 0))
+        total = sum(m.get("size", 0) for m in metas)
+        evicted = []
+        for meta in metas:
+            if total <= limit:
+                break
+            shutil.rmtree(meta["path"], ignore_errors=True)
+            total -= meta.get("size", 0)
+            evicted.append(meta["key"])
+        return evicted
+
+    # ---------------- per-sweep statistics ----------------
+    def record(self, sweep: str, design: str, hit: bool) -> None:
+        """Append one lookup result to the sweep's stats file."""
+        self.sweeps_dir.mkdir(parents=True, exist_ok=True)
+        with (self.sweeps_dir / f"{sweep}.csv").open("a", newline="") as f:
+            csv.writer(f).writerow([design, int(hit), f"{time.time():.3f}"])
+
+    def sweep_stats(self, sweep: str) -> Dict[str, Dict[str, int]]:
+        stats: Dict[str, Dict[str, int]] = {}
+        path = self.sweeps_dir / f"{sweep}.csv"
+        if not path.exists():
+            return stats
+        with path.open(newline="") as f:
+            for row in csv.reader(f):
+                if len(row) < 2:
+                    continue
+                s = stats.setdefault(row[0], {"hit": 0, "miss": 0})
+                s["hit" if row[1] == "1" else "miss"] += 1
+        return stats
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    tmp = path.with_name(path.name + f".{tmp_tag()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _variants(path: Path) -> List[Path]:
+    """path and its compressed siblings that exist (one is restored over them)."""
+    base = path.with_suffix("") if path.suffix in COMPRESSED_SUFFIXES else path
+    cands = [base] + [base.with_name(base.name + s) for s in COMPRESSED_SUFFIXES]
+    return [c for c in cands if c.is_file()]
+
+
+def _copy_last_metrics_row(src: Path, dst: Path) -> None:
+    """metrics.csv is appended to on every eval; keep header + this run's row."""
+    with src.open(newline="") as f:
+        rows = list(csv.reader(f))
+    with dst.open("w", newline="") as f:
+        csv.writer(f).writerows(rows[:1] + rows[-1:] if len(rows) > 1 else rows)
+
+
+def print_stats(cache: ResultCache, sweep: Optional[str]) -> None:
+    if sweep:
+        stats = cache.sweep_stats(sweep)
+        hits = sum(s["hit"] for s in stats.values())
+        misses = sum(s["miss"] for s in stats.values())
+        total = hits + misses
+        print(f"===== RESULT CACHE: sweep {sweep} =====")
+        for design in sorted(stats):
+            s = stats[design]
+            print(f"{design:24s}: hit {s['hit']}  miss {s['miss']}")
+        rate = 100.0 * hits / total if total else 0.0
+        print(f"{'total':24s}: hit {hits}  miss {misses}  ({rate:.1f}% hit rate)")
+    metas = cache.entries()
+    size = sum(m.get("size", 0) for m in metas)
+    print(f"cache: {len(metas)} entries, {format_size(size)} / "
+          f"{format_size(cache.max_bytes)} at {cache.root}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Content-addressed cache for flow runs.")
+    ap.add_argument("--cache-dir", default=str(CACHE_ROOT / "results"))
+    ap.add_argument("--max-size", default=DEFAULT_MAX_SIZE,
+                    help="Evict LRU entries beyond this size (e.g. 20G)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    lk = sub.add_parser("lookup", help="Print the key; restore outputs and exit 0 on a hit")
+    lk.add_argument("--design", required=True)
+    lk.add_argument("--scenario", required=True)
+    lk.add_argument("--tcl", required=True, help="Generated Tcl file")
+    lk.add_argument("--design-dir", required=True)
+    lk.add_argument("--out-dir", required=True)
+    lk.add_argument("--sweep", default=None, help="Sweep id for hit/miss statistics")
+
+    st = sub.add_parser("store", help="Store the outputs of a finished run")
+    st.add_argument("--key", required=True)
+    st.add_argument("--design", required=True)
+    st.add_argument("--scenario", default=None)
+    st.add_argument("--tcl-name", default=None)
+    st.add_argument("--out-dir", required=True)
+
+    ss = sub.add_parser("stats", help="Report cache usage and sweep hit/miss counts")
+    ss.add_argument("--sweep", default=None)
+
+    sub.add_parser("evict", help="Evict entries down to --max-size")
+
+    args = ap.parse_args()
+    cache = ResultCache(Path(args.cache_dir), parse_size(args.max_size))
+
+    if args.cmd == "lookup":
+        tcl = Path(args.tcl)
+        if not tcl.is_file():
+            print(f"ERROR: generated Tcl not found: {tcl}", file=sys.stderr)
+            return 2
+        key = cache.key(args.design, args.scenario, tcl, Path(args.design_dir))
+        hit = cache.restore(key, Path(args.out_dir))
+        if args.sweep:
+            cache.record(args.sweep, args.design, hit)
+        print(key)
+        return 0 if hit else 1
+    if args.cmd == "store":
+        ok = cache.store(args.key, args.design, Path(args.out_dir),
+                         scenario=args.scenario, tcl_name=args.tcl_name)
+        return 0 if ok else 1
+    if args.cmd == "stats":
+        print_stats(cache, args.sweep)
+        return 0
+    if args.cmd == "evict":
+        evicted = cache.evict()
+        print(f"evicted {len(evicted)} entries")
+        return 0
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,805 @@
+#!/usr/bin/env python3
+"""
+RUDY / pin-density congestion estimate on the evaluation gcell grid.
+
+Predicts where global routing will run out of tracks without running
+global_route. Every net spreads its wirelength uniformly over its
+bounding box (RUDY, Spindler & Johannes 2007), split into horizontal and
+vertical track usage per gcell:
+
+  usage_h[g] = k * w / (w * h) * area(bbox & g) / width(g)
+  usage_v[g] = k * h / (w * h) * area(bbox & g) / height(g)
+
+with k the Steiner factor for the pin count (surrogate_sta.steiner_factor),
+so a gcell's usage is in tracks, like the capacity/usage evaluation.tcl
+dumps after global_route (gr_overflow.py). Pin density is the pin
+count per gcell.
+
+- grid: OpenROAD's, 15 track pitches of the lowest signal layer (M2) per
+  gcell from the die origin, the last gcell absorbing the remainder; a
+  GR dump from an evaluation log fixes the gcell counts
+- placement: component positions from the DEF (pin = cell center), I/Os
+  from node.csv; connectivity from nets.csv; nets with more than 300 sinks
+  are skipped as in `global_route -skip_large_fanout_nets 300`
+- capacity: DEF TRACKS of M2-M9 in each layer's preferred direction,
+  or the GR dump's own capacity when a log is given
+
+The full map is built in one vectorized pass (each net's box is a rank-one
+window, summed through difference arrays). apply() takes changelist
+entries (changelist.py) and moves/splits the touched nets only;
+checkpoint()/rollback() undo trial moves as in surrogate_sta.py.
+
+`check` predicts max/total GR overflow before and after a changelist and
+flags a likely max_gr_overflow regression. `correlate` fits the estimate to
+the GR dump of an evaluation log (scale per design, saved for `check`) and
+reports Pearson/Spearman and hotspot overlap.
+
+python3 rudy.py report -d aes_cipher_top
+python3 rudy.py report -d aes_cipher_top --def solution/output/<run>/aes_cipher_top/.../aes_cipher_top.def
+python3 rudy.py check -d aes_cipher_top changes.txt
+python3 rudy.py correlate -d aes_cipher_top --log solution/output/<run>/.../evaluation.log
+python3 rudy.py bench -d aes_cipher_top
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from changelist import Change, InsertBuffer, Resize, read_changelist
+from common import BENCH_ROOT, CACHE_ROOT, SCENARIOS
+from def_reader import DEF, load_def, read_def
+from gr_overflow import find_dump, read_usage
+from lef import Lef, load_lef
+from name_table import load_netlist
+from parse_log import GR_LINE, open_text, resolve_input
+from surrogate_sta import steiner_factor
+
+PITCHES_IN_TILE = 15
+SKIP_FANOUT = 300
+SIGNAL_LAYERS = tuple(f"M{i}" for i in range(2, 10))
+MIN_EXTENT = 1e-3          # um; zero-width boxes are widened to this
+RUDY_CACHE = CACHE_ROOT / "rudy"
+
+
+@dataclass
+class Grid:
+    """GCell boundaries in um (nx + 1 and ny + 1 values)."""
+    xs: np.ndarray
+    ys: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.xs) - 1, len(self.ys) - 1
+
+    @property
+    def widths(self) -> np.ndarray:
+        return np.diff(self.xs)
+
+    @property
+    def heights(self) -> np.ndarray:
+        return np.diff(self.ys)
+
+    def locate(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """GCell indices of points; points outside land in the border gcells."""
+        return (np.searchsorted(self.xs[1:-1], x, side="right"),
+                np.searchsorted(self.ys[1:-1], y, side="right"))
+
+
+def gcell_grid(die: Tuple[float, float, float, float], tile: float,
+               shape: Optional[Tuple[int, int]] = None) -> Grid:
+    """The global router's grid over die (um); shape overrides the counts."""
+    x0, y0, x1, y1 = die
+    nx, ny = shape or (max(int((x1 - x0) // tile), 1), max(int((y1 - y0) // tile), 1))
+    return Grid(np.append(x0 + tile * np.arange(nx), x1),
+                np.append(y0 + tile * np.arange(ny), y1))
+
+
+def default_tile(lef: Lef, layer: str = SIGNAL_LAYERS[0]) -> float:
+    pitch = lef.layers[layer].pitch if layer in lef.layers else 0.0
+    return PITCHES_IN_TILE * (pitch or 0.036)
+
+
+def track_capacity(d: DEF, lef: Lef, grid: Grid,
+                   layers: Sequence[str] = SIGNAL_LAYERS) -> np.ndarray:
+    """Tracks per gcell over the given layers, preferred direction only."""
+    nx, ny = grid.shape
+    cap = np.zeros((nx, ny))
+    for name in layers:
+        layer = lef.layers.get(name)
+        if layer is None or layer.direction not in ("HORIZONTAL", "VERTICAL"):
+            continue
+        horizontal = layer.direction == "HORIZONTAL"
+        pos = d.tracks.positions(name, "Y" if horizontal else "X") / d.dbu
+        edges = grid.ys if horizontal else grid.xs
+        count, _ = np.histogram(pos, bins=edges)
+        cap += count[None, :] if horizontal else count[:, None]
+    return cap
+
+
+# ---------------- RUDY windows ----------------
+def _profile(lo: np.ndarray, hi: np.ndarray, edges: np.ndarray):
+    """Per-net overlap with the gcells along one axis.
+
+    Returns (first, last, overlap of first, overlap of last); the gcells
+    strictly inside are fully covered. When first == last the first
+    overlap is the whole extent.
+    """
+    inner = edges[1:-1]
+    i0 = np.searchsorted(inner, lo, side="right")
+    i1 = np.searchsorted(inner, hi, side="left")
+    i1 = np.maximum(i1, i0)
+    o0 = np.minimum(hi, edges[i0 + 1]) - lo
+    o1 = np.where(i1 > i0, hi - edges[i1], 0.0)
+    return i0, i1, o0, o1
+
+
+def _scatter(shape: Tuple[int, int], i: np.ndarray, j: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return np.bincount(i * shape[1] + j, weights=v,
+                       minlength=shape[0] * shape[1]).reshape(shape)
+
+
+def _window_sum(shape, px, py, sx: np.ndarray, sy: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """sum over nets of w * outer(fx, fy), fx/fy the per-axis profiles.
+
+    Along x a net's profile is sx[i] on its interior gcells and given end
+    values (px = (i0, i1, end0, end1), likewise py). Splitting each
+    profile into "sx on [i0, i1]" plus two end corrections makes the sum
+    four separable parts: rectangles (2-D difference array), row and
+    column strips (1-D difference arrays) and corner points.
+    """
+    nx, ny = shape
+    i0, i1, ex0, ex1 = px
+    j0, j1, ey0, ey1 = py
+    cx0 = ex0 - sx[i0]
+    cx1 = np.where(i1 > i0, ex1 - sx[i1], 0.0)
+    cy0 = ey0 - sy[j0]
+    cy1 = np.where(j1 > j0, ey1 - sy[j1], 0.0)
+
+    big = (nx + 1, ny + 1)
+    rect = (_scatter(big, i0, j0, w) - _scatter(big, i1 + 1, j0, w)
+            - _scatter(big, i0, j1 + 1, w) + _scatter(big, i1 + 1, j1 + 1, w))
+    rect = rect.cumsum(0).cumsum(1)[:nx, :ny]
+
+    rows = np.zeros((nx + 1, ny))
+    cols = np.zeros((nx, ny + 1))
+    points = np.zeros((nx, ny))
+    for j, cy in ((j0, cy0), (j1, cy1)):
+        rows += _scatter((nx + 1, ny), i0, j, w * cy) - _scatter((nx + 1, ny), i1 + 1, j, w * cy)
+    for i, cx in ((i0, cx0), (i1, cx1)):
+        cols += _scatter((nx, ny + 1), i, j0, w * cx) - _scatter((nx, ny + 1), i, j1 + 1, w * cx)
+        for j, cy in ((j0, cy0), (j1, cy1)):
+            points += _scatter((nx, ny), i, j, w * cx * cy)
+    return (rect * np.outer(sx, sy) + rows.cumsum(0)[:nx] * sx[:, None]
+            + cols.cumsum(1)[:, :ny] * sy[None, :] + points)
+
+
+def _widen(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    pad = np.maximum(MIN_EXTENT - (hi - lo), 0.0) / 2
+    return lo - pad, hi + pad
+
+
+def _profiles(bbox: np.ndarray, grid: Grid):
+    xlo, xhi = _widen(bbox[:, 0], bbox[:, 2])
+    ylo, yhi = _widen(bbox[:, 1], bbox[:, 3])
+    return _profile(xlo, xhi, grid.xs), _profile(ylo, yhi, grid.ys), xhi - xlo, yhi - ylo
+
+
+def rudy_maps(bbox: np.ndarray, factor: np.ndarray, grid: Grid) -> Tuple[np.ndarray, np.ndarray]:
+    """(horizontal, vertical) track usage of nets with boxes [n, 4] (um)."""
+    shape = grid.shape
+    if len(bbox) == 0:
+        return np.zeros(shape), np.zeros(shape)
+    px, py, w, h = _profiles(bbox, grid)
+    cw, rh = grid.widths, grid.heights
+    i0, i1, ox0, ox1 = px
+    j0, j1, oy0, oy1 = py
+    # horizontal: x profile in gcell widths, y profile in um
+    usage_h = _window_sum(shape, (i0, i1, ox0 / cw[i0], ox1 / cw[i1]), py,
+                          np.ones(len(cw)), rh, factor / h)
+    usage_v = _window_sum(shape, px, (j0, j1, oy0 / rh[j0], oy1 / rh[j1]),
+                          cw, np.ones(len(rh)), factor / w)
+    return usage_h, usage_v
+
+
+def _net_window(box: np.ndarray, factor: float, grid: Grid):
+    """(i0, j0, usage_h block, usage_v block) of one net, for incremental updates."""
+    (i0, i1, ox0, ox1), (j0, j1, oy0, oy1), w, h = _profiles(box[None, :], grid)
+    i0, i1, j0, j1 = int(i0[0]), int(i1[0]), int(j0[0]), int(j1[0])
+    ox = grid.widths[i0:i1 + 1].copy()
+    oy = grid.heights[j0:j1 + 1].copy()
+    ox[0] = ox0[0]
+    oy[0] = oy0[0]
+    if i1 > i0:
+        ox[-1] = ox1[0]
+    if j1 > j0:
+        oy[-1] = oy1[0]
+    area = np.outer(ox, oy)
+    usage_h = area * (factor / h[0]) / grid.widths[i0:i1 + 1, None]
+    usage_v = area * (factor / w[0]) / grid.heights[None, j0:j1 + 1]
+    return i0, j0, usage_h, usage_v
+
+
+# ---------------- the map ----------------
+class RudyMap:
+    """Incrementally updatable RUDY + pin-density map of one placement."""
+
+    def __init__(self, grid: Grid, names: Sequence[str], x: np.ndarray, y: np.ndarray,
+                 sizes: np.ndarray, masters: Sequence[str], net_names: Sequence[str],
+                 net_ptr: np.ndarray, net_nodes: np.ndarray, lef: Lef,
+                 capacity: Optional[np.ndarray] = None):
+        self.grid = grid
+        self.lef = lef
+        self.node_names = list(names)
+        self.node_index = {n: i for i, n in enumerate(self.node_names)}
+        self.node_master = list(masters)
+        self.x = np.asarray(x, dtype=np.float64).copy()       # pin (cell center) um
+        self.y = np.asarray(y, dtype=np.float64).copy()
+        self.size = np.asarray(sizes, dtype=np.float64).reshape(-1, 2).copy()
+        self.net_names = list(net_names)
+        self.net_index = {n: i for i, n in enumerate(self.net_names)}
+        self.net_ptr = np.asarray(net_ptr, dtype=np.int64)
+        self.net_nodes = np.asarray(net_nodes, dtype=np.int64)
+        self.capacity = capacity if capacity is not None else np.zeros(grid.shape)
+        self.scale = 1.0            # fitted usage per RUDY track (correlate)
+        self.pin_weight = 0.0       # fitted usage per pin
+
+        # node -> nets (CSR), overridden per node once a net changes
+        order = np.argsort(self.net_nodes, kind="stable")
+        owner = np.repeat(np.arange(len(self.net_names)), np.diff(self.net_ptr))
+        self._node_nets = owner[order]
+        self._node_ptr = np.searchsorted(self.net_nodes[order], np.arange(len(self.x) + 1))
+        self._members: Dict[int, np.ndarray] = {}
+        self._nets_of: Dict[int, np.ndarray] = {}
+        self._undo: Optional[List] = None
+        self._marks: List[int] = []
+        self._build()
+
+    # ---------------- full build ----------------
+    def _build(self) -> None:
+        n = len(self.net_names)
+        counts = np.diff(self.net_ptr)
+        self.bbox = np.zeros((n, 4))
+        nonempty = counts > 0
+        starts = self.net_ptr[:-1][nonempty]
+        if len(starts):
+            px, py = self.x[self.net_nodes], self.y[self.net_nodes]
+            self.bbox[nonempty] = np.stack([
+                np.minimum.reduceat(px, starts), np.minimum.reduceat(py, starts),
+                np.maximum.reduceat(px, starts), np.maximum.reduceat(py, starts)], axis=1)
+        self.live = (counts >= 2) & (counts - 1 <= SKIP_FANOUT)
+        self.factor = steiner_factor(counts)
+        self.usage_h, self.usage_v = rudy_maps(self.bbox[self.live], self.factor[self.live],
+                                               self.grid)
+        i, j = self.grid.locate(self.x[self.net_nodes], self.y[self.net_nodes])
+        self.pins = _scatter(self.grid.shape, i, j, np.ones(len(i)))
+
+    # ---------------- undo ----------------
+    def checkpoint(self) -> None:
+        """Start recording changes; rollback() returns to this point."""
+        if self._undo is None:
+            self._undo = []
+        self._marks.append(len(self._undo))
+
+    def rollback(self) -> None:
+        mark = self._marks.pop()
+        while len(self._undo) > mark:
+            self._undo.pop()()
+        if not self._marks:
+            self._undo = None
+
+    def commit(self) -> None:
+        self._marks.pop()
+        if not self._marks:
+            self._undo = None
+
+    def _log(self, undo) -> None:
+        if self._undo is not None:
+            self._undo.append(undo)
+
+    # ---------------- structure ----------------
+    def members(self, net: int) -> np.ndarray:
+        m = self._members.get(net)
+        return m if m is not None else self.net_nodes[self.net_ptr[net]:self.net_ptr[net + 1]]
+
+    def nets_of(self, node: int) -> np.ndarray:
+        m = self._nets_of.get(node)
+        if m is not None:
+            return m
+        if node + 1 >= len(self._node_ptr):
+            return np.zeros(0, dtype=np.int64)
+        return self._node_nets[self._node_ptr[node]:self._node_ptr[node + 1]]
+
+    def _set(self, table: Dict[int, np.ndarray], key: int, value: np.ndarray) -> None:
+        old = table.get(key)
+        table[key] = value
+
+        def undo():
+            if old is None:
+                table.pop(key, None)
+            else:
+                table[key] = old
+        self._log(undo)
+
+    def _window(self, net: int, sign: float) -> None:
+        i0, j0, uh, uv = _net_window(self.bbox[net], self.factor[net], self.grid)
+        sl = (slice(i0, i0 + uh.shape[0]), slice(j0, j0 + uh.shape[1]))
+        self.usage_h[sl] += sign * uh
+        self.usage_v[sl] += sign * uv
+
+    def _pin(self, x: float, y: float, count: float) -> None:
+        i, j = self.grid.locate(x, y)
+        self.pins[i, j] += count
+        self._log(lambda: self.pins.__setitem__((i, j), self.pins[i, j] - count))
+
+    def _refresh(self, net: int) -> None:
+        """Recompute one net's box from its members and re-add its window."""
+        old = (self.bbox[net].copy(), bool(self.live[net]), float(self.factor[net]))
+        if old[1]:
+            self._window(net, -1.0)
+        nodes = self.members(net)
+        if len(nodes):
+            px, py = self.x[nodes], self.y[nodes]
+            self.bbox[net] = (px.min(), py.min(), px.max(), py.max())
+        self.live[net] = 2 <= len(nodes) <= SKIP_FANOUT + 1
+        self.factor[net] = steiner_factor(np.array([len(nodes)]))[0]
+        if self.live[net]:
+            self._window(net, 1.0)
+
+        def undo():
+            if self.live[net]:
+                self._window(net, -1.0)
+            self.bbox[net], self.live[net], self.factor[net] = old
+            if old[1]:
+                self._window(net, 1.0)
+        self._log(undo)
+
+    def _grow(self, attr: str, rows: np.ndarray) -> None:
+        old = getattr(self, attr)
+        setattr(self, attr, np.concatenate([old, rows]))
+        self._log(lambda: setattr(self, attr, old))
+
+    def _new_node(self, name: str, master: str, x: float, y: float) -> int:
+        node = len(self.x)
+        size = self._master_size(master)
+        self._grow("x", np.array([x + size[0] / 2]))
+        self._grow("y", np.array([y + size[1] / 2]))
+        self._grow("size", np.array([size]))
+        self.node_names.append(name)
+        self.node_master.append(master)
+        self.node_index[name] = node
+
+        def undo():
+            self.node_names.pop()
+            self.node_master.pop()
+            del self.node_index[name]
+        self._log(undo)
+        return node
+
+    def _new_net(self, name: str) -> int:
+        net = len(self.net_names)
+        self._grow("bbox", np.zeros((1, 4)))
+        self._grow("live", np.zeros(1, dtype=bool))
+        self._grow("factor", np.ones(1))
+        self.net_names.append(name)
+        self.net_index[name] = net
+
+        def undo():
+            self.net_names.pop()
+            del self.net_index[name]
+        self._log(undo)
+        return net
+
+    def _master_size(self, master: str) -> Tuple[float, float]:
+        m = self.lef.macros.get(master)
+        return (m.width, m.height) if m else (0.0, 0.0)
+
+    def _node(self, name: str) -> int:
+        node = self.node_index.get(name)
+        if node is None:
+            raise ValueError(f"unknown instance {name}")
+        return node
+
+    # ---------------- changes ----------------
+    def move(self, inst: str, x: float, y: float) -> int:
+        """Move an instance to lower-left (x, y) um; returns the nets updated."""
+        node = self._node(inst)
+        self._move_node(node, x + self.size[node, 0] / 2, y + self.size[node, 1] / 2)
+        return len(self.nets_of(node))
+
+    def _move_node(self, node: int, cx: float, cy: float) -> None:
+        nets = self.nets_of(node)
+        ox, oy = float(self.x[node]), float(self.y[node])
+        self._pin(ox, oy, -len(nets))
+        self.x[node], self.y[node] = cx, cy
+
+        def undo():
+            self.x[node], self.y[node] = ox, oy
+        self._log(undo)
+        self._pin(cx, cy, len(nets))
+        for net in nets:
+            self._refresh(int(net))
+
+    def resize(self, inst: str, master: str) -> int:
+        """Swap the master; the cell keeps its lower-left corner."""
+        node = self._node(inst)
+        old_size = self.size[node].copy()
+        new_size = np.array(self._master_size(master), dtype=np.float64)
+        old_master = self.node_master[node]
+        self.node_master[node] = master
+        self.size[node] = new_size
+
+        def undo():
+            self.node_master[node] = old_master
+            self.size[node] = old_size
+        self._log(undo)
+        shift = (new_size - old_size) / 2
+        if not shift.any():
+            return 0
+        self._move_node(node, self.x[node] + shift[0], self.y[node] + shift[1])
+        return len(self.nets_of(node))
+
+    def insert_buffer(self, name: str, master: str, x: float, y: float, net: str,
+                      new_net: str, sinks: Sequence[Tuple[str, str]]) -> int:
+        """Buffer `name` on `net` driving `new_net` with the given sinks moved over."""
+        if name in self.node_index or new_net in self.net_index:
+            raise ValueError(f"buffer {name} / net {new_net} already exists")
+        src = self.net_index.get(net)
+        if src is None:
+            raise ValueError(f"unknown net {net}")
+        members = list(self.members(src))
+        moved = []
+        for inst, _ in sinks:
+            node = self._node(inst)
+            if node not in members[1:]:
+                raise ValueError(f"{inst} is not a sink of {net}")
+            members.remove(node)
+            moved.append(node)
+
+        buf = self._new_node(name, master, x, y)
+        dst = self._new_net(new_net)
+        self._set(self._members, src, np.array(members + [buf], dtype=np.int64))
+        self._set(self._members, dst, np.array([buf] + moved, dtype=np.int64))
+        self._set(self._nets_of, buf, np.array([src, dst], dtype=np.int64))
+        for node in moved:
+            nets = list(self.nets_of(node))
+            nets.remove(src)
+            self._set(self._nets_of, node, np.array(nets + [dst], dtype=np.int64))
+        self._pin(self.x[buf], self.y[buf], 2)
+        self._refresh(src)
+        self._refresh(dst)
+        return 2
+
+    def apply(self, change: Change) -> int:
+        """Apply one changelist entry; returns the number of nets updated."""
+        if isinstance(change, Resize):
+            return self.resize(change.inst, change.master)
+        if isinstance(change, InsertBuffer):
+            return self.insert_buffer(change.name, change.master, change.x, change.y,
+                                      change.net, change.new_net, change.sinks)
+        raise ValueError(f"unsupported change {change!r}")
+
+    # ---------------- congestion ----------------
+    def rudy(self) -> np.ndarray:
+        """Estimated track usage per gcell (raw RUDY, both directions)."""
+        return self.usage_h + self.usage_v
+
+    def usage(self) -> np.ndarray:
+        """Usage in GR tracks, with the fit of the last correlate run if any."""
+        return self.scale * self.rudy() + self.pin_weight * self.pins
+
+    def summary(self) -> Dict:
+        usage = self.usage()
+        over = np.maximum(usage - self.capacity, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(self.capacity > 0, usage / self.capacity, 0.0)
+        return {
+            "max_overflow": float(over.max()) if over.size else 0.0,
+            "total_overflow": float(over.sum()),
+            "overflow_gcells": int((over > 0).sum()),
+            "max_utilization": float(ratio.max()) if ratio.size else 0.0,
+        }
+
+    def trial(self, changes: Sequence[Change]) -> Dict:
+        """summary() after the changes; the map is left unchanged."""
+        self.checkpoint()
+        try:
+            for change in changes:
+                self.apply(change)
+            return self.summary()
+        finally:
+            self.rollback()
+
+
+def flag_regression(before: Dict, after: Dict, tol: float = 0.5) -> List[str]:
+    """Reasons to expect a worse max_gr_overflow (empty when it looks safe)."""
+    reasons = []
+    if after["max_overflow"] > before["max_overflow"] + tol:
+        reasons.append(f"max overflow {before['max_overflow']:.2f} -> "
+                       f"{after['max_overflow']:.2f}")
+    if after["overflow_gcells"] > before["overflow_gcells"]:
+        reasons.append(f"overflowing gcells {before['overflow_gcells']} -> "
+                       f"{after['overflow_gcells']}")
+    return reasons
+
+
+# ---------------- loading ----------------
+def read_gr_grid(log: Path) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(capacity, usage) [nx, ny] of the last GR dump in an evaluation log.
+
+    Reads the bulk gcell dump when the log names one ([GCELL_DUMP]), else
+    the per-gcell text lines of older logs.
+    """
+    dump = find_dump(log)
+    if dump is not None and dump.is_file():
+        cap, usage = read_usage(dump).totals()
+        return cap.astype(float), usage.astype(float)
+    rows: List[Tuple[int, int, float, float]] = []
+    inside = False
+    with open_text(log) as f:
+        for line in f:
+            s = line.strip()
+            if s.startswith("Start Global Routing Results Analysis"):
+                inside, rows = True, []
+            elif s.startswith("End Global Routing Results Analysis"):
+                inside = False
+            elif inside:
+                g = GR_LINE.match(s)
+                if g:
+                    rows.append((int(g.group(1)), int(g.group(2)),
+                                 float(g.group(3)), float(g.group(4))))
+    if not rows:
+        return None
+    a = np.array(rows)
+    nx, ny = int(a[:, 0].max()) + 1, int(a[:, 1].max()) + 1
+    cap, usage = np.zeros((nx, ny)), np.zeros((nx, ny))
+    ix, iy = a[:, 0].astype(np.int64), a[:, 1].astype(np.int64)
+    cap[ix, iy] = a[:, 2]
+    usage[ix, iy] = a[:, 3]
+    return cap, usage
+
+
+def calibration_file(design: str) -> Path:
+    return RUDY_CACHE / f"{design}.json"
+
+
+def load_map(design: str, def_path: Optional[Path] = None, log: Optional[Path] = None,
+             lef: Optional[Lef] = None, use_calibration: bool = True,
+             design_dir: Optional[Path] = None) -> RudyMap:
+    """RudyMap of a benchmark; def_path defaults to its contest.def."""
+    design_dir = Path(design_dir) if design_dir else BENCH_ROOT / design / SCENARIOS[design]
+    d = load_def(design_dir / "contest.def") if def_path is None else read_def(def_path)
+    lef = lef or load_lef()
+    dbu = float(d.dbu)
+    die = tuple(v / dbu for v in d.die)
+    gr = read_gr_grid(log) if log else None
+    grid = gcell_grid(die, default_tile(lef), gr[0].shape if gr else None)
+
+    c = d.components
+    masters, inv = np.unique(c.masters, return_inverse=True)
+    sizes = np.array([[lef.macros[m].width, lef.macros[m].height] if m in lef.macros
+                      else [0.0, 0.0] for m in masters]).reshape(-1, 2)[inv]
+    names = list(c.names)
+    x = c.x / dbu + sizes[:, 0] / 2
+    y = c.y / dbu + sizes[:, 1] / 2
+    table, nodes, nets = load_netlist(design_dir / "node.csv", design_dir / "nets.csv")
+    # DEF components first, then node.csv entries the DEF lacks (I/O pins, and
+    # instances the DEF does not have), all keyed by name-table ID
+    def_ids = table.add_many(names)
+    row = np.full(len(table), -1, dtype=np.int64)
+    row[def_ids] = np.arange(len(names))
+    extra = np.flatnonzero(row[nodes.ids] < 0)
+    row[nodes.ids[extra]] = len(names) + np.arange(len(extra))
+    extra_names = table.names(nodes.ids[extra])
+    io = nodes.kinds.index("IO") if "IO" in nodes.kinds else -1
+    extra_m = [nodes.masters[m] if k != io else ""
+               for m, k in zip(nodes.master[extra].tolist(), nodes.kind[extra].tolist())]
+    extra_size = np.array([[lef.macros[m].width, lef.macros[m].height] if m in lef.macros
+                           else [0.0, 0.0] for m in extra_m]).reshape(-1, 2)
+    all_names = names + extra_names
+    all_masters = list(c.masters) + extra_m
+    x = np.concatenate([x, nodes.x[extra] + extra_size[:, 0] / 2])
+    y = np.concatenate([y, nodes.y[extra] + extra_size[:, 1] / 2])
+    sizes = np.concatenate([sizes, extra_size])
+
+    pin_node = row[nets.inst]
+    keep = pin_node >= 0
+    per_net = np.add.reduceat(keep.astype(np.int64), nets.ptr[:-1]) if len(nets) else \
+        np.zeros(0, dtype=np.int64)
+    ptr = np.zeros(len(nets) + 1, dtype=np.int64)
+    np.cumsum(per_net, out=ptr[1:])
+    flat = pin_node[keep]
+    net_names = table.names(nets.ids)
+
+    if gr:
+        capacity = gr[0]
+    else:
+        capacity = track_capacity(d, lef, grid)
+    m = RudyMap(grid, all_names, x, y, sizes, all_masters, net_names, ptr, flat, lef,
+                capacity)
+    cal = calibration_file(design)
+    if use_calibration and cal.is_file():
+        fit = json.loads(cal.read_text())
+        m.scale, m.pin_weight = fit["scale"], fit["pin_weight"]
+    return m
+
+
+# ---------------- correlation ----------------
+def _ranks(v: np.ndarray) -> np.ndarray:
+    r = np.empty(len(v))
+    r[np.argsort(v, kind="stable")] = np.arange(len(v))
+    return r
+
+
+def _stats(est: np.ndarray, actual: np.ndarray, top: float) -> Dict:
+    k = max(int(len(actual) * top), 1)
+    hot_a = set(np.argsort(-est, kind="stable")[:k].tolist())
+    hot_b = set(np.argsort(-actual, kind="stable")[:k].tolist())
+    return {"pearson": float(np.corrcoef(est, actual)[0, 1]),
+            "spearman": float(np.corrcoef(_ranks(est), _ranks(actual))[0, 1]),
+            f"top{k}_overlap": len(hot_a & hot_b) / k}
+
+
+def correlation(m: RudyMap, capacity: np.ndarray, usage: np.ndarray,
+                top: float = 0.01) -> Dict:
+    """RUDY and pin density vs. the GR usage of the same gcells.
+
+    Also fits usage ~ scale * rudy + pin_weight * pins (least squares,
+    non-negative) and compares predicted with actual GR overflow.
+    """
+    if usage.shape != m.grid.shape:
+        raise ValueError(f"GR grid {usage.shape} does not match the estimate "
+                         f"{m.grid.shape}")
+    rudy, pins, actual = m.rudy().ravel(), m.pins.ravel(), usage.ravel()
+    res = {"gcells": int(actual.size)}
+    if actual.size < 2 or actual.std() == 0:
+        return res
+    a = np.stack([rudy, pins], axis=1)
+    coef, *_ = np.linalg.lstsq(a, actual, rcond=None)
+    if (coef < 0).any():
+        coef = np.array([max(float(rudy @ actual / max(rudy @ rudy, 1e-12)), 0.0), 0.0])
+    fit = a @ coef
+    over_est = np.maximum(fit - capacity.ravel(), 0.0)
+    over_gr = np.maximum(actual - capacity.ravel(), 0.0)
+    res.update({
+        "rudy": _stats(rudy, actual, top),
+        "pins": _stats(pins, actual, top),
+        "fit": _stats(fit, actual, top),
+        "scale": float(coef[0]),
+        "pin_weight": float(coef[1]),
+        "max_overflow": [float(over_est.max()), float(over_gr.max())],
+        "total_overflow": [float(over_est.sum()), float(over_gr.sum())],
+    })
+    return res
+
+
+# ---------------- CLI ----------------
+def _random_buffers(m: RudyMap, count: int, seed: int) -> List[Change]:
+    rng = random.Random(seed)
+    nets = [n for n in range(len(m.net_names)) if m.live[n] and len(m.members(n)) >= 3]
+    moves = []
+    for k in range(count):
+        net = rng.choice(nets)
+        sinks = m.members(net)[1:]
+        picked = rng.sample(list(sinks), max(len(sinks) // 2, 1))
+        x = float(np.mean(m.x[picked]))
+        y = float(np.mean(m.y[picked]))
+        moves.append(InsertBuffer(f"rudy_buf_{k}", "BUFx2_ASAP7_75t_R", x, y,
+                                  m.net_names[net], f"rudy_net_{k}",
+                                  tuple((m.node_names[p], "A") for p in picked)))
+    return moves
+
+
+def main():
+    ap = argparse.ArgumentParser(description="RUDY / pin-density congestion estimate.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("report", help="Predicted overflow and hottest gcells")
+    r.add_argument("-n", "--top", type=int, default=10)
+    c = sub.add_parser("check", help="Flag a likely max_gr_overflow regression")
+    c.add_argument("changelist")
+    c.add_argument("--tol", type=float, default=0.5,
+                   help="Allowed rise of the predicted max overflow (tracks)")
+    k = sub.add_parser("correlate", help="Estimate vs. the GR dump of an evaluation log")
+    k.add_argument("--no-save", action="store_true", help="Do not save the fitted scale")
+    k.add_argument("--out", default=None, help="Write the report as JSON here")
+    b = sub.add_parser("bench", help="Full build vs. incremental buffer insertion")
+    b.add_argument("--moves", type=int, default=200)
+    b.add_argument("--seed", type=int, default=1)
+    for p in (r, c, k, b):
+        p.add_argument("-d", "--design", required=True)
+        p.add_argument("--def", dest="def_path", default=None,
+                       help="Placement DEF (default: the benchmark's contest.def)")
+        p.add_argument("--log", default=None,
+                       help="evaluation.log with a GR dump (grid and capacity)")
+    args = ap.parse_args()
+
+    if args.design not in SCENARIOS:
+        print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+        return 1
+    if not resolve_input(BENCH_ROOT / args.design / SCENARIOS[args.design] / "nets.csv").is_file():
+        print(f"ERROR: {args.design}: no node.csv/nets.csv", file=sys.stderr)
+        return 1
+    for p in (args.def_path, args.log, getattr(args, "changelist", None)):
+        if p and not Path(p).is_file():
+            print(f"ERROR: file not found: {p}", file=sys.stderr)
+            return 1
+    if args.cmd == "correlate" and not args.log:
+        print("ERROR: correlate needs --log", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    m = load_map(args.design, args.def_path, args.log,
+                 use_calibration=args.cmd != "correlate")
+    build_s = time.perf_counter() - t0
+    nx, ny = m.grid.shape
+    print(f"===== {args.design}: {len(m.net_names)} nets ({int(m.live.sum())} estimated), "
+          f"{nx}x{ny} gcells, built in {build_s:.2f}s =====")
+    base = m.summary()
+
+    if args.cmd == "report":
+        print("predicted " + "  ".join(f"{key} {v:.4g}" for key, v in base.items()))
+        usage = m.usage()
+        hot = np.argsort(-(usage - m.capacity), axis=None, kind="stable")[:args.top]
+        for flat in hot:
+            i, j = np.unravel_index(flat, usage.shape)
+            print(f"  gcell {i:4d} {j:4d}  usage {usage[i, j]:7.2f}  capacity "
+                  f"{m.capacity[i, j]:6.1f}  pins {int(m.pins[i, j])}")
+    elif args.cmd == "check":
+        try:
+            changes = read_changelist(Path(args.changelist))
+            for change in changes:
+                m.apply(change)
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        after = m.summary()
+        for key in base:
+            print(f"  {key:18s} {base[key]:10.4g} -> {after[key]:10.4g}")
+        reasons = flag_regression(base, after, args.tol)
+        if reasons:
+            print("[WARN] likely max_gr_overflow regression: " + "; ".join(reasons))
+            return 3
+        print(f"OK: {len(changes)} changes, no predicted overflow regression")
+    elif args.cmd == "correlate":
+        capacity, usage = read_gr_grid(Path(args.log)) or (None, None)
+        if usage is None:
+            print(f"ERROR: no GR dump in {args.log}", file=sys.stderr)
+            return 1
+        try:
+            res = correlation(m, capacity, usage)
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        for key, value in res.items():
+            print(f"  {key:16s} {value}")
+        if "scale" in res and not args.no_save:
+            cal = calibration_file(args.design)
+            cal.parent.mkdir(parents=True, exist_ok=True)
+            cal.write_text(json.dumps({"scale": res["scale"], "pin_weight": res["pin_weight"],
+                                       "log": str(args.log)}, indent=2))
+            print(f"fit saved to {cal}")
+        if args.out:
+            Path(args.out).write_text(json.dumps(res, indent=2))
+    else:
+        t0 = time.perf_counter()
+        rudy_maps(m.bbox[m.live], m.factor[m.live], m.grid)
+        full_s = time.perf_counter() - t0
+        moves = _random_buffers(m, args.moves, args.seed)
+        t0 = time.perf_counter()
+        flagged = 0
+        for move in moves:
+            flagged += bool(flag_regression(base, m.trial([move])))
+        inc_s = (time.perf_counter() - t0) / max(len(moves), 1)
+        print(f"full map {full_s * 1e3:.1f} ms, trial buffer {inc_s * 1e3:.3f} ms "
+              f"({full_s / max(inc_s, 1e-9):.0f}x), {len(moves)} moves, {flagged} flagged")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,1093 @@
+#!/usr/bin/env python3
+"""
+Surrogate static timing engine for ranking candidate moves.
+
+A levelized setup-timing model over the benchmark data model (node.csv /
+nets.csv via load_nodes/load_nets of netlist_equiv_check.py), the Liberty
+NLDM tables from liberty.py and placement-based wires:
+
+- net length: HPWL times a Steiner factor, setRC.tcl signal RC per um
+- sink delay: Elmore delay of the driver-to-sink segment, slew degraded as
+  sqrt(s^2 + (ln9 * elmore)^2)
+- cell arcs: NLDM delay/transition at (input slew, driver load), worst of
+  rise and fall
+- ideal clocks (the flows call set_ideal_network), contest.sdc input/output
+  delays, setup checks from the Liberty constraint tables
+
+The graph is levelized once; arrival and slew are propagated level by level
+in NumPy batches. apply() takes changelist entries (changelist.py: resize,
+buffer insertion) and re-propagates only the fanout cone of the touched
+pins, stopping where arrival and slew no longer change. checkpoint() and
+rollback() undo trial moves, so candidates can be ranked without OpenROAD.
+
+It ranks moves, it does not sign off. `correlate` compares its endpoint
+slacks with OpenSTA's, dumped by solution/tcl/util/sta_export.tcl.
+
+python3 surrogate_sta.py report -d aes_cipher_top
+python3 surrogate_sta.py correlate -d aes_cipher_top jpeg_encoder       # runs OpenROAD
+python3 surrogate_sta.py correlate -d aes_cipher_top --sta slacks.txt
+python3 surrogate_sta.py bench -d aes_cipher_top                        # full vs incremental
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from changelist import Change, InsertBuffer, Resize
+from common import BENCH_ROOT, EQUIV_CELLS, FLOW_OPENROAD, OUT_ROOT, SCENARIOS, TCL_DIR, TECH_DIR
+from liberty import PIN_CLOCK, TIMING_TYPES, Liberty, LibertySet, load_libraries
+from netlist_equiv_check import load_equiv_cells, load_nets, load_nodes
+from parse_log import open_text
+
+R_PER_UM = 3.23151e-2       # setRC.tcl set_wire_rc -signal, kOhm/um
+C_PER_UM = 1.73323e-4       # pF/um
+SLEW_RC = math.log(9.0)     # 10-90% slew of an RC step per unit of Elmore delay
+SDC_TIME_SCALE = 1e-3       # contest.sdc is in Liberty time units (ps); model is in ns
+EPS = 1e-7                  # ns; smaller changes stop incremental propagation
+
+COMB_ARCS = {"combinational", "combinational_rise", "combinational_fall", "preset", "clear"}
+LAUNCH_ARCS = {"rising_edge", "falling_edge"}
+SETUP_ARCS = {"setup_rising", "setup_falling", "recovery_rising", "recovery_falling"}
+ARC_EDGE, ARC_SETUP = 0, 1
+NET, CELL = 0, 1
+
+_BUS_BIT_RE = re.compile(r"\[\d+\]$")
+
+
+def steiner_factor(npins: np.ndarray) -> np.ndarray:
+    """RSMT/HPWL ratio by pin count, a log fit to Cheng's table (1.0 up to 3 pins)."""
+    n = np.maximum(np.asarray(npins, dtype=np.float64), 3.0)
+    return 1.0 + 0.39 * np.log(n / 3.0)
+
+
+# ---------------- SDC ----------------
+@dataclass
+class Constraints:
+    period: float = 0.0                                   # ns
+    clock_ports: List[str] = field(default_factory=list)
+    input_delay: Dict[str, float] = field(default_factory=dict)
+    output_delay: Dict[str, float] = field(default_factory=dict)
+
+
+_PORTS_RE = re.compile(r"get_ports\s+(?:\{([^}]*)\}|([^\s\]]+))")
+_PERIOD_RE = re.compile(r"-period\s+([-+\d.eE]+)")
+_OPTS_WITH_ARG = {"-clock", "-reference_pin", "-name", "-period", "-waveform"}
+
+
+def _first_number(tokens: Sequence[str]) -> float:
+    skip = False
+    for t in tokens:
+        if skip:
+            skip = False
+            continue
+        if t in _OPTS_WITH_ARG:
+            skip = True
+            continue
+        try:
+            return float(t)
+        except ValueError:
+            continue
+    return 0.0
+
+
+def read_sdc(path: Path) -> Constraints:
+    """The subset of contest.sdc the surrogate uses (max delays, one clock)."""
+    c = Constraints()
+    with Path(path).open() as f:
+        for line in f:
+            tok = line.split()
+            if not tok:
+                continue
+            ports = [p for m in _PORTS_RE.finditer(line) for p in (m.group(1) or m.group(2)).split()]
+            if tok[0] == "create_clock":
+                m = _PERIOD_RE.search(line)
+                if m:
+                    c.period = float(m.group(1)) * SDC_TIME_SCALE
+                c.clock_ports.extend(ports)
+            elif tok[0] in ("set_input_delay", "set_output_delay"):
+                if "-min" in tok and "-max" not in tok:
+                    continue
+                value = _first_number(tok[1:]) * SDC_TIME_SCALE
+                target = c.input_delay if tok[0] == "set_input_delay" else c.output_delay
+                for p in ports:
+                    target[p] = max(target.get(p, -math.inf), value)
+    return c
+
+
+# ---------------- Liberty tables ----------------
+@dataclass
+class MasterInfo:
+    pins: Dict[str, Tuple[int, float, bool]]                      # pin -> (dir, cap pF, clock)
+    arcs: Dict[Tuple[str, str, int], Tuple[Tuple[int, ...], bool]]  # (from, to, kind) -> (tables, falling)
+
+    def signal_pin(self, direction: int) -> str:
+        names = [p for p, (d, _, clk) in self.pins.items() if d == direction and not clk]
+        if len(names) != 1:
+            raise ValueError(f"expected one pin of direction {direction}, found {names}")
+        return names[0]
+
+
+class TableBank:
+    """All NLDM tables of a LibertySet, padded to [n, K] axes and [n, K, K] values.
+
+    Several timing groups between the same pin pair (state-dependent arcs)
+    are merged into their element-wise maximum when their axes agree.
+    """
+
+    def __init__(self, libs: LibertySet):
+        self.libs = libs
+        self._rows: List[Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[int, int]]] = []
+        self._ids: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+        self.masters: Dict[str, MasterInfo] = {}
+        for name, (lib, cid) in libs.where.items():
+            self.masters[name] = self._master(lib, cid)
+        self._freeze()
+
+    def _add(self, lib: Liberty, tids: List[int]) -> int:
+        if not tids:
+            return -1
+        key = (id(lib), tuple(tids))
+        if key in self._ids:
+            return self._ids[key]
+        i1, i2, vals = lib.table(tids[0])
+        vals = np.array(vals)
+        for t in tids[1:]:
+            o1, o2, ov = lib.table(t)
+            if ov.shape == vals.shape and np.array_equal(o1, i1) and np.array_equal(o2, i2):
+                vals = np.maximum(vals, ov)
+        var = tuple(int(v) for v in lib.tab_var[tids[0]])
+        self._rows.append((np.array(i1), np.array(i2), vals, var))
+        self._ids[key] = len(self._rows) - 1
+        return self._ids[key]
+
+    def _master(self, lib: Liberty, cid: int) -> MasterInfo:
+        pins = {}
+        raw: Dict[Tuple[str, str, int], Tuple[List[List[int]], bool]] = {}
+        for p in lib.pins(cid):
+            name = lib.pin_name_of(p)
+            pins[name] = (int(lib.pin_dir[p]), float(lib.pin_cap[p]),
+                          bool(lib.pin_flags[p] & PIN_CLOCK))
+            for a in lib.arcs(p):
+                if lib.arc_from[a] < 0:
+                    continue
+                ttype = TIMING_TYPES[lib.arc_type[a]]
+                if ttype in COMB_ARCS or ttype in LAUNCH_ARCS:
+                    kind = ARC_EDGE
+                elif ttype in SETUP_ARCS:
+                    kind = ARC_SETUP
+                else:
+                    continue
+                key = (lib.pin_name_of(lib.arc_from[a]), name, kind)
+                slots, _ = raw.setdefault(key, ([[], [], [], []], ttype.endswith("falling")
+                                                or ttype == "falling_edge"))
+                for s in range(4):
+                    if lib.arc_tables[a][s] >= 0:
+                        slots[s].append(int(lib.arc_tables[a][s]))
+        arcs = {key: (tuple(self._add(lib, tids) for tids in slots), falling)
+                for key, (slots, falling) in raw.items()}
+        return MasterInfo(pins, arcs)
+
+    def _freeze(self) -> None:
+        k = max(max(len(r[0]), len(r[1])) for r in self._rows)
+        n = len(self._rows)
+        self.i1 = np.full((n, k), np.inf)
+        self.i2 = np.full((n, k), np.inf)
+        self.vals = np.zeros((n, k, k))
+        self.n1 = np.zeros(n, dtype=np.int64)
+        self.n2 = np.zeros(n, dtype=np.int64)
+        self.var = np.zeros((n, 2), dtype=np.int64)
+        for t, (i1, i2, vals, var) in enumerate(self._rows):
+            self.i1[t, :len(i1)] = i1
+            self.i2[t, :len(i2)] = i2
+            self.vals[t, :vals.shape[0], :vals.shape[1]] = vals
+            self.n1[t], self.n2[t] = len(i1), len(i2)
+            self.var[t] = var
+
+    @staticmethod
+    def _axis(axis: np.ndarray, n: np.ndarray, x: np.ndarray):
+        k = np.clip((axis <= x[:, None]).sum(1) - 1, 0, np.maximum(n - 2, 0))
+        kb = np.minimum(k + 1, n - 1)
+        lo = np.take_along_axis(axis, k[:, None], 1)[:, 0]
+        hi = np.take_along_axis(axis, kb[:, None], 1)[:, 0]
+        den = np.where(kb > k, hi - lo, 1.0)
+        return k, kb, np.where(kb > k, (x - lo) / den, 0.0)
+
+    def lookup(self, t: np.ndarray, slew, load, related=0.0) -> np.ndarray:
+        """Bilinear lookup/extrapolation of tables t; axes pick slew/load/related by variable."""
+        t = np.asarray(t, dtype=np.int64)
+        zero = np.zeros(t.shape)
+        # Indexed by liberty.VARIABLES: "", input_net_transition,
+        # total_output_net_capacitance, constrained_pin_transition, related_pin_transition.
+        x = np.stack(np.broadcast_arrays(zero, slew, load, slew, related))
+        rows = np.arange(len(t))
+        x1 = x[self.var[t, 0], rows]
+        x2 = x[self.var[t, 1], rows]
+        k1, k1b, w1 = self._axis(self.i1[t], self.n1[t], x1)
+        k2, k2b, w2 = self._axis(self.i2[t], self.n2[t], x2)
+        v = self.vals
+        return ((1 - w1) * ((1 - w2) * v[t, k1, k2] + w2 * v[t, k1, k2b])
+                + w1 * ((1 - w2) * v[t, k1b, k2] + w2 * v[t, k1b, k2b]))
+
+    def worst(self, ta: np.ndarray, tb: np.ndarray, slew, load, related=0.0) -> np.ndarray:
+        """Max of two table lookups (rise/fall); missing tables (-1) are skipped."""
+        slew, load, related = np.broadcast_arrays(slew, load, related)
+        out = np.full(len(ta), -np.inf)
+        for t in (ta, tb):
+            m = t >= 0
+            if m.any():
+                out[m] = np.maximum(out[m], self.lookup(t[m], slew[m], load[m], related[m]))
+        out[np.isneginf(out)] = 0.0
+        return out
+
+
+# ---------------- timing graph ----------------
+def _gather(ptr: np.ndarray, items: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Concatenated CSR rows of keys."""
+    start = ptr[keys]
+    count = ptr[keys + 1] - start
+    total = int(count.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offs = np.repeat(start - np.cumsum(count) + count, count) + np.arange(total)
+    return items[offs]
+
+
+def _csr(keys: np.ndarray, items: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(keys, kind="stable")
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=ptr[1:])
+    return ptr, items[order]
+
+
+# Per-pin and per-edge arrays with the value new entries start with.
+PIN_ARRAYS = {"x": 0.0, "y": 0.0, "cap": 0.0, "is_clock": False, "base_arr": -np.inf,
+              "base_slew": 0.0, "arr": -np.inf, "slew": 0.0, "load": 0.0, "level": 0,
+              "pin_net": -1, "pin_inst": -1}
+EDGE_ARRAYS = {"e_src": 0, "e_dst": 0, "e_kind": NET, "e_wire_delay": 0.0,
+               "e_wire_slew": 0.0, "e_offset": 0.0, "e_alive": True, "e_delay": 0.0}
+
+
+class SurrogateTimer:
+    def __init__(self, nodes: Dict[str, Tuple[str, str, float, float]],
+                 nets: Dict[str, Tuple[Tuple[str, str], List[Tuple[str, str]]]],
+                 bank: TableBank, sdc: Constraints):
+        self.bank = bank
+        self.sdc = sdc
+        self._undo: Optional[List[Callable[[], None]]] = None
+        self._marks: List[int] = []
+        self.unknown_masters = set()
+
+        self.pin_names: List[str] = []
+        self.pin_index: Dict[str, int] = {}
+        self.inst_names: List[str] = []
+        self.inst_index: Dict[str, int] = {}
+        self.inst_master: List[str] = []
+        self.inst_pins: List[Dict[str, int]] = []
+        self.inst_edges: List[Dict[Tuple[str, str, int], int]] = []
+        self.net_names: List[str] = []
+        self.net_index: Dict[str, int] = {}
+        self.net_pins: List[List[int]] = []
+        self.net_edges: List[List[int]] = []     # edge per sink, -1 for ideal clock sinks
+
+        for name, (master, kind, _, _) in nodes.items():
+            if kind != "IO":
+                self.inst_index[name] = len(self.inst_names)
+                self.inst_names.append(name)
+                self.inst_master.append(master)
+                self.inst_pins.append({})
+                self.inst_edges.append({})
+
+        # Pins in net order, then the arrays in one go.
+        px, py, pcap, pclk, pinst = [], [], [], [], []
+
+        def pin_id(inst: str, pin: str) -> int:
+            port = pin in ("", "_IO_")
+            name = inst if port else f"{inst}/{pin}"
+            pid = self.pin_index.get(name)
+            if pid is not None:
+                return pid
+            pid = self.pin_index[name] = len(self.pin_names)
+            self.pin_names.append(name)
+            x, y = nodes[inst][2:] if inst in nodes else (0.0, 0.0)
+            px.append(x)
+            py.append(y)
+            cap, clk, iid = 0.0, False, -1
+            if not port and inst in self.inst_index:
+                iid = self.inst_index[inst]
+                info = self.bank.masters.get(self.inst_master[iid])
+                if info is None:
+                    self.unknown_masters.add(self.inst_master[iid])
+                else:
+                    _, cap, clk = info.pins.get(_BUS_BIT_RE.sub("", pin), (0, 0.0, False))
+                self.inst_pins[iid][pin] = pid
+            pcap.append(cap)
+            pclk.append(clk)
+            pinst.append(iid)
+            return pid
+
+        src, dst, pin_net = [], [], {}
+        for name, (driver, sinks) in nets.items():
+            nid = self.net_index[name] = len(self.net_names)
+            self.net_names.append(name)
+            d = pin_id(*driver)
+            pins = [d] + [pin_id(*s) for s in sinks]
+            edges = []
+            for s in pins[1:]:
+                if pclk[s]:
+                    edges.append(-1)
+                else:
+                    edges.append(len(src))
+                    src.append(d)
+                    dst.append(s)
+            self.net_pins.append(pins)
+            self.net_edges.append(edges)
+            for p in pins:
+                pin_net[p] = nid
+
+        n = len(self.pin_names)
+        for attr, default in PIN_ARRAYS.items():
+            setattr(self, attr, np.full(n, default))
+        self.x[:] = px
+        self.y[:] = py
+        self.cap[:] = pcap
+        self.is_clock[:] = pclk
+        self.pin_inst[:] = pinst
+        self.level = self.level.astype(np.int64)
+        self.pin_net = self.pin_net.astype(np.int64)
+        self.pin_inst = self.pin_inst.astype(np.int64)
+        for p, nid in pin_net.items():
+            self.pin_net[p] = nid
+
+        # Cell arcs and setup checks of every instance.
+        kinds, tabs, offsets = [NET] * len(src), [(-1, -1, -1, -1)] * len(src), [0.0] * len(src)
+        checks = []
+        for iid in range(len(self.inst_names)):
+            edges, inst_checks = self._arc_tables(iid)
+            for key, (frm, to, tab, offset) in edges.items():
+                self.inst_edges[iid][key] = len(src)
+                src.append(frm)
+                dst.append(to)
+                kinds.append(CELL)
+                tabs.append(tab)
+                offsets.append(offset)
+            checks.extend((iid, c) for c in inst_checks)
+
+        e = len(src)
+        for attr, default in EDGE_ARRAYS.items():
+            setattr(self, attr, np.full(e, default))
+        self.e_src = np.array(src, dtype=np.int64)
+        self.e_dst = np.array(dst, dtype=np.int64)
+        self.e_kind = np.array(kinds, dtype=np.int8)
+        self.e_offset = np.array(offsets, dtype=np.float64)
+        self.e_tab = np.array(tabs, dtype=np.int64).reshape(e, 4)
+        self.chk_data = np.array([c[0] for _, c in checks], dtype=np.int64)
+        self.chk_clock = np.array([c[1] for _, c in checks], dtype=np.int64)
+        self.chk_tab = np.array([c[2] for _, c in checks], dtype=np.int64).reshape(-1, 2)
+        self.chk_req = np.array([c[3] for _, c in checks], dtype=np.float64)
+        self.chk_inst = np.array([iid for iid, _ in checks], dtype=np.int64)
+        self.chk_alive = np.ones(len(checks), dtype=bool)
+
+        # Sources: ideal clock pins and constrained input ports.
+        self.base_arr[self.is_clock] = 0.0
+        clocks = set(sdc.clock_ports)
+        for port, delay in sdc.input_delay.items():
+            pid = self.pin_index.get(port)
+            if pid is not None and port not in clocks:
+                self.base_arr[pid] = delay
+        outs = [(self.pin_index[p], sdc.period - d) for p, d in sdc.output_delay.items()
+                if p in self.pin_index]
+        self.out_pin = np.array([p for p, _ in outs], dtype=np.int64)
+        self.out_req = np.array([r for _, r in outs], dtype=np.float64)
+
+        self._index_edges()
+        self.cyclic_edges = self._levelize()
+        self._index_levels()
+        self._update_nets(range(len(self.net_names)))
+        self.update_timing()
+
+    # ---------------- undo log ----------------
+    def _log(self, fn: Callable[[], None]) -> None:
+        if self._undo is not None:
+            self._undo.append(fn)
+
+    def _set(self, name: str, idx, values) -> None:
+        arr = getattr(self, name)
+        if self._undo is not None:
+            if not isinstance(idx, (int, np.integer, slice)):
+                idx = np.array(idx, copy=True)
+            old = np.array(arr[idx], copy=True)
+            self._undo.append(lambda a=arr, i=idx, v=old: a.__setitem__(i, v))
+        arr[idx] = values
+
+    def _replace(self, name: str, value) -> None:
+        old = getattr(self, name, None)
+        self._log(lambda o=old: setattr(self, name, o))
+        setattr(self, name, value)
+
+    def _append(self, items: list, value) -> None:
+        items.append(value)
+        self._log(items.pop)
+
+    def _setitem(self, items, key, value) -> None:
+        if isinstance(items, dict) and key not in items:
+            self._log(lambda: items.pop(key))
+        else:
+            old = items[key]
+            self._log(lambda: items.__setitem__(key, old))
+        items[key] = value
+
+    def checkpoint(self) -> None:
+        """Start recording changes; rollback() returns to this point."""
+        if self._undo is None:
+            self._undo = []
+        self._marks.append(len(self._undo))
+
+    def rollback(self) -> None:
+        mark = self._marks.pop()
+        while len(self._undo) > mark:
+            self._undo.pop()()
+        if not self._marks:
+            self._undo = None
+
+    def commit(self) -> None:
+        self._marks.pop()
+        if not self._marks:
+            self._undo = None
+
+    # ---------------- structure ----------------
+    def _grow_pins(self, k: int) -> np.ndarray:
+        n = len(self.x)
+        for attr, default in PIN_ARRAYS.items():
+            old = getattr(self, attr)
+            self._replace(attr, np.concatenate([old, np.full(k, default, dtype=old.dtype)]))
+        return np.arange(n, n + k)
+
+    def _new_edges(self, src: Sequence[int], dst: Sequence[int], kind: int,
+                   tabs: Optional[Sequence[Sequence[int]]] = None,
+                   offsets: Optional[Sequence[float]] = None) -> np.ndarray:
+        k = len(src)
+        e0 = len(self.e_src)
+        values = {"e_src": src, "e_dst": dst, "e_kind": [kind] * k}
+        if offsets is not None:
+            values["e_offset"] = offsets
+        for attr, default in EDGE_ARRAYS.items():
+            old = getattr(self, attr)
+            new = np.array(values[attr], dtype=old.dtype) if attr in values \
+                else np.full(k, default, dtype=old.dtype)
+            self._replace(attr, np.concatenate([old, new]))
+        tab = np.array(tabs, dtype=np.int64).reshape(k, 4) if tabs is not None \
+            else np.full((k, 4), -1, dtype=np.int64)
+        self._replace("e_tab", np.concatenate([self.e_tab, tab]))
+        return np.arange(e0, e0 + k)
+
+    def _arc_tables(self, iid: int):
+        """Cell edges and setup checks of an instance's master, limited to connected pins."""
+        info = self.bank.masters.get(self.inst_master[iid])
+        if info is None:
+            return {}, []
+        pins = self.inst_pins[iid]
+        half = self.sdc.period / 2.0
+        edges, checks = {}, []
+        for (frm, to, kind), (tabs, falling) in info.arcs.items():
+            if frm not in pins or to not in pins:
+                continue
+            if kind == ARC_EDGE:
+                edges[(frm, to, kind)] = (pins[frm], pins[to], tabs, half if falling else 0.0)
+            else:
+                checks.append((pins[to], pins[frm], tabs[:2],
+                               half if falling else self.sdc.period))
+        return edges, checks
+
+    def _add_inst_arcs(self, iid: int) -> None:
+        edges, checks = self._arc_tables(iid)
+        if edges:
+            keys = list(edges)
+            ids = self._new_edges([edges[k][0] for k in keys], [edges[k][1] for k in keys],
+                                  CELL, [edges[k][2] for k in keys], [edges[k][3] for k in keys])
+            for key, e in zip(keys, ids):
+                self._setitem(self.inst_edges[iid], key, int(e))
+        if checks:
+            self._add_checks(iid, checks)
+
+    def _add_checks(self, iid: int, checks) -> None:
+        self._replace("chk_data", np.append(self.chk_data, [c[0] for c in checks]))
+        self._replace("chk_clock", np.append(self.chk_clock, [c[1] for c in checks]))
+        self._replace("chk_tab", np.concatenate(
+            [self.chk_tab, np.array([c[2] for c in checks], dtype=np.int64).reshape(-1, 2)]))
+        self._replace("chk_req", np.append(self.chk_req, [c[3] for c in checks]))
+        self._replace("chk_inst", np.append(self.chk_inst, [iid] * len(checks)))
+        self._replace("chk_alive", np.append(self.chk_alive, [True] * len(checks)))
+
+    def _index_edges(self) -> None:
+        alive = np.flatnonzero(self.e_alive)
+        n = len(self.x)
+        in_ptr, in_edges = _csr(self.e_dst[alive], alive, n)
+        out_ptr, out_edges = _csr(self.e_src[alive], alive, n)
+        for name, value in (("in_ptr", in_ptr), ("in_edges", in_edges),
+                            ("out_ptr", out_ptr), ("out_edges", out_edges)):
+            self._replace(name, value)
+
+    def _index_levels(self) -> None:
+        order = np.argsort(self.level, kind="stable")
+        ptr = np.zeros(int(self.level.max(initial=0)) + 2, dtype=np.int64)
+        np.cumsum(np.bincount(self.level, minlength=len(ptr) - 1), out=ptr[1:])
+        self._replace("lvl_order", order)
+        self._replace("lvl_ptr", ptr)
+
+    def _levelize(self) -> int:
+        """Longest-path levels; edges closing a combinational loop are disabled."""
+        n = len(self.x)
+        indeg = np.bincount(self.e_dst[self.e_alive], minlength=n)
+        level = np.zeros(n, dtype=np.int64)
+        done = np.zeros(n, dtype=bool)
+        frontier = np.flatnonzero(indeg == 0)
+        depth = 0
+        while frontier.size:
+            level[frontier] = depth
+            done[frontier] = True
+            e = _gather(self.out_ptr, self.out_edges, frontier)
+            dst = self.e_dst[e]
+            np.subtract.at(indeg, dst, 1)
+            frontier = np.unique(dst[indeg[dst] == 0])
+            depth += 1
+        cyclic = 0
+        if not done.all():
+            # Loop pins go after everything else; their back edges are dropped.
+            level[~done] = depth
+            bad = np.flatnonzero(self.e_alive & ~done[self.e_src] & ~done[self.e_dst])
+            self.e_alive[bad] = False
+            cyclic = len(bad)
+            self._index_edges()
+        self.level = level
+        return cyclic
+
+    def _relevel(self, start: Iterable[int]) -> None:
+        """Push levels down the fanout of start so every edge goes to a higher level."""
+        stack = list(start)
+        while stack:
+            p = stack.pop()
+            e = self.out_edges[self.out_ptr[p]:self.out_ptr[p + 1]]
+            dst = self.e_dst[e]
+            low = dst[self.level[dst] <= self.level[p]]
+            if low.size:
+                self._set("level", low, self.level[p] + 1)
+                stack.extend(low.tolist())
+
+    def _update_nets(self, net_ids: Iterable[int]) -> None:
+        """Wire load of the drivers and Elmore delay/slew of the sink edges."""
+        lists = [self.net_pins[n] for n in net_ids]
+        if not lists:
+            return
+        counts = np.array([len(p) for p in lists], dtype=np.int64)
+        flat = np.fromiter(chain.from_iterable(lists), dtype=np.int64, count=int(counts.sum()))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        x, y, cap = self.x[flat], self.y[flat], self.cap[flat]
+        hpwl = (np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts)
+                + np.maximum.reduceat(y, starts) - np.minimum.reduceat(y, starts))
+        drivers = flat[starts]
+        sink_cap = np.add.reduceat(cap, starts) - cap[starts]
+        self._set("load", drivers, C_PER_UM * hpwl * steiner_factor(counts) + sink_cap)
+
+        edges = np.fromiter(chain.from_iterable(self.net_edges[n] for n in net_ids),
+                            dtype=np.int64, count=int(counts.sum() - len(counts)))
+        is_sink = np.ones(len(flat), dtype=bool)
+        is_sink[starts] = False
+        sinks = flat[is_sink]
+        drv = np.repeat(drivers, counts - 1)
+        keep = edges >= 0
+        edges, sinks, drv = edges[keep], sinks[keep], drv[keep]
+        dist = np.abs(self.x[sinks] - self.x[drv]) + np.abs(self.y[sinks] - self.y[drv])
+        elmore = R_PER_UM * dist * (C_PER_UM * dist / 2.0 + self.cap[sinks])
+        self._set("e_wire_delay", edges, elmore)
+        self._set("e_wire_slew", edges, SLEW_RC * elmore)
+
+    # ---------------- propagation ----------------
+    def _edge_timing(self, e: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        s_in = self.slew[self.e_src[e]]
+        delay = self.e_wire_delay[e].copy()
+        slew = np.sqrt(s_in * s_in + self.e_wire_slew[e] ** 2)
+        c = np.flatnonzero(self.e_kind[e] == CELL)
+        if c.size:
+            ec = e[c]
+            tab = self.e_tab[ec]
+            load = self.load[self.e_dst[ec]]
+            delay[c] = self.bank.worst(tab[:, 0], tab[:, 1], s_in[c], load) + self.e_offset[ec]
+            slew[c] = self.bank.worst(tab[:, 2], tab[:, 3], s_in[c], load)
+        return delay, slew
+
+    def _recompute(self, pins: np.ndarray) -> None:
+        """Arrival/slew of pins (all on one level) from their fanin edges."""
+        self._set("arr", pins, self.base_arr[pins])
+        self._set("slew", pins, self.base_slew[pins])
+        e = _gather(self.in_ptr, self.in_edges, pins)
+        if not e.size:
+            return
+        delay, slew = self._edge_timing(e)
+        self._set("e_delay", e, delay)
+        src_arr = self.arr[self.e_src[e]]
+        slew[np.isneginf(src_arr)] = 0.0
+        dst = self.e_dst[e]
+        np.maximum.at(self.arr, dst, src_arr + delay)
+        np.maximum.at(self.slew, dst, slew)
+
+    def update_timing(self) -> None:
+        """Full propagation, one NumPy batch per level."""
+        self._set("arr", slice(None), self.base_arr)
+        self._set("slew", slice(None), self.base_slew)
+        for lvl in range(1, len(self.lvl_ptr) - 1):
+            self.recompute_level(lvl)
+
+    def recompute_level(self, lvl: int) -> None:
+        """Arrival/slew of the pins on one level from their fanin; nothing downstream."""
+        pins = self.lvl_order[self.lvl_ptr[lvl]:self.lvl_ptr[lvl + 1]]
+        if pins.size:
+            self._recompute(pins)
+
+    def _propagate(self, dirty: Iterable[int]) -> int:
+        """Incremental propagation from dirty pins; returns the pins recomputed."""
+        buckets: Dict[int, set] = {}
+        for p in dirty:
+            buckets.setdefault(int(self.level[p]), set()).add(int(p))
+        done = 0
+        while buckets:
+            lvl = min(buckets)
+            pins = np.fromiter(buckets.pop(lvl), dtype=np.int64)
+            old_arr, old_slew = self.arr[pins].copy(), self.slew[pins].copy()
+            self._recompute(pins)
+            done += len(pins)
+            new_arr = self.arr[pins]
+            with np.errstate(invalid="ignore"):
+                moved = ~(((old_arr == new_arr) | (np.abs(old_arr - new_arr) <= EPS))
+                          & (np.abs(old_slew - self.slew[pins]) <= EPS))
+            changed = pins[moved]
+            if not changed.size:
+                continue
+            fanout = self.e_dst[_gather(self.out_ptr, self.out_edges, changed)]
+            for p, l in zip(fanout.tolist(), self.level[fanout].tolist()):
+                buckets.setdefault(l, set()).add(p)
+        return done
+
+    # ---------------- results ----------------
+    def endpoint_required(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(endpoint pins, required times) of setup checks and output ports."""
+        alive = np.flatnonzero(self.chk_alive)
+        data = self.chk_data[alive]
+        tab = self.chk_tab[alive]
+        setup = self.bank.worst(tab[:, 0], tab[:, 1], self.slew[data], 0.0,
+                                self.slew[self.chk_clock[alive]])
+        pins = np.concatenate([data, self.out_pin])
+        req = np.concatenate([self.chk_req[alive] - setup, self.out_req])
+        return pins, req
+
+    def endpoint_slacks(self) -> Dict[str, float]:
+        """Worst slack per constrained endpoint (ns)."""
+        pins, req = self.endpoint_required()
+        slack = req - self.arr[pins]
+        out: Dict[str, float] = {}
+        for p, s in zip(pins.tolist(), slack.tolist()):
+            if math.isfinite(s):
+                name = self.pin_names[p]
+                out[name] = min(out.get(name, math.inf), s)
+        return out
+
+    def summary(self) -> Tuple[float, float]:
+        """(worst slack, total negative slack) over endpoints, ns."""
+        pins, req = self.endpoint_required()
+        slack = req - self.arr[pins]
+        slack = slack[np.isfinite(slack)]
+        if not slack.size:
+            return 0.0, 0.0
+        return float(slack.min()), float(np.minimum(slack, 0.0).sum())
+
+    def pin_slacks(self) -> np.ndarray:
+        """Setup slack of every pin (backward required-time propagation)."""
+        req = np.full(len(self.x), np.inf)
+        pins, ep_req = self.endpoint_required()
+        np.minimum.at(req, pins, ep_req)
+        for lvl in range(len(self.lvl_ptr) - 2, -1, -1):
+            src = self.lvl_order[self.lvl_ptr[lvl]:self.lvl_ptr[lvl + 1]]
+            e = _gather(self.out_ptr, self.out_edges, src)
+            if e.size:
+                np.minimum.at(req, self.e_src[e], req[self.e_dst[e]] - self.e_delay[e])
+        return req - self.arr
+
+    # ---------------- moves ----------------
+    def resize(self, inst: str, master: str) -> int:
+        iid = self.inst_index.get(inst)
+        if iid is None:
+            raise ValueError(f"unknown instance {inst}")
+        info = self.bank.masters.get(master)
+        if info is None:
+            raise ValueError(f"unknown master {master}")
+        old_keys = set(self._arc_tables(iid)[0])
+        self._setitem(self.inst_master, iid, master)
+        touched = set()
+        for pin, pid in self.inst_pins[iid].items():
+            _, cap, _ = info.pins.get(_BUS_BIT_RE.sub("", pin), (0, 0.0, False))
+            if cap != self.cap[pid]:
+                self._set("cap", pid, cap)
+                touched.add(int(self.pin_net[pid]))
+        edges, checks = self._arc_tables(iid)
+        if set(edges) == old_keys:
+            ids = [self.inst_edges[iid][k] for k in edges]
+            self._set("e_tab", ids, np.array([edges[k][2] for k in edges], dtype=np.int64))
+            self._set("e_offset", ids, [edges[k][3] for k in edges])
+            mine = np.flatnonzero((self.chk_inst == iid) & self.chk_alive)
+            if len(mine) == len(checks):
+                self._set("chk_tab", mine,
+                          np.array([c[2] for c in checks], dtype=np.int64).reshape(-1, 2))
+            else:
+                self._set("chk_alive", mine, False)
+                self._add_checks(iid, checks)
+        else:
+            self._set("e_alive", list(self.inst_edges[iid].values()), False)
+            self._set("chk_alive", np.flatnonzero(self.chk_inst == iid), False)
+            self._setitem(self.inst_edges, iid, {})
+            self._add_inst_arcs(iid)
+            self._index_edges()
+            self._relevel([p for p in self.inst_pins[iid].values()])
+            self._index_levels()
+        touched.discard(-1)
+        self._update_nets(sorted(touched))
+        dirty = set(self.inst_pins[iid].values())
+        for n in touched:
+            dirty.update(self.net_pins[n])
+        return self._propagate(dirty)
+
+    def resize_many(self, iids: Sequence[int], masters: Sequence[str]) -> None:
+        """Resize many instances; nets are updated, timing is not (update_timing()).
+
+        Meant for masters with the current master's arcs (other size or Vt of
+        the same function): their tables and pin caps are swapped in bulk.
+        Anything else (other arcs, setup checks) goes through resize().
+        """
+        edges, tabs, offsets, pins, caps, slow = [], [], [], [], [], []
+        touched = set()
+        for iid, master in zip(iids, masters):
+            info = self.bank.masters.get(master)
+            if info is None:
+                raise ValueError(f"unknown master {master}")
+            old_master, old_keys = self.inst_master[iid], set(self.inst_edges[iid])
+            self._setitem(self.inst_master, iid, master)
+            new_edges, checks = self._arc_tables(iid)
+            if checks or set(new_edges) != old_keys:
+                self._setitem(self.inst_master, iid, old_master)
+                slow.append((iid, master))
+                continue
+            for key, (_, _, tab, offset) in new_edges.items():
+                edges.append(self.inst_edges[iid][key])
+                tabs.append(tab)
+                offsets.append(offset)
+            for pin, pid in self.inst_pins[iid].items():
+                _, cap, _ = info.pins.get(_BUS_BIT_RE.sub("", pin), (0, 0.0, False))
+                if cap != self.cap[pid]:
+                    pins.append(pid)
+                    caps.append(cap)
+                    touched.add(int(self.pin_net[pid]))
+        if edges:
+            self._set("e_tab", edges, np.array(tabs, dtype=np.int64).reshape(-1, 4))
+            self._set("e_offset", edges, offsets)
+        if pins:
+            self._set("cap", pins, caps)
+        touched.discard(-1)
+        self._update_nets(sorted(touched))
+        for iid, master in slow:
+            self.resize(self.inst_names[iid], master)
+
+    def insert_buffer(self, name: str, master: str, x: float, y: float, net: str,
+                      new_net: str, sinks: Sequence[Tuple[str, str]]) -> int:
+        nid = self.net_index.get(net)
+        if nid is None:
+            raise ValueError(f"unknown net {net}")
+        if new_net in self.net_index or name in self.inst_index:
+            raise ValueError(f"{new_net} or {name} already exists")
+        info = self.bank.masters.get(master)
+        if info is None:
+            raise ValueError(f"unknown master {master}")
+        in_pin, out_pin = info.signal_pin(0), info.signal_pin(1)
+        moved = []
+        for inst, pin in sinks:
+            pid = self.pin_index.get(f"{inst}/{pin}")
+            if pid is None or pid not in self.net_pins[nid][1:]:
+                raise ValueError(f"{inst}/{pin} is not a sink of {net}")
+            moved.append(pid)
+
+        iid = len(self.inst_names)
+        a, z = self._grow_pins(2).tolist()
+        for pid, pin in ((a, in_pin), (z, out_pin)):
+            pname = f"{name}/{pin}"
+            self._append(self.pin_names, pname)
+            self._setitem(self.pin_index, pname, pid)
+        self._set("x", [a, z], x)
+        self._set("y", [a, z], y)
+        self._set("cap", a, info.pins[in_pin][1])
+        self._set("pin_inst", [a, z], iid)
+        self._append(self.inst_names, name)
+        self._setitem(self.inst_index, name, iid)
+        self._append(self.inst_master, master)
+        self._append(self.inst_pins, {in_pin: a, out_pin: z})
+        self._append(self.inst_edges, {})
+
+        # Old net keeps its other sinks and drives the buffer input.
+        driver = self.net_pins[nid][0]
+        keep_pins, keep_edges, gone = [], [], []
+        for p, e in zip(self.net_pins[nid][1:], self.net_edges[nid]):
+            if p in moved:
+                if e >= 0:
+                    gone.append(e)
+            else:
+                keep_pins.append(p)
+                keep_edges.append(e)
+        self._set("e_alive", gone, False)
+        (ea,) = self._new_edges([driver], [a], NET).tolist()
+        self._setitem(self.net_pins, nid, [driver] + keep_pins + [a])
+        self._setitem(self.net_edges, nid, keep_edges + [ea])
+
+        # New net from the buffer output to the moved sinks.
+        mid = len(self.net_names)
+        self._append(self.net_names, new_net)
+        self._setitem(self.net_index, new_net, mid)
+        timed = [p for p in moved if not self.is_clock[p]]
+        new_edges = dict(zip(timed, self._new_edges([z] * len(timed), timed, NET).tolist()))
+        self._append(self.net_pins, [z] + moved)
+        self._append(self.net_edges, [new_edges.get(p, -1) for p in moved])
+        self._set("pin_net", a, nid)
+        self._set("pin_net", [z] + moved, mid)
+
+        self._add_inst_arcs(iid)
+        self._index_edges()
+        self._set("level", a, self.level[driver] + 1)
+        self._set("level", z, self.level[driver] + 2)
+        self._relevel([z])
+        self._index_levels()
+        self._update_nets([nid, mid])
+        return self._propagate({driver, a, z, *moved})
+
+    def apply(self, change: Change) -> int:
+        """Apply one changelist entry; returns the number of pins re-timed."""
+        if isinstance(change, Resize):
+            return self.resize(change.inst, change.master)
+        if isinstance(change, InsertBuffer):
+            return self.insert_buffer(change.name, change.master, change.x, change.y,
+                                      change.net, change.new_net, change.sinks)
+        raise ValueError(f"unsupported change {change!r}")
+
+    def trial(self, changes: Sequence[Change]) -> Tuple[float, float]:
+        """(worst slack, TNS) after the changes; the timer is left unchanged."""
+        self.checkpoint()
+        try:
+            for c in changes:
+                self.apply(c)
+            return self.summary()
+        finally:
+            self.rollback()
+
+    def rank(self, moves: Sequence[Sequence[Change]]) -> List[Tuple[int, float, float]]:
+        """(move index, delta TNS, delta WNS) sorted best first."""
+        wns0, tns0 = self.summary()
+        scored = []
+        for i, move in enumerate(moves):
+            try:
+                wns, tns = self.trial(move)
+            except ValueError:
+                continue
+            scored.append((i, tns - tns0, wns - wns0))
+        scored.sort(key=lambda s: (-s[1], -s[2]))
+        return scored
+
+
+def load_timer(design: str, design_dir: Optional[Path] = None,
+               libs: Optional[LibertySet] = None) -> SurrogateTimer:
+    design_dir = Path(design_dir) if design_dir else BENCH_ROOT / design / SCENARIOS[design]
+    bank = TableBank(libs or load_libraries())
+    return SurrogateTimer(load_nodes(str(design_dir / "node.csv")),
+                          load_nets(str(design_dir / "nets.csv")),
+                          bank, read_sdc(design_dir / "contest.sdc"))
+
+
+# ---------------- OpenSTA correlation ----------------
+def read_sta_slacks(path: Path) -> Dict[str, float]:
+    slacks = {}
+    with open_text(path) as f:
+        for line in f:
+            tok = line.split()
+            if len(tok) == 3 and tok[0] == "endpoint":
+                try:
+                    slacks[tok[1]] = float(tok[2])
+                except ValueError:
+                    continue
+    return slacks
+
+
+def dump_sta_slacks(design: str, out_file: Path, openroad: str = FLOW_OPENROAD,
+                    export: str = "sta_export_endpoint_slacks") -> None:
+    """Run the baseline setup (read, setRC, estimate_parasitics -placement) and dump slacks
+    with one of the sta_export.tcl procs."""
+    from odb_checkpoint import setup_only_tcl
+    scenario = SCENARIOS[design]
+    text = setup_only_tcl("baseline")
+    text = text[:text.rstrip().rfind("exit")]
+    values = {"DESIGN_NAME": design, "TECH_DIR": str(TECH_DIR),
+              "DESIGN_DIR": str(BENCH_ROOT / design / scenario),
+              "OUTPUT_DIR": str(out_file.parent), "DESIGN_DB": "", "TCL_DIR": str(TCL_DIR)}
+    for name, value in values.items():
+        text = text.replace(f"$::env({name})", f'"{value}"')
+    text += (f'source "{TCL_DIR}/util/sta_export.tcl"\n'
+             f'{export} "{out_file}"\nexit\n')
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".tcl", delete=False) as f:
+        f.write(text)
+        tcl = f.name
+    try:
+        with (out_file.parent / "sta_dump.log").open("w") as log:
+            proc = subprocess.run([openroad, "-no_init", "-exit", tcl], stdout=log,
+                                  stderr=subprocess.STDOUT, check=False)
+    finally:
+        os.unlink(tcl)
+    if proc.returncode != 0 or not out_file.is_file():
+        raise RuntimeError(f"OpenSTA dump failed for {design}, see {out_file.parent}/sta_dump.log")
+
+
+def _ranks(v: np.ndarray) -> np.ndarray:
+    r = np.empty(len(v))
+    r[np.argsort(v, kind="stable")] = np.arange(len(v))
+    return r
+
+
+def correlation(surrogate: Dict[str, float], sta: Dict[str, float], top: int = 100) -> Dict:
+    names = sorted(set(surrogate) & set(sta))
+    a = np.array([surrogate[n] for n in names])
+    b = np.array([sta[n] for n in names])
+    res = {"endpoints": len(names), "surrogate_only": len(set(surrogate) - set(sta)),
+           "sta_only": len(set(sta) - set(surrogate))}
+    if len(names) < 2:
+        return res
+    k = min(top, len(names))
+    worst_a = set(np.argsort(a)[:k].tolist())
+    worst_b = set(np.argsort(b)[:k].tolist())
+    res.update({
+        "pearson": float(np.corrcoef(a, b)[0, 1]),
+        "spearman": float(np.corrcoef(_ranks(a), _ranks(b))[0, 1]),
+        f"top{k}_overlap": len(worst_a & worst_b) / k,
+        "mae_ns": float(np.abs(a - b).mean()),
+        "wns": [float(a.min()), float(b.min())],
+        "tns": [float(np.minimum(a, 0).sum()), float(np.minimum(b, 0).sum())],
+    })
+    return res
+
+
+# ---------------- CLI ----------------
+def _random_resizes(timer: SurrogateTimer, count: int, seed: int) -> List[Resize]:
+    groups, _, _ = load_equiv_cells(str(EQUIV_CELLS))
+    members: Dict[int, List[str]] = {}
+    for cell, gid in groups.items():
+        members.setdefault(gid, []).append(cell)
+    slack = timer.pin_slacks()
+    rng = random.Random(seed)
+    candidates = []
+    for iid, master in enumerate(timer.inst_master):
+        if master in groups and len(members[groups[master]]) > 1:
+            pins = list(timer.inst_pins[iid].values())
+            if pins and np.min(slack[pins]) < 0:
+                candidates.append(iid)
+    if not candidates:
+        candidates = [i for i, m in enumerate(timer.inst_master) if m in groups]
+    moves = []
+    for _ in range(count):
+        iid = rng.choice(candidates)
+        options = [m for m in members[groups[timer.inst_master[iid]]]
+                   if m != timer.inst_master[iid] and m in timer.bank.masters]
+        if options:
+            moves.append(Resize(timer.inst_names[iid], rng.choice(options)))
+    return moves
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Surrogate static timing for move ranking.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("report", help="WNS/TNS and worst endpoints")
+    r.add_argument("-d", "--designs", nargs="+", required=True)
+    r.add_argument("-n", "--top", type=int, default=10)
+    c = sub.add_parser("correlate", help="Endpoint slacks vs. OpenSTA")
+    c.add_argument("-d", "--designs", nargs="+", default=["aes_cipher_top", "jpeg_encoder"])
+    c.add_argument("--sta", default=None, help="Existing sta_export dump (one design only)")
+    c.add_argument("--openroad", default=FLOW_OPENROAD)
+    c.add_argument("--out", default=None, help="Write the report as JSON here")
+    b = sub.add_parser("bench", help="Full propagation vs. incremental trial moves")
+    b.add_argument("-d", "--designs", nargs="+", required=True)
+    b.add_argument("--moves", type=int, default=200)
+    b.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    unknown = [d for d in args.designs if d not in SCENARIOS]
+    if unknown:
+        print(f"ERROR: unknown design(s): {' '.join(unknown)}", file=sys.stderr)
+        return 1
+    libs = load_libraries()
+    report = {}
+    for design in args.designs:
+        if not (BENCH_ROOT / design / SCENARIOS[design] / "nets.csv").is_file():
+            print(f"[WARN] {design}: no node.csv/nets.csv, skipped", file=sys.stderr)
+            continue
+        t0 = time.perf_counter()
+        timer = load_timer(design, libs=libs)
+        build_s = time.perf_counter() - t0
+        wns, tns = timer.summary()
+        print(f"===== {design}: {len(timer.x)} pins, {int(timer.e_alive.sum())} edges, "
+              f"{len(timer.lvl_ptr) - 1} levels, built in {build_s:.2f}s =====")
+        if timer.unknown_masters:
+            names = sorted(timer.unknown_masters)
+            print(f"[WARN] {len(names)} masters without Liberty (untimed): "
+                  f"{' '.join(names[:5])}{' ...' if len(names) > 5 else ''}")
+        print(f"WNS {wns:.4f} ns  TNS {tns:.3f} ns")
+
+        if args.cmd == "report":
+            slacks = timer.endpoint_slacks()
+            for name, s in sorted(slacks.items(), key=lambda kv: kv[1])[:args.top]:
+                print(f"  {s:9.4f}  {name}")
+        elif args.cmd == "bench":
+            t0 = time.perf_counter()
+            timer.update_timing()
+            full_s = time.perf_counter() - t0
+            moves = _random_resizes(timer, args.moves, args.seed)
+            t0 = time.perf_counter()
+            ranked = timer.rank([[m] for m in moves])
+            inc_s = (time.perf_counter() - t0) / max(len(moves), 1)
+            print(f"full propagation {full_s * 1e3:.1f} ms, trial move {inc_s * 1e3:.2f} ms "
+                  f"({full_s / max(inc_s, 1e-9):.0f}x), {len(moves)} moves")
+            for i, dtns, dwns in ranked[:5]:
+                print(f"  dTNS {dtns:+.4f}  dWNS {dwns:+.4f}  {moves[i].line()}")
+        else:
+            if args.sta and len(args.designs) == 1:
+                sta_file = Path(args.sta)
+            else:
+                sta_file = OUT_ROOT / "surrogate" / design / "sta_endpoints.txt"
+                try:
+                    dump_sta_slacks(design, sta_file, args.openroad)
+                except (RuntimeError, ValueError) as e:
+                    print(f"ERROR: {e}", file=sys.stderr)
+                    continue
+            res = correlation(timer.endpoint_slacks(), read_sta_slacks(sta_file))
+            report[design] = res
+            for key, value in res.items():
+                print(f"  {key:16s} {value}")
+    if args.cmd == "correlate" and args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter sweep over flow Tcl variants with successive halving.
+
+Variants are generated from a parameter space (see sweep_space.json): every
+$::env(<PARAM>) in the template is replaced by the chosen value and the
+result is written to solution/tcl/sweep/<name>/vNNN.tcl. run.sh then expands
+the remaining DESIGN_NAME/TECH_DIR/DESIGN_DIR/OUTPUT_DIR placeholders as
+usual, so a variant is just another `-t sweep/<name>/vNNN`.
+
+Designs are evaluated in rungs of increasing cost:
+  rung 0: aes_cipher_top(_v2), jpeg_encoder(_v2)
+  rung 1: ariane(_v2)
+  rung 2: bsg_chip(_v2)
+After each rung only the top 1/eta variants, ranked by the weighted S_final
+(final_score.py chip weights) over all designs seen so far, are promoted.
+With --hyperband one successive-halving bracket is run per starting rung.
+
+Every (variant, design) run is a job in a process pool and goes through the
+result cache, so re-running a sweep only pays for new variants. With
+--queue the runs are submitted to the job queue instead (job_queue.py) and
+executed by workers on any host sharing the filesystem; --workers then
+sets the slots of the worker this process runs itself (0: none).
+
+python3 sweep.py --space sweep_space.json --name rt1 --workers 8 --eta 3
+python3 sweep.py --name rt2 --queue --workers 2   # + `job_queue.py worker` elsewhere
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common import OUT_ROOT, TCL_DIR, TOOLS_DIR
+from flow_runner import run_design
+from job_queue import QUEUE_DB, JobQueue, Worker
+from result_cache import ResultCache, print_stats
+from final_score import chips as CHIP_WEIGHTS
+
+RUNGS: List[List[str]] = [
+    ["aes_cipher_top", "aes_cipher_top_v2", "jpeg_encoder", "jpeg_encoder_v2"],
+    ["ariane", "ariane_v2"],
+    ["bsg_chip", "bsg_chip_v2"],
+]
+
+
+@dataclass
+class Variant:
+    index: int
+    tcl_name: str
+    params: Dict[str, str]
+    bracket: int = 0
+    scores: Dict[str, Optional[float]] = field(default_factory=dict)
+    status: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def weighted_score(self) -> float:
+        """Weighted S_final over evaluated designs; any failed run ranks last."""
+        if any(s is None for s in self.scores.values()):
+            return float("-inf")
+        return sum(CHIP_WEIGHTS.get(d, 1.0) * s for d, s in self.scores.items())
+
+
+def load_space(path: Path) -> Tuple[str, Dict[str, List[str]]]:
+    space = json.loads(Path(path).read_text())
+    params = {k: [str(v) for v in vals] for k, vals in space["params"].items()}
+    return space["template"], params
+
+
+def expand_configs(params: Dict[str, List[str]], max_configs: Optional[int],
+                   seed: int) -> List[Dict[str, str]]:
+    """Full grid, or a random sample of it when larger than max_configs."""
+    names = sorted(params)
+    grid = [dict(zip(names, values))
+            for values in itertools.product(*(params[n] for n in names))]
+    if max_configs is not None and len(grid) > max_configs:
+        grid = random.Random(seed).sample(grid, max_configs)
+    return grid
+
+
+def render_variant(template_text: str, config: Dict[str, str]) -> str:
+    text = template_text
+    for name, value in config.items():
+        text = text.replace(f"$::env({name})", value)
+    return text
+
+
+def write_variants(name: str, template: str, configs: List[Dict[str, str]],
+                   start: int = 0, bracket: int = 0) -> List[Variant]:
+    template_text = (TCL_DIR / f"{template}.tcl").read_text()
+    var_dir = TCL_DIR / "sweep" / name
+    var_dir.mkdir(parents=True, exist_ok=True)
+    variants = []
+    for i, config in enumerate(configs, start):
+        header = "".join(f"# sweep {k} = {v}\n" for k, v in sorted(config.items()))
+        (var_dir / f"v{i:03d}.tcl").write_text(header + render_variant(template_text, config))
+        variants.append(Variant(i, f"sweep/{name}/v{i:03d}", config, bracket))
+    return variants
+
+
+def _run_job(tcl_name: str, design: str, use_cache: bool, sweep_id: str,
+             checkpoint: bool) -> Tuple[str, str, str, Optional[float], float]:
+    cache = ResultCache() if use_cache else None
+    r = run_design(design, tcl_name, cache=cache, sweep=sweep_id, checkpoint=checkpoint)
+    return tcl_name, design, r.status, r.score, r.runtime
+
+
+def _report(tcl_name: str, design: str, status: str, score: Optional[float],
+            runtime: float) -> None:
+    print(f"  {tcl_name:28s} {design:20s} {status:12s} "
+          f"S_final={'' if score is None else f'{score:.4f}'} ({runtime:.0f}s)",
+          flush=True)
+
+
+def evaluate_queued(queue: JobQueue, variants: List[Variant], designs: List[str],
+                    use_cache: bool, sweep_id: str, checkpoint: bool,
+                    poll: float = 10.0) -> None:
+    """Submit the runs to the job queue and wait for the workers to finish them."""
+    opts = {k: v for k, v in (("no_cache", not use_cache), ("checkpoint", checkpoint)) if v}
+    pending: Dict[int, Tuple[Variant, str]] = {}
+    for v in variants:
+        todo = [d for d in designs if d not in v.scores]
+        for job_id, d in zip(queue.submit(sweep_id, todo, [v.tcl_name], options=opts), todo):
+            pending[job_id] = (v, d)
+    while pending:
+        for job in queue.jobs(sweep_id, ("done", "failed", "cancelled")):
+            if job["id"] not in pending:
+                continue
+            v, d = pending.pop(job["id"])
+            status = job["status"] if job["state"] == "done" else job["state"]
+            v.scores[d] = job["score"] if job["state"] == "done" else None
+            v.status[d] = status
+            _report(v.tcl_name, d, status, v.scores[d], job["runtime"] or 0.0)
+        if pending:
+            time.sleep(poll)
+
+
+def evaluate(pool, variants: List[Variant], designs: List[str],
+             use_cache: bool, sweep_id: str, checkpoint: bool) -> None:
+    if isinstance(pool, JobQueue):
+        evaluate_queued(pool, variants, designs, use_cache, sweep_id, checkpoint)
+        return
+    by_name = {v.tcl_name: v for v in variants}
+    futures = [pool.submit(_run_job, v.tcl_name, d, use_cache, sweep_id, checkpoint)
+               for v in variants for d in designs if d not in v.scores]
+    for fut in as_completed(futures):
+        tcl_name, design, status, score, runtime = fut.result()
+        v = by_name[tcl_name]
+        v.scores[design] = score
+        v.status[design] = status
+        _report(tcl_name, design, status, score, runtime)
+
+
+def successive_halving(pool, variants: List[Variant],
+                       rungs: List[List[str]], eta: float, use_cache: bool,
+                       sweep_id: str, checkpoint: bool = False) -> List[Variant]:
+    alive = list(variants)
+    for r, designs in enumerate(rungs):
+        print(f"[SWEEP] rung {r}: {len(alive)} variants x {len(designs)} designs "
+              f"({', '.join(designs)})", flush=True)
+        evaluate(pool, alive, designs, use_cache, sweep_id, checkpoint)
+        alive.sort(key=lambda v: v.weighted_score, reverse=True)
+        if r < len(rungs) - 1:
+            keep = max(1, int(math.floor(len(alive) / eta)))
+            alive = alive[:keep]
+    return alive
+
+
+def hyperband_plans(rungs: List[List[str]], max_configs: int,
+                    eta: float) -> List[Tuple[int, List[List[str]]]]:
+    """One bracket per starting rung; later brackets start with fewer variants
+    evaluated on all cheaper designs at once."""
+    plans = []
+    for s in range(len(rungs)):
+        n = max(1, int(math.ceil(max_configs * eta ** (-s))))
+        first = [d for rung in rungs[:s + 1] for d in rung]
+        plans.append((n, [first] + rungs[s + 1:]))
+    return plans
+
+
+def write_results(path: Path, variants: List[Variant]) -> None:
+    designs = [d for rung in RUNGS for d in rung]
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["variant", "bracket", "params", "weighted_score"] + designs)
+        for v in sorted(variants, key=lambda v: v.weighted_score, reverse=True):
+            w.writerow([v.tcl_name, v.bracket, json.dumps(v.params, sort_keys=True),
+                        v.weighted_score]
+                       + ["" if v.scores.get(d) is None else v.scores[d] for d in designs])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Successive-halving sweep over Tcl variants.")
+    ap.add_argument("--space", default=str(TOOLS_DIR / "sweep_space.json"))
+    ap.add_argument("--name", default=time.strftime("sweep_%Y%m%d_%H%M%S"))
+    ap.add_argument("--max-configs", type=int, default=None,
+                    help="Randomly sample at most this many variants from the grid")
+    ap.add_argument("--eta", type=float, default=3.0, help="Keep the top 1/eta per rung")
+    ap.add_argument("--hyperband", action="store_true")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--odb", action="store_true", help="Start flows from ODB checkpoints")
+    ap.add_argument("--queue", nargs="?", const=str(QUEUE_DB), default=None, metavar="DB",
+                    help="Run through the multi-host job queue (default db: %(const)s)")
+    args = ap.parse_args()
+
+    template, params = load_space(Path(args.space))
+    if not (TCL_DIR / f"{template}.tcl").is_file():
+        print(f"ERROR: template not found: {TCL_DIR / template}.tcl", file=sys.stderr)
+        return 2
+
+    use_cache = not args.no_cache
+    sweep_id = args.name
+    all_variants: List[Variant] = []
+    t0 = time.time()
+
+    local_worker = None
+    if args.queue:
+        pool = JobQueue(Path(args.queue))
+        if args.workers > 0:
+            local_worker = Worker(Path(args.queue), slots=args.workers, sweep=sweep_id)
+            threading.Thread(target=local_worker.run, daemon=True).start()
+    else:
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+
+    try:
+        if args.hyperband:
+            total = args.max_configs or len(expand_configs(params, None, args.seed))
+            plans = hyperband_plans(RUNGS, total, args.eta)
+            configs = expand_configs(params, None, args.seed)
+            random.Random(args.seed).shuffle(configs)
+            start = 0
+            for bracket, (n, plan) in enumerate(plans):
+                chosen = [configs[(start + i) % len(configs)] for i in range(n)]
+                variants = write_variants(args.name, template, chosen, start, bracket)
+                start += n
+                all_variants += variants
+                print(f"[SWEEP] bracket {bracket}: {n} variants", flush=True)
+                successive_halving(pool, variants, plan, args.eta, use_cache, sweep_id,
+                                   args.odb)
+        else:
+            configs = expand_configs(params, args.max_configs, args.seed)
+            all_variants = write_variants(args.name, template, configs)
+            successive_halving(pool, all_variants, RUNGS, args.eta, use_cache, sweep_id,
+                               args.odb)
+    finally:
+        if local_worker is not None:
+            local_worker.stop.set()
+        if isinstance(pool, ProcessPoolExecutor):
+            pool.shutdown()
+
+    out_dir = OUT_ROOT / "sweep" / args.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results_csv = out_dir / "sweep_results.csv"
+    write_results(results_csv, all_variants)
+
+    full = [v for v in all_variants if all(d in v.scores for rung in RUNGS for d in rung)]
+    ranked = sorted(full or all_variants, key=lambda v: v.weighted_score, reverse=True)
+    print("===== SWEEP RESULT =====")
+    for v in ranked[:5]:
+        print(f"{v.tcl_name:28s} {v.weighted_score:12.4f}  {json.dumps(v.params, sort_keys=True)}")
+    print(f"results: {results_csv}")
+    print(f"elapsed: {time.time() - t0:.0f}s")
+    if use_cache:
+        print_stats(ResultCache(), sweep_id)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
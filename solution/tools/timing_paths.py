@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Columnar database of setup paths from OpenSTA path reports.
+
+Parses `report_checks -format full_clock_expanded` output, which
+`sta_export_paths` in solution/tcl/util/sta_export.tcl writes for the
+worst N endpoints with the slew/cap/fanout/net columns, into flat NumPy
+columns:
+
+- paths:  startpoint, endpoint, group, slack, arrival, required, and the
+          range of their stages
+- stages: one row per pin of the data path (launch clock network left
+          out): instance, pin, cell, net, rise/fall, incremental delay,
+          arrival, slew, load cap, fanout, and whether the pin drives the
+          net (output pin: the delay is the cell arc) or is a sink (input
+          pin: the delay is the wire)
+
+Names are interned into tables (instances, pins, cells, nets, ...), so
+the queries below are array operations: the worst paths through a net or
+an instance, stage-delay histograms per cell, and the cells that show up
+on most failing paths. Columns of a parsed report are cached in
+CACHE_ROOT/paths keyed by the file digest (bincache.py), so a report is
+parsed once.
+
+Names are as in node.csv / nets.csv (Verilog escapes dropped).
+
+python3 timing_paths.py dump -d aes_cipher_top -o paths.rpt         # runs OpenROAD
+python3 timing_paths.py summary paths.rpt
+python3 timing_paths.py net paths.rpt <net> -n 5
+python3 timing_paths.py hist paths.rpt --kind cell --cell BUFx2_ASAP7_75t_R
+python3 timing_paths.py cells paths.rpt -n 20 --by master
+"""
+
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bincache import read_arrays, write_arrays
+from common import CACHE_ROOT, FLOW_OPENROAD, SCENARIOS, DigestMemo
+from parse_log import open_text
+
+PATHS_CACHE_VERSION = 1
+PATHS_CACHE = CACHE_ROOT / "paths"
+
+_HEAD_RE = re.compile(r"^(Startpoint|Endpoint|Path Group|Path Type):\s*(\S+)")
+_PIN_RE = re.compile(r"^(\S+) \(([^)\s]+)\)$")
+_TOKEN_RE = re.compile(r"\S+")
+PORT_CELLS = {"in", "out", "inout"}
+# Stage columns filled from the report header (lower-cased header words).
+NUMERIC = ("delay", "time", "slew", "cap", "fanout")
+TABLES = ("inst", "pin", "cell", "net", "point")
+
+
+@dataclass
+class TimingPaths:
+    """Flat path/stage columns; *_names are the string tables of the codes."""
+    # per path
+    startpoint: np.ndarray       # int32 into point_names
+    endpoint: np.ndarray
+    group: np.ndarray            # int32 into group_names
+    slack: np.ndarray            # float64 ns
+    arrival: np.ndarray
+    required: np.ndarray
+    stage_ptr: np.ndarray        # int64 [n_paths + 1]
+    # per stage
+    stage_path: np.ndarray       # int32
+    inst: np.ndarray             # int32 into inst_names (port name for I/O rows)
+    pin: np.ndarray              # int32 into pin_names ("" for ports)
+    cell: np.ndarray             # int32 into cell_names ("in"/"out" for ports)
+    net: np.ndarray              # int32 into net_names, -1 if not reported
+    rise: np.ndarray             # bool
+    driver: np.ndarray           # bool, pin drives the next net
+    delay: np.ndarray            # float64 ns, NaN if not reported
+    time: np.ndarray
+    slew: np.ndarray
+    cap: np.ndarray
+    fanout: np.ndarray           # int32, -1 if not reported
+    # string tables
+    inst_names: np.ndarray
+    pin_names: np.ndarray
+    cell_names: np.ndarray
+    net_names: np.ndarray
+    point_names: np.ndarray
+    group_names: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.slack)
+
+    def code(self, table: str, name: str) -> int:
+        """Code of name in one of the tables (inst, pin, cell, net, point, group); -1 if absent."""
+        names = getattr(self, f"{table}_names")
+        hit = np.flatnonzero(names == name)
+        return int(hit[0]) if hit.size else -1
+
+    def stages(self, p: int) -> slice:
+        return slice(int(self.stage_ptr[p]), int(self.stage_ptr[p + 1]))
+
+    def _worst(self, mask: np.ndarray, top: int) -> np.ndarray:
+        paths = np.unique(self.stage_path[mask])
+        return paths[np.argsort(self.slack[paths], kind="stable")][:top]
+
+    def through_net(self, net: str, top: int = 10) -> np.ndarray:
+        """Worst paths (ids, worst first) with a stage on net."""
+        return self._worst(self.net == self.code("net", net), top)
+
+    def through_inst(self, inst: str, top: int = 10) -> np.ndarray:
+        return self._worst(self.inst == self.code("inst", inst), top)
+
+    def delay_histogram(self, bins: int = 20, kind: str = "cell", cell: Optional[str] = None,
+                        failing: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """np.histogram of stage delays: cell arcs (kind "cell", driver rows) or wires
+        ("net", sink rows), optionally of one cell and of failing paths only."""
+        mask = self.driver if kind == "cell" else ~self.driver
+        mask = mask & np.isfinite(self.delay)
+        if cell is not None:
+            mask &= self.cell == self.code("cell", cell)
+        if failing:
+            mask &= self.slack[self.stage_path] < 0
+        return np.histogram(self.delay[mask], bins=bins)
+
+    def failing_cells(self, top: int = 20, by: str = "master",
+                      threshold: float = 0.0) -> List[Tuple[str, int, float, float]]:
+        """(name, failing paths through it, worst slack, total cell delay on them) for
+        the masters (by="master") or instances (by="inst") on most paths with
+        slack < threshold; each path counts once per name."""
+        mask = self.driver & (self.slack[self.stage_path] < threshold)
+        keys = (self.cell if by == "master" else self.inst)[mask]
+        names = self.cell_names if by == "master" else self.inst_names
+        paths = self.stage_path[mask].astype(np.int64)
+        pair = np.unique(paths * len(names) + keys)
+        count = np.bincount(pair % len(names), minlength=len(names))
+        worst = np.full(len(names), np.inf)
+        np.minimum.at(worst, keys, self.slack[paths])
+        delay = np.bincount(keys, weights=np.nan_to_num(self.delay[mask]), minlength=len(names))
+        order = np.argsort(-count, kind="stable")[:top]
+        return [(str(names[k]), int(count[k]), float(worst[k]), float(delay[k]))
+                for k in order if count[k]]
+
+    def path_lines(self, p: int) -> List[str]:
+        s = self.stages(p)
+        out = [f"{self.slack[p]:9.4f}  {self.point_names[self.startpoint[p]]} -> "
+               f"{self.point_names[self.endpoint[p]]}  ({self.group_names[self.group[p]]})"]
+        for i in range(s.start, s.stop):
+            name = self.inst_names[self.inst[i]]
+            if self.pin_names[self.pin[i]]:
+                name = f"{name}/{self.pin_names[self.pin[i]]}"
+            net = self.net_names[self.net[i]] if self.net[i] >= 0 else ""
+            out.append(f"    {self.delay[i]:8.4f} {self.time[i]:8.4f} {'^' if self.rise[i] else 'v'} "
+                       f"{name} ({self.cell_names[self.cell[i]]}) {net}")
+        return out
+
+
+# ---------------- parser ----------------
+class _Interner:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def __call__(self, name: str) -> int:
+        code = self.index.get(name)
+        if code is None:
+            code = self.index[name] = len(self.index)
+        return code
+
+    def table(self) -> np.ndarray:
+        return np.array(list(self.index), dtype=bytes) if self.index else np.zeros(0, dtype="S1")
+
+
+def _columns(header: str) -> Tuple[int, List[Tuple[str, int]]]:
+    """(start of Description, [(column, right edge)]) of a report header line."""
+    desc = header.index("Description")
+    return desc, [(m.group(0).lower(), m.end()) for m in _TOKEN_RE.finditer(header[:desc])]
+
+
+def _row(line: str, desc: int, cols: List[Tuple[str, int]]):
+    """(values by column, edge '^'/'v'/'', description) of one report row."""
+    values, edge = {}, ""
+    for m in _TOKEN_RE.finditer(line[:desc]):
+        tok = m.group(0)
+        if tok in ("^", "v"):
+            edge = tok
+            continue
+        # Numbers are right-aligned under their header word.
+        name = min(cols, key=lambda c: abs(c[1] - m.end()))[0]
+        try:
+            values[name] = float(tok)
+        except ValueError:
+            pass
+    return values, edge, line[desc:].strip()
+
+
+def parse_report(path: Path) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, arrays) of a report_checks dump; strings are kept as bytes for the cache."""
+    tables = {t: _Interner() for t in TABLES + ("group",)}
+    p_cols = {k: [] for k in ("startpoint", "endpoint", "group", "slack", "arrival",
+                              "required", "stage_ptr")}
+    s_cols = {k: [] for k in ("stage_path", "inst", "pin", "cell", "net", "rise", "driver")
+              + NUMERIC}
+    head: Dict[str, str] = {}
+    desc, cols = 0, []
+    phase = None               # None, "arrival", "required"
+    started = False
+    pending_net = -1           # net row seen, applies to the next (sink) pin
+
+    def end_path(slack: float) -> None:
+        p_cols["startpoint"].append(tables["point"](head.get("Startpoint", "")))
+        p_cols["endpoint"].append(tables["point"](head.get("Endpoint", "")))
+        p_cols["group"].append(tables["group"](head.get("Path Group", "")))
+        p_cols["slack"].append(slack)
+        p_cols["stage_ptr"].append(len(s_cols["inst"]))
+
+    with open_text(path, errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            m = _HEAD_RE.match(line)
+            if m:
+                if m.group(1) == "Startpoint":
+                    head = {}
+                    phase = None
+                head[m.group(1)] = m.group(2).replace("\\", "")
+                continue
+            if "Description" in line and "Time" in line:
+                desc, cols = _columns(line)
+                continue
+            if line.startswith("---"):
+                if phase is None and "Startpoint" in head and cols:
+                    phase = "arrival"
+                    started = False
+                    pending_net = -1
+                    p_cols["arrival"].append(np.nan)
+                    p_cols["required"].append(np.nan)
+                continue
+            if phase is None or not line.strip():
+                continue
+            values, edge, text = _row(line, desc, cols)
+            if text.startswith("slack"):
+                end_path(values.get("time", np.nan))
+                phase = None
+                continue
+            if text == "data arrival time":
+                if phase == "arrival":
+                    p_cols["arrival"][-1] = values.get("time", np.nan)
+                    phase = "required"
+                continue
+            if text == "data required time":
+                if np.isnan(p_cols["required"][-1]):
+                    p_cols["required"][-1] = values.get("time", np.nan)
+                continue
+            if phase != "arrival":
+                continue
+            m = _PIN_RE.match(text)
+            if not m:
+                continue
+            name, cell = m.group(1).replace("\\", ""), m.group(2)
+            if cell == "net":
+                if started:
+                    net = tables["net"](name)
+                    s_cols["net"][-1] = net
+                    s_cols["driver"][-1] = True
+                    for key in ("cap", "fanout"):
+                        if key in values:
+                            s_cols[key][-1] = values[key]
+                    pending_net = net
+                continue
+            if cell in PORT_CELLS:
+                inst, pin = name, ""
+            else:
+                inst, _, pin = name.rpartition("/")
+            if not started:
+                if head.get("Startpoint") not in (name, inst):
+                    continue
+                started = True
+            s_cols["stage_path"].append(len(p_cols["slack"]))
+            s_cols["inst"].append(tables["inst"](inst))
+            s_cols["pin"].append(tables["pin"](pin))
+            s_cols["cell"].append(tables["cell"](cell))
+            s_cols["net"].append(pending_net)
+            s_cols["rise"].append(edge == "^")
+            s_cols["driver"].append(False)
+            for key in NUMERIC:
+                s_cols[key].append(values.get(key, -1 if key == "fanout" else np.nan))
+            pending_net = -1
+
+    n = len(p_cols["slack"])
+    n_stages = p_cols["stage_ptr"][-1] if n else 0
+    # A path cut short (no slack line) drops its stages.
+    for key in s_cols:
+        del s_cols[key][n_stages:]
+    arrays = {
+        "startpoint": np.array(p_cols["startpoint"], dtype=np.int32),
+        "endpoint": np.array(p_cols["endpoint"], dtype=np.int32),
+        "group": np.array(p_cols["group"], dtype=np.int32),
+        "slack": np.array(p_cols["slack"], dtype=np.float64),
+        "arrival": np.array(p_cols["arrival"][:n], dtype=np.float64),
+        "required": np.array(p_cols["required"][:n], dtype=np.float64),
+        "stage_ptr": np.array([0] + p_cols["stage_ptr"], dtype=np.int64),
+        "stage_path": np.array(s_cols["stage_path"], dtype=np.int32),
+        "inst": np.array(s_cols["inst"], dtype=np.int32),
+        "pin": np.array(s_cols["pin"], dtype=np.int32),
+        "cell": np.array(s_cols["cell"], dtype=np.int32),
+        "net": np.array(s_cols["net"], dtype=np.int32),
+        "rise": np.array(s_cols["rise"], dtype=bool),
+        "driver": np.array(s_cols["driver"], dtype=bool),
+        "fanout": np.array(s_cols["fanout"], dtype=np.int32),
+    }
+    for key in ("delay", "time", "slew", "cap"):
+        arrays[key] = np.array(s_cols[key], dtype=np.float64)
+    for t, interner in tables.items():
+        arrays[f"{t}_names"] = interner.table()
+    return {"paths": n}, arrays
+
+
+def _build(arrays: Dict[str, np.ndarray]) -> TimingPaths:
+    cols = {k: (v.astype(str) if k.endswith("_names") else np.asarray(v))
+            for k, v in arrays.items()}
+    return TimingPaths(**cols)
+
+
+def read_paths(path: Path) -> TimingPaths:
+    return _build(parse_report(path)[1])
+
+
+def load_paths(path: Path, use_cache: bool = True) -> TimingPaths:
+    """read_paths() through the binary cache."""
+    path = Path(path)
+    if not use_cache:
+        return read_paths(path)
+    memo = DigestMemo(PATHS_CACHE / "digests.json")
+    digest = memo.digest(path)
+    memo.save()
+    cached = PATHS_CACHE / f"{digest[:24]}.bin"
+    try:
+        _, arrays = read_arrays(cached, kind="paths", version=PATHS_CACHE_VERSION, key=digest)
+    except (OSError, ValueError):
+        meta, arrays = parse_report(path)
+        write_arrays(cached, arrays, meta, kind="paths", version=PATHS_CACHE_VERSION, key=digest)
+    return _build(arrays)
+
+
+# ---------------- CLI ----------------
+def main():
+    ap = argparse.ArgumentParser(description="Columnar setup-path database.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dump", help="Write the path report of a benchmark with OpenROAD")
+    d.add_argument("-d", "--design", required=True)
+    d.add_argument("-o", "--out", required=True)
+    d.add_argument("--openroad", default=FLOW_OPENROAD)
+    s = sub.add_parser("summary", help="Paths, stages and the worst paths")
+    s.add_argument("-n", "--top", type=int, default=5)
+    t = sub.add_parser("net", help="Worst paths through a net")
+    t.add_argument("name")
+    t.add_argument("-n", "--top", type=int, default=5)
+    i = sub.add_parser("inst", help="Worst paths through an instance")
+    i.add_argument("name")
+    i.add_argument("-n", "--top", type=int, default=5)
+    h = sub.add_parser("hist", help="Stage-delay histogram")
+    h.add_argument("--kind", choices=("cell", "net"), default="cell")
+    h.add_argument("--cell", default=None, help="Only stages of this master")
+    h.add_argument("--bins", type=int, default=20)
+    h.add_argument("--failing", action="store_true", help="Only paths with negative slack")
+    c = sub.add_parser("cells", help="Cells on most failing paths")
+    c.add_argument("-n", "--top", type=int, default=20)
+    c.add_argument("--by", choices=("master", "inst"), default="master")
+    c.add_argument("--threshold", type=float, default=0.0, help="Failing below this slack (ns)")
+    for p in (s, t, i, h, c):
+        p.add_argument("report", help="sta_export_paths / report_checks output")
+        p.add_argument("--no-cache", action="store_true")
+    args = ap.parse_args()
+
+    if args.cmd == "dump":
+        from surrogate_sta import dump_sta_slacks
+        if args.design not in SCENARIOS:
+            print(f"ERROR: unknown design: {args.design}", file=sys.stderr)
+            return 1
+        try:
+            dump_sta_slacks(args.design, Path(args.out).resolve(), args.openroad,
+                            export="sta_export_paths")
+        except RuntimeError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        print(f"wrote {args.out}")
+        return 0
+
+    if not Path(args.report).is_file():
+        print(f"ERROR: file not found: {args.report}", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    db = load_paths(Path(args.report), use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - t0
+    if not len(db):
+        print(f"ERROR: no paths in {args.report}", file=sys.stderr)
+        return 1
+
+    if args.cmd == "summary":
+        failing = db.slack < 0
+        print(f"{len(db)} paths ({int(failing.sum())} failing), {len(db.inst)} stages, "
+              f"{len(db.net_names)} nets, {len(db.cell_names)} cells ({elapsed:.2f}s)")
+        print(f"WNS {db.slack.min():.4f} ns  TNS {np.minimum(db.slack, 0).sum():.4f} ns")
+        for p in np.argsort(db.slack, kind="stable")[:args.top]:
+            print("\n".join(db.path_lines(int(p))))
+    elif args.cmd in ("net", "inst"):
+        found = db.through_net(args.name, args.top) if args.cmd == "net" else \
+            db.through_inst(args.name, args.top)
+        if not found.size:
+            print(f"ERROR: no path through {args.cmd} {args.name}", file=sys.stderr)
+            return 1
+        for p in found:
+            print("\n".join(db.path_lines(int(p))))
+    elif args.cmd == "hist":
+        counts, edges = db.delay_histogram(args.bins, args.kind, args.cell, args.failing)
+        top = max(int(counts.max()), 1) if counts.size else 1
+        for k, n in enumerate(counts):
+            print(f"  {edges[k]:8.4f} .. {edges[k + 1]:8.4f}  {n:7d}  {'#' * (50 * n // top)}")
+    else:
+        print(f"  {'paths':>6s}  {'worst':>8s}  {'delay':>8s}  {args.by}")
+        for name, count, worst, delay in db.failing_cells(args.top, args.by, args.threshold):
+            print(f"  {count:6d}  {worst:8.4f}  {delay:8.4f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())